@@ -67,6 +67,7 @@ def get_local_path(
     access_token=None,
     download_resources=True,
     task_id=None,
+    downloader=None,
 ):
     f"""This helper function is used to download (cache) url and return local path to it.
 
@@ -81,6 +82,7 @@ def get_local_path(
     :param download_resources: Download and cache a file from URL
     :param task_id: Synapse Task ID, required for cloud storage files 
       because the URL will be rebuilt to `{hostname}/tasks/{task_id}/presign/?fileuri={url}` 
+    :param downloader: ResourceDownloader used to fetch remote files through its shared content cache
 
     :return: filepath
     """
@@ -186,6 +188,7 @@ def get_local_path(
         access_token,
         is_local_storage_file,
         is_cloud_storage_file,
+        downloader=downloader,
     )
     return filepath
 
@@ -198,6 +201,7 @@ def download_and_cache(
     access_token,
     is_local_storage_file,
     is_cloud_storage_file,
+    downloader=None,
 ):
     # File specified by remote URL - download and cache it
     cache_dir = cache_dir or get_cache_dir()
@@ -238,6 +242,10 @@ def download_and_cache(
                 else:
                     headers["Authorization"] = "Token " + access_token
                 logger.debug("Authorization token is used for download_and_cache")
+            if downloader is not None:
+                downloader.fetch(url, target=filepath, headers=headers)
+                logger.info(f"File downloaded to {filepath}")
+                return filepath
             try:
                 r = requests.get(url, stream=True, headers=headers, verify=VERIFY_SSL)
                 r.raise_for_status()
@@ -248,7 +256,8 @@ def download_and_cache(
                 )
                 raise e
             with io.open(filepath, mode="wb") as fout:
-                fout.write(r.content)
+                for chunk in r.iter_content(chunk_size=1024 * 1024):
+                    fout.write(chunk)
                 logger.info(f"File downloaded to {filepath}")
     return filepath
 
@@ -33,6 +33,8 @@ import uuid
 import numpy as np
 import logging
 
+from functools import partial
+
 from PIL import Image
 from collections import defaultdict
 from itertools import groupby
@@ -66,42 +68,81 @@ def bytes2bit(data):
     return "".join([str(access_bit(data, i)) for i in range(len(data) * 8)])
 
 
+class BitReader:
+    """Read big-endian bit fields straight from a byte buffer
+
+    Each read takes a 64-bit window starting at the byte that holds the
+    current bit, so fields up to 57 bits wide are read in O(1) without
+    expanding the buffer into a bit string.
+    """
+
+    def __init__(self, data):
+        # pad so that the last window never runs past the end of the buffer
+        self.data = bytes(data) + b"\x00" * 8
+        self.i = 0
+
+    def read(self, size):
+        pos = self.i
+        self.i = pos + size
+        window = int.from_bytes(self.data[pos >> 3 : (pos >> 3) + 8], "big")
+        return (window >> (64 - (pos & 7) - size)) & ((1 << size) - 1)
+
+
 def decode_rle(rle, print_params: bool = False):
     """from Synapse RLE to numpy uint8 3d image [width, height, channel]
 
+    Runs are collected as (value, length) pairs while parsing and expanded
+    in one vectorized np.repeat.
+
     Args:
         print_params (bool, optional): If true, a RLE parameters print statement is suppressed
     """
-    input = InputStream(bytes2bit(rle))
-    num = input.read(32)
-    word_size = input.read(5) + 1
-    rle_sizes = [input.read(4) + 1 for _ in range(4)]
+    reader = BitReader(rle)
+    read = reader.read
+    num = read(32)
+    word_size = read(5) + 1
+    rle_sizes = [read(4) + 1 for _ in range(4)]
 
     if print_params:
         print(
             "RLE params:", num, "values", word_size, "word_size", rle_sizes, "rle_sizes"
         )
 
+    values = []
+    lengths = []
     i = 0
-    out = np.zeros(num, dtype=np.uint8)
     while i < num:
-        x = input.read(1)
-        j = i + 1 + input.read(rle_sizes[input.read(2)])
+        x = read(1)
+        j = i + 1 + read(rle_sizes[read(2)])
         if x:
-            val = input.read(word_size)
-            out[i:j] = val
-            i = j
+            values.append(read(word_size))
+            lengths.append(j - i)
         else:
-            while i < j:
-                val = input.read(word_size)
-                out[i] = val
-                i += 1
-    return out
+            for _ in range(j - i):
+                values.append(read(word_size))
+                lengths.append(1)
+        i = j
 
+    out = np.repeat(np.array(values, dtype=np.uint8), lengths)
+    return out[:num]
 
-def decode_from_annotation(from_name, results):
-    """from Synapse annotation to {"tag_name + label_name": [numpy uint8 image (width x height)]}"""
-    layers = {}
+
+def decode_rle_batch(rles, processes=None):
+    """Decode many Synapse RLEs, optionally across a process pool
+
+    :param rles: iterable of RLEs (lists of ints or bytes)
+    :param processes: number of worker processes, None or 1 decodes in this process
+    :return: list of numpy uint8 arrays in the same order as rles
+    """
+    return _map(decode_rle, rles, processes)
+
+
+def decode_from_annotation(from_name, results, processes=None):
+    """from Synapse annotation to {"tag_name + label_name": [numpy uint8 image (width x height)]}
+
+    :param processes: decode the regions across this many processes (see decode_rle_batch)
+    """
+    regions = []
     counters = defaultdict(int)
     for result in results:
         key = (
@@ -112,7 +153,6 @@ def decode_from_annotation(from_name, results):
         if key is None or "rle" not in result:
             continue
 
-        rle = result["rle"]
         width = result["original_width"]
         height = result["original_height"]
         labels = result[key] if key in result else ["no_label"]
@@ -123,7 +163,12 @@ def decode_from_annotation(from_name, results):
         counters[name] += 1
         name += "-" + i
 
-        image = decode_rle(rle)
+        regions.append((name, result["rle"], width, height))
+
+    images = decode_rle_batch([rle for _, rle, _, _ in regions], processes=processes)
+
+    layers = {}
+    for (name, _, width, height), image in zip(regions, images):
         layers[name] = np.reshape(image, [height, width, 4])[:, :, 3]
     return layers
 
@@ -245,104 +290,117 @@ def encode_rle(arr, wordsize=8, rle_sizes=[3, 4, 8, 16]):
     :type rle: list
 
     """
-    # Set length of array in 32 bits
-    num = len(arr)
-    numbits = f"{num:032b}"
-
-    # put in the wordsize in bits
-    wordsizebits = f"{wordsize - 1:05b}"
-
-    # put rle sizes in the bits
-    rle_bits = "".join([f"{x - 1:04b}" for x in rle_sizes])
-
-    # combine it into base string
-    base_str = numbits + wordsizebits + rle_bits
-
-    # start with creating the rle bite string
-    out_str = ""
-    for length_reeks, p, value in zip(*base_rle_encode(arr)):
-        # TODO: A nice to have but --> this can be optimized but works
-        if length_reeks == 1:
-            # we state with the first 0 that it has a length of 1
-            out_str += "0"
-            # We state now the index on the rle sizes
-            out_str += "00"
+    arr = np.asarray(arr).ravel()
+    if len(arr) == 0:
+        return _encode_runs(0, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), wordsize, rle_sizes)
 
-            # the rle size value is 0 for an individual number
-            out_str += "000"
+    run_lengths, _, values = base_rle_encode(arr)
+    return _encode_runs(len(arr), run_lengths, values, wordsize, rle_sizes)
 
-            # put the value in a 8 bit string
-            out_str += f"{value:08b}"
-            state = "single_val"
 
-        elif length_reeks > 1:
-            state = "series"
-            # rle size = 3
-            if length_reeks <= 8:
-                # Starting with a 1 indicates that we have started a series
-                out_str += "1"
+# Number of bit fields expanded at once, bounds the temporary arrays in _fields_to_bits
+_FIELDS_PER_CHUNK = 1 << 20
 
-                # index in rle size arr
-                out_str += "00"
 
-                # length of array to bits
-                out_str += f"{length_reeks - 1:03b}"
+def _fields_to_bits(values, widths):
+    """Expand big-endian bit fields of the given widths into a uint8 array of 0/1"""
+    chunks = []
+    for start in range(0, len(values), _FIELDS_PER_CHUNK):
+        chunk_values = values[start : start + _FIELDS_PER_CHUNK]
+        chunk_widths = widths[start : start + _FIELDS_PER_CHUNK]
 
-                out_str += f"{value:08b}"
+        field = np.repeat(np.arange(len(chunk_widths)), chunk_widths)
+        field_start = np.cumsum(chunk_widths) - chunk_widths
+        offset = np.arange(len(field)) - field_start[field]
+        shift = chunk_widths[field] - 1 - offset
+        chunks.append(((chunk_values[field] >> shift) & 1).astype(np.uint8))
 
-            # rle size = 4
-            elif 8 < length_reeks <= 16:
-                # Starting with a 1 indicates that we have started a series
-                out_str += "1"
-                out_str += "01"
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.uint8)
 
-                # length of array to bits
-                out_str += f"{length_reeks - 1:04b}"
 
-                out_str += f"{value:08b}"
+def _encode_runs(num, run_lengths, values, wordsize=8, rle_sizes=(3, 4, 8, 16)):
+    """Write runs as Synapse RLE bytes
 
-            # rle size = 8
-            elif 16 < length_reeks <= 256:
-                # Starting with a 1 indicates that we have started a series
-                out_str += "1"
+    Every run becomes one block: a single value is a literal block of size 1
+    (flag 0, size index 0), a longer run a repeat block (flag 1) using the
+    smallest size index that fits. Runs longer than the smaller sizes use the
+    last size and are split into blocks of at most 2 ** rle_sizes[-1].
 
-                out_str += "10"
-
-                # length of array to bits
-                out_str += f"{length_reeks - 1:08b}"
-
-                out_str += f"{value:08b}"
+    :param num: total number of values
+    :param run_lengths: length of every run
+    :param values: value of every run
+    :return rle: list of ints (bytes)
+    """
+    run_lengths = np.asarray(run_lengths, dtype=np.int64)
+    values = np.asarray(values).astype(np.int64)
+    rle_sizes = list(rle_sizes)
+    last = len(rle_sizes) - 1
+
+    # size index of each run: smallest one that fits, the last one otherwise
+    size_index = np.full(len(run_lengths), last, dtype=np.int64)
+    for k in reversed(range(last)):
+        size_index[run_lengths <= 2 ** rle_sizes[k]] = k
+
+    # long runs are split into blocks of max_block, the remainder goes last
+    max_block = 2 ** rle_sizes[last]
+    blocks_per_run = np.where(size_index == last, -(-run_lengths // max_block), 1)
+    block_run = np.repeat(np.arange(len(run_lengths)), blocks_per_run)
+    block_pos = np.arange(len(block_run)) - np.repeat(np.cumsum(blocks_per_run) - blocks_per_run, blocks_per_run)
+    is_last_block = block_pos == blocks_per_run[block_run] - 1
+    block_length = np.where(is_last_block, run_lengths[block_run] - block_pos * max_block, max_block)
+
+    block_index = size_index[block_run]
+    n_blocks = len(block_run)
+
+    # four fields per block: repeat flag, size index, length - 1, value
+    field_values = np.empty(n_blocks * 4, dtype=np.int64)
+    field_values[0::4] = run_lengths[block_run] > 1
+    field_values[1::4] = block_index
+    field_values[2::4] = block_length - 1
+    field_values[3::4] = values[block_run]
+
+    field_widths = np.empty(n_blocks * 4, dtype=np.int64)
+    field_widths[0::4] = 1
+    field_widths[1::4] = 2
+    field_widths[2::4] = np.asarray(rle_sizes, dtype=np.int64)[block_index]
+    field_widths[3::4] = wordsize
+
+    # header: number of values, word size and rle sizes
+    header_values = np.array([num, wordsize - 1] + [x - 1 for x in rle_sizes], dtype=np.int64)
+    header_widths = np.array([32, 5] + [4] * len(rle_sizes), dtype=np.int64)
+
+    bits = _fields_to_bits(
+        np.concatenate([header_values, field_values]),
+        np.concatenate([header_widths, field_widths]),
+    )
 
-            # rle size = 16 or longer
-            else:
-                length_temp = length_reeks
-                while length_temp > 2**16:
-                    # Starting with a 1 indicates that we have started a series
-                    out_str += "1"
+    # make sure that we have an 8 fold length, otherwise add 0's at the end
+    nzfill = 8 - len(bits) % 8
+    bits = np.concatenate([bits, np.zeros(nzfill, dtype=np.uint8)])
 
-                    out_str += "11"
-                    out_str += f"{2 ** 16 - 1:016b}"
+    return np.packbits(bits).tolist()
 
-                    out_str += f"{value:08b}"
-                    length_temp -= 2**16
 
-                # Starting with a 1 indicates that we have started a series
-                out_str += "1"
+def encode_rle_batch(arrays, processes=None, wordsize=8, rle_sizes=[3, 4, 8, 16]):
+    """Encode many 1d arrays to rle, optionally across a process pool
 
-                out_str += "11"
-                # length of array to bits
-                out_str += f"{length_temp - 1:016b}"
+    :param arrays: iterable of flattened np.arrays (see encode_rle)
+    :param processes: number of worker processes, None or 1 encodes in this process
+    :return: list of RLEs in the same order as arrays
+    """
+    return _map(partial(encode_rle, wordsize=wordsize, rle_sizes=rle_sizes), arrays, processes)
 
-                out_str += f"{value:08b}"
 
-    # make sure that we have an 8 fold lenght otherwise add 0's at the end
-    nzfill = 8 - len(base_str + out_str) % 8
-    total_str = base_str + out_str
-    total_str = total_str + nzfill * "0"
+def _map(func, items, processes=None):
+    """Map func over items, in a process pool if processes > 1"""
+    items = list(items)
+    if not processes or processes <= 1 or len(items) < 2:
+        return [func(item) for item in items]
 
-    rle = bits2byte(total_str)
+    from multiprocessing import Pool
 
-    return rle
+    with Pool(processes=min(processes, len(items))) as pool:
+        return pool.map(func, items)
 
 
 def contour2rle(contours, contour_id, img_width, img_height):
@@ -375,10 +433,30 @@ def mask2rle(mask):
     """
     assert len(mask.shape) == 2, "mask must be 2D np.array"
     assert mask.dtype == np.uint8 or mask.dtype == int, "mask must be uint8 or int"
+    return _encode_mask(mask)
+
+
+def mask2rle_batch(masks, processes=None):
+    """Convert many masks to RLE, optionally across a process pool
+
+    :param masks: iterable of 2D uint8 or int np.array masks (see mask2rle)
+    :param processes: number of worker processes, None or 1 encodes in this process
+    :return: list of RLEs in the same order as masks
+    """
+    return _map(mask2rle, masks, processes)
+
+
+def _encode_mask(mask):
+    """RLE of a 2D mask with every pixel repeated over 4 channels
+
+    Same output as encode_rle(np.repeat(mask.ravel(), 4)), but runs are
+    computed on the mask and scaled instead of building the 4x array.
+    """
     array = mask.ravel()
-    array = np.repeat(array, 4)  # must be 4 channels
-    rle = encode_rle(array)
-    return rle
+    if len(array) == 0:
+        return encode_rle(array)
+    run_lengths, _, values = base_rle_encode(array)
+    return _encode_runs(len(array) * 4, run_lengths * 4, values)
 
 
 def image2rle(path):
@@ -395,9 +473,7 @@ def image2rle(path):
     """
     with Image.open(path).convert("L") as image:
         mask = np.array((np.array(image) > 128) * 255, dtype=np.uint8)
-        array = mask.ravel()
-        array = np.repeat(array, 4)
-        rle = encode_rle(array)
+        rle = _encode_mask(mask)
         return rle, image.size[0], image.size[1]
 
 
@@ -3,10 +3,13 @@ import logging
 import math
 import os
 import re
+import shutil
+import tempfile
+import threading
 import xml.dom
 import xml.dom.minidom
 from collections import defaultdict
-from copy import deepcopy
+from copy import copy, deepcopy
 from datetime import datetime
 from enum import Enum
 from glob import glob
@@ -41,6 +44,8 @@ from synapse_sdk.converter.utils import (
     convert_annotation_to_yolo_obb,
 )
 from synapse_sdk._extensions.synapse_tools.core.utils.io import get_local_path
+from synapse_sdk.converter.downloader import ResourceDownloader
+from synapse_sdk.converter.task_stream import TaskStream, is_ndjson_export, iter_tasks
 from synapse_sdk.converter.exports.yolo import process_and_save_yolo_annotations
 
 logger = logging.getLogger(__name__)
@@ -197,6 +202,7 @@ class Converter(object):
         download_resources=True,
         access_token=None,
         hostname=None,
+        downloader=None,
     ):
         """Initialize Synapse Converter for Exports
 
@@ -205,6 +211,7 @@ class Converter(object):
         :param output_tags: it will be calculated automatically, contains label names
         :param upload_dir: upload root directory with files that were imported using LS GUI
         :param download_resources: if True, LS will try to download images, audio, etc and include them to export
+        :param downloader: ResourceDownloader for images, created on first use if None
         """
         self.project_dir = project_dir
         self.upload_dir = upload_dir
@@ -213,6 +220,7 @@ class Converter(object):
         self.access_token = access_token
         self.hostname = hostname
         self.is_keypoints = None
+        self._downloader = downloader
 
         if isinstance(config, dict):
             self._schema = config
@@ -237,6 +245,12 @@ class Converter(object):
         self._supported_formats = self._get_supported_formats()
 
     def convert(self, input_data, output_data, format, is_dir=True, **kwargs):
+        try:
+            self._convert(input_data, output_data, format, is_dir=is_dir, **kwargs)
+        finally:
+            self._trim_download_cache()
+
+    def _convert(self, input_data, output_data, format, is_dir=True, **kwargs):
         if isinstance(format, str):
             format = Format.from_string(format)
 
@@ -328,6 +342,75 @@ class Converter(object):
             image_dir = kwargs.get("image_dir")
             convert_to_coco(items, output_data, output_image_dir=image_dir)
 
+    # formats whose converters read input_data twice
+    _MULTI_PASS_FORMATS = frozenset(
+        {
+            Format.CSV,
+            Format.TSV,
+            Format.COCO_WITH_IMAGES,
+            Format.YOLO_WITH_IMAGES,
+            Format.YOLO_OBB_WITH_IMAGES,
+            Format.VOC,
+        }
+    )
+
+    def convert_many(self, input_data, outputs, is_dir=False, is_ndjson=None, **kwargs):
+        """Convert one export to several formats, reading the input only once
+
+        Every task is parsed once and fanned out to one writer thread per
+        format, each running the usual convert_to_* method on a TaskStream.
+        A failing format does not stop the others.
+
+        :param input_data: directory of json files, json file path or binary file object
+        :param outputs: dict of format (Format or str) -> output directory
+        :param is_dir: input_data is a directory
+        :param is_ndjson: input_data is an NDJSON snapshot, detected from the name or the content when None
+        :return: dict of format -> exception for the formats that failed
+        """
+        outputs = {Format.from_string(f) if isinstance(f, str) else f: out for f, out in outputs.items()}
+        errors = {}
+        spool_dir = tempfile.mkdtemp(prefix="synapse-convert-")
+        images_formats = {Format.COCO_WITH_IMAGES, Format.YOLO_WITH_IMAGES, Format.YOLO_OBB_WITH_IMAGES}
+        if self.download_resources or images_formats & set(outputs):
+            # created before the converters are copied, so all formats share one download cache
+            _ = self.downloader
+
+        def run(fmt, converter, stream, output_dir):
+            try:
+                converter._convert(stream, output_dir, fmt, is_dir=False, **kwargs)
+            except Exception as e:
+                logger.exception(f"Conversion to {fmt} failed")
+                errors[fmt] = e
+            finally:
+                stream.drain()
+
+        streams, threads = [], []
+        for fmt, output_dir in outputs.items():
+            spool_path = os.path.join(spool_dir, f"{fmt}.ndjson") if fmt in self._MULTI_PASS_FORMATS else None
+            stream = TaskStream(spool_path=spool_path)
+            # each format gets its own converter state (download_resources, is_keypoints)
+            thread = threading.Thread(
+                target=run, args=(fmt, copy(self), stream, output_dir), name=f"convert-{fmt}", daemon=True
+            )
+            streams.append(stream)
+            threads.append(thread)
+            thread.start()
+
+        try:
+            for task in iter_tasks(input_data, is_dir=is_dir, is_ndjson=is_ndjson):
+                for stream in streams:
+                    stream.put(task)
+        finally:
+            for stream in streams:
+                stream.finish()
+            for thread in threads:
+                thread.join()
+            shutil.rmtree(spool_dir, ignore_errors=True)
+            # the formats share the downloader, the cache is trimmed once all of them are written
+            self._trim_download_cache()
+
+        return errors
+
     def _get_data_keys_and_output_tags(self, output_tags=None):
         data_keys = set()
         output_tag_names = []
@@ -467,8 +550,16 @@ class Converter(object):
     def iter_from_json_file(self, json_file):
         """Extract annotation results from json file
 
-        param json_file: path to task list or dict with annotations
+        param json_file: path to task list, NDJSON snapshot or dict with annotations, or a TaskStream
         """
+        if isinstance(json_file, TaskStream) or is_ndjson_export(json_file):
+            tasks = json_file if isinstance(json_file, TaskStream) else iter_tasks(json_file)
+            for task in tasks:
+                for item in self.annotation_result_from_task(task):
+                    if item is not None:
+                        yield item
+            return
+
         data_type = get_json_root_type(json_file)
 
         # one task
@@ -608,6 +699,66 @@ class Converter(object):
     def _check_format(self, fmt):
         pass
 
+    @property
+    def downloader(self):
+        if self._downloader is None:
+            self._downloader = ResourceDownloader()
+        return self._downloader
+
+    def _trim_download_cache(self):
+        """Keep the shared download cache within its size limit after an export"""
+        if self._downloader is None:
+            return
+        try:
+            self._downloader.trim()
+        except OSError as e:
+            logger.warning(f"Unable to trim the download cache: {e}")
+
+    def _prefetch_resources(self, input_data, is_dir, output_image_dir, cache_only=False):
+        """Download the resources of all items concurrently before the export loop
+
+        Files land where get_local_path() would put them, so the export loop
+        finds them on disk. With cache_only, files are only fetched into the
+        downloader cache (for download(), which picks file names itself).
+        Failed downloads are logged and retried by the export loop.
+        """
+        if not self.download_resources:
+            return {}
+
+        data_key = self._data_keys[0]
+        item_iterator = (
+            self.iter_from_dir(input_data)
+            if is_dir
+            else self.iter_from_json_file(input_data)
+        )
+        task_ids = {}
+        for item in item_iterator:
+            paths = item["input"].get(data_key)
+            paths = [paths] if isinstance(paths, str) else paths or []
+            for path in paths:
+                if isinstance(path, str) and not os.path.exists(path):
+                    task_ids.setdefault(path, item["id"])
+
+        downloader = self.downloader
+        if cache_only:
+            urls = [url for url in task_ids if url.startswith(("http://", "https://"))]
+            return downloader.prefetch(urls)
+
+        def fetch(url):
+            return get_local_path(
+                url=url,
+                hostname=self.hostname,
+                project_dir=self.project_dir,
+                image_dir=self.upload_dir,
+                cache_dir=output_image_dir,
+                download_resources=self.download_resources,
+                access_token=self.access_token,
+                task_id=task_ids[url],
+                downloader=downloader,
+            )
+
+        return downloader.prefetch(task_ids, fetch=fetch)
+
     def convert_to_json(self, input_data, output_dir, is_dir=True):
         self._check_format(Format.JSON)
         ensure_dir(output_dir)
@@ -632,6 +783,17 @@ class Converter(object):
                         del record
 
                 fout.write("\n]")
+        elif isinstance(input_data, TaskStream) or is_ndjson_export(input_data):
+            tasks = input_data if isinstance(input_data, TaskStream) else iter_tasks(input_data)
+            with open(output_file, mode="w", encoding="utf8") as fout:
+                fout.write("[\n")
+                first_record = True
+                for task in tasks:
+                    if not first_record:
+                        fout.write(",\n")
+                    json.dump(task, fout, indent=2, ensure_ascii=False)
+                    first_record = False
+                fout.write("\n]")
         else:
             copy2(input_data, output_file)
 
@@ -730,6 +892,7 @@ class Converter(object):
             categories, category_name_to_id, self._schema
         )
         data_key = self._data_keys[0]
+        self._prefetch_resources(input_data, is_dir, output_image_dir)
         item_iterator = (
             self.iter_from_dir(input_data)
             if is_dir
@@ -753,6 +916,7 @@ class Converter(object):
                         download_resources=self.download_resources,
                         access_token=self.access_token,
                         task_id=task_id,
+                        downloader=self._downloader,
                     )
                     # make path relative to output_image_dir
                     image_path = os.path.relpath(image_path, output_dir)
@@ -967,6 +1131,7 @@ class Converter(object):
         else:
             categories, category_name_to_id = self._get_labels()
         data_key = self._data_keys[0]
+        self._prefetch_resources(input_data, is_dir, output_image_dir)
         item_iterator = (
             self.iter_from_dir(input_data)
             if is_dir
@@ -993,6 +1158,7 @@ class Converter(object):
                             download_resources=self.download_resources,
                             access_token=self.access_token,
                             task_id=task_id,
+                            downloader=self._downloader,
                         )
                         # make path relative to output_image_dir
                         image_path = os.path.relpath(image_path, output_dir)
@@ -1149,6 +1315,7 @@ class Converter(object):
             parent_node.appendChild(child_node)
 
         data_key = self._data_keys[0]
+        self._prefetch_resources(input_data, is_dir, output_image_dir, cache_only=True)
         item_iterator = (
             self.iter_from_dir(input_data)
             if is_dir
@@ -1170,6 +1337,7 @@ class Converter(object):
                         upload_dir=self.upload_dir,
                         return_relative_path=True,
                         download_resources=self.download_resources,
+                        downloader=self._downloader,
                     )
                 except:
                     logger.info(
@@ -0,0 +1,375 @@
+"""Parallel resource downloader for Converter exports
+
+Exports with images (COCO, YOLO, VOC) used to fetch every resource serially
+and read each body into memory. ResourceDownloader keeps one pooled HTTP
+session, streams bodies to disk and stores them in a content cache shared by
+all exports:
+
+    <cache_dir>/index/<url hash>.json    url -> etag, last-modified, object
+    <cache_dir>/objects/<sha256>         downloaded content, stored once
+    <cache_dir>/partial/<url hash>.part  interrupted download, resumed with Range
+
+A URL that is already in the cache is revalidated with If-None-Match /
+If-Modified-Since and only downloaded again when the server reports a change.
+Files are hard linked (or copied) from the cache into the export directory.
+
+The cache is bounded: trim() removes the least recently used objects once it
+holds more than EXPORT_DOWNLOAD_CACHE_MAX_SIZE bytes, the Converter calls it
+after each export. With EXPORT_DOWNLOAD_CACHE=false every downloader uses a
+private temporary directory that trim() empties.
+
+Usage:
+    downloader = ResourceDownloader(max_workers=16)
+    failed = downloader.prefetch(urls)  # warm the cache in parallel
+    path = downloader.fetch(url, target="/export/images/1.jpg")
+    downloader.trim()  # once the export is finished
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from synapse_sdk._extensions.synapse_tools.core.utils.io import (
+    VERIFY_SSL,
+    get_cache_dir,
+)
+from synapse_sdk._extensions.synapse_tools.core.utils.params import get_env
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_WORKERS = int(get_env("EXPORT_DOWNLOAD_WORKERS", default=8))
+DOWNLOAD_TIMEOUT = float(get_env("EXPORT_DOWNLOAD_TIMEOUT", default=60))
+DOWNLOAD_CACHE_DIR = get_env("EXPORT_DOWNLOAD_CACHE_DIR")
+DOWNLOAD_REVALIDATE = get_env("EXPORT_DOWNLOAD_REVALIDATE", default=True, is_bool=True)
+# keep downloads between exports, a disabled cache only lives as long as one export
+DOWNLOAD_CACHE = get_env("EXPORT_DOWNLOAD_CACHE", default=True, is_bool=True)
+# size limit of the cached objects in bytes, 0 disables the limit
+DOWNLOAD_CACHE_MAX_SIZE = int(get_env("EXPORT_DOWNLOAD_CACHE_MAX_SIZE", default=5 * 1024**3))
+# interrupted downloads older than this are not resumed anymore and removed by trim()
+PARTIAL_MAX_AGE = 24 * 60 * 60
+CHUNK_SIZE = 1024 * 1024
+
+USER_AGENT = (
+    # avoid requests.exceptions.HTTPError: 403 Client Error: Forbidden. Please comply with the User-Agent policy:
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_4) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/83.0.4103.97 Safari/537.36"
+)
+
+
+def url_key(url):
+    return hashlib.sha1(url.encode()).hexdigest()
+
+
+def link_or_copy(source, target):
+    """Hard link source to target, copy if linking is not possible"""
+    if os.path.exists(target):
+        return target
+    tmp = f"{target}.{threading.get_ident()}.tmp"
+    try:
+        os.link(source, tmp)
+    except OSError:
+        shutil.copyfile(source, tmp)
+    os.replace(tmp, target)
+    return target
+
+
+class ResourceDownloader:
+    def __init__(
+        self,
+        cache_dir=None,
+        max_workers=None,
+        timeout=None,
+        revalidate=None,
+        progress=None,
+        session=None,
+        max_cache_size=None,
+    ):
+        """Initialize the downloader
+
+        :param cache_dir: content cache directory, shared across exports
+          (defaults to EXPORT_DOWNLOAD_CACHE_DIR or <user cache dir>/resources,
+          a private temporary directory when EXPORT_DOWNLOAD_CACHE is off)
+        :param max_workers: number of concurrent downloads in prefetch()
+        :param timeout: connect/read timeout in seconds for each request
+        :param revalidate: ask the server whether cached URLs changed (ETag / Last-Modified)
+        :param progress: callable(done, total, failed) called as prefetch() advances
+        :param session: requests.Session to use, a pooled session is created if None
+        :param max_cache_size: bytes kept by trim(), defaults to EXPORT_DOWNLOAD_CACHE_MAX_SIZE
+        """
+        # a private cache is emptied by trim() instead of being shared with later exports
+        self._private_cache = not cache_dir and not DOWNLOAD_CACHE
+        if self._private_cache:
+            self.cache_dir = tempfile.mkdtemp(prefix="synapse-downloads-")
+        else:
+            self.cache_dir = cache_dir or DOWNLOAD_CACHE_DIR or os.path.join(get_cache_dir(), "resources")
+        self.max_workers = max(int(max_workers or DOWNLOAD_WORKERS), 1)
+        self.timeout = timeout or DOWNLOAD_TIMEOUT
+        self.revalidate = DOWNLOAD_REVALIDATE if revalidate is None else revalidate
+        self.progress = progress
+        self.session = session or self._create_session()
+        self.max_cache_size = DOWNLOAD_CACHE_MAX_SIZE if max_cache_size is None else max_cache_size
+
+        self._create_dirs()
+
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        # URLs already checked against the server by this downloader
+        self._fresh = set()
+
+    def _create_session(self):
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+        )
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["User-Agent"] = USER_AGENT
+        session.verify = VERIFY_SSL
+        return session
+
+    def _create_dirs(self):
+        for name in ("index", "objects", "partial"):
+            os.makedirs(os.path.join(self.cache_dir, name), exist_ok=True)
+
+    def _lock(self, key):
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _index_path(self, key):
+        return os.path.join(self.cache_dir, "index", key + ".json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.cache_dir, "objects", digest)
+
+    def _partial_path(self, key):
+        return os.path.join(self.cache_dir, "partial", key + ".part")
+
+    @staticmethod
+    def _read_json(path):
+        try:
+            with open(path, encoding="utf8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_json(path, data):
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, mode="w", encoding="utf8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def cached_path(self, url):
+        """Path of the cached content for url, or None"""
+        entry = self._read_json(self._index_path(url_key(url)))
+        if entry:
+            path = self._object_path(entry["object"])
+            if os.path.exists(path):
+                return path
+        return None
+
+    def fetch(self, url, target=None, headers=None):
+        """Download url through the content cache
+
+        :param url: http(s) URL
+        :param target: if set, the content is linked or copied to this path
+        :param headers: extra request headers (e.g. Authorization)
+        :return: target, or the cache object path if no target is given
+        """
+        key = url_key(url)
+        with self._lock(key):
+            path = self._fetch(url, key, headers or {})
+        return link_or_copy(path, target) if target else path
+
+    def _fetch(self, url, key, headers):
+        entry = self._read_json(self._index_path(key))
+        cached = entry and self._object_path(entry["object"])
+        if cached and not os.path.exists(cached):
+            entry = cached = None
+
+        if cached and (not self.revalidate or key in self._fresh):
+            return self._touch(cached)
+
+        request_headers = dict(headers)
+        if cached:
+            if entry.get("etag"):
+                request_headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                request_headers["If-Modified-Since"] = entry["last_modified"]
+            if "If-None-Match" not in request_headers and "If-Modified-Since" not in request_headers:
+                # nothing to revalidate with, the URL is treated as immutable
+                self._fresh.add(key)
+                return self._touch(cached)
+
+        partial = self._partial_path(key)
+        partial_meta = self._read_json(partial + ".json") or {}
+        offset = os.path.getsize(partial) if os.path.exists(partial) else 0
+        if offset and partial_meta.get("validator"):
+            request_headers["Range"] = f"bytes={offset}-"
+            request_headers["If-Range"] = partial_meta["validator"]
+
+        with self.session.get(url, headers=request_headers, stream=True, timeout=self.timeout) as r:
+            if r.status_code == 304 and cached:
+                logger.debug(f"Not modified, using cached {url}")
+                self._fresh.add(key)
+                return self._touch(cached)
+            r.raise_for_status()
+
+            etag = r.headers.get("ETag")
+            last_modified = r.headers.get("Last-Modified")
+            resume = r.status_code == 206
+            if not resume:
+                offset = 0
+            validator = etag or last_modified
+            self._write_json(partial + ".json", {"url": url, "validator": validator})
+
+            logger.debug(f"Download {url} ({'resume at ' + str(offset) if resume else 'full'})")
+            with open(partial, mode="ab" if resume else "wb") as fout:
+                fout.writelines(r.iter_content(chunk_size=CHUNK_SIZE))
+
+        digest = hashlib.sha256()
+        with open(partial, mode="rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        digest = digest.hexdigest()
+
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            os.remove(partial)
+        else:
+            os.replace(partial, path)
+        if os.path.exists(partial + ".json"):
+            os.remove(partial + ".json")
+
+        self._write_json(
+            self._index_path(key),
+            {"url": url, "etag": etag, "last_modified": last_modified, "object": digest},
+        )
+        self._fresh.add(key)
+        return path
+
+    def prefetch(self, urls, fetch=None):
+        """Download many URLs concurrently
+
+        Failures are logged and returned instead of raised: finished downloads
+        stay in the cache and interrupted ones are resumed by the next call.
+
+        :param urls: iterable of URLs, duplicates are fetched once
+        :param fetch: callable(url) used instead of self.fetch, e.g. to add
+          URL resolution or authorization headers
+        :return: dict of url -> exception for the URLs that failed
+        """
+        urls = list(dict.fromkeys(urls))
+        fetch = fetch or self.fetch
+        total = len(urls)
+        failed = {}
+        if not total:
+            return failed
+
+        logger.info(f"Downloading {total} resources with {self.max_workers} workers")
+        step = max(total // 20, 1)
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(fetch, url): url for url in urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    future.result()
+                except Exception as e:  # noqa: BLE001 - any failure of a custom fetch is reported, not raised
+                    failed[url] = e
+                    logger.info(f"Unable to download {url}: {e}")
+                done += 1
+                if self.progress:
+                    self.progress(done, total, len(failed))
+                if done % step == 0 or done == total:
+                    logger.info(f"Downloaded {done}/{total} resources ({len(failed)} failed)")
+        return failed
+
+    @staticmethod
+    def _touch(path):
+        """Mark a cached object as used, trim() removes the least recently used ones first"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def trim(self, max_size=None):
+        """Shrink the cache to max_size bytes, least recently used objects first
+
+        A private cache (EXPORT_DOWNLOAD_CACHE off) is emptied. Objects are
+        ordered by access time, which fetch() refreshes on every cache hit.
+
+        :param max_size: bytes to keep, defaults to max_cache_size (0 keeps everything)
+        :return: number of bytes removed
+        """
+        if self._private_cache:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            self._create_dirs()
+            self._fresh.clear()
+            return 0
+
+        now = time.time()
+        with os.scandir(os.path.join(self.cache_dir, "partial")) as entries:
+            for entry in entries:
+                try:
+                    if now - entry.stat().st_mtime > PARTIAL_MAX_AGE:
+                        os.remove(entry.path)
+                except OSError:
+                    continue
+
+        max_size = self.max_cache_size if max_size is None else max_size
+        if not max_size:
+            return 0
+
+        objects, total = [], 0
+        with os.scandir(os.path.join(self.cache_dir, "objects")) as entries:
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                objects.append((stat.st_atime, stat.st_size, entry.name))
+                total += stat.st_size
+        if total <= max_size:
+            return 0
+
+        removed, freed = set(), 0
+        for _, size, name in sorted(objects):
+            if total - freed <= max_size:
+                break
+            try:
+                os.remove(self._object_path(name))
+            except OSError:
+                continue
+            removed.add(name)
+            freed += size
+
+        # index entries of removed objects would only be read to find them missing
+        with os.scandir(os.path.join(self.cache_dir, "index")) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".json"):
+                    continue
+                data = self._read_json(entry.path)
+                if data and data.get("object") in removed:
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        continue
+
+        logger.info(f"Download cache trimmed: removed {len(removed)} objects, {freed} bytes")
+        return freed
@@ -0,0 +1,210 @@
+"""Task streams for converting one export to several formats in a single pass
+
+Converter.convert_many() parses the export once and hands every task to one
+TaskStream per format. Each format runs its usual convert_to_* method in its
+own thread with the stream as input_data.
+
+Exports are JSON arrays of tasks or NDJSON snapshots (one task per line),
+optionally gzip or zstd compressed. NDJSON is read line by line without ijson.
+"""
+
+import gzip
+import io
+import logging
+import os
+import queue
+from glob import glob
+
+import ijson
+import ujson as json
+
+from synapse_sdk.converter.utils import get_json_root_type
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class TaskStream:
+    """Tasks pushed by a producer thread, iterable by one consumer
+
+    Converters that read their input twice (CSV collects its columns first,
+    image exports prefetch resources) need a spool_path: the first iteration
+    writes every task to it as NDJSON and later iterations read it back.
+    """
+
+    def __init__(self, maxsize=256, spool_path=None):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._spool_path = spool_path
+        self._started = False
+        self._exhausted = False
+
+    def put(self, task):
+        if not self._exhausted:
+            self._queue.put(task)
+
+    def finish(self):
+        """Signal that no more tasks will be put"""
+        self._queue.put(_DONE)
+
+    def drain(self):
+        """Discard the remaining tasks, so the producer never blocks on a finished consumer"""
+        while not self._exhausted:
+            if self._queue.get() is _DONE:
+                self._exhausted = True
+
+    def __iter__(self):
+        if not self._started:
+            self._started = True
+            return self._iter_queue()
+        if self._spool_path is None:
+            raise RuntimeError("TaskStream without spool_path can only be iterated once")
+        return self._iter_spool()
+
+    def _iter_queue(self):
+        if self._spool_path is None:
+            yield from self._iter_tasks(None)
+            return
+        with open(self._spool_path, mode="w", encoding="utf8") as spool:
+            yield from self._iter_tasks(spool)
+
+    def _iter_tasks(self, spool):
+        try:
+            while True:
+                task = self._queue.get()
+                if task is _DONE:
+                    self._exhausted = True
+                    return
+                if spool is not None:
+                    spool.write(json.dumps(task, ensure_ascii=False) + "\n")
+                yield task
+        finally:
+            if spool is not None:
+                # an interrupted first pass still leaves a complete spool behind
+                while not self._exhausted:
+                    task = self._queue.get()
+                    if task is _DONE:
+                        self._exhausted = True
+                    else:
+                        spool.write(json.dumps(task, ensure_ascii=False) + "\n")
+
+    def _iter_spool(self):
+        with open(self._spool_path, encoding="utf8") as f:
+            for line in f:
+                yield json.loads(line)
+
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+NDJSON_SUFFIXES = (".ndjson", ".jsonl", ".ndjson.gz", ".ndjson.zst")
+
+
+class _ReplayStream(io.RawIOBase):
+    """Binary stream returning already read bytes before the rest of the source, so sniffing never seeks"""
+
+    def __init__(self, head, source):
+        self.head = head
+        self.source = source
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.head:
+            data, self.head = self.head[: len(buffer)], self.head[len(buffer) :]
+        else:
+            data = self.source.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _replay(head, source):
+    return io.BufferedReader(_ReplayStream(head, source))
+
+
+def _decompress(f):
+    """Binary stream of f, decompressed on the fly if f starts with a gzip or zstd header"""
+    head = f.read(len(ZSTD_MAGIC))
+    f = _replay(head, f)
+    if head.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=f, mode="rb"), True
+    if head.startswith(ZSTD_MAGIC):
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("zstandard package is required to read .zst exports") from e
+        return zstandard.ZstdDecompressor().stream_reader(f), True
+    return f, False
+
+
+def is_ndjson_export(path):
+    """NDJSON exports are recognized by their file name"""
+    return str(path).lower().endswith(NDJSON_SUFFIXES)
+
+
+def _is_ndjson_line(line):
+    """A line holding a whole task object, while a JSON export starts with "[" or spreads a task over lines"""
+    line = line.strip()
+    if not line.startswith(b"{"):
+        return False
+    try:
+        return isinstance(json.loads(line), dict)
+    except ValueError:
+        return False
+
+
+def open_export(source, is_ndjson=None):
+    """Read an export from a binary file object, which is never seeked
+
+    :param is_ndjson: the export format when it is known, e.g. from the export snapshot format
+    :return: tuple (binary stream, True if the export is NDJSON)
+    """
+    stream, compressed = _decompress(source)
+    if is_ndjson is None:
+        name = getattr(source, "name", None)
+        if compressed or (isinstance(name, str) and is_ndjson_export(name)):
+            is_ndjson = True
+        elif isinstance(name, str) and name.lower().endswith(".json"):
+            is_ndjson = False
+        else:
+            # unknown name: NDJSON when the first line holds a whole task
+            line = stream.readline()
+            stream = _replay(line, stream)
+            is_ndjson = _is_ndjson_line(line)
+    return stream, is_ndjson
+
+
+def iter_ndjson(stream):
+    """Yield tasks from a binary NDJSON stream"""
+    for line in io.TextIOWrapper(stream, encoding="utf8"):
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_tasks(input_data, is_dir=False, is_ndjson=None):
+    """Yield raw tasks from an export: a directory of json files, a json or NDJSON file path or a binary file object
+
+    :param is_ndjson: the export format of a file object when it is known, detected otherwise
+    """
+    if hasattr(input_data, "read"):
+        stream, is_ndjson = open_export(input_data, is_ndjson=is_ndjson)
+        if is_ndjson:
+            yield from iter_ndjson(stream)
+        else:
+            yield from ijson.items(stream, "item", use_float=True)
+        return
+
+    json_files = glob(os.path.join(input_data, "*.json")) if is_dir else [input_data]
+    for json_file in json_files:
+        if is_ndjson_export(json_file):
+            with open(json_file, "rb") as f:
+                stream, _ = open_export(f, is_ndjson=True)
+                yield from iter_ndjson(stream)
+            continue
+        data_type = get_json_root_type(json_file)
+        if data_type == "dict":
+            with open(json_file, encoding="utf8") as f:
+                yield json.load(f)
+        elif data_type == "list":
+            with open(json_file, "rb") as f:
+                yield from ijson.items(f, "item", use_float=True)
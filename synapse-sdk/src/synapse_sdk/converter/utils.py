@@ -1,5 +1,4 @@
 import argparse
-import datetime
 import hashlib
 import io
 import logging
@@ -142,6 +141,7 @@ def download(
     return_relative_path=False,
     upload_dir=None,
     download_resources=True,
+    downloader=None,
 ):
     is_local_file = url.startswith("/data/") and "?d=" in url
     is_uploaded_file = url.startswith("/data/upload")
@@ -178,23 +178,22 @@ def download(
         filename = f"{basename}{ext}"
         filepath = os.path.join(output_dir, filename)
         if os.path.exists(filepath):
+            # the suffix depends on the url only, so repeated exports reuse the same name
             filename = (
-                basename
-                + "_"
-                + hashlib.md5(
-                    url.encode() + str(datetime.datetime.now().timestamp()).encode()
-                ).hexdigest()[:4]
-                + ext
+                basename + "_" + hashlib.md5(url.encode()).hexdigest()[:4] + ext
             )
 
     filepath = os.path.join(output_dir, filename)
     if not os.path.exists(filepath):
         logger.info("Download {url} to {filepath}".format(url=url, filepath=filepath))
-        if download_resources:
-            r = requests.get(url)
-            r.raise_for_status()
-            with io.open(filepath, mode="wb") as fout:
-                fout.write(r.content)
+        if download_resources and downloader is not None:
+            downloader.fetch(url, target=filepath)
+        elif download_resources:
+            with requests.get(url, stream=True) as r:
+                r.raise_for_status()
+                with io.open(filepath, mode="wb") as fout:
+                    for chunk in r.iter_content(chunk_size=1024 * 1024):
+                        fout.write(chunk)
     if return_relative_path:
         return os.path.join(os.path.basename(output_dir), os.path.basename(filename))
     return filepath
@@ -0,0 +1,122 @@
+"""
+Benchmarks for brush RLE encoding and decoding on real-size masks
+
+Run with:
+    python tests/custom/converter/benchmark_brush.py [--repeat N] [--sizes 1080p 4k]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from synapse_sdk.converter.brush import InputStream, base_rle_encode, bits2byte, bytes2bit, decode_rle, mask2rle
+
+# name -> (width, height)
+MASK_SIZES = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+
+
+def make_mask(width, height, shapes=12, seed=0):
+    """Segmentation-like mask: filled ellipses with jagged edges on a black background"""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:height, 0:width]
+    mask = np.zeros((height, width), dtype=np.uint8)
+    for _ in range(shapes):
+        cx, cy = rng.integers(0, width), rng.integers(0, height)
+        rx, ry = rng.integers(width // 20, width // 5), rng.integers(height // 20, height // 5)
+        inside = ((xx - cx) / rx) ** 2 + ((yy - cy) / ry) ** 2 <= 1 + rng.normal(0, 0.02, size=(height, width))
+        mask[inside] = 255
+    return mask
+
+
+def decode_rle_bitstring(rle):
+    """Bit string decoder the byte-level decoder replaced, kept as the baseline"""
+    input = InputStream(bytes2bit(rle))
+    num = input.read(32)
+    word_size = input.read(5) + 1
+    rle_sizes = [input.read(4) + 1 for _ in range(4)]
+
+    i = 0
+    out = np.zeros(num, dtype=np.uint8)
+    while i < num:
+        x = input.read(1)
+        j = i + 1 + input.read(rle_sizes[input.read(2)])
+        if x:
+            out[i:j] = input.read(word_size)
+            i = j
+        else:
+            while i < j:
+                out[i] = input.read(word_size)
+                i += 1
+    return out
+
+
+def encode_rle_bitstring(arr, wordsize=8, rle_sizes=[3, 4, 8, 16]):
+    """Bit string encoder the vectorized encoder replaced, kept as the baseline"""
+    out_str = f"{len(arr):032b}" + f"{wordsize - 1:05b}" + "".join([f"{x - 1:04b}" for x in rle_sizes])
+    for length, value in zip(*base_rle_encode(arr)[::2]):
+        value = int(value)
+        if length == 1:
+            out_str += "0" + "00" + "000" + f"{value:08b}"
+        elif length <= 8:
+            out_str += "1" + "00" + f"{length - 1:03b}" + f"{value:08b}"
+        elif length <= 16:
+            out_str += "1" + "01" + f"{length - 1:04b}" + f"{value:08b}"
+        elif length <= 256:
+            out_str += "1" + "10" + f"{length - 1:08b}" + f"{value:08b}"
+        else:
+            rem = length
+            while rem > 2**16:
+                out_str += "1" + "11" + f"{2**16 - 1:016b}" + f"{value:08b}"
+                rem -= 2**16
+            out_str += "1" + "11" + f"{rem - 1:016b}" + f"{value:08b}"
+    out_str += "0" * (8 - len(out_str) % 8)
+    return bits2byte(out_str)
+
+
+def best_of(repeat, func, *args):
+    best = None
+    result = None
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=list(MASK_SIZES), choices=list(MASK_SIZES))
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, best is reported")
+    parser.add_argument("--skip-baseline", action="store_true", help="skip the slow bit string baseline")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        width, height = MASK_SIZES[size]
+        mask = make_mask(width, height)
+
+        encode_time, rle = best_of(args.repeat, mask2rle, mask)
+        print(f"{size} ({width}x{height}): {len(rle)} RLE bytes")
+        print(f"  mask2rle:          {encode_time * 1000:10.1f} ms")
+
+        decode_time, decoded = best_of(args.repeat, decode_rle, rle)
+        assert np.array_equal(decoded.reshape(height, width, 4)[:, :, 3], mask)
+        print(f"  decode_rle:        {decode_time * 1000:10.1f} ms")
+
+        if not args.skip_baseline:
+            baseline_time, baseline = best_of(1, encode_rle_bitstring, np.repeat(mask.ravel(), 4))
+            assert baseline == rle
+            print(f"  bit string encode: {baseline_time * 1000:10.1f} ms ({baseline_time / encode_time:.0f}x)")
+
+            baseline_time, baseline = best_of(1, decode_rle_bitstring, rle)
+            assert np.array_equal(baseline, decoded)
+            print(f"  bit string decode: {baseline_time * 1000:10.1f} ms ({baseline_time / decode_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
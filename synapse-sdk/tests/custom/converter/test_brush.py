@@ -95,12 +95,152 @@ def test_rle_encoding():
     ]
 
 
+def _decode_rle_bitstring(rle):
+    """Reference decoder working on a '0'/'1' string (the original implementation)"""
+    import numpy as np
+    from synapse_sdk.converter.brush import InputStream, bytes2bit
+
+    input = InputStream(bytes2bit(rle))
+    num = input.read(32)
+    word_size = input.read(5) + 1
+    rle_sizes = [input.read(4) + 1 for _ in range(4)]
+
+    i = 0
+    out = np.zeros(num, dtype=np.uint8)
+    while i < num:
+        x = input.read(1)
+        j = i + 1 + input.read(rle_sizes[input.read(2)])
+        if x:
+            out[i:j] = input.read(word_size)
+            i = j
+        else:
+            while i < j:
+                out[i] = input.read(word_size)
+                i += 1
+    return out
+
+
+def test_rle_decoding():
+    """
+    Decode RLE straight from bytes, same result as the bit string reference
+    """
+    import numpy as np
+    from synapse_sdk.converter.brush import decode_rle, image2rle
 
+    rle = [0, 0, 0, 18, 57, 27, 252, 96, 32, 1, 0, 6, 0, 40, 0, 192, 3, 128, 17, 56, 32]
+    assert decode_rle(rle).tolist() == [1, 1, 1, 1, 2, 3, 5, 6, 7, 8, 4, 4, 4, 4, 4, 4, 4, 4]
 
+    rle, width, height = image2rle(os.path.abspath(os.path.dirname(__file__)) + "/data/test_brush/test.png")
+    decoded = decode_rle(rle)
+    assert decoded.dtype == np.uint8
+    assert decoded.shape == (width * height * 4,)
+    assert np.array_equal(decoded, _decode_rle_bitstring(rle))
 
+    # runs longer than 2**16 are split into several blocks
+    long_run = [7] * (2**16 + 300) + [1, 2] + [0] * 20
+    assert decode_rle(encode_rle(long_run)).tolist() == long_run
 
 
+def test_decode_from_annotation_batch():
+    """
+    Regions decoded in a process pool match sequential decoding
+    """
+    import numpy as np
+    from synapse_sdk.converter.brush import decode_from_annotation, mask2rle
+
+    masks = [np.zeros((20, 30), dtype=np.uint8) for _ in range(3)]
+    masks[0][2:10, 5:25] = 255
+    masks[1][:, ::2] = 255
+    results = [
+        {
+            "type": "brushlabels",
+            "rle": mask2rle(mask),
+            "original_width": 30,
+            "original_height": 20,
+            "brushlabels": ["Car"],
+        }
+        for mask in masks
+    ]
 
+    sequential = decode_from_annotation("tag", results)
+    parallel = decode_from_annotation("tag", results, processes=2)
+
+    assert list(sequential) == ["tag-Car-0", "tag-Car-1", "tag-Car-2"]
+    for name, mask in zip(sequential, masks):
+        assert np.array_equal(sequential[name], mask)
+        assert np.array_equal(parallel[name], mask)
+
+
+def _encode_rle_bitstring(arr, wordsize=8, rle_sizes=[3, 4, 8, 16]):
+    """Reference encoder building a '0'/'1' string (the original implementation)"""
+    from synapse_sdk.converter.brush import base_rle_encode, bits2byte
+
+    num = len(arr)
+    numbits = f"{num:032b}"
+    wordsizebits = f"{wordsize - 1:05b}"
+    rle_bits = "".join([f"{x - 1:04b}" for x in rle_sizes])
+    out_str = numbits + wordsizebits + rle_bits
+
+    for length, value in zip(*base_rle_encode(arr)[::2]):
+        value = int(value)
+        if length == 1:
+            out_str += "0" + "00" + "000" + f"{value:08b}"
+        elif length <= 8:
+            out_str += "1" + "00" + f"{length - 1:03b}" + f"{value:08b}"
+        elif length <= 16:
+            out_str += "1" + "01" + f"{length - 1:04b}" + f"{value:08b}"
+        elif length <= 256:
+            out_str += "1" + "10" + f"{length - 1:08b}" + f"{value:08b}"
+        else:
+            rem = length
+            while rem > 2**16:
+                out_str += "1" + "11" + f"{2**16 - 1:016b}" + f"{value:08b}"
+                rem -= 2**16
+            out_str += "1" + "11" + f"{rem - 1:016b}" + f"{value:08b}"
+
+    out_str += "0" * (8 - len(out_str) % 8)
+    return bits2byte(out_str)
+
+
+def test_rle_encoding_matches_bitstring():
+    """
+    Vectorized encoder produces the same bytes as the bit string reference
+    """
+    import numpy as np
+    from synapse_sdk.converter.brush import encode_rle, mask2rle
+
+    rng = np.random.default_rng(0)
+    arrays = [
+        [5],
+        rng.integers(0, 3, size=1000).astype(np.uint8),
+        np.repeat(rng.integers(0, 256, size=200), rng.integers(1, 400, size=200)).astype(np.uint8),
+        # run boundaries of every size index, including exact multiples of 2**16
+        np.repeat([1, 2, 3, 4, 5, 6, 7, 8, 9], [8, 9, 16, 17, 256, 257, 2**16, 2**16 + 1, 2 * 2**16]).astype(np.uint8),
+    ]
+    for arr in arrays:
+        assert encode_rle(arr) == _encode_rle_bitstring(arr)
+
+    mask = np.zeros((40, 50), dtype=np.uint8)
+    mask[5:30, 10:45] = 255
+    assert mask2rle(mask) == _encode_rle_bitstring(np.repeat(mask.ravel(), 4))
+
+
+def test_mask2rle_batch():
+    """
+    Masks encoded in a process pool match sequential encoding
+    """
+    import numpy as np
+    from synapse_sdk.converter.brush import decode_rle, encode_rle_batch, mask2rle, mask2rle_batch
 
+    masks = [np.zeros((20, 30), dtype=np.uint8) for _ in range(3)]
+    masks[0][2:10, 5:25] = 255
+    masks[1][:, ::2] = 255
 
+    sequential = mask2rle_batch(masks)
+    assert sequential == [mask2rle(mask) for mask in masks]
+    assert mask2rle_batch(masks, processes=2) == sequential
+    for rle, mask in zip(sequential, masks):
+        assert np.array_equal(decode_rle(rle).reshape(20, 30, 4)[:, :, 3], mask)
 
+    arrays = [mask.ravel() for mask in masks]
+    assert encode_rle_batch(arrays, processes=2) == [encode_rle(arr) for arr in arrays]
@@ -0,0 +1,89 @@
+"""
+Test for Converter.convert_many
+"""
+
+import gzip
+import io
+import json
+import os
+
+from synapse_sdk.converter import Converter
+from synapse_sdk.converter.converter import Format
+from synapse_sdk.converter.task_stream import iter_tasks
+
+INPUT_DATA = os.path.abspath(os.path.dirname(__file__)) + "/data/test_export_csv/csv_test.json"
+
+
+def test_convert_many_matches_single_format(tmp_path):
+    converter = Converter({}, "/tmp")
+    outputs = {fmt: str(tmp_path / "many" / fmt) for fmt in ["JSON", "JSON_MIN", "CSV"]}
+
+    with open(INPUT_DATA, "rb") as f:
+        errors = converter.convert_many(f, outputs, csv_separator=",")
+    assert errors == {}
+
+    for fmt, output_dir in outputs.items():
+        single_dir = str(tmp_path / "single" / fmt)
+        Converter({}, "/tmp").convert(INPUT_DATA, single_dir, fmt, is_dir=False, csv_separator=",")
+        result = "result.csv" if fmt == "CSV" else "result.json"
+        with io.open(os.path.join(output_dir, result), encoding="utf8") as many, io.open(
+            os.path.join(single_dir, result), encoding="utf8"
+        ) as single:
+            if fmt == "JSON":
+                assert json.load(many) == json.load(single)
+            else:
+                assert many.read() == single.read()
+
+
+def test_convert_many_reports_failed_format(tmp_path):
+    converter = Converter({}, "/tmp")
+    # CONLL2003 needs a text data key, which the empty config does not define
+    errors = converter.convert_many(
+        INPUT_DATA,
+        {"CONLL2003": str(tmp_path / "conll"), "JSON_MIN": str(tmp_path / "json_min")},
+    )
+    assert list(errors) == [Format.CONLL2003]
+    assert os.path.exists(tmp_path / "json_min" / "result.json")
+
+
+def test_convert_compressed_ndjson_snapshot(tmp_path):
+    with open(INPUT_DATA, encoding="utf8") as f:
+        tasks = json.load(f)
+    ndjson_path = tmp_path / "snapshot.ndjson.gz"
+    with gzip.open(ndjson_path, "wt", encoding="utf8") as f:
+        for task in tasks:
+            f.write(json.dumps(task) + "\n")
+
+    Converter({}, "/tmp").convert(INPUT_DATA, str(tmp_path / "from_json"), "JSON_MIN", is_dir=False)
+    Converter({}, "/tmp").convert(str(ndjson_path), str(tmp_path / "from_path"), "JSON_MIN", is_dir=False)
+    with open(ndjson_path, "rb") as f:
+        errors = Converter({}, "/tmp").convert_many(f, {"JSON_MIN": str(tmp_path / "from_file")})
+    assert errors == {}
+
+    with open(tmp_path / "from_json" / "result.json", encoding="utf8") as f:
+        expected = f.read()
+    for output_dir in ("from_path", "from_file"):
+        with open(tmp_path / output_dir / "result.json", encoding="utf8") as f:
+            assert f.read() == expected
+
+
+class _UnseekableStream(io.RawIOBase):
+    def __init__(self, data):
+        self.data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self.data.readinto(buffer)
+
+
+def test_iter_tasks_detects_ndjson_without_seeking():
+    tasks = [{"data": {"text": "a"}}, {"data": {"text": "b"}}]
+    ndjson = "".join(json.dumps(task) + "\n" for task in tasks).encode()
+
+    assert list(iter_tasks(_UnseekableStream(gzip.compress(ndjson)))) == tasks
+    assert list(iter_tasks(_UnseekableStream(ndjson))) == tasks
+    assert list(iter_tasks(_UnseekableStream(json.dumps(tasks).encode()))) == tasks
+    # a pretty printed task is not a task list, it yields nothing as before
+    assert list(iter_tasks(_UnseekableStream(json.dumps(tasks[0], indent=2).encode()))) == []
@@ -0,0 +1,118 @@
+"""
+Test for the downloader.py module
+"""
+
+import os
+from pathlib import Path
+
+import requests_mock
+
+from synapse_sdk.converter.downloader import ResourceDownloader, url_key
+
+
+def test_fetch_uses_cache_and_revalidates(tmp_path):
+    url = "https://example.com/images/1.jpg"
+    target = tmp_path / "export" / "1.jpg"
+    target.parent.mkdir()
+
+    with requests_mock.Mocker() as m:
+        m.get(url, content=b"image-bytes", headers={"ETag": '"v1"'})
+        downloader = ResourceDownloader(cache_dir=str(tmp_path / "cache"))
+        assert downloader.fetch(url, target=str(target)) == str(target)
+        assert target.read_bytes() == b"image-bytes"
+
+        # same downloader: no second request
+        downloader.fetch(url)
+        assert m.call_count == 1
+
+        # a new export revalidates with the stored ETag and reuses the content
+        m.get(url, status_code=304)
+        path = ResourceDownloader(cache_dir=str(tmp_path / "cache")).fetch(url)
+        assert m.call_count == 2
+        assert m.last_request.headers["If-None-Match"] == '"v1"'
+        assert Path(path).read_bytes() == b"image-bytes"
+
+
+def test_fetch_resumes_partial_download(tmp_path):
+    url = "https://example.com/images/2.jpg"
+    downloader = ResourceDownloader(cache_dir=str(tmp_path / "cache"))
+
+    # simulate a download interrupted after 5 bytes
+    partial = downloader._partial_path(url_key(url))
+    with open(partial, "wb") as f:
+        f.write(b"01234")
+    downloader._write_json(partial + ".json", {"url": url, "validator": '"v2"'})
+
+    with requests_mock.Mocker() as m:
+        m.get(url, status_code=206, content=b"56789", headers={"ETag": '"v2"'})
+        path = downloader.fetch(url)
+
+    assert m.last_request.headers["Range"] == "bytes=5-"
+    assert m.last_request.headers["If-Range"] == '"v2"'
+    assert Path(path).read_bytes() == b"0123456789"
+    assert not os.path.exists(partial)
+
+
+def test_prefetch_reports_failures_and_progress(tmp_path):
+    urls = [f"https://example.com/images/{i}.jpg" for i in range(5)]
+    progress = []
+
+    with requests_mock.Mocker() as m:
+        for i, url in enumerate(urls):
+            if i == 3:
+                m.get(url, status_code=404)
+            else:
+                m.get(url, content=f"image-{i}".encode())
+        downloader = ResourceDownloader(
+            cache_dir=str(tmp_path / "cache"),
+            max_workers=3,
+            progress=lambda done, total, failed: progress.append((done, total, failed)),
+        )
+        failed = downloader.prefetch(urls + urls[:2])
+
+    assert list(failed) == [urls[3]]
+    assert progress[-1] == (5, 5, 1)
+    assert Path(downloader.cached_path(urls[1])).read_bytes() == b"image-1"
+    assert downloader.cached_path(urls[3]) is None
+
+
+def test_trim_removes_least_recently_used_objects(tmp_path):
+    urls = [f"https://example.com/images/{i}.jpg" for i in range(3)]
+    downloader = ResourceDownloader(cache_dir=str(tmp_path / "cache"), max_cache_size=10)
+
+    with requests_mock.Mocker() as m:
+        for i, url in enumerate(urls):
+            m.get(url, content=f"image-{i}".encode())
+        paths = [downloader.fetch(url) for url in urls]
+
+    # 21 bytes cached, the oldest access is the first image even though it was downloaded first
+    for age, path in zip([300, 100, 200], paths):
+        os.utime(path, (1000 - age, 1000 - age))
+
+    assert downloader.trim() == 14
+    assert downloader.cached_path(urls[0]) is None
+    assert downloader.cached_path(urls[2]) is None
+    assert downloader.cached_path(urls[1]) == paths[1]
+    assert not os.path.exists(downloader._index_path(url_key(urls[0])))
+
+
+def test_disabled_cache_is_emptied_by_trim(monkeypatch):
+    from synapse_sdk.converter import downloader as downloader_module
+
+    monkeypatch.setattr(downloader_module, "DOWNLOAD_CACHE", False)
+    url = "https://example.com/images/1.jpg"
+    downloader = ResourceDownloader()
+
+    with requests_mock.Mocker() as m:
+        m.get(url, content=b"image-bytes")
+        path = downloader.fetch(url)
+
+    assert path.startswith(downloader.cache_dir)
+    downloader.trim()
+    assert not os.path.exists(path)
+    # the downloader can still be used, it downloads again
+    with requests_mock.Mocker() as m:
+        m.get(url, content=b"image-bytes")
+        downloader.fetch(url)
+        assert m.call_count == 1
+    downloader.trim()
@@ -493,10 +493,14 @@ class AnnotationWorkflowService:
 
     @staticmethod
     @transaction.atomic
-    def trigger_consolidation(task, consensus):
+    def trigger_consolidation(task, consensus, completed_assignments=None):
         """
         Trigger consolidation when all annotations are received.
 
+        completed_assignments may be passed in already loaded (e.g. prefetched
+        for a whole batch by the consolidation queue); otherwise they are
+        queried here.
+
         Steps:
         1. Get all completed assignments with annotations
         2. Calculate pairwise agreement scores between annotators
@@ -523,17 +527,19 @@ class AnnotationWorkflowService:
         consensus.save(update_fields=["status"])
 
         # Get all completed assignments with annotations
-        completed_assignments = TaskAssignment.objects.filter(
-            task=task, status="completed", annotation__isnull=False
-        ).select_related("annotation", "annotator", "annotator__user")
+        if completed_assignments is None:
+            completed_assignments = TaskAssignment.objects.filter(
+                task=task, status="completed", annotation__isnull=False
+            ).select_related("annotation", "annotator", "annotator__user")
+        completed_assignments = list(completed_assignments)
 
-        if completed_assignments.count() < 1:
+        if len(completed_assignments) < 1:
             logger.warning(f"No completed assignments found for task {task.id}")
             return
 
         # Single annotation - auto-finalize
-        if completed_assignments.count() == 1:
-            assignment = completed_assignments.first()
+        if len(completed_assignments) == 1:
+            assignment = completed_assignments[0]
             consensus.status = "finalized"
             consensus.consolidated_result = assignment.annotation.result
             consensus.finalized_at = timezone.now()
@@ -3,9 +3,11 @@ from django.db.models import Q, Count, Avg, F, Case, When, Value, FloatField
 from django.conf import settings
 from django.utils import timezone
 from projects.models import Project, ProjectMember
+from tasks.models import Task
 from .models import AnnotatorProfile, ProjectAssignment, TaskAssignment, TrustLevel
 import logging
 import random
+from collections import defaultdict
 from datetime import timedelta
 from decimal import Decimal
 
@@ -14,6 +16,9 @@ logger = logging.getLogger(__name__)
 
 MAX_TASKS_IN_PROGRESS = getattr(settings, "ANNOTATOR_MAX_ACTIVE_TASKS", 10)
 
+# Rows per bulk_create / UPDATE chunk when distributing tasks in bulk mode
+BULK_ASSIGNMENT_BATCH_SIZE = getattr(settings, "ANNOTATOR_BULK_ASSIGNMENT_BATCH_SIZE", 1000)
+
 # Capacity limits based on trust level (increased for better testing and real-world usage)
 CAPACITY_LIMITS = {
     "new": 50,
@@ -775,8 +780,8 @@ class AssignmentEngine:
         return assignment
 
     @staticmethod
-    def check_annotator_capacity(annotator):
-        """Check annotator's current capacity"""
+    def _get_capacity_limit(annotator):
+        """Maximum number of active tasks allowed for an annotator"""
         try:
             trust_level = annotator.trust_level.level
             max_tasks = CAPACITY_LIMITS.get(trust_level, 10)
@@ -788,6 +793,13 @@ class AssignmentEngine:
         if custom_max:
             max_tasks = min(max_tasks, custom_max)
 
+        return max_tasks
+
+    @staticmethod
+    def check_annotator_capacity(annotator):
+        """Check annotator's current capacity"""
+        max_tasks = AssignmentEngine._get_capacity_limit(annotator)
+
         active_count = TaskAssignment.objects.filter(
             annotator=annotator, status__in=["assigned", "in_progress"]
         ).count()
@@ -816,7 +828,9 @@ class AssignmentEngine:
         return assignments
 
     @staticmethod
-    def distribute_tasks_intelligently(project, annotators, required_overlap=3):
+    def distribute_tasks_intelligently(
+        project, annotators, required_overlap=3, bulk=False
+    ):
         """
         Intelligently distribute tasks with rotating assignment pattern.
 
@@ -836,6 +850,9 @@ class AssignmentEngine:
             project: Project instance
             annotators: List of AnnotatorProfile instances (already sorted by score)
             required_overlap: Number of annotators per task (default 3)
+            bulk: Plan the whole distribution in memory and write it with
+                  chunked bulk_create instead of one query per task
+                  (see _distribute_tasks_in_bulk)
 
         Returns:
             Dict with assignment statistics
@@ -848,6 +865,11 @@ class AssignmentEngine:
         if required_overlap == 1:  # Default parameter
             required_overlap = getattr(project, "required_overlap", 3)
 
+        if bulk:
+            return AssignmentEngine._distribute_tasks_in_bulk(
+                project, annotators, required_overlap
+            )
+
         logger.info(
             f"Distributing tasks with required_overlap={required_overlap} "
             f"across {len(annotators)} annotators: "
@@ -1064,6 +1086,226 @@ class AssignmentEngine:
             "incomplete_tasks": incomplete_count,
         }
 
+    @staticmethod
+    def plan_task_distribution(tasks, annotators, required_overlap, existing, capacities):
+        """
+        Compute a task distribution in memory, without touching the database.
+
+        Mirrors the strategies of distribute_tasks_intelligently: ALL-TO-ALL when
+        there are no more annotators than required_overlap, otherwise ROTATING
+        with the rotation index carried over from task to task.
+
+        Args:
+            tasks: Iterable of (task_id, target_assignment_count) ordered by id
+            annotators: List of annotator ids (already sorted by score)
+            required_overlap: Number of annotators per task
+            existing: Dict of task_id -> set of already assigned annotator ids
+            capacities: Dict of annotator_id -> available slots (mutated)
+
+        Returns:
+            Tuple (plan, stats) where plan is a list of (task_id, annotator_id)
+        """
+        plan = []
+        stats = {
+            "assigned_tasks": 0,
+            "tasks_fully_assigned": 0,
+            "tasks_partially_assigned": 0,
+            "tasks_waiting": 0,
+        }
+        num_annotators = len(annotators)
+        rotation_index = 0
+
+        for task_id, target in tasks:
+            stats["assigned_tasks"] += 1
+            already_assigned = existing.get(task_id, set())
+            assigned_to_task = len(already_assigned)
+
+            if target - assigned_to_task <= 0:
+                if num_annotators > required_overlap:
+                    stats["tasks_fully_assigned"] += 1
+                continue
+
+            if num_annotators <= required_overlap:
+                for annotator_id in annotators:
+                    if annotator_id in already_assigned or capacities[annotator_id] <= 0:
+                        continue
+                    plan.append((task_id, annotator_id))
+                    capacities[annotator_id] -= 1
+                    assigned_to_task += 1
+
+                if assigned_to_task >= target:
+                    stats["tasks_fully_assigned"] += 1
+                continue
+
+            already_assigned = set(already_assigned)
+            attempts = 0
+            max_attempts = num_annotators * 2  # Prevent infinite loop
+
+            while assigned_to_task < target and attempts < max_attempts:
+                annotator_id = annotators[rotation_index % num_annotators]
+                rotation_index += 1
+                attempts += 1
+
+                if annotator_id in already_assigned or capacities[annotator_id] <= 0:
+                    continue
+
+                plan.append((task_id, annotator_id))
+                already_assigned.add(annotator_id)
+                capacities[annotator_id] -= 1
+                assigned_to_task += 1
+
+            if assigned_to_task >= target:
+                stats["tasks_fully_assigned"] += 1
+            elif assigned_to_task > 0:
+                stats["tasks_partially_assigned"] += 1
+            else:
+                stats["tasks_waiting"] += 1
+
+        return plan, stats
+
+    @staticmethod
+    def _distribute_tasks_in_bulk(project, annotators, required_overlap):
+        """
+        Set-based variant of distribute_tasks_intelligently.
+
+        Existing (task, annotator) pairs and annotator capacities are loaded with
+        a few queries, the whole plan is computed by plan_task_distribution and
+        written with chunked bulk_create / update statements.
+        """
+        batch_size = BULK_ASSIGNMENT_BATCH_SIZE
+
+        tasks = list(
+            project.tasks.annotate(assignments_count=Count("annotator_assignments"))
+            .filter(assignments_count__lt=required_overlap)
+            .order_by("id")
+            .values_list("id", "target_assignment_count")
+        )
+
+        if not tasks:
+            logger.info(f"No tasks to assign for project {project.id}")
+            return {"assigned_tasks": 0, "annotators_used": 0}
+
+        logger.info(f"Found {len(tasks)} tasks needing assignment (bulk mode)")
+
+        pending_task_ids = {task_id for task_id, _ in tasks}
+        existing = {}
+        pairs = (
+            TaskAssignment.objects.filter(task__project=project)
+            .values_list("task_id", "annotator_id")
+            .iterator(chunk_size=batch_size)
+        )
+        for task_id, annotator_id in pairs:
+            if task_id in pending_task_ids:
+                existing.setdefault(task_id, set()).add(annotator_id)
+
+        annotators_by_id = {annotator.id: annotator for annotator in annotators}
+        active_counts = dict(
+            TaskAssignment.objects.filter(
+                annotator_id__in=annotators_by_id.keys(),
+                status__in=["assigned", "in_progress"],
+            )
+            .values("annotator_id")
+            .annotate(active=Count("id"))
+            .values_list("annotator_id", "active")
+        )
+        capacities = {
+            annotator.id: max(
+                0,
+                AssignmentEngine._get_capacity_limit(annotator)
+                - active_counts.get(annotator.id, 0),
+            )
+            for annotator in annotators
+        }
+
+        plan, stats = AssignmentEngine.plan_task_distribution(
+            tasks,
+            [annotator.id for annotator in annotators],
+            required_overlap,
+            existing,
+            capacities,
+        )
+
+        per_task = defaultdict(int)
+        per_annotator = defaultdict(int)
+        for task_id, annotator_id in plan:
+            per_task[task_id] += 1
+            per_annotator[annotator_id] += 1
+
+        with transaction.atomic():
+            if plan:
+                user_ids = {annotators_by_id[a_id].user_id for a_id in per_annotator}
+                member_ids = set(
+                    ProjectMember.objects.filter(
+                        project=project, user_id__in=user_ids
+                    ).values_list("user_id", flat=True)
+                )
+                ProjectMember.objects.bulk_create(
+                    [
+                        ProjectMember(user_id=user_id, project=project, enabled=True)
+                        for user_id in user_ids - member_ids
+                    ]
+                )
+
+                if not project.is_published:
+                    project.is_published = True
+                    project.save(update_fields=["is_published"])
+                    logger.info(
+                        f"Auto-published project {project.id} for annotator visibility"
+                    )
+
+            for start in range(0, len(plan), batch_size):
+                TaskAssignment.objects.bulk_create(
+                    [
+                        TaskAssignment(
+                            task_id=task_id, annotator_id=annotator_id, status="assigned"
+                        )
+                        for task_id, annotator_id in plan[start : start + batch_size]
+                    ]
+                )
+
+            # Tasks grouped by increment so each chunk is a single UPDATE
+            tasks_by_increment = defaultdict(list)
+            for task_id, increment in per_task.items():
+                tasks_by_increment[increment].append(task_id)
+            for increment, task_ids in tasks_by_increment.items():
+                for start in range(0, len(task_ids), batch_size):
+                    Task.objects.filter(id__in=task_ids[start : start + batch_size]).update(
+                        assignment_count=F("assignment_count") + increment
+                    )
+
+            for annotator_id, count in per_annotator.items():
+                ProjectAssignment.objects.filter(
+                    project=project, annotator_id=annotator_id
+                ).update(assigned_tasks=F("assigned_tasks") + count)
+
+        incomplete_count = stats["tasks_partially_assigned"] + stats["tasks_waiting"]
+
+        logger.info(
+            f"📈 Bulk task distribution complete:\n"
+            f"  - Total tasks: {stats['assigned_tasks']}\n"
+            f"  - Assignments created: {len(plan)}\n"
+            f"  - Annotators used: {len(per_annotator)}\n"
+            f"  - Fully assigned: {stats['tasks_fully_assigned']}\n"
+            f"  - Partially assigned: {stats['tasks_partially_assigned']}\n"
+            f"  - Waiting (0): {stats['tasks_waiting']}"
+        )
+
+        if incomplete_count > 0:
+            logger.warning(
+                f"🔔 {incomplete_count} tasks need additional annotators. "
+                f"Will auto-assign when new annotators become available."
+            )
+
+        return {
+            "assigned_tasks": stats["assigned_tasks"],
+            "total_assignments": len(plan),
+            "annotators_used": len(per_annotator),
+            "tasks_fully_assigned": stats["tasks_fully_assigned"],
+            "tasks_partially_assigned": stats["tasks_partially_assigned"],
+            "tasks_waiting": stats["tasks_waiting"],
+            "incomplete_tasks": incomplete_count,
+        }
+
     @staticmethod
     def reassign_incomplete_tasks(project):
         """Reassign tasks that have been idle for too long"""
@@ -1215,6 +1457,7 @@ class AssignmentEngine:
             project,
             [a.annotator for a in assignments],
             required_overlap=required_overlap,
+            bulk=True,
         )
 
         logger.info(
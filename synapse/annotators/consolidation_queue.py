@@ -0,0 +1,326 @@
+"""
+Consolidation queue for consensus processing.
+
+Annotation saves only push the task id into a Redis set (deduplicated per
+task). A background job drains the set in batches and consolidates many
+tasks per transaction, loading their completed assignments with a single
+prefetch. Drain jobs are enqueued right away (RQ workers run without a
+scheduler) and debounced by a pending flag, so submits arriving while a
+drain is queued share its batch. When the queue still has work after a
+batch is popped, another drain job is queued, so throughput scales with
+the number of RQ workers listening on the consolidation queue. Tasks that
+fail are pushed back and retried up to CONSOLIDATION_MAX_ATTEMPTS times.
+
+Without Redis the task is consolidated synchronously, as before.
+"""
+
+import logging
+
+from core.redis import redis_connected, start_job_async_or_sync
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
+from django_rq import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+# Redis keys
+CONSOLIDATION_QUEUE_KEY = getattr(
+    settings, "CONSOLIDATION_QUEUE_REDIS_KEY", "annotators:consolidation_queue"
+)
+CONSOLIDATION_DRAIN_SCHEDULED_KEY = f"{CONSOLIDATION_QUEUE_KEY}:drain_scheduled"
+CONSOLIDATION_ATTEMPTS_KEY = f"{CONSOLIDATION_QUEUE_KEY}:attempts"
+
+# Configuration
+CONSOLIDATION_BATCH_SIZE = getattr(settings, "CONSOLIDATION_BATCH_SIZE", 50)
+CONSOLIDATION_RQ_QUEUE = getattr(settings, "CONSOLIDATION_RQ_QUEUE", "default")
+# Failed tasks are dropped from the queue after this many drains
+CONSOLIDATION_MAX_ATTEMPTS = getattr(settings, "CONSOLIDATION_MAX_ATTEMPTS", 5)
+# Safety net: a drain job that died without clearing its flag is forgotten after this
+CONSOLIDATION_DRAIN_SCHEDULED_TTL = getattr(
+    settings, "CONSOLIDATION_DRAIN_SCHEDULED_TTL", 300
+)
+
+
+def enqueue_task_consolidation(task_id):
+    """
+    Queue a task for consolidation.
+
+    Args:
+        task_id: Task ID whose annotation count changed
+
+    Returns:
+        True if the task was queued, False if it was consolidated synchronously
+    """
+    if not redis_connected():
+        consolidate_tasks([task_id])
+        return False
+
+    try:
+        redis_client = get_connection()
+        redis_client.sadd(CONSOLIDATION_QUEUE_KEY, task_id)
+        _schedule_drain(redis_client)
+        return True
+    except Exception as e:
+        logger.error(f"Failed to queue consolidation for task {task_id}: {e}")
+        consolidate_tasks([task_id])
+        return False
+
+
+def _schedule_drain(redis_client):
+    """Enqueue a drain job unless one is already pending"""
+    if not redis_client.set(
+        CONSOLIDATION_DRAIN_SCHEDULED_KEY,
+        1,
+        nx=True,
+        ex=CONSOLIDATION_DRAIN_SCHEDULED_TTL,
+    ):
+        return False
+
+    try:
+        start_job_async_or_sync(
+            drain_consolidation_queue, queue_name=CONSOLIDATION_RQ_QUEUE
+        )
+    except Exception:
+        redis_client.delete(CONSOLIDATION_DRAIN_SCHEDULED_KEY)
+        raise
+    return True
+
+
+def get_consolidation_queue_size():
+    """Number of tasks waiting for consolidation"""
+    if not redis_connected():
+        return 0
+    return get_connection().scard(CONSOLIDATION_QUEUE_KEY)
+
+
+def drain_consolidation_queue(batch_size=None):
+    """
+    Pop one batch of task ids from the queue and consolidate them.
+
+    The pending flag is cleared *before* popping, so a task enqueued at any
+    point is either picked up by this pop or schedules a new drain itself.
+    If tasks remain after the pop, the next drain is scheduled before this
+    batch is processed so another worker can start on it in parallel.
+
+    Args:
+        batch_size: Max number of tasks to pop (defaults to CONSOLIDATION_BATCH_SIZE)
+
+    Returns:
+        Dict with consolidation statistics for this batch
+    """
+    if not redis_connected():
+        return {"processed": 0, "consolidated": 0, "skipped": 0, "errors": 0}
+
+    batch_size = batch_size or CONSOLIDATION_BATCH_SIZE
+    redis_client = get_connection()
+
+    redis_client.delete(CONSOLIDATION_DRAIN_SCHEDULED_KEY)
+    task_ids = [
+        int(task_id)
+        for task_id in redis_client.spop(CONSOLIDATION_QUEUE_KEY, batch_size) or []
+    ]
+
+    if redis_client.scard(CONSOLIDATION_QUEUE_KEY):
+        _schedule_drain(redis_client)
+
+    if not task_ids:
+        return {"processed": 0, "consolidated": 0, "skipped": 0, "errors": 0}
+
+    logger.info(f"🧮 Draining consolidation queue: {len(task_ids)} task(s)")
+    try:
+        stats = consolidate_tasks(task_ids)
+    except Exception:
+        _retry_failed(redis_client, task_ids, task_ids)
+        raise
+    _retry_failed(redis_client, task_ids, stats["failed_task_ids"])
+    return stats
+
+
+def _retry_failed(redis_client, task_ids, failed_task_ids):
+    """Push failed tasks back into the queue, tasks failing too often are dropped"""
+    failed_task_ids = set(failed_task_ids)
+    done = [task_id for task_id in task_ids if task_id not in failed_task_ids]
+    if done:
+        redis_client.hdel(CONSOLIDATION_ATTEMPTS_KEY, *done)
+    if not failed_task_ids:
+        return
+
+    retried = []
+    for task_id in failed_task_ids:
+        attempts = redis_client.hincrby(CONSOLIDATION_ATTEMPTS_KEY, task_id, 1)
+        if attempts < CONSOLIDATION_MAX_ATTEMPTS:
+            retried.append(task_id)
+        else:
+            redis_client.hdel(CONSOLIDATION_ATTEMPTS_KEY, task_id)
+            logger.error(
+                f"Consolidation of task {task_id} failed {attempts} times, dropped from the queue"
+            )
+    if retried:
+        redis_client.sadd(CONSOLIDATION_QUEUE_KEY, *retried)
+        _schedule_drain(redis_client)
+
+
+def consolidate_tasks(task_ids):
+    """
+    Consolidate a batch of tasks in one transaction.
+
+    Annotation counts, completed assignments and existing consensus records
+    for the whole batch are loaded up front; adaptive overlap is computed
+    once per project. Each task runs in its own savepoint so one failure
+    does not roll back the rest of the batch.
+
+    Args:
+        task_ids: Iterable of task IDs
+
+    Returns:
+        Dict with consolidation statistics, failed_task_ids lists the tasks that raised
+    """
+    from annotators.adaptive_assignment_engine import AdaptiveAssignmentEngine
+    from annotators.annotation_workflow import AnnotationWorkflowService
+    from annotators.models import TaskAssignment, TaskConsensus
+    from tasks.models import Task
+
+    stats = {
+        "processed": 0,
+        "consolidated": 0,
+        "skipped": 0,
+        "errors": 0,
+        "failed_task_ids": [],
+    }
+
+    tasks = (
+        Task.objects.filter(id__in=list(task_ids))
+        .select_related("project")
+        .annotate(
+            active_annotation_count=Count(
+                "annotations", filter=Q(annotations__was_cancelled=False)
+            )
+        )
+        .prefetch_related(
+            Prefetch(
+                "annotator_assignments",
+                queryset=TaskAssignment.objects.filter(
+                    status="completed", annotation__isnull=False
+                ).select_related("annotation", "annotator", "annotator__user"),
+                to_attr="completed_assignments",
+            )
+        )
+        .order_by("id")
+    )
+
+    with transaction.atomic():
+        tasks = list(tasks)
+        consensus_by_task = {
+            consensus.task_id: consensus
+            for consensus in TaskConsensus.objects.filter(
+                task_id__in=[task.id for task in tasks]
+            )
+        }
+        overlap_by_project = {}
+
+        for task in tasks:
+            stats["processed"] += 1
+            project = task.project
+
+            try:
+                if project.id not in overlap_by_project:
+                    overlap_by_project[project.id], _, _ = (
+                        AdaptiveAssignmentEngine.calculate_optimal_overlap(project)
+                    )
+                required_overlap = overlap_by_project[project.id]
+            except Exception as e:
+                logger.error(f"Error calculating overlap for project {project.id}: {e}")
+                stats["errors"] += 1
+                stats["failed_task_ids"].append(task.id)
+                continue
+
+            try:
+                with transaction.atomic():
+                    consensus = _prepare_consensus(
+                        task,
+                        consensus_by_task.get(task.id),
+                        task.active_annotation_count,
+                        required_overlap,
+                    )
+                    if consensus is None:
+                        stats["skipped"] += 1
+                        continue
+
+                    logger.info(f"🚀 Triggering consolidation for Task {task.id}...")
+                    AnnotationWorkflowService.trigger_consolidation(
+                        task, consensus, task.completed_assignments
+                    )
+                    stats["consolidated"] += 1
+                    logger.info(f"✅ Consolidation completed for Task {task.id}")
+
+            except Exception as e:
+                stats["errors"] += 1
+                stats["failed_task_ids"].append(task.id)
+                logger.error(
+                    f"❌ Error triggering consolidation for Task {task.id}: {e}",
+                    exc_info=True,
+                )
+
+    logger.info(f"Consolidation batch complete: {stats}")
+    return stats
+
+
+def _prepare_consensus(task, consensus, annotation_count, required_overlap):
+    """
+    Check if a task is ready for consolidation and get its consensus record.
+
+    Uses the adaptive overlap system - consolidation triggers when:
+    - Task has reached the required number of annotations based on available annotators
+    - 2 annotators → need 2 annotations
+    - 3+ annotators → need 3 annotations
+
+    Returns:
+        TaskConsensus to consolidate, or None if the task is not ready or
+        already consolidated
+    """
+    from annotators.models import TaskConsensus
+
+    logger.info(
+        f"📊 Task {task.id}: {annotation_count}/{required_overlap} annotations "
+        f"(Project {task.project_id} has adaptive overlap={required_overlap})"
+    )
+
+    if annotation_count < required_overlap:
+        remaining = required_overlap - annotation_count
+        logger.info(
+            f"⏳ Task {task.id} needs {remaining} more annotation(s) before consolidation"
+        )
+        return None
+
+    logger.info(
+        f"🔔 Task {task.id} ready for consolidation with {annotation_count} annotations!"
+    )
+
+    if consensus is None:
+        consensus = TaskConsensus.objects.create(
+            task=task,
+            required_annotations=required_overlap,
+            current_annotations=annotation_count,
+            status="pending",
+        )
+        logger.info(f"📝 Created new consensus record for Task {task.id}")
+        return consensus
+
+    # Check if consolidation already completed
+    if consensus.status in ["review_required", "consensus_reached", "finalized"]:
+        logger.info(
+            f"✅ Task {task.id} already consolidated (status={consensus.status})"
+        )
+        return None
+
+    # Consolidation started but not completed - update and retry
+    logger.info(
+        f"⚠️  Task {task.id} has consensus but status={consensus.status}, retriggering..."
+    )
+    consensus.required_annotations = required_overlap
+    consensus.current_annotations = annotation_count
+    consensus.status = "in_consensus"
+    consensus.save()
+    return consensus
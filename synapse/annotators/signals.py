@@ -14,10 +14,11 @@ The workflow is fully automatic with FIXED OVERLAP=3:
 """
 
 import logging
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+
 from django.db import models
 from django.db.models import Count
+from django.db.models.signals import post_save
+from django.dispatch import receiver
 
 logger = logging.getLogger(__name__)
 
@@ -243,6 +244,7 @@ def auto_assign_on_tasks_imported(project_id):
     This is called from:
     - data_import/api.py (sync import)
     - data_import/functions.py (async import)
+    - io_storages/base_models.py (storage sync)
 
     Args:
         project_id: ID of the project that received new tasks
@@ -490,100 +492,21 @@ def check_reassignment_on_task_completion(sender, instance, created, **kwargs):
 )
 def check_consolidation_on_annotation_save(sender, instance, created, **kwargs):
     """
-    When an annotation is created or updated, check if task is ready for consolidation.
+    When an annotation is created, queue its task for consolidation.
 
-    This uses the adaptive overlap system - consolidation triggers when:
-    - Task has reached the required number of annotations based on available annotators
-    - 2 annotators → need 2 annotations
-    - 3+ annotators → need 3 annotations
+    The readiness check (adaptive overlap) and the consensus work itself run
+    in the consolidation queue worker (see annotators.consolidation_queue), so
+    submit latency does not depend on consensus cost. The task is queued only
+    after the annotation is committed, so the worker always sees it.
     """
     if not created or instance.was_cancelled:
         return
 
-    task = instance.task
-    project = task.project
-
-    # Count non-cancelled annotations for this task
-    from tasks.models import Annotation
-
-    annotation_count = Annotation.objects.filter(task=task, was_cancelled=False).count()
-
-    # Get adaptive required overlap
-    from annotators.adaptive_assignment_engine import AdaptiveAssignmentEngine
-
-    try:
-        required_overlap, _, _ = AdaptiveAssignmentEngine.calculate_optimal_overlap(
-            project
-        )
-    except Exception as e:
-        logger.error(f"Error calculating overlap: {e}")
-        return
-
-    logger.info(
-        f"📊 Task {task.id}: {annotation_count}/{required_overlap} annotations "
-        f"(Project {project.id} has adaptive overlap={required_overlap})"
-    )
-
-    # Check if ready for consolidation
-    if annotation_count >= required_overlap:
-        logger.info(
-            f"🔔 Task {task.id} ready for consolidation with {annotation_count} annotations!"
-        )
-
-        # Check if already has consensus
-        from annotators.models import TaskConsensus
-
-        try:
-            consensus = TaskConsensus.objects.get(task=task)
-
-            # Check if consolidation already completed
-            if consensus.status in [
-                "review_required",
-                "consensus_reached",
-                "finalized",
-            ]:
-                logger.info(
-                    f"✅ Task {task.id} already consolidated (status={consensus.status})"
-                )
-                return
-
-            # Consolidation started but not completed - update and retry
-            logger.info(
-                f"⚠️  Task {task.id} has consensus but status={consensus.status}, retriggering..."
-            )
-            consensus.required_annotations = required_overlap
-            consensus.current_annotations = annotation_count
-            consensus.status = "in_consensus"
-            consensus.save()
-
-        except TaskConsensus.DoesNotExist:
-            # Create new consensus object
-            consensus = TaskConsensus.objects.create(
-                task=task,
-                required_annotations=required_overlap,
-                current_annotations=annotation_count,
-                status="pending",
-            )
-            logger.info(f"📝 Created new consensus record for Task {task.id}")
+    from annotators.consolidation_queue import enqueue_task_consolidation
+    from django.db import transaction
 
-        # Trigger consolidation directly (not through background job to avoid Redis auth issues)
-        try:
-            from annotators.annotation_workflow import AnnotationWorkflowService
-
-            logger.info(f"🚀 Triggering consolidation for Task {task.id}...")
-            AnnotationWorkflowService.trigger_consolidation(task, consensus)
-            logger.info(f"✅ Consolidation completed for Task {task.id}")
-
-        except Exception as e:
-            logger.error(
-                f"❌ Error triggering consolidation for Task {task.id}: {e}",
-                exc_info=True,
-            )
-    else:
-        remaining = required_overlap - annotation_count
-        logger.info(
-            f"⏳ Task {task.id} needs {remaining} more annotation(s) before consolidation"
-        )
+    task_id = instance.task_id
+    transaction.on_commit(lambda: enqueue_task_consolidation(task_id))
 
 
 @receiver(
@@ -790,8 +713,9 @@ def trigger_dynamic_assignment_on_import(project_id):
     Args:
         project_id: ID of the project that received new tasks
     """
-    from .assignment_engine import DynamicAssignmentEngine
     from projects.models import Project
+
+    from .assignment_engine import DynamicAssignmentEngine
     
     try:
         project = Project.objects.get(id=project_id)
@@ -842,8 +766,8 @@ def reactivate_annotator_on_login(user):
     Args:
         user: User instance that just logged in
     """
-    from .models import AnnotatorProfile
     from .assignment_engine import DynamicAssignmentEngine
+    from .models import AnnotatorProfile
     
     try:
         # Check if user is an annotator
@@ -890,8 +814,8 @@ def reactivate_expert_on_login(user):
     Args:
         user: User instance that just logged in
     """
-    from .models import ExpertProfile
     from .expert_assignment_engine import ExpertAssignmentEngine
+    from .models import ExpertProfile
     
     try:
         # Check if user is an expert
@@ -921,8 +845,8 @@ def on_expert_review_completed(sender, instance, created, **kwargs):
     if created:
         return  # Skip on creation
     
-    from .models import ExpertProfile
     from .expert_assignment_engine import ExpertAssignmentEngine
+    from .models import ExpertProfile
     
     try:
         review = instance
@@ -0,0 +1,144 @@
+"""
+Tests for AssignmentEngine task distribution
+
+Tests cover:
+- In-memory distribution planning (rotation and all-to-all)
+- Bulk mode produces the same assignments and statistics as the row-by-row mode
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+User = get_user_model()
+
+
+class PlanTaskDistributionTests(TestCase):
+    """Tests for AssignmentEngine.plan_task_distribution"""
+
+    def test_rotation_pattern(self):
+        from annotators.assignment_engine import AssignmentEngine
+
+        tasks = [(task_id, 3) for task_id in range(1, 6)]
+        capacities = {a: 100 for a in "ABCDE"}
+
+        plan, stats = AssignmentEngine.plan_task_distribution(
+            tasks, list("ABCDE"), 3, {}, capacities
+        )
+
+        by_task = {}
+        for task_id, annotator_id in plan:
+            by_task.setdefault(task_id, []).append(annotator_id)
+
+        self.assertEqual(by_task[1], ["A", "B", "C"])
+        self.assertEqual(by_task[2], ["D", "E", "A"])
+        self.assertEqual(stats["tasks_fully_assigned"], 5)
+        self.assertEqual(capacities["A"], 97)
+
+    def test_capacity_and_existing_pairs(self):
+        from annotators.assignment_engine import AssignmentEngine
+
+        tasks = [(1, 3), (2, 3), (3, 3)]
+        capacities = {"A": 0, "B": 1, "C": 5, "D": 5}
+        existing = {1: {"C"}}
+
+        plan, stats = AssignmentEngine.plan_task_distribution(
+            tasks, list("ABCD"), 3, existing, capacities
+        )
+
+        self.assertNotIn((1, "C"), plan)
+        self.assertFalse([pair for pair in plan if pair[1] == "A"])
+        self.assertEqual(len([pair for pair in plan if pair[1] == "B"]), 1)
+        self.assertEqual(stats["tasks_fully_assigned"], 1)
+        self.assertEqual(stats["tasks_partially_assigned"], 2)
+        self.assertEqual(stats["tasks_waiting"], 0)
+
+    def test_all_to_all(self):
+        from annotators.assignment_engine import AssignmentEngine
+
+        tasks = [(1, 3), (2, 3)]
+        capacities = {"A": 10, "B": 10}
+
+        plan, stats = AssignmentEngine.plan_task_distribution(
+            tasks, ["A", "B"], 3, {}, capacities
+        )
+
+        self.assertEqual(plan, [(1, "A"), (1, "B"), (2, "A"), (2, "B")])
+        self.assertEqual(stats["tasks_fully_assigned"], 0)
+
+
+class BulkDistributionTests(TestCase):
+    """Bulk mode must match the row-by-row distribution"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from annotators.models import AnnotatorProfile, TrustLevel
+        from organizations.models import Organization
+
+        cls.org = Organization.objects.create(title="Test Org")
+        cls.annotators = []
+        for i in range(5):
+            user = User.objects.create_user(
+                username=f"dist{i}", email=f"dist{i}@test.com", password="testpass123"
+            )
+            annotator = AnnotatorProfile.objects.create(user=user, status="approved")
+            TrustLevel.objects.create(annotator=annotator, level="new")
+            cls.annotators.append(annotator)
+
+    def _make_project(self, title):
+        from projects.models import Project
+        from tasks.models import Task
+
+        project = Project.objects.create(
+            title=title, organization=self.org, is_published=True
+        )
+        # bulk_create skips the auto-assignment signal on task creation
+        Task.objects.bulk_create(
+            [
+                Task(project=project, data={"text": f"task {i}"}, target_assignment_count=3)
+                for i in range(12)
+            ]
+        )
+        return project
+
+    def _assignments(self, project):
+        from annotators.models import TaskAssignment
+
+        tasks = list(project.tasks.order_by("id").values_list("id", flat=True))
+        return sorted(
+            (tasks.index(task_id), annotator_id)
+            for task_id, annotator_id in TaskAssignment.objects.filter(
+                task__project=project
+            ).values_list("task_id", "annotator_id")
+        )
+
+    def test_bulk_matches_row_by_row(self):
+        from annotators.assignment_engine import AssignmentEngine
+        from projects.models import ProjectMember
+
+        row_project = self._make_project("Row project")
+        bulk_project = self._make_project("Bulk project")
+
+        row_stats = AssignmentEngine.distribute_tasks_intelligently(
+            row_project, self.annotators, required_overlap=3
+        )
+        # Reset active assignments so both runs start with the same capacity
+        from annotators.models import TaskAssignment
+
+        TaskAssignment.objects.filter(task__project=row_project).update(
+            status="completed"
+        )
+        bulk_stats = AssignmentEngine.distribute_tasks_intelligently(
+            bulk_project, self.annotators, required_overlap=3, bulk=True
+        )
+
+        self.assertEqual(row_stats, bulk_stats)
+        self.assertEqual(
+            self._assignments(row_project), self._assignments(bulk_project)
+        )
+        self.assertEqual(
+            sorted(bulk_project.tasks.values_list("assignment_count", flat=True)),
+            [3] * 12,
+        )
+        self.assertEqual(
+            ProjectMember.objects.filter(project=bulk_project).count(), 5
+        )
@@ -0,0 +1,119 @@
+"""
+Tests for the consolidation queue
+
+Tests cover:
+- Annotation saves queue the task instead of consolidating inline
+- Batched consolidation skips tasks that are not ready or already consolidated
+- Drains are enqueued without a delay and failed tasks are retried
+"""
+
+from unittest.mock import patch
+
+from django.test import TestCase
+
+
+class ConsolidationQueueTests(TestCase):
+    """Tests for annotators.consolidation_queue"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from organizations.models import Organization
+        from projects.models import Project
+        from tasks.models import Task
+
+        cls.org = Organization.objects.create(title="Test Org")
+        cls.project = Project.objects.create(title="Queue project", organization=cls.org)
+        Task.objects.bulk_create(
+            [Task(project=cls.project, data={"text": f"task {i}"}) for i in range(3)]
+        )
+        cls.tasks = list(cls.project.tasks.order_by("id"))
+
+    def test_annotation_save_enqueues_task(self):
+        from tasks.models import Annotation
+
+        task = self.tasks[0]
+        with patch(
+            "annotators.consolidation_queue.enqueue_task_consolidation"
+        ) as enqueue, self.captureOnCommitCallbacks(execute=True):
+            Annotation.objects.create(task=task, project=self.project, result=[])
+
+        enqueue.assert_called_once_with(task.id)
+
+    def test_enqueue_without_redis_consolidates_synchronously(self):
+        from annotators import consolidation_queue
+
+        with patch.object(
+            consolidation_queue, "redis_connected", return_value=False
+        ), patch.object(consolidation_queue, "consolidate_tasks") as consolidate:
+            queued = consolidation_queue.enqueue_task_consolidation(self.tasks[0].id)
+
+        self.assertFalse(queued)
+        consolidate.assert_called_once_with([self.tasks[0].id])
+
+    def test_consolidate_tasks_skips_not_ready_and_finalized(self):
+        from annotators import consolidation_queue
+        from annotators.models import TaskConsensus
+
+        TaskConsensus.objects.create(
+            task=self.tasks[1],
+            required_annotations=1,
+            current_annotations=1,
+            status="finalized",
+        )
+
+        with patch(
+            "annotators.adaptive_assignment_engine.AdaptiveAssignmentEngine.calculate_optimal_overlap",
+            return_value=(0, 0, 0),
+        ) as overlap, patch(
+            "annotators.annotation_workflow.AnnotationWorkflowService.trigger_consolidation"
+        ) as trigger:
+            stats = consolidation_queue.consolidate_tasks(
+                [self.tasks[1].id, self.tasks[2].id]
+            )
+
+        # Overlap is computed once per project, not once per task
+        overlap.assert_called_once()
+        self.assertEqual(stats["processed"], 2)
+        self.assertEqual(stats["skipped"], 1)
+        self.assertEqual(stats["consolidated"], 1)
+
+        task, consensus, assignments = trigger.call_args[0]
+        self.assertEqual(task.id, self.tasks[2].id)
+        self.assertEqual(consensus.status, "pending")
+        self.assertEqual(assignments, [])
+
+    def test_drain_retries_failed_tasks(self):
+        from annotators import consolidation_queue
+        from fakeredis import FakeRedis
+
+        redis = FakeRedis()
+        task_ids = [task.id for task in self.tasks[:2]]
+        failed = {"failed_task_ids": [task_ids[0]]}
+        with patch.object(
+            consolidation_queue, "redis_connected", return_value=True
+        ), patch.object(
+            consolidation_queue, "get_connection", return_value=redis
+        ), patch.object(
+            consolidation_queue, "start_job_async_or_sync"
+        ) as start_job, patch.object(
+            consolidation_queue, "consolidate_tasks", return_value=failed
+        ):
+            for task_id in task_ids:
+                consolidation_queue.enqueue_task_consolidation(task_id)
+            # one drain, enqueued without a delay
+            start_job.assert_called_once_with(
+                consolidation_queue.drain_consolidation_queue,
+                queue_name=consolidation_queue.CONSOLIDATION_RQ_QUEUE,
+            )
+
+            consolidation_queue.drain_consolidation_queue()
+            self.assertEqual(
+                redis.smembers(consolidation_queue.CONSOLIDATION_QUEUE_KEY),
+                {str(task_ids[0]).encode()},
+            )
+            self.assertEqual(start_job.call_count, 2)
+
+            # dropped after CONSOLIDATION_MAX_ATTEMPTS drains
+            for _ in range(consolidation_queue.CONSOLIDATION_MAX_ATTEMPTS - 1):
+                consolidation_queue.drain_consolidation_queue()
+            self.assertEqual(redis.scard(consolidation_queue.CONSOLIDATION_QUEUE_KEY), 0)
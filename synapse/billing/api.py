@@ -1657,6 +1657,11 @@ class APIUsageViewSet(viewsets.ViewSet):
 
             today = timezone.now().date()
 
+            # Include requests still counted in Redis
+            from billing.usage_counters import APIUsageCounters
+
+            APIUsageCounters.flush(organization_ids=[org.id])
+
             usage, _ = APIUsageTracking.objects.get_or_create(
                 organization=org, date=today
             )
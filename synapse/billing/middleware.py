@@ -23,6 +23,10 @@ class APIRateLimitMiddleware:
 
     Note: This middleware tracks usage but doesn't block requests.
     Organizations are billed for overage at end of day.
+
+    Counts are kept in Redis counters and flushed to APIUsageTracking in
+    the background (see billing.usage_counters), so tracking adds no
+    database writes to the request.
     """
 
     # Endpoints that count as exports
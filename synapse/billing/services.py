@@ -2161,20 +2161,28 @@ class APIRateLimitService:
         Returns:
             dict: Rate limit status
         """
-        today = timezone.now().date()
-
-        usage, _ = APIUsageTracking.objects.get_or_create(
-            organization=organization, date=today
-        )
+        from billing.usage_counters import APIUsageCounters
 
+        today = timezone.now().date()
         limit = cls.FREE_LIMITS.get(request_type, 10000)
 
-        if request_type == "read":
-            current = usage.read_requests
-        elif request_type == "write":
-            current = usage.write_requests
+        if APIUsageCounters.is_enabled():
+            current = APIUsageCounters.get_usage(
+                organization.id,
+                request_type if request_type in cls.FREE_LIMITS else "export",
+                today,
+            )
         else:
-            current = usage.export_requests
+            usage, _ = APIUsageTracking.objects.get_or_create(
+                organization=organization, date=today
+            )
+
+            if request_type == "read":
+                current = usage.read_requests
+            elif request_type == "write":
+                current = usage.write_requests
+            else:
+                current = usage.export_requests
 
         remaining = max(0, limit - current)
         is_over_limit = current > limit
@@ -2197,11 +2205,21 @@ class APIRateLimitService:
             organization: Organization instance
             request_type: Type of request
 
+        Counts go to the Redis counters (see billing.usage_counters) and are
+        flushed to APIUsageTracking in the background; without Redis the
+        database row is updated directly.
+
         Returns:
             bool: True if within free limit, False if overage
         """
+        from billing.usage_counters import APIUsageCounters
+
         today = timezone.now().date()
 
+        if request_type in cls.FREE_LIMITS and APIUsageCounters.is_enabled():
+            used = APIUsageCounters.increment(organization.id, request_type, today)
+            return used <= cls.FREE_LIMITS[request_type]
+
         usage, _ = APIUsageTracking.objects.get_or_create(
             organization=organization, date=today
         )
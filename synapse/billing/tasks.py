@@ -5,6 +5,7 @@ These should be scheduled via Celery, RQ, or cron.
 Recommended schedule:
 - process_project_lifecycle: Daily at 00:30 UTC
 - charge_api_overage: Daily at 00:15 UTC
+- flush_api_usage: Every 5 minutes
 - charge_storage_billing: Monthly on 1st at 01:00 UTC
 - expire_credits: Daily at 00:45 UTC
 - cleanup_unpublished_projects: Hourly (fallback for abandoned project creation)
@@ -59,10 +60,14 @@ def charge_api_overage():
     """
     from billing.services import APIRateLimitService
     from billing.models import APIUsageTracking
+    from billing.usage_counters import APIUsageCounters
     from organizations.models import Organization
 
     logger.info("Starting API overage billing...")
 
+    # Make sure counts still held in Redis are in the database before charging
+    APIUsageCounters.flush()
+
     yesterday = (timezone.now() - timedelta(days=1)).date()
 
     summary = {
@@ -99,6 +104,24 @@ def charge_api_overage():
     return summary
 
 
+@job("low", timeout=600)
+def flush_api_usage():
+    """
+    Write API usage counted in Redis to APIUsageTracking.
+
+    Flushes are also scheduled automatically while requests are tracked;
+    this job is a safety net for quiet periods.
+
+    Returns:
+        dict: Number of organization-day rows updated
+    """
+    from billing.usage_counters import APIUsageCounters
+
+    updated = APIUsageCounters.flush()
+    logger.info(f"Flushed API usage counters: {updated} row(s) updated")
+    return {"rows_updated": updated}
+
+
 @job("default", timeout=1800)
 def charge_storage_billing():
     """
@@ -0,0 +1,292 @@
+"""
+Redis-backed API usage counters.
+
+APIRateLimitMiddleware increments atomic Redis counters keyed by
+(organization, day, request type) instead of writing APIUsageTracking on
+every request. Two hashes are kept per (organization, day):
+
+- total:   running daily total (flushed + pending), read by rate limit checks
+- pending: increments not yet written to the database
+
+A background flush moves pending increments into APIUsageTracking in bulk.
+Pending hashes are renamed before they are read, so increments arriving
+during a flush land in a fresh hash, and counts are pushed back if the
+database write fails. charge_api_overage flushes before charging.
+
+Without Redis every request is written to the database directly, as before.
+"""
+
+import logging
+import time
+import uuid
+from datetime import date as date_cls
+
+from core.redis import redis_connected, start_job_async_or_sync
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django_rq import get_connection
+from redis.exceptions import ResponseError
+
+logger = logging.getLogger(__name__)
+
+
+REQUEST_TYPES = ("read", "write", "export")
+
+# Redis keys
+KEY_PREFIX = getattr(settings, "API_USAGE_REDIS_KEY_PREFIX", "api_usage")
+PENDING_SET_KEY = f"{KEY_PREFIX}:pending_keys"
+FLUSH_SCHEDULED_KEY = f"{KEY_PREFIX}:flush_scheduled"
+
+# Configuration
+FLUSH_INTERVAL = getattr(settings, "API_USAGE_FLUSH_INTERVAL", 60)  # seconds
+COUNTER_TTL = getattr(settings, "API_USAGE_COUNTER_TTL", 3 * 86400)  # 3 days
+# How long a Redis health check result is reused before pinging again
+REDIS_CHECK_INTERVAL = getattr(settings, "API_USAGE_REDIS_CHECK_INTERVAL", 10)  # seconds
+
+# (checked_at, connected) of the last Redis health check in this process
+_redis_check = (0.0, False)
+
+
+class APIUsageCounters:
+    """
+    Fast store for daily API usage counts.
+
+    Usage:
+        # Count a request, returns the daily total for that request type
+        used = APIUsageCounters.increment(organization.id, "read")
+
+        # Read current usage
+        used = APIUsageCounters.get_usage(organization.id, "write")
+
+        # Move pending counts into APIUsageTracking
+        APIUsageCounters.flush()
+    """
+
+    @staticmethod
+    def _suffix(organization_id, day):
+        return f"{day.isoformat()}:{organization_id}"
+
+    @classmethod
+    def _total_key(cls, organization_id, day):
+        return f"{KEY_PREFIX}:total:{cls._suffix(organization_id, day)}"
+
+    @classmethod
+    def _pending_key(cls, organization_id, day):
+        return f"{KEY_PREFIX}:pending:{cls._suffix(organization_id, day)}"
+
+    @classmethod
+    def is_enabled(cls):
+        return getattr(settings, "API_USAGE_REDIS_COUNTERS", True) and cls._redis_available()
+
+    @staticmethod
+    def _redis_available():
+        """
+        Cached redis_connected().
+
+        is_enabled runs on every API request; pinging Redis each time would
+        double the round trips, so the result is reused for REDIS_CHECK_INTERVAL.
+        """
+        global _redis_check
+
+        checked_at, connected = _redis_check
+        now = time.monotonic()
+        if now - checked_at >= REDIS_CHECK_INTERVAL:
+            connected = redis_connected()
+            _redis_check = (now, connected)
+        return connected
+
+    @classmethod
+    def increment(cls, organization_id, request_type, day=None):
+        """
+        Count one API request.
+
+        Returns:
+            int: Daily total for this request type including this request
+        """
+        day = day or timezone.now().date()
+        redis_client = get_connection()
+        total_key = cls._total_key(organization_id, day)
+        pending_key = cls._pending_key(organization_id, day)
+
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.exists(total_key)
+        pipe.hincrby(total_key, request_type, 1)
+        pipe.hincrby(pending_key, request_type, 1)
+        pipe.sadd(PENDING_SET_KEY, cls._suffix(organization_id, day))
+        pipe.expire(total_key, COUNTER_TTL)
+        pipe.expire(pending_key, COUNTER_TTL)
+        existed, used = pipe.execute()[:2]
+
+        if not existed:
+            used += cls._add_database_base(redis_client, organization_id, day)[request_type]
+
+        cls._schedule_flush(redis_client)
+        return used
+
+    @classmethod
+    def get_usage(cls, organization_id, request_type, day=None):
+        """Daily total for a request type (flushed and pending)"""
+        day = day or timezone.now().date()
+        redis_client = get_connection()
+        total_key = cls._total_key(organization_id, day)
+
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.exists(total_key)
+        pipe.hincrby(total_key, request_type, 0)
+        pipe.expire(total_key, COUNTER_TTL)
+        existed, used = pipe.execute()[:2]
+
+        if not existed:
+            used += cls._add_database_base(redis_client, organization_id, day)[request_type]
+        return used
+
+    @classmethod
+    def _add_database_base(cls, redis_client, organization_id, day):
+        """
+        Add the counts already stored in APIUsageTracking to a new running total.
+
+        Called only by the request that created the total hash (EXISTS and
+        the first HINCRBY run in one MULTI), so the base is added exactly once.
+        """
+        from billing.models import APIUsageTracking
+
+        usage = (
+            APIUsageTracking.objects.filter(organization_id=organization_id, date=day)
+            .values("read_requests", "write_requests", "export_requests")
+            .first()
+        ) or {}
+        base = {request_type: usage.get(f"{request_type}_requests", 0) for request_type in REQUEST_TYPES}
+
+        if any(base.values()):
+            pipe = redis_client.pipeline(transaction=True)
+            for request_type, count in base.items():
+                pipe.hincrby(cls._total_key(organization_id, day), request_type, count)
+            pipe.execute()
+        return base
+
+    @classmethod
+    def _schedule_flush(cls, redis_client):
+        """
+        Enqueue a flush at most once per FLUSH_INTERVAL.
+
+        The flag is left to expire rather than cleared by the job, so the
+        first request after each interval triggers the next flush.
+        """
+        if not redis_client.set(FLUSH_SCHEDULED_KEY, 1, nx=True, ex=FLUSH_INTERVAL):
+            return
+
+        try:
+            start_job_async_or_sync(flush_api_usage_counters, queue_name="low")
+        except Exception as e:
+            redis_client.delete(FLUSH_SCHEDULED_KEY)
+            logger.error(f"Failed to schedule API usage flush: {e}")
+
+    @classmethod
+    def flush(cls, organization_ids=None):
+        """
+        Write pending counts to APIUsageTracking.
+
+        Args:
+            organization_ids: Only flush these organizations (defaults to all)
+
+        Returns:
+            int: Number of (organization, day) rows updated
+        """
+        if not cls.is_enabled():
+            return 0
+
+        redis_client = get_connection()
+        members = [
+            member.decode() if isinstance(member, bytes) else member
+            for member in redis_client.smembers(PENDING_SET_KEY)
+        ]
+        if organization_ids is not None:
+            organization_ids = {str(organization_id) for organization_id in organization_ids}
+            members = [m for m in members if m.rsplit(":", 1)[1] in organization_ids]
+
+        # Take pending hashes out of the write path before reading them
+        deltas = {}
+        for member in members:
+            day_str, organization_id = member.rsplit(":", 1)
+            day = date_cls.fromisoformat(day_str)
+            pending_key = cls._pending_key(organization_id, day)
+            flushing_key = f"{pending_key}:flushing:{uuid.uuid4().hex}"
+
+            redis_client.srem(PENDING_SET_KEY, member)
+            try:
+                redis_client.rename(pending_key, flushing_key)
+            except ResponseError:
+                # Already flushed by someone else
+                continue
+
+            counts = redis_client.hgetall(flushing_key)
+            redis_client.delete(flushing_key)
+            deltas[(int(organization_id), day)] = {
+                (k.decode() if isinstance(k, bytes) else k): int(v) for k, v in counts.items()
+            }
+
+        if not deltas:
+            return 0
+
+        try:
+            cls._write_deltas(deltas)
+        except Exception as e:
+            logger.error(f"Failed to flush API usage counters, restoring pending counts: {e}", exc_info=True)
+            cls._restore_deltas(redis_client, deltas)
+            raise
+
+        logger.debug(f"Flushed API usage counters for {len(deltas)} organization-day(s)")
+        return len(deltas)
+
+    @staticmethod
+    def _write_deltas(deltas):
+        """Upsert pending counts into APIUsageTracking"""
+        from billing.models import APIUsageTracking
+
+        with transaction.atomic():
+            APIUsageTracking.objects.bulk_create(
+                [
+                    APIUsageTracking(organization_id=organization_id, date=day)
+                    for organization_id, day in deltas
+                ],
+                ignore_conflicts=True,
+            )
+
+            for (organization_id, day), counts in deltas.items():
+                APIUsageTracking.objects.filter(organization_id=organization_id, date=day).update(
+                    read_requests=F("read_requests") + counts.get("read", 0),
+                    write_requests=F("write_requests") + counts.get("write", 0),
+                    export_requests=F("export_requests") + counts.get("export", 0),
+                    updated_at=timezone.now(),
+                )
+
+            # Recompute overage after the increments are applied
+            for day in {day for _, day in deltas}:
+                APIUsageTracking.objects.filter(
+                    date=day,
+                    organization_id__in=[organization_id for organization_id, d in deltas if d == day],
+                ).update(
+                    read_overage=Greatest(F("read_requests") - F("free_read_limit"), Value(0)),
+                    write_overage=Greatest(F("write_requests") - F("free_write_limit"), Value(0)),
+                    export_overage=Greatest(F("export_requests") - F("free_export_limit"), Value(0)),
+                )
+
+    @classmethod
+    def _restore_deltas(cls, redis_client, deltas):
+        """Put counts back into the pending hashes after a failed flush"""
+        for (organization_id, day), counts in deltas.items():
+            pending_key = cls._pending_key(organization_id, day)
+            pipe = redis_client.pipeline(transaction=True)
+            for request_type, count in counts.items():
+                pipe.hincrby(pending_key, request_type, count)
+            pipe.sadd(PENDING_SET_KEY, cls._suffix(organization_id, day))
+            pipe.expire(pending_key, COUNTER_TTL)
+            pipe.execute()
+
+
+def flush_api_usage_counters(organization_ids=None):
+    """Background job entry point for APIUsageCounters.flush"""
+    return APIUsageCounters.flush(organization_ids=organization_ids)
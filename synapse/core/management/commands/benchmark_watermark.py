@@ -0,0 +1,71 @@
+import io
+import time
+
+from core.watermark_service import WatermarkService
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+# Megapixels -> (width, height), 4:3 like typical camera output
+IMAGE_SIZES = {
+    1: (1152, 864),
+    12: (4000, 3000),
+    40: (7296, 5472),
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the NumPy LSB watermark engine against the per-pixel reference loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=sorted(IMAGE_SIZES),
+            choices=sorted(IMAGE_SIZES),
+            help='image sizes in megapixels',
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='runs per measurement (best is reported)')
+        parser.add_argument('--skip-loop', action='store_true', help='skip the slow per-pixel reference loop')
+
+    def handle(self, *args, **options):
+        payload = WatermarkService.create_forensic_watermark(
+            user_id='benchmark-user', session_id='benchmark-session', project_id='1', task_id='1'
+        )
+        data = WatermarkService._pack_payload(payload)
+
+        for megapixels in options['sizes']:
+            width, height = IMAGE_SIZES[megapixels]
+            image = Image.effect_noise((width, height), 64).convert('RGB')
+            buffer = io.BytesIO()
+            image.save(buffer, format='PNG')
+            image_bytes = buffer.getvalue()
+
+            self.stdout.write(f'{megapixels} MP ({width}x{height}), payload {len(data)} bytes')
+
+            engines = [('numpy', WatermarkService._embed_lsb, WatermarkService._extract_lsb)]
+            if not options['skip_loop']:
+                engines.append(
+                    ('loop', WatermarkService._embed_lsb_pixel_loop, WatermarkService._extract_lsb_pixel_loop)
+                )
+
+            for name, embed, extract in engines:
+                embed_time = self._best_of(options['repeat'], lambda: embed(image.copy(), data))
+                extract_time = self._best_of(options['repeat'], lambda: extract(image, len(data)))
+                self.stdout.write(f'  {name:>5}: embed {embed_time * 1000:9.2f} ms, extract {extract_time * 1000:9.2f} ms')
+
+            # End-to-end request cost (decode + embed + PNG encode) with the current engine
+            total_time = self._best_of(
+                options['repeat'], lambda: WatermarkService.apply_invisible_watermark(image_bytes, payload)
+            )
+            self.stdout.write(f'  apply_invisible_watermark end-to-end: {total_time * 1000:9.2f} ms')
+
+    @staticmethod
+    def _best_of(repeat, func):
+        best = None
+        for _ in range(max(repeat, 1)):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -633,6 +633,8 @@ os.makedirs(EXPORT_DIR, exist_ok=True)
 # dir for delayed export
 DELAYED_EXPORT_DIR = "export"
 os.makedirs(os.path.join(BASE_DATA_DIR, MEDIA_ROOT, DELAYED_EXPORT_DIR), exist_ok=True)
+# Snapshots with more tasks are exported in shards of this many tasks, in parallel on RQ workers, 0 disables sharding
+EXPORT_SHARD_SIZE = int(get_env("EXPORT_SHARD_SIZE", 100000))
 
 # file / task size limits
 # For multipart file uploads, this limits the non-file POST data size, not file size
@@ -664,7 +666,20 @@ LABEL_STREAM_HISTORY_LIMIT = int(get_env("LABEL_STREAM_HISTORY_LIMIT", default=1
 
 RANDOM_NEXT_TASK_SAMPLE_SIZE = int(get_env("RANDOM_NEXT_TASK_SAMPLE_SIZE", 50))
 
+# Serve next tasks from per-annotator candidate queues kept in Redis (projects/functions/next_task_queue.py)
+NEXT_TASK_QUEUE = get_bool_env("NEXT_TASK_QUEUE", False)
+# Number of candidates ordered into a queue at once
+NEXT_TASK_QUEUE_SIZE = int(get_env("NEXT_TASK_QUEUE_SIZE", 1000))
+# Seconds before a queue is rebuilt, picking up new tasks and annotation counts of others
+NEXT_TASK_QUEUE_TTL = int(get_env("NEXT_TASK_QUEUE_TTL", 600))
+
 TASK_API_PAGE_SIZE_MAX = int(get_env("TASK_API_PAGE_SIZE_MAX", 0)) or None
+# Seconds Data Manager task list totals are cached in Redis (data_manager/totals.py), 0 disables the cache
+DATA_MANAGER_TOTALS_CACHE_TTL = int(get_env("DATA_MANAGER_TOTALS_CACHE_TTL", 300))
+# Task lists requested with estimate_totals report planner estimates from this many estimated tasks
+DATA_MANAGER_ESTIMATED_TOTALS_THRESHOLD = int(
+    get_env("DATA_MANAGER_ESTIMATED_TOTALS_THRESHOLD", 100000)
+)
 
 # Email backend configuration
 # For development: use console backend (prints to terminal)
@@ -802,6 +817,7 @@ MEMBER_PERM = "core.api_permissions.MemberHasOwnerPermission"
 RECALCULATE_ALL_STATS = None
 GET_STORAGE_LIST = "io_storages.functions.get_storage_list"
 STORAGE_LOAD_TASKS_JSON = "io_storages.utils.load_tasks_json_lso"
+STORAGE_LOAD_TASKS_JSON_STREAM = "io_storages.utils.load_tasks_json_stream_lso"
 STORAGE_ANNOTATION_SERIALIZER = "io_storages.serializers.StorageAnnotationSerializer"
 TASK_SERIALIZER_BULK = "tasks.serializers.BaseTaskSerializerBulk"
 PREPROCESS_FIELD_NAME = "data_manager.functions.preprocess_field_name"
@@ -898,6 +914,16 @@ DEFAULT_STORAGE_LIST_LIMIT = int(get_env("DEFAULT_STORAGE_LIST_LIMIT", 100))
 STORAGE_EXISTED_COUNT_BATCH_SIZE = int(
     get_env("STORAGE_EXISTED_COUNT_BATCH_SIZE", 1000)
 )
+# Number of storage objects turned into tasks per bulk write during sync
+STORAGE_IMPORT_BATCH_SIZE = int(get_env("STORAGE_IMPORT_BATCH_SIZE", 500))
+# Objects fetched and parsed in background threads while a sync writes tasks
+STORAGE_IMPORT_PREFETCH_WORKERS = int(get_env("STORAGE_IMPORT_PREFETCH_WORKERS", 8))
+STORAGE_IMPORT_PREFETCH_IN_FLIGHT = int(get_env("STORAGE_IMPORT_PREFETCH_IN_FLIGHT", 32))
+# Incremental sync: resyncs only read keys that are not linked yet, a full reconcile runs periodically
+STORAGE_INCREMENTAL_SYNC = get_bool_env("STORAGE_INCREMENTAL_SYNC", False)
+STORAGE_SYNC_FULL_RECONCILE_INTERVAL = float(get_env("STORAGE_SYNC_FULL_RECONCILE_INTERVAL", 24))  # hours
+STORAGE_SYNC_BLOOM_ERROR_RATE = float(get_env("STORAGE_SYNC_BLOOM_ERROR_RATE", 0.001))
+STORAGE_SYNC_MODIFIED_SKEW = int(get_env("STORAGE_SYNC_MODIFIED_SKEW", 300))  # seconds
 
 USE_NGINX_FOR_EXPORT_DOWNLOADS = get_bool_env("USE_NGINX_FOR_EXPORT_DOWNLOADS", False)
 USE_NGINX_FOR_UPLOADS = get_bool_env("USE_NGINX_FOR_UPLOADS", False)  # Set to True in production with NGINX
@@ -1154,5 +1180,21 @@ SECURITY_WATERMARK_ENABLED = get_bool_env("SECURITY_WATERMARK_ENABLED", True)
 SECURITY_WATERMARK_POSITION = get_env("SECURITY_WATERMARK_POSITION", "tiled")
 # Enable invisible/steganographic watermarks for forensic tracing
 SECURITY_INVISIBLE_WATERMARK = get_bool_env("SECURITY_INVISIBLE_WATERMARK", True)
+# Cache pre-rendered watermark layers and final watermarked images (with ETag revalidation)
+SECURITY_WATERMARK_CACHE_ENABLED = get_bool_env("SECURITY_WATERMARK_CACHE_ENABLED", True)
+# Memory budget for pre-rendered transparent text layers (per process, in bytes)
+SECURITY_WATERMARK_LAYER_CACHE_MAX_BYTES = int(
+    get_env("SECURITY_WATERMARK_LAYER_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+)
+# TTL for watermarked images in the render cache (seconds, identity changes every minute anyway)
+SECURITY_WATERMARK_RENDER_CACHE_TTL = int(get_env("SECURITY_WATERMARK_RENDER_CACHE_TTL", 120))
+# Memory budget for the in-process render cache used when Redis is not available (bytes)
+SECURITY_WATERMARK_RENDER_CACHE_MAX_BYTES = int(
+    get_env("SECURITY_WATERMARK_RENDER_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+)
+# Watermarked images larger than this are never cached (bytes)
+SECURITY_WATERMARK_RENDER_CACHE_MAX_ENTRY_BYTES = int(
+    get_env("SECURITY_WATERMARK_RENDER_CACHE_MAX_ENTRY_BYTES", 20 * 1024 * 1024)
+)
 # Default presign TTL for cloud storage URLs (in minutes)
 SECURITY_PRESIGN_TTL_MINUTES = int(get_env("SECURITY_PRESIGN_TTL_MINUTES", 15))
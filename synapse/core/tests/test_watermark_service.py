@@ -0,0 +1,96 @@
+import io
+
+import pytest
+from core.watermark_service import WatermarkService
+from PIL import Image
+
+
+def _noise_png(size):
+    image = Image.effect_noise(size, 64).convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize('size', [(64, 48), (7, 500), (301, 3)])
+def test_numpy_engine_matches_pixel_loop(size):
+    """Vectorized LSB embedding must produce exactly the pixels of the original per-pixel loop."""
+    image = Image.open(io.BytesIO(_noise_png(size))).convert('RGB')
+    data = WatermarkService._pack_payload({'u': 'user-1', 's': 'session', 'v': 1})
+
+    reference = image.copy()
+    WatermarkService._embed_lsb_pixel_loop(reference, data)
+    vectorized = image.copy()
+    WatermarkService._embed_lsb(vectorized, data)
+
+    assert vectorized.tobytes() == reference.tobytes()
+    assert WatermarkService._extract_lsb(reference, len(data)) == data
+    assert WatermarkService._extract_lsb_pixel_loop(vectorized, len(data)) == data
+
+
+def test_watermark_round_trip():
+    payload = WatermarkService.create_forensic_watermark('user-1', 'session-1', project_id='3', task_id='7')
+    image_bytes = _noise_png((120, 80))
+
+    watermarked = WatermarkService.apply_invisible_watermark(image_bytes, payload)
+
+    assert WatermarkService.extract_watermark(watermarked) == payload
+    assert WatermarkService.extract_watermark(image_bytes) is None
+
+
+def test_extract_watermark_from_pixel_loop_output():
+    """Watermarks issued by the per-pixel implementation can still be extracted."""
+    payload = {'u': 'legacy', 'v': 1}
+    image = Image.open(io.BytesIO(_noise_png((50, 50)))).convert('RGB')
+    WatermarkService._embed_lsb_pixel_loop(image, WatermarkService._pack_payload(payload))
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+
+    assert WatermarkService.extract_watermark(buffer.getvalue()) == payload
+
+
+def test_image_too_small_is_returned_unchanged():
+    image_bytes = _noise_png((4, 4))
+
+    assert WatermarkService.apply_invisible_watermark(image_bytes, {'u': 'user'}) == image_bytes
+
+
+def test_bounded_lru_cache_evicts_least_recently_used():
+    from core.watermark_cache import BoundedLRUCache
+
+    cache = BoundedLRUCache(max_bytes=10)
+    cache.set('a', b'1234')
+    cache.set('b', b'1234')
+    assert cache.get('a') == b'1234'
+
+    cache.set('c', b'1234')
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1234'
+    assert cache.get('c') == b'1234'
+
+    cache.set('huge', b'x' * 11)
+    assert cache.get('huge') is None
+    assert len(cache) == 2
+
+
+def test_render_key_depends_on_file_and_identity():
+    from core.watermark_cache import make_render_key
+
+    identity = {'user_id': 'a@b.c', 'session_id': 's', 'timestamp': '2024-01-01T10:00:00', 'ip': ''}
+
+    assert make_render_key('hash', identity) == make_render_key('hash', dict(reversed(identity.items())))
+    assert make_render_key('hash', identity) != make_render_key('other', identity)
+    assert make_render_key('hash', identity) != make_render_key('hash', {**identity, 'timestamp': '2024-01-01T10:01:00'})
+
+
+def test_tiled_layer_is_cached_per_text_and_size():
+    from core import watermark_service
+
+    watermark_service._tiled_layer_cache.clear()
+    first = WatermarkService._get_tiled_layer((40, 30), 'use***01 | 2024-01-01 10:00')
+    second = WatermarkService._get_tiled_layer((40, 30), 'use***01 | 2024-01-01 10:00')
+    other = WatermarkService._get_tiled_layer((40, 31), 'use***01 | 2024-01-01 10:00')
+
+    assert first is second
+    assert other is not first
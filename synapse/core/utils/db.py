@@ -1,4 +1,5 @@
 import itertools
+import json
 import logging
 import time
 from typing import Dict, Optional, TypeVar
@@ -37,6 +38,21 @@ def fast_first_or_create(model, **model_params) -> Optional[ModelType]:
     return model.objects.create(**model_params)
 
 
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """Row count of a queryset as estimated by the PostgreSQL planner, without running the query.
+
+    Returns None for other databases or when the plan can't be read, callers should count instead.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+    try:
+        plan = json.loads(queryset.explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+    except Exception as e:
+        logger.warning(f'Failed to estimate queryset count: {e}')
+        return None
+
+
 def batch_update_with_retry(queryset, batch_size=500, max_retries=3, **update_fields):
     """
     Update objects in batches with retry logic to handle deadlocks.
@@ -0,0 +1,4 @@
+info = {"message": "[user-025] fix: detect NDJSON exports by format or name, never seek", "commit": "d9381dcb606151710de95b9566110e14cf9819de", "date": "2026/10/16 23:33:46", "branch": "", "version": "d9381dc+dirty"}
+
+# This file is automatically generated by version.py
+# Do not include it to git!
@@ -0,0 +1,113 @@
+"""
+Caches for watermark rendering.
+
+- BoundedLRUCache: thread-safe in-process LRU bounded by total size in bytes,
+  used for pre-rendered watermark layers and as the render cache fallback.
+- Render cache: final watermarked image bytes keyed by file hash and
+  watermark identity, stored in Redis (with TTL) or in-process when Redis
+  is not connected.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from core.redis import redis_connected, redis_get, redis_set
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+RENDER_CACHE_KEY_PREFIX = "watermark_render"
+
+
+class BoundedLRUCache:
+    """
+    Least-recently-used cache bounded by the total size of its values.
+
+    Values larger than the whole budget are not stored.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int] = len):
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            return item[0]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._items:
+                self._size -= self._items.pop(key)[1]
+            self._items[key] = (value, size)
+            self._size += size
+
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self._size -= evicted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+_local_render_cache = BoundedLRUCache(settings.SECURITY_WATERMARK_RENDER_CACHE_MAX_BYTES)
+
+
+def make_render_key(file_hash: str, identity: Dict[str, Any]) -> str:
+    """
+    Build a stable key for a watermarked rendering.
+
+    Args:
+        file_hash: Hex digest of the original file content
+        identity: Everything that ends up in the visible and invisible watermark
+
+    Returns:
+        Hex digest usable both as cache key and as ETag value
+    """
+    identity_json = json.dumps(identity, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{file_hash}:{identity_json}".encode("utf-8")).hexdigest()
+
+
+def get_cached_render(key: str) -> Optional[bytes]:
+    """Get watermarked image bytes from the render cache"""
+    if redis_connected():
+        return redis_get(f"{RENDER_CACHE_KEY_PREFIX}:{key}")
+    return _local_render_cache.get(key)
+
+
+def set_cached_render(key: str, data: bytes) -> None:
+    """Store watermarked image bytes in the render cache"""
+    if len(data) > settings.SECURITY_WATERMARK_RENDER_CACHE_MAX_ENTRY_BYTES:
+        return
+
+    if redis_connected():
+        try:
+            redis_set(
+                f"{RENDER_CACHE_KEY_PREFIX}:{key}",
+                data,
+                ttl=settings.SECURITY_WATERMARK_RENDER_CACHE_TTL,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to cache watermarked image: {e}")
+        return
+
+    _local_render_cache.set(key, data)
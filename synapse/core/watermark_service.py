@@ -11,11 +11,20 @@ import logging
 from datetime import datetime
 from typing import Optional, Tuple, Dict, Any
 
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 from django.conf import settings
 
+from core.watermark_cache import BoundedLRUCache
+
 logger = logging.getLogger(__name__)
 
+# Pre-rendered RGBA text layers keyed by (watermark text, image size)
+_tiled_layer_cache = BoundedLRUCache(
+    settings.SECURITY_WATERMARK_LAYER_CACHE_MAX_BYTES,
+    sizeof=lambda layer: layer.width * layer.height * 4,
+)
+
 
 class WatermarkService:
     """
@@ -124,56 +133,23 @@ class WatermarkService:
         Returns:
             Watermarked image bytes
         """
-        import json
-
         try:
             image = Image.open(io.BytesIO(image_data))
 
             if image.mode != "RGB":
                 image = image.convert("RGB")
 
-            # Prepare payload
-            payload_json = json.dumps(payload, separators=(",", ":"))
-            payload_bytes = cls.MAGIC_HEADER + payload_json.encode("utf-8")
-
-            # Add length prefix and checksum
-            length = len(payload_bytes)
-            checksum = hashlib.md5(payload_bytes).digest()[:4]
-            data_to_embed = length.to_bytes(4, "big") + checksum + payload_bytes
-
-            # Convert to bits
-            bits = "".join(format(byte, "08b") for byte in data_to_embed)
+            data_to_embed = cls._pack_payload(payload)
 
             # Check if image can hold the data
-            pixels = image.load()
             width, height = image.size
             max_bits = width * height * 3  # 3 channels
 
-            if len(bits) > max_bits:
+            if len(data_to_embed) * 8 > max_bits:
                 logger.warning("Image too small for steganographic watermark")
                 return image_data
 
-            # Embed bits in LSB
-            bit_index = 0
-            for y in range(height):
-                for x in range(width):
-                    if bit_index >= len(bits):
-                        break
-
-                    r, g, b = pixels[x, y]
-
-                    # Modify LSB of each channel
-                    if bit_index < len(bits):
-                        r = (r & 0xFE) | int(bits[bit_index])
-                        bit_index += 1
-                    if bit_index < len(bits):
-                        g = (g & 0xFE) | int(bits[bit_index])
-                        bit_index += 1
-                    if bit_index < len(bits):
-                        b = (b & 0xFE) | int(bits[bit_index])
-                        bit_index += 1
-
-                    pixels[x, y] = (r, g, b)
+            cls._embed_lsb(image, data_to_embed)
 
             # Save as PNG to preserve LSB data
             output = io.BytesIO()
@@ -203,54 +179,19 @@ class WatermarkService:
             if image.mode != "RGB":
                 image = image.convert("RGB")
 
-            pixels = image.load()
             width, height = image.size
 
-            # Extract LSB bits
-            bits = []
-            for y in range(height):
-                for x in range(width):
-                    r, g, b = pixels[x, y]
-                    bits.extend([r & 1, g & 1, b & 1])
-
-                    # Stop once we have enough for header check
-                    if len(bits) >= 512:  # Enough for length + checksum + header
-                        break
-                if len(bits) >= 512:
-                    break
-
-            # Convert bits to bytes
-            extracted_bytes = bytes(
-                int("".join(str(b) for b in bits[i : i + 8]), 2)
-                for i in range(0, len(bits), 8)
-            )
-
             # Parse length and checksum
-            length = int.from_bytes(extracted_bytes[:4], "big")
-            stored_checksum = extracted_bytes[4:8]
+            header = cls._extract_lsb(image, 8)
+            length = int.from_bytes(header[:4], "big")
+            stored_checksum = header[4:8]
 
             # Validate
-            if length > width * height * 3 // 8:
+            if length > width * height * 3 // 8 or (8 + length) * 8 > width * height * 3:
                 return None
 
             # Extract full payload
-            bits = []
-            total_bytes_needed = 8 + length
-            for y in range(height):
-                for x in range(width):
-                    r, g, b = pixels[x, y]
-                    bits.extend([r & 1, g & 1, b & 1])
-                    if len(bits) >= total_bytes_needed * 8:
-                        break
-                if len(bits) >= total_bytes_needed * 8:
-                    break
-
-            extracted_bytes = bytes(
-                int("".join(str(b) for b in bits[i : i + 8]), 2)
-                for i in range(0, len(bits), 8)
-            )
-
-            payload_bytes = extracted_bytes[8 : 8 + length]
+            payload_bytes = cls._extract_lsb(image, 8 + length)[8:]
 
             # Verify checksum
             computed_checksum = hashlib.md5(payload_bytes).digest()[:4]
@@ -269,6 +210,112 @@ class WatermarkService:
             logger.debug(f"Failed to extract watermark: {e}")
             return None
 
+    @classmethod
+    def _pack_payload(cls, payload: Dict[str, Any]) -> bytes:
+        """
+        Serialize payload in the SYN_WM_V1 layout:
+        4-byte big-endian length | 4-byte MD5 prefix | MAGIC_HEADER + JSON
+        """
+        import json
+
+        payload_json = json.dumps(payload, separators=(",", ":"))
+        payload_bytes = cls.MAGIC_HEADER + payload_json.encode("utf-8")
+
+        # Add length prefix and checksum
+        length = len(payload_bytes)
+        checksum = hashlib.md5(payload_bytes).digest()[:4]
+        return length.to_bytes(4, "big") + checksum + payload_bytes
+
+    @staticmethod
+    def _lsb_rows(width: int, n_bits: int) -> int:
+        """Number of leading pixel rows that hold n_bits LSBs (3 per pixel)"""
+        return -(-n_bits // (width * 3))
+
+    @classmethod
+    def _embed_lsb(cls, image: Image.Image, data: bytes) -> None:
+        """
+        Write data into the LSBs of an RGB image in place.
+
+        Bits are MSB-first and fill R, G, B of each pixel in row-major order,
+        exactly like the original per-pixel loop, so the output is
+        bit-identical. Only the leading rows that hold the payload are
+        touched.
+        """
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+        width = image.width
+        rows = cls._lsb_rows(width, bits.size)
+
+        region = image.crop((0, 0, width, rows))
+        channels = np.array(region, dtype=np.uint8).reshape(-1)
+        channels[: bits.size] = (channels[: bits.size] & 0xFE) | bits
+
+        image.paste(Image.fromarray(channels.reshape(rows, width, 3), "RGB"), (0, 0))
+
+    @classmethod
+    def _extract_lsb(cls, image: Image.Image, n_bytes: int) -> bytes:
+        """Read n_bytes back from the LSBs of an RGB image"""
+        n_bits = n_bytes * 8
+        width = image.width
+        rows = cls._lsb_rows(width, n_bits)
+
+        region = image.crop((0, 0, width, rows))
+        channels = np.asarray(region, dtype=np.uint8).reshape(-1)[:n_bits]
+        return np.packbits(channels & 1).tobytes()
+
+    @classmethod
+    def _embed_lsb_pixel_loop(cls, image: Image.Image, data: bytes) -> None:
+        """
+        Reference per-pixel implementation of _embed_lsb.
+
+        Kept for the watermark benchmark and format compatibility tests.
+        """
+        bits = "".join(format(byte, "08b") for byte in data)
+        pixels = image.load()
+        width, height = image.size
+
+        bit_index = 0
+        for y in range(height):
+            for x in range(width):
+                if bit_index >= len(bits):
+                    break
+
+                r, g, b = pixels[x, y]
+
+                # Modify LSB of each channel
+                if bit_index < len(bits):
+                    r = (r & 0xFE) | int(bits[bit_index])
+                    bit_index += 1
+                if bit_index < len(bits):
+                    g = (g & 0xFE) | int(bits[bit_index])
+                    bit_index += 1
+                if bit_index < len(bits):
+                    b = (b & 0xFE) | int(bits[bit_index])
+                    bit_index += 1
+
+                pixels[x, y] = (r, g, b)
+
+    @classmethod
+    def _extract_lsb_pixel_loop(cls, image: Image.Image, n_bytes: int) -> bytes:
+        """Reference per-pixel implementation of _extract_lsb"""
+        pixels = image.load()
+        width, height = image.size
+
+        bits = []
+        for y in range(height):
+            for x in range(width):
+                r, g, b = pixels[x, y]
+                bits.extend([r & 1, g & 1, b & 1])
+                if len(bits) >= n_bytes * 8:
+                    break
+            if len(bits) >= n_bytes * 8:
+                break
+
+        bits = bits[: n_bytes * 8]
+        return bytes(
+            int("".join(str(b) for b in bits[i : i + 8]), 2)
+            for i in range(0, len(bits), 8)
+        )
+
     @classmethod
     def _mask_identifier(cls, identifier: str) -> str:
         """Mask identifier for privacy"""
@@ -279,8 +326,32 @@ class WatermarkService:
     @classmethod
     def _apply_tiled_watermark(cls, image: Image.Image, text: str) -> Image.Image:
         """Apply watermark in a diagonal tiled pattern"""
-        overlay = Image.new("RGBA", image.size, (0, 0, 0, 0))
+        return Image.alpha_composite(image, cls._get_tiled_layer(image.size, text))
+
+    @classmethod
+    def _get_tiled_layer(cls, size: Tuple[int, int], text: str) -> Image.Image:
+        """
+        Get the transparent tiled text layer for an image size.
+
+        The text already holds the masked user, minute and session, so layers
+        are shared by every image of the same size viewed in that minute.
+        """
+        if not settings.SECURITY_WATERMARK_CACHE_ENABLED:
+            return cls._render_tiled_layer(size, text)
+
+        key = (text, size)
+        layer = _tiled_layer_cache.get(key)
+        if layer is None:
+            layer = cls._render_tiled_layer(size, text)
+            _tiled_layer_cache.set(key, layer)
+        return layer
+
+    @classmethod
+    def _render_tiled_layer(cls, size: Tuple[int, int], text: str) -> Image.Image:
+        """Draw the diagonal tiled text pattern on a transparent layer"""
+        overlay = Image.new("RGBA", size, (0, 0, 0, 0))
         draw = ImageDraw.Draw(overlay)
+        width, height = size
 
         try:
             font = ImageFont.truetype("arial.ttf", cls.FONT_SIZE)
@@ -297,8 +368,8 @@ class WatermarkService:
         spacing_y = text_height + 80
 
         # Draw tiled pattern
-        for y in range(-text_height, image.height + text_height, spacing_y):
-            for x in range(-text_width, image.width + text_width, spacing_x):
+        for y in range(-text_height, height + text_height, spacing_y):
+            for x in range(-text_width, width + text_width, spacing_x):
                 # Offset every other row
                 offset = (spacing_x // 2) if (y // spacing_y) % 2 else 0
                 draw.text(
@@ -308,8 +379,7 @@ class WatermarkService:
                     fill=(*cls.WATERMARK_COLOR, cls.WATERMARK_OPACITY),
                 )
 
-        # Composite
-        return Image.alpha_composite(image, overlay)
+        return overlay
 
     @classmethod
     def _apply_corner_watermark(cls, image: Image.Image, text: str) -> Image.Image:
@@ -28,6 +28,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from tasks.models import Task
 
+from .mixins import SNAPSHOT_CONTENT_TYPES
 from .models import ConvertedFormat, DataExport, Export
 from .serializers import (
     ExportConvertSerializer,
@@ -582,7 +583,7 @@ class ProjectExportFilesAuthCheck(APIView):
     ),
 )
 class ExportListAPI(generics.ListCreateAPIView):
-    queryset = Export.objects.all().order_by("-created_at")
+    queryset = Export.objects.prefetch_related("shards").order_by("-created_at")
     project_model = Project
     serializer_class = ExportSerializer
     permission_required = all_permissions.projects_change
@@ -750,6 +751,10 @@ class ExportDetailAPI(generics.RetrieveDestroyAPIView):
                 for converted_format in export.converted_formats.all():
                     if converted_format.file:
                         converted_format.file.delete()
+
+                for shard in export.shards.all():
+                    if shard.file:
+                        shard.file.delete()
             except Exception as e:
                 return Response(
                     status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -774,6 +779,65 @@ class ExportDetailAPI(generics.RetrieveDestroyAPIView):
         return super().get_queryset().filter(project=project)
 
 
+@method_decorator(
+    name="post",
+    decorator=extend_schema(
+        tags=["Export"],
+        summary="Resume export snapshot",
+        description="""
+        Export the failed shards of a sharded export snapshot again. Completed shards are kept.
+        """,
+        parameters=[
+            OpenApiParameter(
+                name="id",
+                type=OpenApiTypes.INT,
+                location="path",
+                description="A unique integer value identifying this project.",
+            ),
+            OpenApiParameter(
+                name="export_pk",
+                type=OpenApiTypes.INT,
+                location="path",
+                description="Primary key identifying the export file.",
+            ),
+        ],
+        responses={200: ExportSerializer},
+        extensions={
+            "x-fern-sdk-group-name": ["projects", "exports"],
+            "x-fern-sdk-method-name": "resume",
+            "x-fern-audiences": ["internal"],
+        },
+    ),
+)
+class ExportResumeAPI(generics.GenericAPIView):
+    queryset = Export.objects.all()
+    project_model = Project
+    serializer_class = ExportSerializer
+    lookup_url_kwarg = "export_pk"
+    permission_required = all_permissions.projects_change
+
+    def _get_project(self):
+        project_pk = self.kwargs.get("pk")
+        project = generics.get_object_or_404(
+            self.project_model.objects.for_user(self.request.user),
+            pk=project_pk,
+        )
+        return project
+
+    def get_queryset(self):
+        project = self._get_project()
+        return super().get_queryset().filter(project=project)
+
+    def post(self, request, *args, **kwargs):
+        snapshot = self.get_object()
+        if not snapshot.resume_file_exporting():
+            raise ValidationError(
+                {"detail": "Only failed or stalled sharded exports can be resumed"}
+            )
+        snapshot.refresh_from_db()
+        return Response(self.get_serializer(snapshot).data)
+
+
 @method_decorator(
     name="get",
     decorator=extend_schema(
@@ -922,9 +986,8 @@ class ExportDownloadAPI(generics.RetrieveAPIView):
 
             # No NGINX: standard way for export downloads in the community edition
             else:
-                ext = file.name.split(".")[-1]
                 response = RangedFileResponse(
-                    request, file, content_type=f"application/{ext}"
+                    request, file, content_type=get_content_type(file.name)
                 )
                 response["Content-Disposition"] = f'attachment; filename="{file.name}"'
                 response["filename"] = os.path.basename(file.name)
@@ -938,16 +1001,20 @@ class ExportDownloadAPI(generics.RetrieveAPIView):
             if file_ is None:
                 return HttpResponse("Can't get file", status=404)
 
-            ext = file_.name.split(".")[-1]
-
             response = RangedFileResponse(
-                request, file_, content_type=f"application/{ext}"
+                request, file_, content_type=get_content_type(file_.name)
             )
             response["Content-Disposition"] = f'attachment; filename="{file_.name}"'
             response["filename"] = file_.name
             return response
 
 
+def get_content_type(file_name):
+    """Content type of a snapshot or converted file, RangedFileResponse streams it in chunks"""
+    ext = file_name.split(".")[-1]
+    return SNAPSHOT_CONTENT_TYPES.get(ext, f"application/{ext}")
+
+
 def async_convert(
     converted_format_id,
     export_type,
@@ -980,6 +1047,10 @@ def async_convert(
         raise ValidationError(
             "No converted file found, probably there are no annotations in the export snapshot"
         )
+    _save_converted_file(converted_format, converted_file, project)
+
+
+def _save_converted_file(converted_format, converted_file, project):
     md5 = Export.eval_md5(converted_file)
     ext = converted_file.name.split(".")[-1]
 
@@ -994,6 +1065,68 @@ def async_convert(
     converted_format.save(update_fields=["file", "status"])
 
 
+def async_convert_many(
+    converted_format_ids,
+    project,
+    hostname,
+    download_resources=False,
+    **kwargs,
+):
+    """Convert one snapshot to several formats, reading the snapshot only once"""
+    with transaction.atomic():
+        converted_formats = list(
+            ConvertedFormat.objects.select_for_update()
+            .filter(id__in=converted_format_ids, status=ConvertedFormat.Status.CREATED)
+            .select_related("export")
+        )
+        if not converted_formats:
+            logger.error(
+                f"ConvertedFormats {converted_format_ids} not found or already started, conversion failed"
+            )
+            return
+        ConvertedFormat.objects.filter(
+            id__in=[cf.id for cf in converted_formats]
+        ).update(status=ConvertedFormat.Status.IN_PROGRESS)
+
+    snapshot = converted_formats[0].export
+    files, errors = snapshot.convert_files(
+        [cf.export_type for cf in converted_formats],
+        download_resources=download_resources,
+        hostname=hostname,
+    )
+
+    for converted_format in converted_formats:
+        export_type = converted_format.export_type
+        if export_type in errors:
+            error = errors[export_type]
+            trace = "".join(
+                tb.format_exception(type(error), error, error.__traceback__)
+            )
+        elif files.get(export_type) is None:
+            trace = "No converted file found, probably there are no annotations in the export snapshot"
+        else:
+            _save_converted_file(converted_format, files[export_type], project)
+            continue
+
+        ConvertedFormat.objects.filter(id=converted_format.id).update(
+            status=ConvertedFormat.Status.FAILED, traceback=trace
+        )
+
+
+def set_convert_many_background_failure(
+    job, connection, type, value, traceback_obj
+):
+    converted_format_ids = job.args[0]
+    trace = "".join(tb.format_exception(type, value, traceback_obj))
+    ConvertedFormat.objects.filter(
+        id__in=converted_format_ids,
+        status__in=[
+            ConvertedFormat.Status.CREATED,
+            ConvertedFormat.Status.IN_PROGRESS,
+        ],
+    ).update(status=ConvertedFormat.Status.FAILED, traceback=trace)
+
+
 def set_convert_background_failure(job, connection, type, value, traceback_obj):
     from data_export.models import ConvertedFormat
 
@@ -1064,9 +1197,15 @@ class ExportConvertAPI(generics.CreateAPIView):
             data=request.data, context={"project": snapshot.project}
         )
         serializer.is_valid(raise_exception=True)
-        export_type = serializer.validated_data["export_type"]
+        export_types = serializer.validated_data["export_types"]
         download_resources = serializer.validated_data.get("download_resources")
 
+        if len(export_types) > 1:
+            return self._convert_many(
+                request, snapshot, export_types, download_resources
+            )
+        export_type = export_types[0]
+
         converted_format, created = ConvertedFormat.objects.exclude(
             status=ConvertedFormat.Status.FAILED
         ).get_or_create(export=snapshot, export_type=export_type)
@@ -1087,6 +1226,37 @@ class ExportConvertAPI(generics.CreateAPIView):
             {"export_type": export_type, "converted_format": converted_format.id}
         )
 
+    def _convert_many(self, request, snapshot, export_types, download_resources):
+        with transaction.atomic():
+            started = list(
+                ConvertedFormat.objects.exclude(status=ConvertedFormat.Status.FAILED)
+                .filter(export=snapshot, export_type__in=export_types)
+                .values_list("export_type", flat=True)
+            )
+            if started:
+                raise ValidationError(
+                    f"Conversion to {', '.join(sorted(started))} already started"
+                )
+            converted_formats = [
+                ConvertedFormat.objects.create(export=snapshot, export_type=export_type)
+                for export_type in export_types
+            ]
+
+        start_job_async_or_sync(
+            async_convert_many,
+            [cf.id for cf in converted_formats],
+            snapshot.project,
+            request.build_absolute_uri("/"),
+            download_resources=download_resources,
+            on_failure=set_convert_many_background_failure,
+        )
+        return Response(
+            {
+                "export_types": export_types,
+                "converted_formats": [cf.id for cf in converted_formats],
+            }
+        )
+
 
 
 
@@ -0,0 +1,60 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_export', '0010_alter_convertedformat_export_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportShard',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('index', models.PositiveIntegerField(help_text='Position of the shard in the snapshot', verbose_name='index')),
+                ('min_id', models.BigIntegerField(help_text='Tasks with greater ids belong to the shard', verbose_name='min id')),
+                (
+                    'max_id',
+                    models.BigIntegerField(
+                        help_text='Last task id of the shard, empty for the last shard', null=True, verbose_name='max id'
+                    ),
+                ),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[
+                            ('created', 'Created'),
+                            ('in_progress', 'In progress'),
+                            ('failed', 'Failed'),
+                            ('completed', 'Completed'),
+                        ],
+                        default='created',
+                        max_length=64,
+                        verbose_name='shard status',
+                    ),
+                ),
+                ('task_number', models.IntegerField(default=0, help_text='Number of exported tasks', verbose_name='task number')),
+                ('file', models.FileField(null=True, upload_to='export')),
+                ('error', models.TextField(blank=True, help_text='Error message in case of failure', null=True)),
+                (
+                    'finished_at',
+                    models.DateTimeField(default=None, help_text='Complete or fail time', null=True, verbose_name='finished at'),
+                ),
+                (
+                    'export',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name='shards', to='data_export.export'
+                    ),
+                ),
+            ],
+            options={
+                'ordering': ['index'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='exportshard',
+            constraint=models.UniqueConstraint(fields=('export', 'index'), name='unique_export_shard_index'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('data_export', '0011_exportshard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='export',
+            name='snapshot_format',
+            field=models.CharField(
+                choices=[
+                    ('json', 'JSON array'),
+                    ('ndjson.gz', 'Gzip compressed NDJSON'),
+                    ('ndjson.zst', 'Zstandard compressed NDJSON'),
+                ],
+                default='json',
+                help_text='JSON array of tasks or compressed NDJSON with one task per line',
+                max_length=16,
+                verbose_name='snapshot format',
+            ),
+        ),
+    ]
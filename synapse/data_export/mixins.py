@@ -1,18 +1,18 @@
+import gzip
 import hashlib
-import io
+import importlib.util
 import json
 import logging
 import pathlib
 import shutil
+import zipfile
 from datetime import datetime
 from functools import reduce
 
 import django_rq
 from core.feature_flags import flag_set
 from core.redis import redis_connected
-from core.utils.common import batch
 from core.utils.io import (
-    SerializableGenerator,
     get_all_dirs_from_dir,
     get_all_files_from_dir,
     get_temp_dir,
@@ -22,7 +22,7 @@ from django.conf import settings
 from django.core.files import File
 from django.core.files import temp as tempfile
 from django.db import transaction
-from django.db.models import Prefetch
+from django.db.models import Exists, OuterRef, Prefetch
 from django.db.models.query_utils import Q
 from django.utils import dateformat, timezone
 from synapse_sdk.converter import Converter
@@ -34,6 +34,73 @@ EXCLUDE = 'exclude'
 
 logger = logging.getLogger(__name__)
 
+# job timeout of the shards concatenation, a claim older than this belongs to a lost job
+CONCATENATION_TIMEOUT = 3 * 60 * 60  # 3 hours
+
+# content types of the snapshot files by extension, other files are served as application/<ext>
+SNAPSHOT_CONTENT_TYPES = {
+    'gz': 'application/gzip',
+    'zst': 'application/zstd',
+}
+
+
+def zstandard_available():
+    return importlib.util.find_spec('zstandard') is not None
+
+
+class SnapshotWriter:
+    """
+    Write encoded tasks into a snapshot file in a single pass.
+
+    'json' snapshots are a JSON array, 'ndjson.gz' and 'ndjson.zst' snapshots hold one task per line
+    compressed on the fly. The md5 is computed over the stored bytes while they are written.
+    """
+
+    def __init__(self, file, snapshot_format='json'):
+        self.file = file
+        self.snapshot_format = snapshot_format
+        self.md5_object = hashlib.md5()  # nosec
+        self.task_number = 0
+        if snapshot_format == 'ndjson.gz':
+            # mtime=0 keeps the md5 stable for the same tasks
+            self.stream = gzip.GzipFile(fileobj=self, mode='wb', mtime=0)
+        elif snapshot_format == 'ndjson.zst':
+            import zstandard
+
+            self.stream = zstandard.ZstdCompressor().stream_writer(self, closefd=False)
+        else:
+            self.stream = self
+            self.write(b'[')
+
+    def write(self, chunk):
+        """Raw write of the stored bytes, also used by the compressors"""
+        self.file.write(chunk)
+        self.md5_object.update(chunk)
+        return len(chunk)
+
+    def flush(self):
+        self.file.flush()
+
+    def write_task(self, encoded_task):
+        """Add one task encoded as JSON bytes without newlines"""
+        if self.snapshot_format == 'json':
+            if self.task_number:
+                self.write(b', ')
+            self.write(encoded_task)
+        else:
+            self.stream.write(encoded_task + b'\n')
+        self.task_number += 1
+
+    def close(self):
+        """Finish the snapshot and rewind the file, returns the md5"""
+        if self.stream is self:
+            self.write(b']')
+        else:
+            self.stream.close()
+        self.file.flush()
+        self.file.seek(0)
+        return self.md5_object.hexdigest()
+
 
 class ExportMixin:
     def has_permission(self, user):
@@ -86,6 +153,13 @@ class ExportMixin:
 
         return tasks
 
+    def _get_export_tasks(self, task_filter_options=None):
+        """Distinct filtered tasks of the project, all filters are applied in SQL"""
+        tasks = self._get_filtered_tasks(self.project.tasks.all(), task_filter_options=task_filter_options)
+        if isinstance(task_filter_options, dict) and task_filter_options.get('only_with_annotations'):
+            tasks = tasks.filter(Exists(Annotation.objects.filter(task_id=OuterRef('pk'))))
+        return tasks.distinct()
+
     def _get_filtered_annotations_queryset(self, annotation_filter_options=None):
         """
         Filtering using disjunction of conditions
@@ -186,7 +260,9 @@ class ExportMixin:
 
         return qs
 
-    def get_export_data(self, task_filter_options=None, annotation_filter_options=None, serialization_options=None):
+    def get_export_data(
+        self, task_filter_options=None, annotation_filter_options=None, serialization_options=None, id_range=None
+    ):
         """
         serialization_options: None or Dict({
             drafts: optional
@@ -208,49 +284,52 @@ class ExportMixin:
                     only_id: true/false
                 })
         })
+        id_range: None or Tuple(min_id, max_id) to export only tasks with min_id < id <= max_id,
+            max_id None means no upper bound
         """
         from .serializers import ExportDataSerializer
 
         logger.debug('Run get_task_queryset')
 
         start = datetime.now()
-        with transaction.atomic():
-            # TODO: make counters from queryset
-            # counters = Project.objects.with_counts().filter(id=self.project.id)[0].get_counters()
-            self.counters = {'task_number': 0}
-            all_tasks = self.project.tasks
-            logger.debug('Tasks filtration')
-            task_ids = list(
-                self._get_filtered_tasks(all_tasks, task_filter_options=task_filter_options)
-                .distinct()
-                .values_list('id', flat=True)
-            )
-            base_export_serializer_option = self._get_export_serializer_option(serialization_options)
-            i = 0
-
-            if flag_set('fflag_fix_back_plt_807_batch_size_26062025_short', self.project.organization.created_by):
-                BATCH_SIZE = self.project.get_task_batch_size()
-            else:
-                BATCH_SIZE = settings.BATCH_SIZE
-
-            for ids in batch(task_ids, BATCH_SIZE):
-                i += 1
-                tasks = list(self.get_task_queryset(ids, annotation_filter_options))
-                logger.debug(f'Batch: {i*BATCH_SIZE}')
-                if isinstance(task_filter_options, dict) and task_filter_options.get('only_with_annotations'):
-                    tasks = [task for task in tasks if task.annotations.exists()]
-
-                if serialization_options and serialization_options.get('include_annotation_history') is True:
-                    task_ids = [task.id for task in tasks]
-                    annotation_ids = Annotation.objects.filter(task_id__in=task_ids).values_list('id', flat=True)
-                    base_export_serializer_option = self.update_export_serializer_option(
-                        base_export_serializer_option, annotation_ids
-                    )
-
-                serializer = ExportDataSerializer(tasks, many=True, **base_export_serializer_option)
-                self.counters['task_number'] += len(tasks)
-                for task in serializer.data:
-                    yield task
+        # TODO: make counters from queryset
+        # counters = Project.objects.with_counts().filter(id=self.project.id)[0].get_counters()
+        self.counters = {'task_number': 0}
+        logger.debug('Tasks filtration')
+        tasks = self._get_export_tasks(task_filter_options)
+        if id_range is not None:
+            min_id, max_id = id_range
+            tasks = tasks.filter(id__gt=min_id)
+            if max_id is not None:
+                tasks = tasks.filter(id__lte=max_id)
+        task_ids_queryset = tasks.order_by('id').values_list('id', flat=True)
+        base_export_serializer_option = self._get_export_serializer_option(serialization_options)
+        i = 0
+
+        if flag_set('fflag_fix_back_plt_807_batch_size_26062025_short', self.project.organization.created_by):
+            BATCH_SIZE = self.project.get_task_batch_size()
+        else:
+            BATCH_SIZE = settings.BATCH_SIZE
+
+        # keyset pagination over task ids, each batch is read in its own short query
+        last_id = 0
+        while ids := list(task_ids_queryset.filter(id__gt=last_id)[:BATCH_SIZE]):
+            last_id = ids[-1]
+            i += 1
+            tasks = list(self.get_task_queryset(ids, annotation_filter_options))
+            logger.debug(f'Batch: {i*BATCH_SIZE}')
+
+            if serialization_options and serialization_options.get('include_annotation_history') is True:
+                task_ids = [task.id for task in tasks]
+                annotation_ids = Annotation.objects.filter(task_id__in=task_ids).values_list('id', flat=True)
+                base_export_serializer_option = self.update_export_serializer_option(
+                    base_export_serializer_option, annotation_ids
+                )
+
+            serializer = ExportDataSerializer(tasks, many=True, **base_export_serializer_option)
+            self.counters['task_number'] += len(tasks)
+            for task in serializer.data:
+                yield task
         duration = datetime.now() - start
         logger.info(
             f'{self.counters["task_number"]} tasks from project {self.project_id} exported in {duration.total_seconds():.2f} seconds'
@@ -272,7 +351,7 @@ class ExportMixin:
 
     def save_file(self, file, md5):
         now = datetime.now()
-        file_name = f'project-{self.project.id}-at-{now.strftime("%Y-%m-%d-%H-%M")}-{md5[0:8]}.json'
+        file_name = f'project-{self.project.id}-at-{now.strftime("%Y-%m-%d-%H-%M")}-{md5[0:8]}.{self.snapshot_format}'
         file_path = f'{self.project.id}/{file_name}'  # finally file will be in settings.DELAYED_EXPORT_DIR/self.project.id/file_name
         file_ = File(file, name=file_path)
         self.file.save(file_path, file_)
@@ -286,23 +365,23 @@ class ExportMixin:
             f'annotation_filter_options: {annotation_filter_options}\n'
             f'serialization_options: {serialization_options}\n'
         )
+        sharded = False
         try:
-            iter_json = json.JSONEncoder(ensure_ascii=False).iterencode(
-                SerializableGenerator(
-                    self.get_export_data(
-                        task_filter_options=task_filter_options,
-                        annotation_filter_options=annotation_filter_options,
-                        serialization_options=serialization_options,
-                    )
-                )
-            )
-            with tempfile.NamedTemporaryFile(suffix='.export.json', dir=settings.FILE_UPLOAD_TEMP_DIR) as file:
-                for chunk in iter_json:
-                    encoded_chunk = chunk.encode('utf-8')
-                    file.write(encoded_chunk)
-                file.seek(0)
-
-                md5 = self.eval_md5(file)
+            sharded = self.run_sharded_export(task_filter_options, annotation_filter_options, serialization_options)
+            if sharded:
+                # the shard jobs complete the export, see _on_shard_finished()
+                return
+
+            encoder = json.JSONEncoder(ensure_ascii=False)
+            with tempfile.NamedTemporaryFile(suffix='.export', dir=settings.FILE_UPLOAD_TEMP_DIR) as file:
+                writer = SnapshotWriter(file, self.snapshot_format)
+                for task in self.get_export_data(
+                    task_filter_options=task_filter_options,
+                    annotation_filter_options=annotation_filter_options,
+                    serialization_options=serialization_options,
+                ):
+                    writer.write_task(encoder.encode(task).encode('utf-8'))
+                md5 = writer.close()
                 self.save_file(file, md5)
 
             self.status = self.Status.COMPLETED
@@ -313,8 +392,231 @@ class ExportMixin:
             self.save(update_fields=['status'])
             logger.exception('Export was failed: %s', e)
         finally:
-            self.finished_at = datetime.now()
-            self.save(update_fields=['finished_at'])
+            if not sharded:
+                self.finished_at = datetime.now()
+                self.save(update_fields=['finished_at'])
+
+    def _plan_shards(self, tasks, shard_size):
+        """Split the ids of tasks into keyset ranges of shard_size tasks: [(min_id, max_id), ...]"""
+        task_ids = tasks.order_by('id').values_list('id', flat=True)
+        bounds, min_id = [], 0
+        while True:
+            max_id = list(task_ids.filter(id__gt=min_id)[shard_size - 1 : shard_size])
+            if not max_id:
+                if task_ids.filter(id__gt=min_id).exists():
+                    bounds.append((min_id, None))
+                return bounds
+            bounds.append((min_id, max_id[0]))
+            min_id = max_id[0]
+
+    def run_sharded_export(self, task_filter_options=None, annotation_filter_options=None, serialization_options=None):
+        """
+        Start a sharded export when the snapshot has more than EXPORT_SHARD_SIZE tasks.
+
+        Every shard is serialized by its own job (inline without Redis) into its own file,
+        the job finishing the last shard concatenates the files into the snapshot.
+
+        Returns:
+            True if the export was sharded
+        """
+        from data_export.models import ExportShard
+
+        shard_size = settings.EXPORT_SHARD_SIZE
+        if shard_size <= 0:
+            return False
+        bounds = self._plan_shards(self._get_export_tasks(task_filter_options), shard_size)
+        if len(bounds) < 2:
+            return False
+
+        # kept for the shard jobs and for resuming failed shards
+        self.counters = {
+            'task_number': 0,
+            'export_options': {
+                'task_filter_options': task_filter_options,
+                'annotation_filter_options': annotation_filter_options,
+                'serialization_options': serialization_options,
+            },
+        }
+        self.save(update_fields=['counters'])
+        self.shards.all().delete()
+        shards = ExportShard.objects.bulk_create(
+            [
+                ExportShard(export=self, index=index, min_id=min_id, max_id=max_id)
+                for index, (min_id, max_id) in enumerate(bounds)
+            ]
+        )
+        logger.info(f'Export {self.id}: {len(shards)} shards of {shard_size} tasks')
+        self._run_shards(shards)
+        return True
+
+    def _run_shards(self, shards):
+        if redis_connected():
+            queue = django_rq.get_queue('default')
+            for shard in shards:
+                queue.enqueue(
+                    export_shard_background,
+                    shard.id,
+                    on_failure=set_export_shard_background_failure,
+                    job_timeout='3h',  # 3 hours
+                )
+        else:
+            for shard in shards:
+                export_shard_background(shard.id)
+
+    def resume_file_exporting(self):
+        """
+        Export the failed shards of a sharded export again, completed shards are kept.
+        When every shard is completed, only the concatenation is run again. An export
+        still in progress is resumed when all its shards are finished and its
+        concatenation was claimed longer ago than CONCATENATION_TIMEOUT (the job was lost).
+
+        Returns:
+            True if the export was resumed
+        """
+        from data_export.models import ExportShard
+
+        if not self.shards.exists():
+            return False
+        if self.status == self.Status.IN_PROGRESS:
+            if not self._concatenation_is_stalled():
+                return False
+        elif self.status != self.Status.FAILED:
+            return False
+        shards = list(self.shards.exclude(status=ExportShard.Status.COMPLETED))
+
+        self.status = self.Status.IN_PROGRESS
+        self.finished_at = None
+        # a concatenation job lost without cleanup leaves its claim behind
+        self.counters.pop('concatenating', None)
+        self.save(update_fields=['status', 'finished_at', 'counters'])
+        if not shards:
+            logger.info(f'Export {self.id}: resume shards concatenation')
+            self._on_shard_finished()
+            return True
+
+        ExportShard.objects.filter(id__in=[shard.id for shard in shards]).update(
+            status=ExportShard.Status.CREATED, error=None, finished_at=None
+        )
+        logger.info(f'Export {self.id}: resume {len(shards)} shards')
+        self._run_shards(shards)
+        return True
+
+    def export_shard(self, shard):
+        """Serialize the tasks of one shard into the shard file"""
+        from data_export.models import ExportShard
+
+        options = self.counters['export_options']
+        shard.status = ExportShard.Status.IN_PROGRESS
+        shard.task_number = 0
+        shard.save(update_fields=['status', 'task_number'])
+        try:
+            encoder = json.JSONEncoder(ensure_ascii=False)
+            with tempfile.NamedTemporaryFile(suffix='.export-shard.json', dir=settings.FILE_UPLOAD_TEMP_DIR) as file:
+                task_number = 0
+                for task in self.get_export_data(id_range=(shard.min_id, shard.max_id), **options):
+                    # shard files hold one task per line, _concatenate_shards() writes them in the snapshot format
+                    file.write(encoder.encode(task).encode('utf-8') + b'\n')
+                    task_number += 1
+                    if task_number % settings.BATCH_SIZE == 0:
+                        ExportShard.objects.filter(id=shard.id).update(task_number=task_number)
+                file.seek(0)
+                file_path = f'{self.project.id}/export-{self.id}-shard-{shard.index}.json'
+                shard.file.save(file_path, File(file, name=file_path), save=False)
+
+            shard.task_number = task_number
+            shard.status = ExportShard.Status.COMPLETED
+        except Exception as e:
+            logger.exception(f'Export {self.id} shard {shard.index} was failed: {e}')
+            shard.status = ExportShard.Status.FAILED
+            shard.error = str(e)
+        shard.finished_at = timezone.now()
+        shard.save(update_fields=['file', 'task_number', 'status', 'error', 'finished_at'])
+        self._on_shard_finished()
+
+    def _concatenation_is_stalled(self):
+        """No shard is pending and nobody has been concatenating for CONCATENATION_TIMEOUT"""
+        from data_export.models import ExportShard
+
+        if self.shards.filter(status__in=[ExportShard.Status.CREATED, ExportShard.Status.IN_PROGRESS]).exists():
+            return False
+        claimed_at = self.counters.get('concatenating')
+        if not isinstance(claimed_at, str):
+            # no claim: the last shard job was lost before claiming, _on_shard_finished() is safe to run again
+            return not claimed_at
+        return (timezone.now() - datetime.fromisoformat(claimed_at)).total_seconds() > CONCATENATION_TIMEOUT
+
+    def _on_shard_finished(self):
+        """Fail the export or start the concatenation once no shard is pending"""
+        from data_export.models import ExportShard
+
+        with transaction.atomic():
+            export = type(self).objects.select_for_update().get(id=self.id)
+            statuses = set(export.shards.values_list('status', flat=True))
+            if (
+                export.status != self.Status.IN_PROGRESS
+                or export.counters.get('concatenating')
+                or statuses & {ExportShard.Status.CREATED, ExportShard.Status.IN_PROGRESS}
+            ):
+                return
+            if ExportShard.Status.FAILED in statuses:
+                export.status = self.Status.FAILED
+                export.finished_at = timezone.now()
+                export.save(update_fields=['status', 'finished_at'])
+                return
+            claimed_at = timezone.now().isoformat()
+            export.counters['concatenating'] = claimed_at
+            export.save(update_fields=['counters'])
+
+        if redis_connected():
+            # its own job, a concatenation killed by the job timeout fails the export instead of a shard
+            queue = django_rq.get_queue('default')
+            queue.enqueue(
+                concatenate_shards_background,
+                export.id,
+                claimed_at,
+                on_failure=set_export_background_failure,
+                job_timeout=CONCATENATION_TIMEOUT,
+            )
+        else:
+            export._finish_concatenation()
+
+    def _finish_concatenation(self):
+        """Concatenate the shards, the caller holds the concatenation claim"""
+        try:
+            self._concatenate_shards()
+            self.status = self.Status.COMPLETED
+        except Exception as e:
+            logger.exception('Export was failed: %s', e)
+            self.counters.pop('concatenating', None)
+            self.status = self.Status.FAILED
+        self.finished_at = timezone.now()
+        self.save(update_fields=['status', 'counters', 'finished_at'])
+
+    def _concatenate_shards(self):
+        """Join the shard files into the snapshot, the md5 is computed while writing"""
+        shards = list(self.shards.order_by('index'))
+        with tempfile.NamedTemporaryFile(suffix='.export', dir=settings.FILE_UPLOAD_TEMP_DIR) as file:
+            writer = SnapshotWriter(file, self.snapshot_format)
+            for shard in shards:
+                if not shard.task_number:
+                    continue
+                with shard.file.open('rb') as shard_file:
+                    for line in shard_file:
+                        line = line.rstrip(b'\n')
+                        if line:
+                            writer.write_task(line)
+            md5 = writer.close()
+
+            # export_options are kept until the snapshot is saved, resuming needs them
+            task_number = sum(shard.task_number for shard in shards)
+            self.counters['task_number'] = task_number
+            self.save_file(file, md5)
+            self.counters = {'task_number': task_number}
+
+        for shard in shards:
+            if shard.file:
+                shard.file.delete(save=False)
+        logger.info(f'Export {self.id}: {len(shards)} shards concatenated, {self.counters["task_number"]} tasks')
 
     def run_file_exporting(self, task_filter_options=None, annotation_filter_options=None, serialization_options=None):
         if self.status == self.Status.IN_PROGRESS:
@@ -342,48 +644,92 @@ class ExportMixin:
                 serialization_options=serialization_options,
             )
 
+    def _get_converter(self, upload_dir, download_resources=False, hostname=None):
+        return Converter(
+            config=self.project.get_parsed_config(),
+            project_dir=None,
+            upload_dir=upload_dir,
+            download_resources=download_resources,
+            # for downloading resource we need access to the API
+            access_token=self.project.organization.created_by.auth_token.key,
+            hostname=hostname,
+        )
+
+    @staticmethod
+    def _pack_converted(out_dir, input_name):
+        """Move conversion output into a temporary file: the single result file, or a zip of everything"""
+        files = get_all_files_from_dir(out_dir)
+        dirs = get_all_dirs_from_dir(out_dir)
+
+        if len(files) == 0 and len(dirs) == 0:
+            return None
+
+        output = tempfile.NamedTemporaryFile(suffix='.converted', dir=settings.FILE_UPLOAD_TEMP_DIR)
+        if len(files) == 1 and len(dirs) == 0:
+            filename = input_name.split('.', 1)[0] + pathlib.Path(files[0]).suffix
+            with open(files[0], mode='rb') as f:
+                shutil.copyfileobj(f, output)
+        else:
+            # written straight to disk, entries are streamed from the output directory
+            filename = input_name.split('.', 1)[0] + '.zip'
+            with zipfile.ZipFile(output, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+                for path in sorted(pathlib.Path(out_dir).rglob('*')):
+                    archive.write(path, path.relative_to(out_dir))
+        output.seek(0)
+        return File(output, name=filename)
+
     def convert_file(self, to_format, download_resources=False, hostname=None):
         with get_temp_dir() as tmp_dir:
             OUT = 'out'
             out_dir = pathlib.Path(tmp_dir) / OUT
             out_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
 
-            converter = Converter(
-                config=self.project.get_parsed_config(),
-                project_dir=None,
-                upload_dir=out_dir,
-                download_resources=download_resources,
-                # for downloading resource we need access to the API
-                access_token=self.project.organization.created_by.auth_token.key,
-                hostname=hostname,
-            )
+            converter = self._get_converter(out_dir, download_resources=download_resources, hostname=hostname)
             input_name = pathlib.Path(self.file.name).name
             input_file_path = pathlib.Path(tmp_dir) / input_name
 
-            with open(input_file_path, 'wb') as file_:
-                file_.write(self.file.open().read())
+            with self.file.open('rb') as snapshot, open(input_file_path, 'wb') as file_:
+                shutil.copyfileobj(snapshot, file_)
 
             converter.convert(input_file_path, out_dir, to_format, is_dir=False)
+            return self._pack_converted(out_dir, input_name)
+
+    def convert_files(self, to_formats, download_resources=False, hostname=None):
+        """
+        Convert the snapshot to several formats in one pass.
+
+        The snapshot is streamed from storage and parsed once; every task is
+        handed to all format writers (see Converter.convert_many).
+
+        Returns:
+            Tuple (files, errors): dict of format -> File (None when the
+            conversion produced nothing) and dict of format -> exception
+        """
+        with get_temp_dir() as tmp_dir:
+            out_dirs = {}
+            for to_format in to_formats:
+                out_dirs[to_format] = pathlib.Path(tmp_dir) / to_format
+                out_dirs[to_format].mkdir(mode=0o700, parents=True, exist_ok=True)
+
+            converter = self._get_converter(
+                pathlib.Path(tmp_dir) / 'upload', download_resources=download_resources, hostname=hostname
+            )
+            input_name = pathlib.Path(self.file.name).name
 
-            files = get_all_files_from_dir(out_dir)
-            dirs = get_all_dirs_from_dir(out_dir)
-
-            if len(files) == 0 and len(dirs) == 0:
-                return None
-            elif len(files) == 1 and len(dirs) == 0:
-                output_file = files[0]
-                filename = pathlib.Path(input_name).stem + pathlib.Path(output_file).suffix
-            else:
-                shutil.make_archive(out_dir, 'zip', out_dir)
-                output_file = pathlib.Path(tmp_dir) / (str(out_dir.stem) + '.zip')
-                filename = pathlib.Path(input_name).stem + '.zip'
-
-            # TODO(jo): can we avoid the `f.read()` here?
-            with open(output_file, mode='rb') as f:
-                return File(
-                    io.BytesIO(f.read()),
-                    name=filename,
+            with self.file.open('rb') as snapshot:
+                failed = converter.convert_many(
+                    snapshot,
+                    {fmt: str(out_dir) for fmt, out_dir in out_dirs.items()},
+                    is_ndjson=self.snapshot_format != self.SnapshotFormat.JSON,
                 )
+            errors = {str(fmt): error for fmt, error in failed.items()}
+
+            files = {
+                to_format: self._pack_converted(out_dir, input_name)
+                for to_format, out_dir in out_dirs.items()
+                if to_format not in errors
+            }
+            return files, errors
 
 
 def export_background(
@@ -408,3 +754,32 @@ def set_export_background_failure(job, connection, type, value, traceback):
 
 
 
+
+
+def export_shard_background(shard_id, *args, **kwargs):
+    from data_export.models import ExportShard
+
+    shard = ExportShard.objects.select_related('export').get(id=shard_id)
+    shard.export.export_shard(shard)
+
+
+def concatenate_shards_background(export_id, claimed_at, *args, **kwargs):
+    from data_export.models import Export
+
+    export = Export.objects.get(id=export_id)
+    # a resume of a stalled export claims the concatenation again, a late job of the old claim must not run
+    if export.status == Export.Status.IN_PROGRESS and export.counters.get('concatenating') == claimed_at:
+        export._finish_concatenation()
+
+
+def set_export_shard_background_failure(job, connection, type, value, traceback):
+    from data_export.models import ExportShard
+
+    shard = ExportShard.objects.select_related('export').filter(id=job.args[0]).first()
+    if shard is None:
+        return
+    shard.status = ExportShard.Status.FAILED
+    shard.error = str(value)
+    shard.finished_at = timezone.now()
+    shard.save(update_fields=['status', 'error', 'finished_at'])
+    shard.export._on_shard_finished()
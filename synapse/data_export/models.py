@@ -33,6 +33,11 @@ class Export(ExportMixin, models.Model):
         FAILED = 'failed', _('Failed')
         COMPLETED = 'completed', _('Completed')
 
+    class SnapshotFormat(models.TextChoices):
+        JSON = 'json', _('JSON array')
+        NDJSON_GZ = 'ndjson.gz', _('Gzip compressed NDJSON')
+        NDJSON_ZST = 'ndjson.zst', _('Zstandard compressed NDJSON')
+
     title = models.CharField(
         _('title'),
         blank=True,
@@ -70,6 +75,13 @@ class Export(ExportMixin, models.Model):
         _('Exporting meta data'),
         default=dict,
     )
+    snapshot_format = models.CharField(
+        _('snapshot format'),
+        max_length=16,
+        choices=SnapshotFormat.choices,
+        default=SnapshotFormat.JSON,
+        help_text='JSON array of tasks or compressed NDJSON with one task per line',
+    )
     project = models.ForeignKey(
         'projects.Project',
         related_name='exports',
@@ -84,6 +96,63 @@ class Export(ExportMixin, models.Model):
     )
 
 
+class ExportShard(models.Model):
+    """Keyset range of task ids exported by one job of a sharded snapshot export"""
+
+    class Status(models.TextChoices):
+        CREATED = 'created', _('Created')
+        IN_PROGRESS = 'in_progress', _('In progress')
+        FAILED = 'failed', _('Failed')
+        COMPLETED = 'completed', _('Completed')
+
+    export = models.ForeignKey(
+        Export,
+        related_name='shards',
+        on_delete=models.CASCADE,
+    )
+    index = models.PositiveIntegerField(
+        _('index'),
+        help_text='Position of the shard in the snapshot',
+    )
+    min_id = models.BigIntegerField(
+        _('min id'),
+        help_text='Tasks with greater ids belong to the shard',
+    )
+    max_id = models.BigIntegerField(
+        _('max id'),
+        null=True,
+        help_text='Last task id of the shard, empty for the last shard',
+    )
+    status = models.CharField(
+        _('shard status'),
+        max_length=64,
+        choices=Status.choices,
+        default=Status.CREATED,
+    )
+    task_number = models.IntegerField(
+        _('task number'),
+        default=0,
+        help_text='Number of exported tasks',
+    )
+    file = models.FileField(
+        upload_to=settings.DELAYED_EXPORT_DIR,
+        null=True,
+    )
+    error = models.TextField(null=True, blank=True, help_text='Error message in case of failure')
+    finished_at = models.DateTimeField(
+        _('finished at'),
+        help_text='Complete or fail time',
+        null=True,
+        default=None,
+    )
+
+    class Meta:
+        ordering = ['index']
+        constraints = [
+            models.UniqueConstraint(fields=['export', 'index'], name='unique_export_shard_index'),
+        ]
+
+
 @receiver(post_save, sender=Export)
 def set_export_default_name(sender, instance, created, **kwargs):
     if created and not instance.title:
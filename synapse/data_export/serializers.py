@@ -2,6 +2,7 @@
 """
 from core.label_config import replace_task_data_undefined_with_config_field
 from core.utils.common import load_func
+from data_export.mixins import zstandard_available
 from data_export.models import DataExport
 from django.conf import settings
 from fsm.serializer_fields import FSMStateField
@@ -15,7 +16,7 @@ from tasks.serializers import AnnotationDraftSerializer, PredictionSerializer
 from users.models import User
 from users.serializers import UserSimpleSerializer
 
-from .models import ConvertedFormat, Export
+from .models import ConvertedFormat, Export, ExportShard
 
 
 class CompletedBySerializer(serializers.ModelSerializer):
@@ -102,7 +103,7 @@ class BaseExportDataSerializer(FlexFieldsModelSerializer):
 
     class Meta:
         model = Task
-        exclude = ('overlap', 'is_labeled', 'precomputed_agreement')
+        exclude = ('overlap', 'is_labeled', 'precomputed_agreement', 'data_fingerprint')
         expandable_fields = {
             'drafts': (AnnotationDraftSerializer, {'many': True}),
             'predictions': (PredictionSerializer, {'many': True}),
@@ -127,6 +128,12 @@ class ConvertedFormatSerializer(serializers.ModelSerializer):
         return data
 
 
+class ExportShardSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ExportShard
+        fields = ['index', 'status', 'task_number', 'error', 'finished_at']
+
+
 class ExportSerializer(serializers.ModelSerializer):
     class Meta:
         model = Export
@@ -139,11 +146,18 @@ class ExportSerializer(serializers.ModelSerializer):
             'md5',
             'counters',
             'converted_formats',
+            'shards',
         ]
-        fields = ['title'] + read_only
+        fields = ['title', 'snapshot_format'] + read_only
 
     created_by = UserSimpleSerializer(required=False)
     converted_formats = ConvertedFormatSerializer(many=True, required=False)
+    shards = ExportShardSerializer(many=True, read_only=True)
+
+    def validate_snapshot_format(self, value):
+        if value == Export.SnapshotFormat.NDJSON_ZST and not zstandard_available():
+            raise serializers.ValidationError('zstandard package is not installed, use ndjson.gz instead')
+        return value
 
 
 ONLY_OR_EXCLUDE_CHOICE = [
@@ -209,16 +223,35 @@ class SerializationOptionsSerializer(serializers.Serializer):
 
 
 class ExportConvertSerializer(serializers.Serializer):
-    export_type = serializers.CharField(help_text='Export file format.')
+    export_type = serializers.CharField(help_text='Export file format.', required=False)
+    export_types = serializers.ListField(
+        child=serializers.CharField(),
+        help_text='Several export file formats, converted in one pass over the snapshot.',
+        required=False,
+        allow_empty=False,
+    )
     download_resources = serializers.BooleanField(help_text='Download resources in converter.', required=False)
 
-    def validate_export_type(self, value):
+    def _validate_format(self, value):
         project = self.context.get('project')
         export_formats = [f['name'] for f in DataExport.get_export_formats(project)]
         if value not in export_formats:
             raise serializers.ValidationError(f'{value} is not supported export format')
         return value
 
+    def validate_export_type(self, value):
+        return self._validate_format(value)
+
+    def validate_export_types(self, value):
+        return list(dict.fromkeys(self._validate_format(v) for v in value))
+
+    def validate(self, attrs):
+        if not attrs.get('export_types'):
+            if not attrs.get('export_type'):
+                raise serializers.ValidationError({'export_type': ['This field is required.']})
+            attrs['export_types'] = [attrs['export_type']]
+        return attrs
+
 
 class ExportCreateSerializer(ExportSerializer):
     class Meta(ExportSerializer.Meta):
@@ -1,6 +1,6 @@
 from unittest.mock import ANY, patch
 
-from data_export.api import async_convert
+from data_export.api import async_convert, async_convert_many
 from data_export.models import ConvertedFormat, Export
 from projects.tests.factories import ProjectFactory
 from rest_framework.test import APITestCase
@@ -69,7 +69,38 @@ class TestExportConvertAPI(APITestCase):
             on_failure=ANY,
         )
 
+    def test_convert_export_many_formats(self, mock_start_job_async_or_sync):
+        self.client.force_authenticate(user=self.user)
 
+        response = self.client.post(
+            f'/api/projects/{self.project.id}/exports/{self.export.id}/convert',
+            {'export_types': ['CSV', 'TSV']},
+        )
+        assert response.status_code == 200
+        cf_ids = [
+            ConvertedFormat.objects.get(export=self.export, export_type=export_type).id
+            for export_type in ['CSV', 'TSV']
+        ]
+        assert response.json() == {'export_types': ['CSV', 'TSV'], 'converted_formats': cf_ids}
+
+        mock_start_job_async_or_sync.assert_called_once_with(
+            async_convert_many,
+            cf_ids,
+            self.project,
+            ANY,
+            download_resources=False,
+            on_failure=ANY,
+        )
 
+    def test_convert_export_many_formats_already_started(self, mock_start_job_async_or_sync):
+        self.client.force_authenticate(user=self.user)
 
+        ConvertedFormat.objects.create(export=self.export, export_type='TSV', status=ConvertedFormat.Status.CREATED)
 
+        response = self.client.post(
+            f'/api/projects/{self.project.id}/exports/{self.export.id}/convert',
+            {'export_types': ['CSV', 'TSV']},
+        )
+        assert response.status_code == 400
+        assert ConvertedFormat.objects.filter(export=self.export, export_type='CSV').count() == 0
+        mock_start_job_async_or_sync.assert_not_called()
@@ -0,0 +1,45 @@
+import gzip
+import hashlib
+import json
+from unittest.mock import patch
+
+import pytest
+from data_export.api import get_content_type
+from data_export.models import Export
+from projects.tests.factories import ProjectFactory
+from synapse_sdk.converter.task_stream import iter_tasks
+from tasks.tests.factories import AnnotationFactory, TaskFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def project():
+    project = ProjectFactory()
+    for i in range(3):
+        task = TaskFactory(project=project, data={'text': str(i)})
+        AnnotationFactory(task=task, project=project)
+    return project
+
+
+@pytest.mark.parametrize('shard_size', [0, 2])
+@patch('data_export.mixins.redis_connected', return_value=False)
+def test_gzip_ndjson_snapshot(_, project, settings, shard_size):
+    settings.EXPORT_SHARD_SIZE = shard_size
+    export = Export.objects.create(project=project, snapshot_format=Export.SnapshotFormat.NDJSON_GZ)
+    export.run_file_exporting()
+
+    export.refresh_from_db()
+    assert export.status == Export.Status.COMPLETED
+    assert export.file.name.endswith('.ndjson.gz')
+    assert get_content_type(export.file.name) == 'application/gzip'
+    with export.file.open('rb') as f:
+        data = f.read()
+    assert export.md5 == hashlib.md5(data).hexdigest()  # nosec
+    lines = gzip.decompress(data).decode('utf-8').splitlines()
+    assert [json.loads(line)['data']['text'] for line in lines] == ['0', '1', '2']
+
+    # the sdk reads the snapshot line by line
+    with export.file.open('rb') as f:
+        assert [task['data']['text'] for task in iter_tasks(f)] == ['0', '1', '2']
+
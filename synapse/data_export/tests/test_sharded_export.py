@@ -0,0 +1,108 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from data_export.models import Export, ExportShard
+from projects.tests.factories import ProjectFactory
+from tasks.tests.factories import AnnotationFactory, TaskFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def project(settings):
+    settings.EXPORT_SHARD_SIZE = 2
+    project = ProjectFactory()
+    for i in range(5):
+        task = TaskFactory(project=project, data={'text': str(i)})
+        if i != 2:
+            AnnotationFactory(task=task, project=project)
+    return project
+
+
+def _snapshot_texts(export):
+    with export.file.open('rb') as f:
+        return [task['data']['text'] for task in json.load(f)]
+
+
+@patch('data_export.mixins.redis_connected', return_value=False)
+def test_sharded_export(_, project):
+    export = Export.objects.create(project=project)
+    export.run_file_exporting(task_filter_options={'only_with_annotations': True})
+
+    export.refresh_from_db()
+    assert export.status == Export.Status.COMPLETED
+    assert export.counters == {'task_number': 4}
+    assert _snapshot_texts(export) == ['0', '1', '3', '4']
+    assert list(export.shards.values_list('status', 'task_number')) == [
+        (ExportShard.Status.COMPLETED, 2),
+        (ExportShard.Status.COMPLETED, 2),
+    ]
+
+
+@patch('data_export.mixins.redis_connected', return_value=False)
+def test_failed_shards_are_resumed(_, project):
+    export = Export.objects.create(project=project)
+    get_export_data = Export.get_export_data
+    second_shard_start = project.tasks.order_by('id').values_list('id', flat=True)[1]
+
+    def failing_get_export_data(self, *args, id_range=None, **kwargs):
+        if id_range and id_range[0] == second_shard_start:
+            raise RuntimeError('database went away')
+        return get_export_data(self, *args, id_range=id_range, **kwargs)
+
+    with patch.object(Export, 'get_export_data', failing_get_export_data):
+        export.run_file_exporting()
+
+    export.refresh_from_db()
+    assert export.status == Export.Status.FAILED
+    assert list(export.shards.values_list('status', flat=True)) == [
+        ExportShard.Status.COMPLETED,
+        ExportShard.Status.FAILED,
+        ExportShard.Status.COMPLETED,
+    ]
+
+    assert export.resume_file_exporting()
+    export.refresh_from_db()
+    assert export.status == Export.Status.COMPLETED
+    assert _snapshot_texts(export) == ['0', '1', '2', '3', '4']
+
+
+@patch('data_export.mixins.redis_connected', return_value=False)
+def test_failed_concatenation_is_resumed(_, project):
+    export = Export.objects.create(project=project)
+    with patch.object(Export, 'save_file', side_effect=OSError('storage is not available')):
+        export.run_file_exporting()
+
+    export.refresh_from_db()
+    assert export.status == Export.Status.FAILED
+    assert 'export_options' in export.counters
+    assert set(export.shards.values_list('status', flat=True)) == {ExportShard.Status.COMPLETED}
+
+    # the shard files are intact, only the concatenation runs again
+    assert export.resume_file_exporting()
+    export.refresh_from_db()
+    assert export.status == Export.Status.COMPLETED
+    assert export.counters == {'task_number': 5}
+    assert _snapshot_texts(export) == ['0', '1', '2', '3', '4']
+
+
+@patch('data_export.mixins.redis_connected', return_value=False)
+def test_stalled_concatenation_is_resumed(_, project):
+    export = Export.objects.create(project=project)
+    # the concatenation job is killed without running any cleanup
+    with patch.object(Export, '_finish_concatenation'):
+        export.run_file_exporting()
+
+    export.refresh_from_db()
+    assert export.status == Export.Status.IN_PROGRESS
+    assert export.counters['concatenating']
+    # a concatenation claimed recently may still be running
+    assert not export.resume_file_exporting()
+
+    export.counters['concatenating'] = '2000-01-01T00:00:00+00:00'
+    export.save(update_fields=['counters'])
+    assert export.resume_file_exporting()
+    export.refresh_from_db()
+    assert export.status == Export.Status.COMPLETED
+    assert _snapshot_texts(export) == ['0', '1', '2', '3', '4']
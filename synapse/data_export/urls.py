@@ -42,6 +42,11 @@ _api_urlpatterns = [
         api.ExportDownloadAPI.as_view(),
         name="project-exports-download",
     ),
+    path(
+        "<int:pk>/exports/<int:export_pk>/resume",
+        api.ExportResumeAPI.as_view(),
+        name="project-exports-resume",
+    ),
     path(
         "<int:pk>/exports/<int:export_pk>/convert",
         api.ExportConvertAPI.as_view(),
@@ -1,5 +1,6 @@
 """This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license."""
 
+import hashlib
 import json
 import logging
 import mimetypes
@@ -15,6 +16,7 @@ from core.redis import start_job_async_or_sync
 from core.utils.common import retry_database_locked, timeit
 from core.utils.params import bool_from_request, list_of_strings_from_request
 from csp.decorators import csp
+from data_manager import totals
 from django.conf import settings
 from django.db import transaction
 from django.http import HttpResponse
@@ -156,6 +158,14 @@ task_create_response_scheme = {
                 default=False,
                 required=False,
             ),
+            OpenApiParameter(
+                name="skip_duplicates",
+                type=OpenApiTypes.BOOL,
+                location="query",
+                description='Set to "true" to skip tasks whose data is already in the project.',
+                default=False,
+                required=False,
+            ),
             OpenApiParameter(
                 name="preannotated_from_fields",
                 many=True,
@@ -255,8 +265,9 @@ class ImportAPI(generics.CreateAPIView):
         # Multipart parsing is handled by MultipartStreamDebugMiddleware
         return super(ImportAPI, self).post(request, *args, **kwargs)
 
-    def _save(self, tasks):
-        serializer = self.get_serializer(data=tasks, many=True)
+    def _save(self, tasks, skip_duplicates=False):
+        context = {**self.get_serializer_context(), "skip_duplicates": skip_duplicates}
+        serializer = self.get_serializer(data=tasks, many=True, context=context)
         serializer.is_valid(raise_exception=True)
         task_instances = serializer.save(project_id=self.kwargs["pk"])
         project = generics.get_object_or_404(
@@ -277,6 +288,7 @@ class ImportAPI(generics.CreateAPIView):
         preannotated_from_fields,
         commit_to_project,
         return_task_ids,
+        skip_duplicates=False,
     ):
         start = time.time()
         tasks = None
@@ -339,7 +351,7 @@ class ImportAPI(generics.CreateAPIView):
 
         if commit_to_project:
             # Immediately create project tasks and update project states and counters
-            tasks, serializer = self._save(parsed_data)
+            tasks, serializer = self._save(parsed_data, skip_duplicates)
             task_count = len(tasks)
             annotation_count = len(serializer.db_annotations)
             prediction_count = len(serializer.db_predictions)
@@ -510,6 +522,7 @@ class ImportAPI(generics.CreateAPIView):
         preannotated_from_fields,
         commit_to_project,
         return_task_ids,
+        skip_duplicates=False,
     ):
 
         project_import = ProjectImport.objects.create(
@@ -517,6 +530,7 @@ class ImportAPI(generics.CreateAPIView):
             preannotated_from_fields=preannotated_from_fields,
             commit_to_project=commit_to_project,
             return_task_ids=return_task_ids,
+            skip_duplicates=skip_duplicates,
         )
 
         # Check content_type first to avoid accessing request.data when we have FILES
@@ -580,6 +594,9 @@ class ImportAPI(generics.CreateAPIView):
         preannotated_from_fields = list_of_strings_from_request(
             request.query_params, "preannotated_from_fields", None
         )
+        skip_duplicates = bool_from_request(
+            request.query_params, "skip_duplicates", False
+        )
 
         # check project permissions
         project = generics.get_object_or_404(
@@ -593,6 +610,7 @@ class ImportAPI(generics.CreateAPIView):
                 preannotated_from_fields,
                 commit_to_project,
                 return_task_ids,
+                skip_duplicates,
             )
         else:
             return self.sync_import(
@@ -601,6 +619,7 @@ class ImportAPI(generics.CreateAPIView):
                 preannotated_from_fields,
                 commit_to_project,
                 return_task_ids,
+                skip_duplicates,
             )
 
 
@@ -737,6 +756,7 @@ class ImportPredictionsAPI(generics.CreateAPIView):
                 batch_predictions, batch_size=settings.BATCH_SIZE
             )
             total_created += len(batch_created)
+            totals.bump_data_version(project.id)
 
             logger.debug(
                 f"Processed batch {batch_start}-{batch_end-1}: created {len(batch_created)} predictions "
@@ -837,6 +857,7 @@ class ImportPredictionsAPI(generics.CreateAPIView):
         predictions_obj = Prediction.objects.bulk_create(
             predictions, batch_size=settings.BATCH_SIZE
         )
+        totals.bump_data_version(project.id)
         start_job_async_or_sync(
             update_tasks_counters, Task.objects.filter(id__in=tasks_ids)
         )
@@ -1277,7 +1298,23 @@ class UploadedFileResponse(generics.RetrieveAPIView):
             return False
         return any(ct in content_type.lower() for ct in self.WATERMARK_CONTENT_TYPES)
 
-    def _apply_watermarks(self, image_data: bytes, request) -> bytes:
+    def _get_watermark_identity(self, request) -> dict:
+        """
+        Everything that ends up in the visible and invisible watermarks.
+
+        The timestamp is bucketed to the minute (the resolution of the visible
+        watermark), so repeated requests within a minute render identically
+        and can be served from the render cache.
+        """
+        user = request.user
+        return {
+            "user_id": getattr(user, "email", str(user.id)),
+            "session_id": request.session.session_key or "no-session",
+            "timestamp": datetime.now().replace(second=0, microsecond=0).isoformat(),
+            "ip": request.META.get("REMOTE_ADDR", ""),
+        }
+
+    def _apply_watermarks(self, image_data: bytes, identity: dict) -> bytes:
         """
         Apply both visible and invisible watermarks to image.
 
@@ -1287,10 +1324,9 @@ class UploadedFileResponse(generics.RetrieveAPIView):
         try:
             from core.watermark_service import WatermarkService
 
-            user = request.user
-            user_id = getattr(user, "email", str(user.id))
-            session_id = request.session.session_key or "no-session"
-            timestamp = datetime.now()
+            user_id = identity["user_id"]
+            session_id = identity["session_id"]
+            timestamp = datetime.fromisoformat(identity["timestamp"])
 
             # Apply visible watermark
             watermarked = WatermarkService.apply_visible_watermark(
@@ -1306,7 +1342,7 @@ class UploadedFileResponse(generics.RetrieveAPIView):
                 "u": user_id,  # User ID/email
                 "s": session_id[:16] if session_id else "",  # Session (truncated)
                 "ts": timestamp.isoformat(),  # Timestamp
-                "ip": request.META.get("REMOTE_ADDR", ""),  # IP address
+                "ip": identity["ip"],  # IP address
             }
 
             watermarked = WatermarkService.apply_invisible_watermark(
@@ -1321,6 +1357,54 @@ class UploadedFileResponse(generics.RetrieveAPIView):
             # Return original if watermarking fails
             return image_data
 
+    def _get_watermarked_response(self, image_data: bytes, request) -> HttpResponse:
+        """
+        Serve a watermarked image, reusing earlier renderings when possible.
+
+        The ETag is derived from the file content hash and the watermark
+        identity, so a browser revalidating within the same minute gets a 304
+        without any rendering, and other requests are served from the render
+        cache instead of being decoded and re-encoded again.
+        """
+        from core.watermark_cache import (
+            get_cached_render,
+            make_render_key,
+            set_cached_render,
+        )
+
+        identity = self._get_watermark_identity(request)
+
+        if not settings.SECURITY_WATERMARK_CACHE_ENABLED:
+            watermarked_data = self._apply_watermarks(image_data, identity)
+            response = HttpResponse(watermarked_data, content_type="image/png")
+            response["Content-Length"] = len(watermarked_data)
+            response["Cache-Control"] = "no-store, no-cache, must-revalidate, private"
+            response["Content-Disposition"] = "inline"
+            return response
+
+        render_key = make_render_key(hashlib.sha256(image_data).hexdigest(), identity)
+        etag = f'"{render_key}"'
+
+        if request.headers.get("If-None-Match") == etag:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            watermarked_data = get_cached_render(render_key)
+            if watermarked_data is None:
+                watermarked_data = self._apply_watermarks(image_data, identity)
+                # Failed watermarking returns the original bytes - never cache those
+                if watermarked_data is not image_data:
+                    set_cached_render(render_key, watermarked_data)
+
+            # Watermarked images are always PNG
+            response = HttpResponse(watermarked_data, content_type="image/png")
+            response["Content-Length"] = len(watermarked_data)
+            response["Content-Disposition"] = "inline"
+
+        response["ETag"] = etag
+        # Per-user content: may be kept by the browser only, and must be revalidated
+        response["Cache-Control"] = "private, no-cache, must-revalidate"
+        return response
+
     @override_report_only_csp
     @csp(SANDBOX=[])
     def get(self, *args, **kwargs):
@@ -1352,20 +1436,7 @@ class UploadedFileResponse(generics.RetrieveAPIView):
                 with file.open(mode="rb") as f:
                     image_data = f.read()
 
-                # Apply watermarks
-                watermarked_data = self._apply_watermarks(image_data, request)
-
-                # Return watermarked image
-                response = HttpResponse(
-                    watermarked_data,
-                    content_type="image/png",  # Watermarked images are always PNG
-                )
-                response["Content-Length"] = len(watermarked_data)
-                response["Cache-Control"] = (
-                    "no-store, no-cache, must-revalidate, private"
-                )
-                response["Content-Disposition"] = "inline"
-                return response
+                return self._get_watermarked_response(image_data, request)
             else:
                 # Non-image files: serve normally
                 return RangedFileResponse(
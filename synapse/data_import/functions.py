@@ -157,7 +157,12 @@ def async_import_background(
 
             # Immediately create project tasks and update project states and counters
             serializer = ImportApiSerializer(
-                data=tasks, many=True, context={"project": project}
+                data=tasks,
+                many=True,
+                context={
+                    "project": project,
+                    "skip_duplicates": project_import.skip_duplicates,
+                },
             )
             serializer.is_valid(raise_exception=True)
 
@@ -610,7 +615,12 @@ def _async_import_background_streaming(project_import, user):
                     )
 
                     serializer = ImportApiSerializer(
-                        data=batch_tasks, many=True, context={"project": project}
+                        data=batch_tasks,
+                        many=True,
+                        context={
+                            "project": project,
+                            "skip_duplicates": project_import.skip_duplicates,
+                        },
                     )
                     serializer.is_valid(raise_exception=True)
                     batch_db_tasks = serializer.save(project_id=project.id)
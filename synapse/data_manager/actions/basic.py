@@ -7,6 +7,7 @@ from core.feature_flags import flag_set
 from core.permissions import AllPermissions
 from core.redis import start_job_async_or_sync
 from core.utils.common import load_func
+from data_manager import totals
 from data_manager.actions import DataManagerAction
 from data_manager.functions import evaluate_predictions
 from django.conf import settings
@@ -44,6 +45,8 @@ def delete_tasks(project, queryset, **kwargs):
     # unlink tasks from project
     queryset = Task.objects.filter(id__in=tasks_ids_list)
     queryset.update(project=None)
+    if totals.is_enabled():
+        totals.bump_data_version(project.id)
     # delete all project tasks
     if count == project_count:
         start_job_async_or_sync(Task.delete_tasks_without_signals_from_task_ids, tasks_ids_list)
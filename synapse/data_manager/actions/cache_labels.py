@@ -2,16 +2,22 @@
 """
 
 import logging
+from collections import Counter, defaultdict
 
 from core.permissions import AllPermissions
 from core.redis import start_job_async_or_sync
 from data_manager.actions import DataManagerAction
+from django.conf import settings
+from rq import get_current_job
 from synapse_sdk.synapse_interface import LabelInterface
 from tasks.models import Annotation, Prediction, Task
 
 logger = logging.getLogger(__name__)
 all_permissions = AllPermissions()
 
+# tasks loaded, labeled and written back at once
+CHUNK_SIZE = getattr(settings, 'CACHE_LABELS_CHUNK_SIZE', 1000)
+
 
 def cache_labels_job(project, queryset, **kwargs):
     request_data = kwargs['request_data']
@@ -35,30 +41,48 @@ def cache_labels_job(project, queryset, **kwargs):
     else:
         column_name = f'{column_name}_{control_tag}'
 
-    tasks = list(queryset.only('data'))
-    logger.info(f'Cache labels for {len(tasks)} tasks and control tag {control_tag}')
-
-    for task in tasks:
-        task_labels = []
-        annotations = source_class.objects.filter(task=task).only('result')
-        for annotation in annotations:
-            labels = extract_labels(annotation, control_tag, label_interface_tags)
-            task_labels.extend(labels)
-
-        # cache labels in separate data column
-        # with counters
-        if with_counters:
-            task.data[column_name] = ', '.join(
-                sorted([f'{label}: {task_labels.count(label)}' for label in set(task_labels)])
-            )
-        # no counters
-        else:
-            task.data[column_name] = ', '.join(sorted(list(set(task_labels))))
-
-    Task.objects.bulk_update(tasks, fields=['data'], batch_size=1000)
-    first_task = Task.objects.get(id=queryset.first().id)
-    project.summary.update_data_columns([first_task])
-    return {'response_code': 200, 'detail': f'Updated {len(tasks)} tasks'}
+    task_ids = queryset.order_by('id').values_list('id', flat=True)
+    total = queryset.count()
+    logger.info(f'Cache labels for {total} tasks and control tag {control_tag}')
+
+    job = get_current_job()
+    first_task = None
+    updated, last_id = 0, 0
+    while True:
+        # id ranges keep every chunk query cheap however deep into the tasks we are
+        chunk_ids = list(task_ids.filter(id__gt=last_id)[:CHUNK_SIZE])
+        if not chunk_ids:
+            break
+        last_id = chunk_ids[-1]
+
+        tasks = list(Task.objects.filter(id__in=chunk_ids).only('data').order_by('id'))
+        task_labels = defaultdict(Counter)
+        for annotation in source_class.objects.filter(task_id__in=chunk_ids).only('task_id', 'result'):
+            task_labels[annotation.task_id].update(extract_labels(annotation, control_tag, label_interface_tags))
+
+        for task in tasks:
+            labels = task_labels[task.id]
+            # cache labels in separate data column
+            # with counters
+            if with_counters:
+                task.data[column_name] = ', '.join(sorted(f'{label}: {count}' for label, count in labels.items()))
+            # no counters
+            else:
+                task.data[column_name] = ', '.join(sorted(labels))
+            task.data_fingerprint = Task.get_data_fingerprint(task.data)
+
+        Task.objects.bulk_update(tasks, fields=['data', 'data_fingerprint'], batch_size=CHUNK_SIZE)
+        first_task = first_task or (tasks[0] if tasks else None)
+        updated += len(tasks)
+
+        logger.info(f'Cached labels for {updated}/{total} tasks of project {project.id}')
+        if job is not None:
+            job.meta['progress'] = {'processed': updated, 'total': total}
+            job.save_meta()
+
+    if first_task is not None:
+        project.summary.update_data_columns([first_task])
+    return {'response_code': 200, 'detail': f'Updated {updated} tasks'}
 
 
 def extract_labels(annotation, control_tag, label_interface_tags=None):
@@ -179,7 +179,8 @@ def add_data_field(project, queryset, **kwargs):
             tasks = list(queryset.only('data'))
             for task in tasks:
                 task.data[value_name] = value
-            Task.objects.bulk_update(tasks, fields=['data'], batch_size=1000)
+                task.data_fingerprint = Task.get_data_fingerprint(task.data)
+            Task.objects.bulk_update(tasks, fields=['data', 'data_fingerprint'], batch_size=1000)
 
         # postgres and other DB
         else:
@@ -189,7 +190,9 @@ def add_data_field(project, queryset, **kwargs):
                     Value([value_name]),
                     Value(value, JSONField()),
                     function='jsonb_set',
-                )
+                ),
+                # filled again by the next remove duplicates action
+                data_fingerprint=None,
             )
 
     project.summary.update_data_columns([queryset.first()])
@@ -269,7 +272,9 @@ def add_expression(queryset, size, value, value_name):
     else:
         raise ValidationError('Undefined expression, you can use: ' + add_data_field_examples)
 
-    Task.objects.bulk_update(tasks, fields=['data'], batch_size=1000)
+    for task in tasks:
+        task.data_fingerprint = Task.get_data_fingerprint(task.data)
+    Task.objects.bulk_update(tasks, fields=['data', 'data_fingerprint'], batch_size=1000)
 
 
 def add_data_field_form(user, project):
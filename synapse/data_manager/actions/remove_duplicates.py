@@ -4,18 +4,19 @@
 import logging
 from collections import defaultdict
 
-import ujson as json
-from core.label_config import replace_task_data_undefined_with_config_field
 from core.permissions import AllPermissions
 from core.redis import start_job_async_or_sync
 from data_manager.actions import DataManagerAction
 from data_manager.actions.basic import delete_tasks
+from django.conf import settings
+from django.db.models import Count
 from io_storages.azure_blob.models import AzureBlobImportStorageLink
 from io_storages.gcs.models import GCSImportStorageLink
 from io_storages.localfiles.models import LocalFilesImportStorageLink
 from io_storages.redis.models import RedisImportStorageLink
 from io_storages.s3.models import S3ImportStorageLink
 from rest_framework.exceptions import ValidationError
+from tasks.functions import fill_missing_data_fingerprints
 from tasks.models import Task
 
 logger = logging.getLogger(__name__)
@@ -188,7 +189,7 @@ def restore_storage_links_for_duplicated_tasks(duplicates) -> None:
 
 
 def find_duplicated_tasks_by_data(project, queryset):
-    """Find duplicated tasks by `task.data` and return them as a dict"""
+    """Find duplicated tasks by `task.data` fingerprints and return them as a dict"""
 
     # get io_storage_* links for tasks, we need to copy them
     storages = []
@@ -196,22 +197,33 @@ def find_duplicated_tasks_by_data(project, queryset):
         if field.startswith('io_storages_'):
             storages += [field]
 
-    groups = defaultdict(list)
-    tasks = list(queryset.values('data', 'id', 'total_annotations', 'cancelled_annotations', *storages))
-    logger.info(f'Retrieved {len(tasks)} tasks from queryset')
-
-    for task in list(tasks):
-        replace_task_data_undefined_with_config_field(task['data'], project)
-        task['data'] = json.dumps(task['data'])
-        groups[task['data']].append(task)
+    # tasks updated in bulk or created before fingerprints existed
+    fill_missing_data_fingerprints(queryset)
+
+    # group in the database, only duplicated tasks are retrieved
+    tasks = Task.objects.filter(id__in=queryset.order_by().values('id'))
+    fingerprints = (
+        tasks.order_by()
+        .values('data_fingerprint')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .values('data_fingerprint')
+    )
+    duplicates = defaultdict(list)
+    for task in (
+        tasks.filter(data_fingerprint__in=fingerprints)
+        .order_by('id')
+        .values('data_fingerprint', 'id', 'total_annotations', 'cancelled_annotations', *storages)
+        .iterator(chunk_size=settings.BATCH_SIZE)
+    ):
+        duplicates[task.pop('data_fingerprint')].append(task)
 
     # make groups of duplicated ids for info print
-    duplicates = {d: groups[d] for d in groups if len(groups[d]) > 1}
     info = {d: [task['id'] for task in duplicates[d]] for d in duplicates}
 
     logger.info(f'Found {len(duplicates)} duplicated tasks')
     logger.info(f'Duplicated tasks: {info}')
-    return duplicates
+    return dict(duplicates)
 
 
 actions: list[DataManagerAction] = [
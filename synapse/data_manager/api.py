@@ -6,7 +6,9 @@ from asgiref.sync import async_to_sync, sync_to_async
 from core.feature_flags import flag_set
 from core.permissions import ViewClassPermission, all_permissions
 from core.utils.common import int_from_request, load_func
+from core.utils.db import estimate_count
 from core.utils.params import bool_from_request
+from data_manager import totals as totals_cache
 from data_manager.actions import get_action_form, get_all_actions, perform_action
 from data_manager.functions import evaluate_predictions, get_prepare_params
 from data_manager.managers import get_fields_for_evaluation
@@ -23,7 +25,9 @@ from data_manager.serializers import (
     ViewSerializer,
 )
 from django.conf import settings
-from django.db.models import Sum
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db.models import F, Sum
+from django.db.models.expressions import OrderBy
 from django.db.models.functions import Coalesce
 from django.utils.decorators import method_decorator
 from django_filters.rest_framework import DjangoFilterBackend
@@ -296,9 +300,54 @@ class ViewAPI(viewsets.ModelViewSet):
         return qs
 
 
+class LookaheadPaginator(Paginator):
+    """
+    Paginator bounding pages by the tasks themselves instead of a total count.
+
+    A page reads one task more than the page size to know whether a next page
+    exists, so cached or estimated totals never shorten or hide pages.
+    """
+
+    def page(self, number):
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages["invalid_page"])
+        if number < 1:
+            raise EmptyPage(self.error_messages["min_page"])
+
+        bottom = (number - 1) * self.per_page
+        tasks = list(self.object_list[bottom : bottom + self.per_page + 1])
+        if not tasks and (number > 1 or not self.allow_empty_first_page):
+            raise EmptyPage(self.error_messages["no_results"])
+        # lower bound of the count, enough for Page.has_next()
+        self.__dict__["count"] = bottom + len(tasks)
+        return self._get_page(tasks[: self.per_page], number, self)
+
+
+def keyset_direction(queryset):
+    """Direction of the id ordering when tasks are ordered by id only, None otherwise"""
+    order_by = queryset.query.order_by
+    if len(order_by) != 1:
+        return None
+    order = order_by[0]
+    if isinstance(order, str):
+        return {"id": "asc", "pk": "asc", "-id": "desc", "-pk": "desc"}.get(order)
+    if (
+        isinstance(order, OrderBy)
+        and isinstance(order.expression, F)
+        and order.expression.name in ("id", "pk")
+    ):
+        return "desc" if order.descending else "asc"
+    return None
+
+
 class TaskPagination(PageNumberPagination):
     page_size = 100
     page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
     total_annotations = 0
     total_predictions = 0
     max_page_size = settings.TASK_API_PAGE_SIZE_MAX
@@ -320,26 +369,79 @@ class TaskPagination(PageNumberPagination):
             queryset, request, view
         )
 
-    def sync_paginate_queryset(self, queryset, request, view=None):
-        self.total_predictions = Prediction.objects.filter(task_id__in=queryset).count()
-        self.total_annotations = Annotation.objects.filter(
-            task_id__in=queryset, was_cancelled=False
-        ).count()
-        return super().paginate_queryset(queryset, request, view)
+    def count_totals(self, queryset):
+        if flag_set("fflag_fix_back_optic_1407_optimize_tasks_api_pagination_counts"):
+            totals = queryset.values("id").aggregate(
+                total_annotations=Coalesce(Sum("total_annotations"), 0),
+                total_predictions=Coalesce(Sum("total_predictions"), 0),
+            )
+        else:
+            totals = {
+                "total_predictions": Prediction.objects.filter(
+                    task_id__in=queryset
+                ).count(),
+                "total_annotations": Annotation.objects.filter(
+                    task_id__in=queryset, was_cancelled=False
+                ).count(),
+            }
+        totals["total"] = queryset.count()
+        totals["total_is_estimated"] = False
+        return totals
+
+    def estimate_totals(self, queryset):
+        """Planner estimates of the totals, exact counts below the threshold"""
+        tasks = queryset.order_by().values("id")
+        total = estimate_count(tasks)
+        if total is None or total < settings.DATA_MANAGER_ESTIMATED_TOTALS_THRESHOLD:
+            return self.count_totals(queryset)
+        annotations = Annotation.objects.filter(task_id__in=tasks, was_cancelled=False)
+        predictions = Prediction.objects.filter(task_id__in=tasks)
+        return {
+            "total": total,
+            "total_annotations": estimate_count(annotations) or 0,
+            "total_predictions": estimate_count(predictions) or 0,
+            "total_is_estimated": True,
+        }
 
-    def paginate_totals_queryset(self, queryset, request, view=None):
-        totals = queryset.values("id").aggregate(
-            total_annotations=Coalesce(Sum("total_annotations"), 0),
-            total_predictions=Coalesce(Sum("total_predictions"), 0),
-        )
-        self.total_annotations = totals["total_annotations"]
-        self.total_predictions = totals["total_predictions"]
-        return super().paginate_queryset(queryset, request, view)
+    def get_totals(self, queryset, request, view=None):
+        estimated = bool_from_request(request.GET, "estimate_totals", False)
+        count = self.estimate_totals if estimated else self.count_totals
+        project = getattr(view, "project", None)
+        if project is None:
+            return count(queryset)
+        mode = "estimated" if estimated else "exact"
+        return totals_cache.get_totals(project.id, queryset, count, mode=mode)
+
+    def paginate_keyset(self, queryset, request, direction):
+        """Page of tasks following the task id in the cursor, without OFFSET"""
+        page_size = self.get_page_size(request)
+        cursor = int_from_request(request.GET, self.cursor_query_param, 0)
+        lookup = "id__gt" if direction == "asc" else "id__lt"
+        page = list(queryset.filter(**{lookup: cursor})[: page_size + 1])
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_cursor = page[-1].id
+        self.request = request
+        return page
 
     def paginate_queryset(self, queryset, request, view=None):
-        if flag_set("fflag_fix_back_optic_1407_optimize_tasks_api_pagination_counts"):
-            return self.paginate_totals_queryset(queryset, request, view)
-        return self.sync_paginate_queryset(queryset, request, view)
+        self.totals = self.get_totals(queryset, request, view)
+        self.total_annotations = self.totals["total_annotations"]
+        self.total_predictions = self.totals["total_predictions"]
+        self.next_cursor = None
+
+        direction = keyset_direction(queryset)
+        if direction and self.get_page_size(request):
+            if request.GET.get(self.cursor_query_param):
+                return self.paginate_keyset(queryset, request, direction)
+
+        # the cached or estimated total is only reported, pages are bounded by the tasks
+        self.django_paginator_class = LookaheadPaginator
+        page = super().paginate_queryset(queryset, request, view)
+        # continue with cursors from any page when tasks are ordered by id
+        if direction and page and self.page.has_next():
+            self.next_cursor = page[-1].id
+        return page
 
     def get_paginated_response_schema(self, schema):
         return {
@@ -361,6 +463,17 @@ class TaskPagination(PageNumberPagination):
                     "description": "Total number of predictions",
                     "example": 78,
                 },
+                "total_is_estimated": {
+                    "type": "boolean",
+                    "description": "Totals are planner estimates",
+                    "example": False,
+                },
+                "next_cursor": {
+                    "type": "integer",
+                    "nullable": True,
+                    "description": "Cursor of the next page for tasks ordered by id",
+                    "example": 1234,
+                },
             },
             "required": ["tasks", "total", "total_annotations", "total_predictions"],
         }
@@ -370,7 +483,9 @@ class TaskPagination(PageNumberPagination):
             {
                 "total_annotations": self.total_annotations,
                 "total_predictions": self.total_predictions,
-                "total": self.page.paginator.count,
+                "total": self.totals["total"],
+                "total_is_estimated": self.totals["total_is_estimated"],
+                "next_cursor": self.next_cursor,
                 "tasks": data,
             }
         )
@@ -509,7 +624,8 @@ class TaskListAPI(generics.ListCreateAPIView):
         prepare_params = get_prepare_params(request, project)
         queryset = self.get_task_queryset(request, prepare_params)
 
-        # paginated tasks
+        # paginated tasks, totals are cached per project
+        self.project = project
         page = self.paginate_queryset(queryset)
 
         # get request params
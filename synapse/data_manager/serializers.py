@@ -487,7 +487,7 @@ class DataManagerTaskSerializer(TaskSerializer):
     class Meta:
         model = Task
         ref_name = "data_manager_task_serializer"
-        exclude = ("precomputed_agreement",)
+        exclude = ("precomputed_agreement", "data_fingerprint")
         expandable_fields = {"annotations": (AnnotationSerializer, {"many": True})}
 
     def to_representation(self, obj):
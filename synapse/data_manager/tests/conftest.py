@@ -0,0 +1,9 @@
+"""
+Expose the shared fixture implementations from ``synapse.tests`` so Data Manager tests
+can run in isolation (pytest only auto-loads fixtures that live in parent directories).
+"""
+
+from synapse.tests.conftest import business_client as _business_client  # noqa: F401
+
+# Re-export fixtures so pytest treats them as part of this subtree.
+business_client = _business_client
@@ -0,0 +1,87 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+from data_manager import totals
+from data_manager.api import LookaheadPaginator, keyset_direction
+from django.core.paginator import EmptyPage
+from django.db.models import F
+from fakeredis import FakeRedis
+from projects.tests.factories import ProjectFactory
+from tasks.models import Task
+from tasks.tests.factories import AnnotationFactory, TaskFactory
+from tests.conftest import project_choices
+from tests.utils import make_project
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def fake_redis():
+    redis = FakeRedis()
+    with patch.object(totals, 'get_connection', return_value=redis), patch.object(
+        totals, 'is_enabled', return_value=True
+    ):
+        yield redis
+
+
+def test_totals_are_cached_until_project_data_changes(fake_redis):
+    project = ProjectFactory()
+    task = TaskFactory(project=project)
+    queryset = Task.objects.filter(project=project)
+    count_totals = Mock(side_effect=lambda qs: {'total': qs.count()})
+
+    assert totals.get_totals(project.id, queryset, count_totals) == {'total': 1}
+    assert totals.get_totals(project.id, queryset, count_totals) == {'total': 1}
+    assert count_totals.call_count == 1
+
+    # other counting modes are cached separately
+    totals.get_totals(project.id, queryset, count_totals, mode='estimated')
+    assert count_totals.call_count == 2
+
+    # new tasks and annotations invalidate the totals of the project
+    TaskFactory(project=project)
+    assert totals.get_totals(project.id, queryset, count_totals) == {'total': 2}
+    AnnotationFactory(task=task, project=project)
+    totals.get_totals(project.id, queryset, count_totals)
+    assert count_totals.call_count == 4
+
+
+def test_keyset_direction():
+    tasks = Task.objects.all()
+    assert keyset_direction(tasks.order_by('id')) == 'asc'
+    assert keyset_direction(tasks.order_by(F('id').desc(nulls_last=True))) == 'desc'
+    assert keyset_direction(tasks.order_by('id', 'created_at')) is None
+    assert keyset_direction(tasks.order_by(F('created_at').asc())) is None
+
+
+def test_totals_change_after_import(fake_redis, business_client):
+    project = make_project(project_choices(), business_client.user, use_ml_backend=False)
+
+    def total():
+        response = business_client.get(f'/api/tasks?project={project.id}')
+        assert response.status_code == 200
+        return response.json()['total']
+
+    assert total() == 0
+    # tasks are bulk created without model signals, the import invalidates the totals itself
+    response = business_client.post(
+        f'/api/projects/{project.id}/import',
+        data=json.dumps([{'data': {'image': 'kittens.jpg'}}, {'data': {'image': 'puppies.jpg'}}]),
+        content_type='application/json',
+    )
+    assert response.status_code == 201
+    assert total() == 2
+
+
+def test_pages_are_bounded_by_tasks_not_totals():
+    project = ProjectFactory()
+    tasks = [TaskFactory(project=project) for _ in range(3)]
+    paginator = LookaheadPaginator(Task.objects.filter(project=project).order_by('id'), 2)
+
+    page = paginator.page(1)
+    assert list(page) == tasks[:2] and page.has_next()
+    page = paginator.page(2)
+    assert list(page) == tasks[2:] and not page.has_next()
+    with pytest.raises(EmptyPage):
+        paginator.page(3)
@@ -0,0 +1,92 @@
+"""
+Cached totals of Data Manager task lists.
+
+Every page of the task list reports the number of filtered tasks, their
+annotations and predictions. These counts cost more than the page itself on
+large projects with complex filters and don't change while the user scrolls,
+so they are cached in Redis by (project, data version, filtered query).
+
+The data version of a project is a Redis counter bumped when its tasks,
+annotations or predictions change (see projects/signals.py), which makes all
+cached totals of the project stale at once. Bulk imports and storage syncs
+create rows without model signals and bump the version explicitly.
+DATA_MANAGER_TOTALS_CACHE_TTL bounds the staleness for other bulk updates.
+
+Without Redis totals are counted on every request.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Callable, Dict
+
+from core.redis import redis_connected
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db.models import QuerySet
+from django_rq import get_connection
+
+logger = logging.getLogger(__name__)
+
+# Redis keys
+KEY_PREFIX = getattr(settings, "DATA_MANAGER_TOTALS_KEY_PREFIX", "dm_totals")
+
+
+def is_enabled() -> bool:
+    return settings.DATA_MANAGER_TOTALS_CACHE_TTL > 0 and redis_connected()
+
+
+def _version_key(project_id: int) -> str:
+    return f"{KEY_PREFIX}:version:{project_id}"
+
+
+def bump_data_version(project_id: int) -> None:
+    """Invalidate all cached totals of a project, called when its tasks change"""
+    if not is_enabled():
+        return
+    try:
+        get_connection().incr(_version_key(project_id))
+    except Exception as exc:
+        logger.warning(f"Failed to invalidate totals of project {project_id}: {exc}")
+
+
+def get_totals(
+    project_id: int,
+    queryset: QuerySet,
+    count_totals: Callable[[QuerySet], Dict],
+    mode: str = "exact",
+) -> Dict:
+    """
+    Totals of a filtered task queryset, counted once per data version.
+
+    Args:
+        project_id: Project of the tasks
+        queryset: Filtered tasks
+        count_totals: Counts the totals of `queryset`, returns a JSON serializable dict
+        mode: Counting mode, part of the cache key
+
+    Returns:
+        dict returned by count_totals
+    """
+    if not is_enabled():
+        return count_totals(queryset)
+
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+    except EmptyResultSet:
+        return count_totals(queryset)
+
+    redis_client = get_connection()
+    version = int(redis_client.get(_version_key(project_id)) or 0)
+    digest = hashlib.sha1(repr((sql, params, mode)).encode()).hexdigest()
+    key = f"{KEY_PREFIX}:{project_id}:{version}:{digest}"
+
+    cached = redis_client.get(key)
+    if cached is not None:
+        return json.loads(cached)
+
+    totals = count_totals(queryset)
+    redis_client.set(
+        key, json.dumps(totals), ex=settings.DATA_MANAGER_TOTALS_CACHE_TTL
+    )
+    return totals
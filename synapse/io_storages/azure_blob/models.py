@@ -24,7 +24,9 @@ from io_storages.base_models import (
     ImportStorageLink,
     ProjectStorageMixin,
 )
+from io_storages.export_outbox import enqueue_annotation_export
 from io_storages.utils import (
+    ChunkedStream,
     StorageObject,
     load_tasks_json,
     storage_can_resolve_bucket_url,
@@ -264,6 +266,10 @@ class AzureBlobImportStorageBase(AzureBlobStorageMixin, ImportStorage):
         blob = blob.content_as_bytes()
         return load_tasks_json(blob, key)
 
+    def get_data_stream(self, key):
+        downloader = self.get_container().download_blob(key)
+        return ChunkedStream(downloader.chunks())
+
     def scan_and_create_links(self):
         return self._scan_and_create_links(AzureBlobImportStorageLink)
 
@@ -296,6 +302,9 @@ class AzureBlobImportStorageBase(AzureBlobStorageMixin, ImportStorage):
     def can_resolve_url(self, url: Union[str, None]) -> bool:
         return storage_can_resolve_bucket_url(self, url)
 
+    def get_url_index_key(self):
+        return self.url_scheme, self.container
+
     def get_blob_metadata(self, key):
         return AZURE.get_blob_metadata(
             key,
@@ -316,22 +325,16 @@ class AzureBlobImportStorage(ProjectStorageMixin, AzureBlobImportStorageBase):
 class AzureBlobExportStorage(
     AzureBlobStorageMixin, ExportStorage
 ):  # note: order is important!
-    def save_annotation(self, annotation):
-        container = self.get_container()
-        logger.debug(
-            f"Creating new object on {self.__class__.__name__} Storage {self} for annotation {annotation}"
-        )
-        ser_annotation = self._get_serialized_data(annotation)
-        # get key that identifies this object in storage
-        key = AzureBlobExportStorageLink.get_key(annotation)
-        key = str(self.prefix) + "/" + key if self.prefix else key
+    def get_export_key(self, key):
+        return str(self.prefix) + "/" + key if self.prefix else key
 
-        # put object into storage
-        blob = container.get_blob_client(key)
-        blob.upload_blob(json.dumps(ser_annotation), overwrite=True)
+    def put_objects(self, objects):
+        container = self.get_container()
+        for key, data in objects:
+            container.get_blob_client(key).upload_blob(json.dumps(data), overwrite=True)
 
-        # create link if everything ok
-        AzureBlobExportStorageLink.create(annotation, self)
+    def put_object(self, key, data):
+        self.put_objects([(key, data)])
 
 
 def async_export_annotation_to_azure_storages(annotation):
@@ -346,7 +349,8 @@ def async_export_annotation_to_azure_storages(annotation):
 def export_annotation_to_azure_storages(sender, instance, **kwargs):
     storages = getattr(instance.project, "io_storages_azureblobexportstorages", None)
     if storages and storages.exists():  # avoid excess jobs in rq
-        start_job_async_or_sync(async_export_annotation_to_azure_storages, instance)
+        if not enqueue_annotation_export(storages.all(), instance):
+            start_job_async_or_sync(async_export_annotation_to_azure_storages, instance)
 
 
 class AzureBlobImportStorageLink(ImportStorageLink):
@@ -8,10 +8,12 @@ import logging
 import os
 import sys
 import traceback as tb
+from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 from dataclasses import asdict
 from datetime import datetime
-from typing import Any, Iterator, Union
+from typing import Any, BinaryIO, Iterator, Union
 from urllib.parse import urljoin
 
 import django_rq
@@ -22,17 +24,23 @@ from core.redis import is_job_in_queue, is_job_on_worker, redis_connected, start
 from core.utils.common import load_func
 from core.utils.iterators import iterate_queryset
 from data_export.serializers import ExportDataSerializer
+from data_manager import totals
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.db import models, transaction
-from django.db.models import JSONField
+from django.db.models import JSONField, Prefetch
 from django.shortcuts import reverse
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from io_storages.utils import StorageObject, get_uri_via_regex, parse_bucket_uri
+from io_storages.prefetch import PrefetchingReader
+from io_storages.presign_cache import get_presigned_url
+from io_storages.presign_cache import invalidate as invalidate_presigned_urls
+from io_storages.sync_state import BloomFilter, SyncCursor
+from io_storages.utils import StorageObject, get_uri_via_regex, load_tasks_json_stream, parse_bucket_uri
+from projects.models import ProjectPayloadStats
 from rest_framework.exceptions import ValidationError
 from rq.job import Job
-from tasks.models import Annotation, Task
+from tasks.models import Annotation, Prediction, Task
 from tasks.serializers import AnnotationSerializer, PredictionSerializer
 from webhooks.models import WebhookAction
 from webhooks.utils import emit_webhooks_for_instance
@@ -309,6 +317,25 @@ class Storage(StorageInfo):
 
 
 class ImportStorage(Storage):
+    sync_state = JSONField(
+        'sync_state',
+        null=True,
+        default=None,
+        blank=True,
+        help_text='Incremental sync cursor: last-modified high-water mark and filter of linked keys',
+    )
+    skip_duplicates = models.BooleanField(
+        _('skip_duplicates'),
+        default=False,
+        help_text='Skip objects whose task data is already in the project',
+    )
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # status updates save only their own fields, edits of credentials or presign_ttl save everything
+        if kwargs.get('update_fields') is None:
+            invalidate_presigned_urls(self)
+
     def iter_objects(self) -> Iterator[Any]:
         """
         Returns:
@@ -323,6 +350,15 @@ class ImportStorage(Storage):
         """
         raise NotImplementedError
 
+    def iter_keys_with_last_modified(self) -> Iterator[tuple[str, Union[datetime, None]]]:
+        """
+        Returns:
+            Iterator[tuple]: (key, last modified time or None) for each object, used by incremental sync.
+        """
+        for obj in self.iter_objects():
+            metadata = self.get_unified_metadata(obj)
+            yield metadata['key'], metadata['last_modified'] or None
+
     def get_unified_metadata(self, obj: Any) -> dict:
         """
         Args:
@@ -336,6 +372,34 @@ class ImportStorage(Storage):
     def get_data(self, key) -> list[StorageObject]:
         raise NotImplementedError
 
+    def get_data_stream(self, key) -> Union[BinaryIO, None]:
+        """
+        Returns:
+            Binary stream with the object content, or None if the storage reads objects with get_data only
+        """
+        return None
+
+    def read_data(self, key) -> list[StorageObject]:
+        """
+        Fetch and parse a task file, streaming its content into the parser when the storage supports it.
+
+        Called from prefetch threads, so it must not touch the database.
+        """
+        try:
+            if not getattr(self, 'use_blob_urls', False) and not key.lower().endswith('.parquet'):
+                stream = self.get_data_stream(key)
+                if stream is not None:
+                    with closing(stream):
+                        return load_tasks_json_stream(stream, key)
+            return list(self.get_data(key))
+        except (UnicodeDecodeError, json.decoder.JSONDecodeError) as exc:
+            logger.debug(exc, exc_info=True)
+            raise ValueError(
+                f'Error loading JSON from file "{key}".\nIf you\'re trying to import non-JSON data '
+                f'(images, audio, text, etc.), edit storage settings and enable '
+                f'"Tasks" import method'
+            )
+
     def generate_http_url(self, url):
         raise NotImplementedError
 
@@ -353,6 +417,14 @@ class ImportStorage(Storage):
     def can_resolve_url(self, url: Union[str, None]) -> bool:
         return self.can_resolve_scheme(url)
 
+    def get_url_index_key(self) -> Union[tuple[str, str], None]:
+        """
+        Returns:
+            (URL scheme, bucket) of the URLs this storage resolves, used by StorageURLIndex;
+            None if can_resolve_url matches URLs in another way.
+        """
+        return None
+
     def can_resolve_scheme(self, url: Union[str, None]) -> bool:
         if not url:
             return False
@@ -425,7 +497,7 @@ class ImportStorage(Storage):
                         # this branch is our old approach:
                         # it generates presigned URLs if storage.presign=True;
                         # or it inserts base64 media into task data if storage.presign=False
-                        http_url = self.generate_http_url(extracted_uri)
+                        http_url, _ = get_presigned_url(self, extracted_uri)
 
                 return uri.replace(extracted_uri, http_url)
             except Exception:
@@ -443,8 +515,14 @@ class ImportStorage(Storage):
 
         raise NotImplementedError
 
-    @classmethod
-    def add_task(cls, project, maximum_annotations, max_inner_id, storage, link_object: StorageObject, link_class):
+    @staticmethod
+    def _prepare_task_data(link_object: StorageObject):
+        """
+        Split a storage object into link fields, task data, predictions and annotations
+
+        Returns:
+            Tuple (link_kwargs, data, predictions, annotations, cancelled_annotations, allow_skip)
+        """
         link_kwargs = asdict(link_object)
         data = link_kwargs.pop('task_data', None)
 
@@ -474,6 +552,14 @@ class ImportStorage(Storage):
             else:
                 data.pop('data')
 
+        return link_kwargs, data, predictions, annotations, cancelled_annotations, allow_skip
+
+    @classmethod
+    def add_task(cls, project, maximum_annotations, max_inner_id, storage, link_object: StorageObject, link_class):
+        link_kwargs, data, predictions, annotations, cancelled_annotations, allow_skip = cls._prepare_task_data(
+            link_object
+        )
+
         with transaction.atomic():
             # Create task without skip_fsm (it's not a model field)
             task = Task(
@@ -530,6 +616,158 @@ class ImportStorage(Storage):
         return task
         # FIXME: add_annotation_history / post_process_annotations should be here
 
+    @classmethod
+    def add_tasks(cls, project, maximum_annotations, max_inner_id, storage, link_objects, link_class, skipped=None):
+        """
+        Bulk version of add_task for a batch of storage objects.
+
+        Tasks, links and predictions are written with bulk_create; tasks get
+        inner_ids max_inner_id, max_inner_id + 1, ... in batch order.
+        Predictions and annotations are validated once for the whole batch.
+        A task whose predictions or annotations are rejected is not created,
+        the same outcome as the rolled back add_task transaction.
+
+        Args:
+            skipped: Optional list, link objects dropped as duplicates are appended to it
+
+        Returns:
+            Tuple (created tasks, list of validation error messages)
+        """
+        prepared = [cls._prepare_task_data(link_object) for link_object in link_objects]
+        if storage.skip_duplicates:
+            # duplicates get no link, the sync records their keys in its cursor (see _scan_and_create_links)
+            kept = Task.exclude_duplicates(project.id, list(zip(link_objects, prepared)), lambda item: item[1][1])
+            if skipped is not None:
+                kept_ids = {id(link_object) for link_object, _ in kept}
+                skipped.extend(link_object for link_object in link_objects if id(link_object) not in kept_ids)
+            link_objects = [link_object for link_object, _ in kept]
+            prepared = [item for _, item in kept]
+        if not prepared:
+            return [], []
+
+        raise_exception = not flag_set(
+            'ff_fix_back_dev_3342_storage_scan_with_invalid_annotations', user=AnonymousUser()
+        )
+        raise_prediction_exception = (
+            flag_set('fflag_feat_utc_210_prediction_validation_15082025', user=project.organization.created_by)
+            or raise_exception
+        )
+        # Task.save() enforces the consensus overlap, bulk_create has to do the same
+        overlap = max(3, getattr(project, 'required_overlap', 3))
+
+        with transaction.atomic():
+            tasks = Task.objects.bulk_create(
+                [
+                    Task(
+                        data=data,
+                        data_fingerprint=Task.get_data_fingerprint(data),
+                        project=project,
+                        overlap=overlap,
+                        target_assignment_count=overlap,
+                        is_labeled=len(annotations) >= maximum_annotations,
+                        total_predictions=len(predictions),
+                        total_annotations=len(annotations) - cancelled_annotations,
+                        cancelled_annotations=cancelled_annotations,
+                        inner_id=max_inner_id + i,
+                        allow_skip=(allow_skip if allow_skip is not None else True),
+                    )
+                    for i, (_, data, predictions, annotations, cancelled_annotations, allow_skip) in enumerate(prepared)
+                ],
+                batch_size=settings.BATCH_SIZE,
+            )
+
+            # validate predictions and annotations of the whole batch at once
+            prediction_owners, prediction_items = [], []
+            annotation_owners, annotation_items = [], []
+            for i, (task, (_, _, predictions, annotations, _, _)) in enumerate(zip(tasks, prepared)):
+                for prediction in predictions:
+                    prediction['task'] = task.id
+                    prediction['project'] = project.id
+                    prediction_owners.append(i)
+                    prediction_items.append(prediction)
+                for annotation in annotations:
+                    annotation['task'] = task.id
+                    annotation['project'] = project.id
+                    annotation_owners.append(i)
+                    annotation_items.append(annotation)
+
+            rejected = {}
+            validated_predictions, prediction_errors = cls._validate_batch(
+                PredictionSerializer(), prediction_items, prediction_owners
+            )
+            annotation_serializer = AnnotationSerializer()
+            validated_annotations, annotation_errors = cls._validate_batch(
+                annotation_serializer, annotation_items, annotation_owners
+            )
+            for i, errors in prediction_errors.items():
+                if raise_prediction_exception:
+                    rejected[i] = errors
+            for i, errors in annotation_errors.items():
+                logger.error(f'Invalid annotations for task {tasks[i].id}: {errors}')
+                if raise_exception:
+                    rejected.setdefault(i, errors)
+
+            validation_errors = [
+                f'Validation error for task from {link_objects[i].key}: {errors}' for i, errors in rejected.items()
+            ]
+            if rejected:
+                Task.delete_tasks_without_signals(Task.objects.filter(id__in=[tasks[i].id for i in rejected]))
+                tasks = [task for i, task in enumerate(tasks) if i not in rejected]
+                # keep inner_ids contiguous, as if the rejected tasks were never created
+                for i, task in enumerate(tasks):
+                    task.inner_id = max_inner_id + i
+                Task.objects.bulk_update(tasks, ['inner_id'], batch_size=settings.BATCH_SIZE)
+
+            kept = [i for i in range(len(prepared)) if i not in rejected]
+            link_class.objects.bulk_create(
+                [
+                    link_class(task=task, storage=storage, object_exists=True, **prepared[i][0])
+                    for i, task in zip(kept, tasks)
+                ],
+                batch_size=settings.BATCH_SIZE,
+            )
+            logger.debug(f'Create {len(tasks)} {storage.__class__.__name__} links')
+            ProjectPayloadStats.record(project.id, task_data=[task.data for task in tasks])
+
+            # predictions: bulk insert, normalized the same way as Prediction.save()
+            db_predictions = []
+            for owner, validated in zip(prediction_owners, validated_predictions):
+                if owner in rejected or owner in prediction_errors:
+                    continue
+                validated['result'] = Prediction.prepare_prediction_result(validated.get('result'), project)
+                db_predictions.append(Prediction(**validated))
+            Prediction.objects.bulk_create(db_predictions, batch_size=settings.BATCH_SIZE)
+
+            # annotations: saved one by one, their signals update task and project counters
+            for owner, validated in zip(annotation_owners, validated_annotations):
+                if owner in rejected or owner in annotation_errors:
+                    continue
+                annotation_serializer.create(validated)
+
+            if tasks and hasattr(project, 'summary'):
+                project.summary.update_data_columns(tasks)
+
+        # tasks and predictions are bulk created without model signals
+        totals.bump_data_version(project.id)
+        return tasks, validation_errors
+
+    @staticmethod
+    def _validate_batch(serializer, items, owners):
+        """
+        Validate items one by one with the same serializer.
+
+        Returns:
+            Tuple (validated data per item, None if invalid; {owner index: [errors]})
+        """
+        validated, errors = [], {}
+        for owner, item in zip(owners, items):
+            try:
+                validated.append(serializer.run_validation(item))
+            except ValidationError as e:
+                validated.append(None)
+                errors.setdefault(owner, []).append(e.detail)
+        return validated, errors
+
     def _scan_and_create_links(self, link_class):
         """
         TODO: deprecate this function and transform it to "pipeline" version  _scan_and_create_links_v2,
@@ -552,99 +790,164 @@ class ImportStorage(Storage):
             'fflag_root_212_reduce_importstoragelink_counts', organization=self.project.organization
         )
 
-        tasks_for_webhook = []
-        for keys_batch in _batched(
-            self.iter_keys(), settings.STORAGE_EXISTED_COUNT_BATCH_SIZE if existed_count_flag_set else 1
-        ):
-            deduplicated_keys = list(dict.fromkeys(keys_batch))  # preserve order
-            for key in deduplicated_keys:
-                logger.debug(f'Scanning key {key}')
-
-            # w/o Dataflow
-            # pubsub.push(topic, key)
-            # -> GF.pull(topic, key) + env -> add_task()
-
-            # skip if key has already been synced
-            existing_keys = link_class.exists(deduplicated_keys, self)
-            tasks_existed += link_class.objects.filter(key__in=existing_keys, storage=self.id).count()
-            self.info_update_progress(last_sync_count=tasks_created, tasks_existed=tasks_existed)
+        # incremental sync: skip keys already linked by previous syncs, a full reconcile rebuilds the cursor
+        cursor = incremental = None
+        if settings.STORAGE_INCREMENTAL_SYNC:
+            cursor = SyncCursor.load(self.sync_state)
+            incremental = cursor is not None
+            if not incremental:
+                # the previous listing is the best guess of the storage size, the link count of a new storage is 0
+                previous_listed_count = (self.sync_state or {}).get('listed_count', 0)
+                cursor = SyncCursor.create(
+                    max(link_class.objects.filter(storage=self.id).count(), previous_listed_count)
+                )
+                cursor.last_full_sync = timezone.now()
+                listed_keys = BloomFilter.for_capacity(cursor.linked.capacity, settings.STORAGE_SYNC_BLOOM_ERROR_RATE)
+            logger.info(f'{self}: {"incremental" if incremental else "full"} sync')
 
-            for key in deduplicated_keys:
-                if key in existing_keys:
-                    logger.debug(f'{self.__class__.__name__} already has tasks linked to {key=}')
-                    continue
+        tasks_for_webhook = []
+        pending_links = []
+        # keys whose objects were all skipped as duplicates have no link, the cursor has to remember them
+        duplicate_keys = set()
+        import_batch_size = settings.STORAGE_IMPORT_BATCH_SIZE
+
+        def flush_links():
+            """Create tasks for the accumulated link objects in one bulk write"""
+            nonlocal max_inner_id, tasks_created, tasks_for_webhook
+            if not pending_links:
+                return
 
-                logger.debug(f'{self}: found new key {key}')
+            skipped = []
+            tasks, errors = self.add_tasks(
+                self.project,
+                maximum_annotations,
+                max_inner_id,
+                self,
+                pending_links,
+                link_class=link_class,
+                skipped=skipped,
+            )
+            pending_links.clear()
+            if cursor is not None:
+                duplicate_keys.update(link_object.key for link_object in skipped)
+            for error_message in errors:
+                # Log validation errors but continue processing other tasks
+                logger.error(error_message)
+            validation_errors.extend(errors)
+
+            max_inner_id += len(tasks)
+            tasks_created += len(tasks)
+            tasks_for_webhook.extend(task.id for task in tasks)
+            if incremental and tasks:
+                cursor.linked.update(
+                    link_class.objects.filter(task_id__in=[task.id for task in tasks])
+                    .values_list('key', flat=True)
+                    .distinct()
+                )
 
-                # Check if file should be processed as JSON based on extension
-                # Skip non-JSON files if use_blob_urls is False
-                if check_file_extension and not self.use_blob_urls:
-                    _, ext = os.path.splitext(key.lower())
-                    # Only process files with JSON/JSONL/PARQUET extensions
-                    json_extensions = {'.json', '.jsonl', '.parquet'}
+            # settings.WEBHOOK_BATCH_SIZE
+            # `WEBHOOK_BATCH_SIZE` sets the maximum number of tasks sent in a single webhook call, ensuring manageable payload sizes.
+            # When `tasks_for_webhook` accumulates tasks equal to/exceeding `WEBHOOK_BATCH_SIZE`, they're sent in a webhook via
+            # `emit_webhooks_for_instance`, and `tasks_for_webhook` is cleared for new tasks.
+            # If tasks remain in `tasks_for_webhook` at process end (less than `WEBHOOK_BATCH_SIZE`), they're sent in a final webhook
+            # call to ensure all tasks are processed and no task is left unreported in the webhook.
+            while len(tasks_for_webhook) >= settings.WEBHOOK_BATCH_SIZE:
+                emit_webhooks_for_instance(
+                    self.project.organization,
+                    self.project,
+                    WebhookAction.TASKS_CREATED,
+                    tasks_for_webhook[: settings.WEBHOOK_BATCH_SIZE],
+                )
+                tasks_for_webhook = tasks_for_webhook[settings.WEBHOOK_BATCH_SIZE :]
 
-                    if ext and ext not in json_extensions:
-                        raise UnsupportedFileFormatError(
-                            f'File "{key}" is not a JSON/JSONL/Parquet file. Only .json, .jsonl, and .parquet files can be processed.\n'
-                            f"If you're trying to import non-JSON data (images, audio, text, etc.), "
-                            f'edit storage settings and enable "Tasks" import method'
-                        )
+            self.info_update_progress(last_sync_count=tasks_created, tasks_existed=tasks_existed)
 
-                try:
-                    link_objects = self.get_data(key)
-                except (UnicodeDecodeError, json.decoder.JSONDecodeError) as exc:
-                    logger.debug(exc, exc_info=True)
-                    raise ValueError(
-                        f'Error loading JSON from file "{key}".\nIf you\'re trying to import non-JSON data '
-                        f'(images, audio, text, etc.), edit storage settings and enable '
-                        f'"Tasks" import method'
-                    )
+        def iter_listed_keys():
+            """All storage keys, or only the ones that can be new when the sync is incremental"""
+            if cursor is None:
+                yield from self.iter_keys()
+                return
 
-                for link_object in link_objects:
-                    # TODO: batch this loop body with add_task -> add_tasks in a single bulk write.
-                    # See DIA-2062 for prerequisites
-                    try:
-                        task = self.add_task(
-                            self.project,
-                            maximum_annotations,
-                            max_inner_id,
-                            self,
-                            link_object,
-                            link_class=link_class,
-                        )
-                        max_inner_id += 1
-
-                        # update progress counters for storage info
-                        tasks_created += 1
-
-                        # add task to webhook list
-                        tasks_for_webhook.append(task.id)
-                    except ValidationError as e:
-                        # Log validation errors but continue processing other tasks
-                        error_message = f'Validation error for task from {link_object.key}: {e}'
-                        logger.error(error_message)
-                        validation_errors.append(error_message)
+            for key, last_modified in self.iter_keys_with_last_modified():
+                cursor.observe(last_modified)
+                if incremental:
+                    if not cursor.is_candidate(key, last_modified):
                         continue
+                else:
+                    listed_keys.add(key)
+                    cursor.listed_count += 1
+                yield key
+
+        def iter_new_keys():
+            """Keys not linked to tasks yet, checked against the database in batches"""
+            nonlocal tasks_existed
+            for keys_batch in _batched(
+                iter_listed_keys(), settings.STORAGE_EXISTED_COUNT_BATCH_SIZE if existed_count_flag_set else 1
+            ):
+                deduplicated_keys = list(dict.fromkeys(keys_batch))  # preserve order
+                for key in deduplicated_keys:
+                    logger.debug(f'Scanning key {key}')
 
-                    # settings.WEBHOOK_BATCH_SIZE
-                    # `WEBHOOK_BATCH_SIZE` sets the maximum number of tasks sent in a single webhook call, ensuring manageable payload sizes.
-                    # When `tasks_for_webhook` accumulates tasks equal to/exceeding `WEBHOOK_BATCH_SIZE`, they're sent in a webhook via
-                    # `emit_webhooks_for_instance`, and `tasks_for_webhook` is cleared for new tasks.
-                    # If tasks remain in `tasks_for_webhook` at process end (less than `WEBHOOK_BATCH_SIZE`), they're sent in a final webhook
-                    # call to ensure all tasks are processed and no task is left unreported in the webhook.
-                    if len(tasks_for_webhook) >= settings.WEBHOOK_BATCH_SIZE:
-                        emit_webhooks_for_instance(
-                            self.project.organization, self.project, WebhookAction.TASKS_CREATED, tasks_for_webhook
-                        )
-                        tasks_for_webhook = []
+                # w/o Dataflow
+                # pubsub.push(topic, key)
+                # -> GF.pull(topic, key) + env -> add_task()
 
+                # skip if key has already been synced
+                existing_keys = link_class.exists(deduplicated_keys, self)
+                tasks_existed += link_class.objects.filter(key__in=existing_keys, storage=self.id).count()
                 self.info_update_progress(last_sync_count=tasks_created, tasks_existed=tasks_existed)
+                if incremental:
+                    cursor.linked.update(key for key in deduplicated_keys if key in existing_keys)
+
+                for key in deduplicated_keys:
+                    if key in existing_keys:
+                        logger.debug(f'{self.__class__.__name__} already has tasks linked to {key=}')
+                        continue
+
+                    logger.debug(f'{self}: found new key {key}')
+
+                    # Check if file should be processed as JSON based on extension
+                    # Skip non-JSON files if use_blob_urls is False
+                    if check_file_extension and not self.use_blob_urls:
+                        _, ext = os.path.splitext(key.lower())
+                        # Only process files with JSON/JSONL/PARQUET extensions
+                        json_extensions = {'.json', '.jsonl', '.parquet'}
+
+                        if ext and ext not in json_extensions:
+                            raise UnsupportedFileFormatError(
+                                f'File "{key}" is not a JSON/JSONL/Parquet file. Only .json, .jsonl, and .parquet files can be processed.\n'
+                                f"If you're trying to import non-JSON data (images, audio, text, etc.), "
+                                f'edit storage settings and enable "Tasks" import method'
+                            )
+
+                    yield key
+
+        # objects of the next keys are fetched and parsed in background threads while tasks are written
+        for key, link_objects in PrefetchingReader(self).iter_data(iter_new_keys()):
+            pending_links.extend(link_objects)
+            if len(pending_links) >= import_batch_size:
+                flush_links()
+
+        flush_links()
 
         if tasks_for_webhook:
             emit_webhooks_for_instance(
                 self.project.organization, self.project, WebhookAction.TASKS_CREATED, tasks_for_webhook
             )
 
+        if cursor is not None:
+            if incremental:
+                # keys skipped by the cursor were not counted batch by batch
+                tasks_existed = link_class.objects.filter(storage=self.id).count() - tasks_created
+            else:
+                # linked keys are collected by the reconcile into a filter sized from the listing
+                cursor.linked = SyncCursor.new_filter(cursor.listed_count)
+                self._reconcile_object_exists(link_class, listed_keys, cursor.linked)
+            # duplicates are not fetched again until they are modified, a full sync checks them anyway
+            cursor.linked.update(duplicate_keys)
+            self.sync_state = cursor.to_state()
+            self.save(update_fields=['sync_state'])
+
         # Create initial FSM states for all tasks created during storage sync
         # CurrentContext is now available because we use start_job_async_or_sync
         from fsm.functions import backfill_fsm_states_for_tasks
@@ -654,6 +957,16 @@ class ImportStorage(Storage):
         self.project.update_tasks_states(
             maximum_annotations_changed=False, overlap_cohort_percentage_changed=False, tasks_number_changed=True
         )
+
+        # tasks are bulk created without post_save, so auto_assign_on_task_created didn't run for them
+        if tasks_created:
+            try:
+                from annotators.signals import auto_assign_on_tasks_imported
+
+                auto_assign_on_tasks_imported(self.project.id)
+            except Exception as e:
+                logger.warning(f'Auto-assignment after storage sync failed: {e}')
+
         if validation_errors:
             # sync is finished, set completed with errors status for storage info
             self.info_set_completed_with_errors(
@@ -663,11 +976,36 @@ class ImportStorage(Storage):
             # sync is finished, set completed status for storage info
             self.info_set_completed(last_sync_count=tasks_created, tasks_existed=tasks_existed)
 
+    def _reconcile_object_exists(self, link_class, listed_keys: BloomFilter, linked: BloomFilter):
+        """Update object_exists of all links after a full listing of the storage, add listed linked keys to `linked`"""
+        changed = {True: [], False: []}
+        links = link_class.objects.filter(storage=self.id).values_list('id', 'key', 'object_exists')
+        for link_id, key, object_exists in links.iterator(chunk_size=settings.BATCH_SIZE):
+            # the filter has no false negatives: a key missing from it was not listed
+            exists = key in listed_keys
+            if exists:
+                linked.add(key)
+            if exists != object_exists:
+                changed[exists].append(link_id)
+
+        for object_exists, link_ids in changed.items():
+            for i in range(0, len(link_ids), settings.BATCH_SIZE):
+                link_class.objects.filter(id__in=link_ids[i : i + settings.BATCH_SIZE]).update(
+                    object_exists=object_exists
+                )
+        if changed[False]:
+            logger.info(f'{self}: {len(changed[False])} linked objects no longer exist in the storage')
+
     def scan_and_create_links(self):
         """This is proto method - you can override it, or just replace ImportStorageLink by your own model"""
         self._scan_and_create_links(ImportStorageLink)
 
-    def sync(self):
+    def sync(self, full_reconcile=False):
+        if full_reconcile and self.sync_state:
+            # the next scan finds no cursor and lists everything
+            self.sync_state = None
+            self.save(update_fields=['sync_state'])
+
         if redis_connected():
             queue_name = 'low'
             queue = django_rq.get_queue(queue_name)
@@ -789,15 +1127,17 @@ class ExportStorage(Storage, ProjectStorageMixin):
     # TODO from testing, more than 8 seems to cause problems. revisit to add more parallelism.
     max_workers = min(8, (os.cpu_count() or 2) * 4)
 
-    def _get_serialized_data(self, annotation):
+    def _is_task_format(self):
+        """Whether annotations are exported as whole tasks with all their annotations"""
         user = self.project.organization.created_by
         flag = flag_set(
             'fflag_feat_optic_650_target_storage_task_format_long', user=user, override_system_default=False
         )
-        if settings.FUTURE_SAVE_TASK_TO_STORAGE or flag:
+        return settings.FUTURE_SAVE_TASK_TO_STORAGE or flag
+
+    def _get_serialized_data(self, annotation):
+        if self._is_task_format():
             # export task with annotations
-            # TODO: we have to rewrite save_all_annotations, because this func will be called for each annotation
-            # TODO: instead of each task, however, we have to call it only once per task
             expand = ['annotations.reviews', 'annotations.completed_by']
             context = {'project': self.project}
             return ExportDataSerializer(annotation.task, context=context, expand=expand).data
@@ -806,39 +1146,163 @@ class ExportStorage(Storage, ProjectStorageMixin):
             # deprecated functionality - save only annotation
             return serializer_class(annotation, context={'project': self.project}).data
 
-    def save_annotation(self, annotation):
+    def get_export_key(self, key: str) -> str:
+        """Full object key in the storage for an ExportStorageLink key"""
+        return key
+
+    def put_object(self, key: str, data: dict):
+        """Write one serialized task or annotation to the storage"""
         raise NotImplementedError
 
-    def save_annotations(self, annotations: models.QuerySet[Annotation]):
+    def put_objects(self, objects: list[tuple[str, dict]]):
+        """Write (key, data) pairs, storages with a batch API override this"""
+        for key, data in objects:
+            self.put_object(key, data)
+
+    def save_annotation(self, annotation):
+        logger.debug(f'Creating new object on {self.__class__.__name__} Storage {self} for annotation {annotation}')
+        ser_annotation = self._get_serialized_data(annotation)
+
+        # get key that identifies this object in storage
+        link_model = self.links.model
+        key = self.get_export_key(link_model.get_key(annotation))
+
+        # put object into storage
+        self.put_object(key, ser_annotation)
+
+        # create link if everything ok
+        link_model.create(annotation, self)
+
+    def _get_export_tasks(self, task_ids):
+        """Tasks with everything ExportDataSerializer reads prefetched"""
+        annotations = Annotation.objects.select_related('completed_by')
+        # prefetch reviews in LSE
+        if hasattr(Annotation, 'reviews'):
+            from reviews.models import AnnotationReview
+
+            annotations = annotations.prefetch_related(
+                Prefetch('reviews', queryset=AnnotationReview.objects.select_related('created_by'))
+            )
+        return (
+            Task.objects.filter(id__in=task_ids)
+            .select_related('file_upload')
+            .prefetch_related(Prefetch('annotations', queryset=annotations), 'predictions', 'drafts')
+        )
+
+    def _iter_export_batches(self, annotations: models.QuerySet[Annotation], batch_size: int):
+        """
+        Serialize annotations batch by batch.
+
+        Yields:
+            list of (object key, serialized data, ids of the exported annotations stored in that object)
+        """
+        if self._is_task_format():
+            # one object per task: serialize each task once, whatever the number of its annotations
+            ext = self.links.model.get_task_key_ext(self.cached_user) or ''
+            expand = ['annotations.reviews', 'annotations.completed_by']
+            context = {'project': self.project}
+            task_ids = annotations.order_by('task_id').values_list('task_id', flat=True).distinct()
+            for task_ids_batch in _batched(task_ids.iterator(), batch_size):
+                annotation_ids = defaultdict(list)
+                for annotation_id, task_id in annotations.filter(task_id__in=task_ids_batch).values_list(
+                    'id', 'task_id'
+                ):
+                    annotation_ids[task_id].append(annotation_id)
+
+                tasks = self._get_export_tasks(task_ids_batch)
+                yield [
+                    (self.get_export_key(f'{task["id"]}{ext}'), task, annotation_ids[task['id']])
+                    for task in ExportDataSerializer(tasks, many=True, context=context, expand=expand).data
+                ]
+        else:
+            # deprecated functionality - one object per annotation
+            serializer_class = load_func(settings.STORAGE_ANNOTATION_SERIALIZER)
+            context = {'project': self.project}
+            queryset = annotations.select_related('task', 'completed_by')
+            for annotation_batch in _batched(iterate_queryset(queryset, chunk_size=batch_size), batch_size):
+                data = serializer_class(annotation_batch, many=True, context=context).data
+                yield [
+                    (self.get_export_key(str(annotation.id)), annotation_data, [annotation.id])
+                    for annotation, annotation_data in zip(annotation_batch, data)
+                ]
+
+    def _create_links(self, annotation_ids: list[int]):
+        """Bulk version of ExportStorageLink.create"""
+        link_model = self.links.model
+        existing = set(
+            link_model.objects.filter(storage=self, annotation_id__in=annotation_ids).values_list(
+                'annotation_id', flat=True
+            )
+        )
+        if existing:
+            link_model.objects.filter(storage=self, annotation_id__in=existing).update(updated_at=timezone.now())
+        link_model.objects.bulk_create(
+            [
+                link_model(storage=self, annotation_id=annotation_id, object_exists=True)
+                for annotation_id in annotation_ids
+                if annotation_id not in existing
+            ],
+            batch_size=settings.BATCH_SIZE,
+        )
+
+    def export_annotations(self, annotations: models.QuerySet[Annotation], progress=None) -> int:
+        """
+        Serialize and upload annotations, without touching the storage sync status.
+
+        Args:
+            annotations: Annotations to export
+            progress: Optional callable(exported count) called after each batch
+
+        Returns:
+            Number of exported annotations
+        """
         annotation_exported = 0
-        total_annotations = annotations.count()
-        self.info_set_in_progress()
         self.cached_user = self.project.organization.created_by
 
-        # Calculate optimal batch size based on project data and worker count
-        project_batch_size = self.project.get_task_batch_size()
-        chunk_size = max(1, project_batch_size // self.max_workers)
+        # Calculate optimal batch size based on project data
+        batch_size = self.project.get_task_batch_size()
+        chunk_size = settings.STORAGE_EXPORT_CHUNK_SIZE
         logger.info(
-            f'Export storage {self.id}: using chunk_size={chunk_size} '
-            f'(project_batch_size={project_batch_size}, max_workers={self.max_workers})'
+            f'Export storage {self.id}: using batch_size={batch_size} upload chunk_size={chunk_size} '
+            f'max_workers={self.max_workers}'
         )
 
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Batch annotations so that we update progress before having to submit every future.
-            # Updating progress in thread requires coordinating on count and db writes, so just
-            # batching to keep it simpler.
-            for annotation_batch in _batched(
-                iterate_queryset(Annotation.objects.filter(project=self.project), chunk_size=chunk_size),
-                chunk_size,
-            ):
-                futures = []
-                for annotation in annotation_batch:
-                    annotation.cached_user = self.cached_user
-                    futures.append(executor.submit(self.save_annotation, annotation))
-
+            # Objects are serialized in this thread one batch at a time and uploaded in chunks by the pool,
+            # so at most one batch of serialized objects is held in memory.
+            for objects in self._iter_export_batches(annotations, batch_size):
+                futures = {}
+                for chunk in _batched(objects, chunk_size):
+                    future = executor.submit(self.put_objects, [(key, data) for key, data, _ in chunk])
+                    futures[future] = [annotation_id for _, _, ids in chunk for annotation_id in ids]
+
+                exported_ids = []
                 for future in concurrent.futures.as_completed(futures):
-                    annotation_exported += 1
-                    self.info_update_progress(last_sync_count=annotation_exported, total_annotations=total_annotations)
+                    try:
+                        future.result()
+                    except Exception as exc:
+                        logger.error(f'Export storage {self.id}: failed to upload objects: {exc}', exc_info=True)
+                        continue
+                    exported_ids.extend(futures[future])
+
+                # create links only for uploaded objects
+                self._create_links(exported_ids)
+                annotation_exported += len(exported_ids)
+                if progress:
+                    progress(annotation_exported)
+
+        return annotation_exported
+
+    def save_annotations(self, annotations: models.QuerySet[Annotation]):
+        total_annotations = annotations.count()
+        self.info_set_in_progress()
+
+        annotation_exported = self.export_annotations(
+            annotations,
+            progress=lambda exported: self.info_update_progress(
+                last_sync_count=exported, total_annotations=total_annotations
+            ),
+        )
 
         self.info_set_completed(last_sync_count=annotation_exported, total_annotations=total_annotations)
 
@@ -895,7 +1359,8 @@ class ImportStorageLink(models.Model):
     task = models.OneToOneField('tasks.Task', on_delete=models.CASCADE, related_name='%(app_label)s_%(class)s')
     key = models.TextField(_('key'), null=False, help_text='External link key')
 
-    # This field is set to True on creation and never updated; it should not be relied upon.
+    # This field is set to True on creation and refreshed only by full reconcile syncs
+    # (STORAGE_INCREMENTAL_SYNC), it is approximate and should not be relied upon.
     object_exists = models.BooleanField(
         _('object exists'), help_text='Whether object under external link still exists', default=True
     )
@@ -931,6 +1396,15 @@ class ExportStorageLink(models.Model):
     created_at = models.DateTimeField(_('created at'), auto_now_add=True, help_text='Creation time')
     updated_at = models.DateTimeField(_('updated at'), auto_now=True, help_text='Update time')
 
+    @staticmethod
+    def get_task_key_ext(user):
+        """Extension of task keys, or None if annotations are stored one per object"""
+        flag = flag_set('fflag_feat_optic_650_target_storage_task_format_long', user=user)
+
+        if settings.FUTURE_SAVE_TASK_TO_STORAGE or flag:
+            return '.json' if settings.FUTURE_SAVE_TASK_TO_STORAGE_JSON_EXT or flag else ''
+        return None
+
     @staticmethod
     def get_key(annotation):
         # get user who created the organization explicitly using filter/values_list to avoid prefetching
@@ -938,10 +1412,9 @@ class ExportStorageLink(models.Model):
         # when signal for annotation save is called, user is not cached
         if user is None:
             user = annotation.project.organization.created_by
-        flag = flag_set('fflag_feat_optic_650_target_storage_task_format_long', user=user)
 
-        if settings.FUTURE_SAVE_TASK_TO_STORAGE or flag:
-            ext = '.json' if settings.FUTURE_SAVE_TASK_TO_STORAGE_JSON_EXT or flag else ''
+        ext = ExportStorageLink.get_task_key_ext(user)
+        if ext is not None:
             return str(annotation.task.id) + ext
         else:
             return str(annotation.id)
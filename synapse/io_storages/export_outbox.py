@@ -0,0 +1,221 @@
+"""
+Coalescing outbox for exporting saved annotations to target storages.
+
+Annotation post_save handlers add (storage, annotation) pairs to Redis sets
+instead of exporting every save. A flush job is enqueued unless one is
+already waiting; it exports the collected annotations of each storage in one
+batch, so an annotation saved several times before it runs is serialized and
+uploaded once, and annotations of the same task share one export pass.
+
+Annotations are queued when their transaction commits, so the flush never
+reads rows that are not committed yet. Pending sets are renamed before they
+are read, so saves arriving during a flush land in a fresh set, and
+annotation ids are pushed back if the export of a storage fails. A failed
+storage is retried by flushes after an exponential backoff; after
+STORAGE_EXPORT_OUTBOX_MAX_ATTEMPTS failures in a row its pending annotations
+are dropped and the storage is marked failed, so a sync has to export them.
+Retries run with the first flush after the backoff, flushes are triggered by
+annotation saves.
+
+Without Redis (or with STORAGE_EXPORT_OUTBOX disabled) the signal handlers
+export every save directly, as before.
+"""
+import logging
+import time
+import traceback as tb
+import uuid
+
+from core.redis import redis_connected, start_job_async_or_sync
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django_rq import get_connection
+from redis.exceptions import ResponseError
+
+logger = logging.getLogger(__name__)
+
+# Redis keys
+KEY_PREFIX = getattr(settings, 'STORAGE_EXPORT_OUTBOX_KEY_PREFIX', 'export_outbox')
+DIRTY_STORAGES_KEY = f'{KEY_PREFIX}:storages'
+FLUSH_SCHEDULED_KEY = f'{KEY_PREFIX}:flush_scheduled'
+# storage member -> consecutive failed exports
+ATTEMPTS_KEY = f'{KEY_PREFIX}:attempts'
+# storage member -> time its next export may run
+RETRY_AT_KEY = f'{KEY_PREFIX}:retry_at'
+
+# Configuration
+# safety expiry of the scheduled flag, in case the flush job is lost
+FLUSH_SCHEDULED_TTL = getattr(settings, 'STORAGE_EXPORT_OUTBOX_SCHEDULED_TTL', 600)  # seconds
+MAX_ATTEMPTS = getattr(settings, 'STORAGE_EXPORT_OUTBOX_MAX_ATTEMPTS', 5)
+# delay before the first retry of a failed storage, doubled on each failure
+RETRY_BACKOFF = getattr(settings, 'STORAGE_EXPORT_OUTBOX_RETRY_BACKOFF', 30)  # seconds
+
+
+def is_enabled():
+    return getattr(settings, 'STORAGE_EXPORT_OUTBOX', True) and redis_connected()
+
+
+def _storage_member(storage):
+    return f'{storage._meta.label_lower}:{storage.id}'
+
+
+def _pending_key(member):
+    return f'{KEY_PREFIX}:pending:{member}'
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def enqueue_annotation_export(storages, annotation):
+    """
+    Queue an annotation for export to export storages.
+
+    Args:
+        storages: Export storages of the annotation project
+        annotation: Saved annotation
+
+    Returns:
+        bool: False if the outbox is disabled and the caller has to export directly
+    """
+    if not is_enabled():
+        return False
+
+    members = [_storage_member(storage) for storage in storages]
+    if members:
+        annotation_id = annotation.id
+        transaction.on_commit(lambda: _enqueue(members, annotation_id))
+    return True
+
+
+def _enqueue(members, annotation_id):
+    redis_client = get_connection()
+    pipe = redis_client.pipeline(transaction=True)
+    for member in members:
+        pipe.sadd(_pending_key(member), annotation_id)
+        pipe.sadd(DIRTY_STORAGES_KEY, member)
+    pipe.execute()
+
+    _schedule_flush(redis_client)
+
+
+def _schedule_flush(redis_client):
+    """Enqueue a flush unless one is already pending, saves made until it starts join it"""
+    if not redis_client.set(FLUSH_SCHEDULED_KEY, 1, nx=True, ex=FLUSH_SCHEDULED_TTL):
+        return
+
+    try:
+        start_job_async_or_sync(flush_export_outbox, queue_name='low')
+    except Exception as e:
+        redis_client.delete(FLUSH_SCHEDULED_KEY)
+        logger.error(f'Failed to schedule export outbox flush: {e}')
+
+
+def _retry_later(redis_client, member, annotation_ids):
+    """
+    Push annotation ids of a failed export back into the outbox.
+
+    Returns:
+        bool: False if the storage ran out of attempts and the ids were dropped
+    """
+    attempts = redis_client.hincrby(ATTEMPTS_KEY, member, 1)
+    if attempts >= MAX_ATTEMPTS:
+        redis_client.hdel(ATTEMPTS_KEY, member)
+        redis_client.zrem(RETRY_AT_KEY, member)
+        logger.error(
+            f'Export to {member} failed {attempts} times, dropping {len(annotation_ids)} annotations from the outbox'
+        )
+        return False
+
+    retry_at = time.time() + RETRY_BACKOFF * 2 ** (attempts - 1)
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.sadd(_pending_key(member), *annotation_ids)
+    pipe.zadd(RETRY_AT_KEY, {member: retry_at})
+    pipe.execute()
+    return True
+
+
+def _mark_failed(member):
+    """Record the current exception on the storage so the user knows a sync is needed"""
+    label, storage_id = member.rsplit(':', 1)
+    storage = apps.get_model(label).objects.filter(id=storage_id).first()
+    if storage is None:
+        return
+    storage.status = storage.Status.FAILED
+    storage.traceback = str(tb.format_exc())
+    storage.save(update_fields=['status', 'traceback'])
+
+
+def _take_due_retries(redis_client):
+    """Move storages whose backoff has passed back to the dirty set"""
+    due = list(map(_decode, redis_client.zrangebyscore(RETRY_AT_KEY, 0, time.time())))
+    if due:
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.zrem(RETRY_AT_KEY, *due)
+        pipe.sadd(DIRTY_STORAGES_KEY, *due)
+        pipe.execute()
+
+
+def _export(member, annotation_ids):
+    from tasks.models import Annotation
+
+    label, storage_id = member.rsplit(':', 1)
+    storage = apps.get_model(label).objects.filter(id=storage_id).first()
+    if storage is None:
+        logger.debug(f'Export storage {member} was deleted, skipping {len(annotation_ids)} annotations')
+        return 0
+
+    # deleted annotations and annotations moved to another project drop out here
+    annotations = Annotation.objects.filter(id__in=annotation_ids, project_id=storage.project_id)
+    logger.debug(f'Export {len(annotation_ids)} annotations to {storage.__class__.__name__} {storage.id}')
+    return storage.export_annotations(annotations)
+
+
+def flush_export_outbox():
+    """
+    Export annotations collected in the outbox, one batch per storage.
+
+    Returns:
+        int: Number of exported annotations
+    """
+    if not redis_connected():
+        return 0
+
+    redis_client = get_connection()
+    # saves from now on schedule the next flush
+    redis_client.delete(FLUSH_SCHEDULED_KEY)
+    _take_due_retries(redis_client)
+
+    exported = 0
+    for member in map(_decode, redis_client.smembers(DIRTY_STORAGES_KEY)):
+        pending_key = _pending_key(member)
+        flushing_key = f'{pending_key}:flushing:{uuid.uuid4().hex}'
+
+        redis_client.srem(DIRTY_STORAGES_KEY, member)
+        if redis_client.zscore(RETRY_AT_KEY, member) is not None:
+            # still backing off, new saves wait in the pending set for the retry
+            continue
+        try:
+            redis_client.rename(pending_key, flushing_key)
+        except ResponseError:
+            # Already flushed by someone else
+            continue
+
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.smembers(flushing_key)
+        pipe.delete(flushing_key)
+        annotation_ids = [int(_decode(annotation_id)) for annotation_id in pipe.execute()[0]]
+        if not annotation_ids:
+            continue
+
+        try:
+            exported += _export(member, annotation_ids)
+        except Exception as e:
+            logger.error(f'Failed to export annotations to {member}: {e}', exc_info=True)
+            if not _retry_later(redis_client, member, annotation_ids):
+                _mark_failed(member)
+        else:
+            redis_client.hdel(ATTEMPTS_KEY, member)
+
+    # failed exports are retried by the first flush after their backoff
+    return exported
@@ -3,6 +3,7 @@ from typing import Dict, Iterable, List, Union
 
 from django.shortcuts import get_object_or_404
 from io_storages.base_models import ImportStorage
+from io_storages.utils import parse_bucket_uri
 from rest_framework.exceptions import PermissionDenied, ValidationError
 
 from .azure_blob.api import AzureBlobExportStorageListAPI, AzureBlobImportStorageListAPI
@@ -111,6 +112,57 @@ def get_storage_by_url(url: Union[str, List, Dict], storage_objects: Iterable[Im
                 return storage_object
 
 
+class StorageURLIndex:
+    """
+    Import storages of a project indexed by (URL scheme, bucket).
+
+    get_storage() returns the same storage as get_storage_by_url() over the
+    same list, but bucket storages (S3, GCS, Azure) are found with a dict
+    lookup instead of calling can_resolve_url on every storage for every
+    task field.
+    """
+
+    def __init__(self, storage_objects: Iterable[ImportStorage]):
+        self.storage_objects = list(storage_objects)
+        self.buckets = {}  # (scheme, bucket) -> [(position, storage)]
+        self.scheme_storages = {}  # scheme -> any storage with this scheme, used to parse URLs
+        self.others = []  # [(position, storage)] storages matching URLs in their own way
+
+        for position, storage in enumerate(self.storage_objects):
+            key = storage.get_url_index_key()
+            if key is None:
+                self.others.append((position, storage))
+                continue
+            self.buckets.setdefault(key, []).append((position, storage))
+            self.scheme_storages.setdefault(key[0], storage)
+
+    def get_storage(self, url: Union[str, List, Dict]) -> Union[ImportStorage, None]:
+        # lists and dicts are rare, resolve them the usual way
+        if not isinstance(url, str):
+            return get_storage_by_url(url, self.storage_objects)
+
+        found = None
+        for scheme, scheme_storage in self.scheme_storages.items():
+            bucket_uri = parse_bucket_uri(url, scheme_storage)
+            if bucket_uri is None:
+                continue
+            for position, storage in self.buckets.get((scheme, bucket_uri.bucket), ()):
+                if found is not None and position > found[0]:
+                    break
+                if storage.can_resolve_url(url):
+                    found = (position, storage)
+                    break
+
+        # keep the priority of the storage list: an earlier storage of another kind wins
+        for position, storage in self.others:
+            if found is not None and position > found[0]:
+                break
+            if storage.can_resolve_url(url):
+                return storage
+
+        return found[1] if found else None
+
+
 
 
 
@@ -21,6 +21,7 @@ from io_storages.base_models import (
     ImportStorageLink,
     ProjectStorageMixin,
 )
+from io_storages.export_outbox import enqueue_annotation_export
 from io_storages.gcs.utils import GCS
 from io_storages.utils import (
     StorageObject,
@@ -234,6 +235,9 @@ class GCSImportStorageBase(GCSStorageMixin, ImportStorage):
         )
         return load_tasks_json(blob, key)
 
+    def get_data_stream(self, key):
+        return self.get_client().bucket(self.bucket).blob(key).open("rb")
+
     def generate_http_url(self, url):
         return GCS.generate_http_url(
             url=url,
@@ -246,6 +250,9 @@ class GCSImportStorageBase(GCSStorageMixin, ImportStorage):
     def can_resolve_url(self, url: Union[str, None]) -> bool:
         return storage_can_resolve_bucket_url(self, url)
 
+    def get_url_index_key(self):
+        return self.url_scheme, self.bucket
+
     def scan_and_create_links(self):
         return self._scan_and_create_links(GCSImportStorageLink)
 
@@ -266,23 +273,17 @@ class GCSImportStorage(ProjectStorageMixin, GCSImportStorageBase):
 
 
 class GCSExportStorage(GCSStorageMixin, ExportStorage):
-    def save_annotation(self, annotation):
-        bucket = self.get_bucket()
-        logger.debug(
-            f"Creating new object on {self.__class__.__name__} Storage {self} for annotation {annotation}"
-        )
-        ser_annotation = self._get_serialized_data(annotation)
-
-        # get key that identifies this object in storage
-        key = GCSExportStorageLink.get_key(annotation)
-        key = str(self.prefix) + "/" + key if self.prefix else key
+    def get_export_key(self, key):
+        return str(self.prefix) + "/" + key if self.prefix else key
 
-        # put object into storage
-        blob = bucket.blob(key)
-        blob.upload_from_string(json.dumps(ser_annotation))
+    def put_objects(self, objects):
+        # bucket() doesn't request bucket metadata, unlike get_bucket()
+        bucket = self.get_client().bucket(self.bucket)
+        for key, data in objects:
+            bucket.blob(key).upload_from_string(json.dumps(data))
 
-        # create link if everything ok
-        GCSExportStorageLink.create(annotation, self)
+    def put_object(self, key, data):
+        self.put_objects([(key, data)])
 
 
 def async_export_annotation_to_gcs_storages(annotation):
@@ -297,7 +298,8 @@ def async_export_annotation_to_gcs_storages(annotation):
 def export_annotation_to_gcs_storages(sender, instance, **kwargs):
     storages = getattr(instance.project, "io_storages_gcsexportstorages", None)
     if storages and storages.exists():  # avoid excess jobs in rq
-        start_job_async_or_sync(async_export_annotation_to_gcs_storages, instance)
+        if not enqueue_annotation_export(storages.all(), instance):
+            start_job_async_or_sync(async_export_annotation_to_gcs_storages, instance)
 
 
 class GCSImportStorageLink(ImportStorageLink):
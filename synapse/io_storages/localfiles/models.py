@@ -22,6 +22,7 @@ from io_storages.base_models import (
     ImportStorageLink,
     ProjectStorageMixin,
 )
+from io_storages.export_outbox import enqueue_annotation_export
 from io_storages.localfiles.functions import normalize_storage_path
 from io_storages.utils import StorageObject, load_tasks_json
 from tasks.models import Annotation
@@ -168,6 +169,12 @@ class LocalFilesImportStorageBase(LocalFilesMixin, ImportStorage):
         except OSError as e:
             raise ValueError(f'Failed to read file {path}: {str(e)}')
 
+    def get_data_stream(self, key):
+        try:
+            return open(Path(key), 'rb')
+        except OSError as e:
+            raise ValueError(f'Failed to read file {key}: {str(e)}')
+
     def scan_and_create_links(self):
         return self._scan_and_create_links(LocalFilesImportStorageLink)
 
@@ -181,21 +188,13 @@ class LocalFilesImportStorage(ProjectStorageMixin, LocalFilesImportStorageBase):
 
 
 class LocalFilesExportStorage(LocalFilesMixin, ExportStorage):
-    def save_annotation(self, annotation):
-        logger.debug(f'Creating new object on {self.__class__.__name__} Storage {self} for annotation {annotation}')
-        ser_annotation = self._get_serialized_data(annotation)
-
-        # get key that identifies this object in storage
-        key = LocalFilesExportStorageLink.get_key(annotation)
+    def get_export_key(self, key):
         storage_path = self._get_storage_path_or_raise()
-        key = os.path.join(storage_path, f'{key}')
+        return os.path.join(storage_path, f'{key}')
 
-        # put object into storage
+    def put_object(self, key, data):
         with open(key, mode='w') as f:
-            json.dump(ser_annotation, f, indent=2)
-
-        # Create export storage link
-        LocalFilesExportStorageLink.create(annotation, self)
+            json.dump(data, f, indent=2)
 
     def delete_annotation(self, annotation):
         logger.debug(f'Deleting object on {self.__class__.__name__} Storage {self} for annotation {annotation}')
@@ -223,7 +222,10 @@ class LocalFilesExportStorageLink(ExportStorageLink):
 def export_annotation_to_local_files(sender, instance, **kwargs):
     project = instance.project
     if hasattr(project, 'io_storages_localfilesexportstorages'):
-        for storage in project.io_storages_localfilesexportstorages.all():
+        storages = project.io_storages_localfilesexportstorages.all()
+        if enqueue_annotation_export(storages, instance):
+            return
+        for storage in storages:
             logger.debug(f'Export {instance} to Local Storage {storage}')
             storage.save_annotation(instance)
 
@@ -0,0 +1,68 @@
+# Generated by Django 5.1.15 on 2026-10-16 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("io_storages", "0023_alter_azureblobimportstorage_presign_ttl_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="azureblobimportstorage",
+            name="sync_state",
+            field=models.JSONField(
+                blank=True,
+                default=None,
+                help_text="Incremental sync cursor: last-modified high-water mark and filter of linked keys",
+                null=True,
+                verbose_name="sync_state",
+            ),
+        ),
+        migrations.AddField(
+            model_name="gcsimportstorage",
+            name="sync_state",
+            field=models.JSONField(
+                blank=True,
+                default=None,
+                help_text="Incremental sync cursor: last-modified high-water mark and filter of linked keys",
+                null=True,
+                verbose_name="sync_state",
+            ),
+        ),
+        migrations.AddField(
+            model_name="localfilesimportstorage",
+            name="sync_state",
+            field=models.JSONField(
+                blank=True,
+                default=None,
+                help_text="Incremental sync cursor: last-modified high-water mark and filter of linked keys",
+                null=True,
+                verbose_name="sync_state",
+            ),
+        ),
+        migrations.AddField(
+            model_name="redisimportstorage",
+            name="sync_state",
+            field=models.JSONField(
+                blank=True,
+                default=None,
+                help_text="Incremental sync cursor: last-modified high-water mark and filter of linked keys",
+                null=True,
+                verbose_name="sync_state",
+            ),
+        ),
+        migrations.AddField(
+            model_name="s3importstorage",
+            name="sync_state",
+            field=models.JSONField(
+                blank=True,
+                default=None,
+                help_text="Incremental sync cursor: last-modified high-water mark and filter of linked keys",
+                null=True,
+                verbose_name="sync_state",
+            ),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.15 on 2026-10-16 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("io_storages", "0024_importstorage_sync_state"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="azureblobimportstorage",
+            name="skip_duplicates",
+            field=models.BooleanField(
+                default=False,
+                help_text="Skip objects whose task data is already in the project",
+                verbose_name="skip_duplicates",
+            ),
+        ),
+        migrations.AddField(
+            model_name="gcsimportstorage",
+            name="skip_duplicates",
+            field=models.BooleanField(
+                default=False,
+                help_text="Skip objects whose task data is already in the project",
+                verbose_name="skip_duplicates",
+            ),
+        ),
+        migrations.AddField(
+            model_name="localfilesimportstorage",
+            name="skip_duplicates",
+            field=models.BooleanField(
+                default=False,
+                help_text="Skip objects whose task data is already in the project",
+                verbose_name="skip_duplicates",
+            ),
+        ),
+        migrations.AddField(
+            model_name="redisimportstorage",
+            name="skip_duplicates",
+            field=models.BooleanField(
+                default=False,
+                help_text="Skip objects whose task data is already in the project",
+                verbose_name="skip_duplicates",
+            ),
+        ),
+        migrations.AddField(
+            model_name="s3importstorage",
+            name="skip_duplicates",
+            field=models.BooleanField(
+                default=False,
+                help_text="Skip objects whose task data is already in the project",
+                verbose_name="skip_duplicates",
+            ),
+        ),
+    ]
@@ -0,0 +1,77 @@
+"""This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
+"""
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, Tuple
+
+from django.conf import settings
+from django.db import connections
+from io_storages.utils import StorageObject
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchingReader:
+    """
+    Fetches and parses storage objects ahead of the sync loop.
+
+    While the caller writes the tasks of one key to the database, the next keys
+    are read with storage.read_data() on a bounded thread pool. At most
+    `max_in_flight` keys are fetched or waiting to be consumed at any time,
+    which bounds memory, and results are yielded in key order.
+
+    Usage:
+        reader = PrefetchingReader(storage)
+        for key, link_objects in reader.iter_data(keys):
+            ...
+    """
+
+    def __init__(self, storage, workers: int = None, max_in_flight: int = None):
+        self.storage = storage
+        self.workers = settings.STORAGE_IMPORT_PREFETCH_WORKERS if workers is None else workers
+        self.max_in_flight = max(
+            settings.STORAGE_IMPORT_PREFETCH_IN_FLIGHT if max_in_flight is None else max_in_flight,
+            self.workers,
+            1,
+        )
+
+    def _read(self, key) -> list[StorageObject]:
+        try:
+            return self.storage.read_data(key)
+        finally:
+            # worker threads get their own DB connections if anything touches the ORM
+            connections.close_all()
+
+    def iter_data(self, keys: Iterable[str]) -> Iterator[Tuple[str, list[StorageObject]]]:
+        """
+        Yield (key, link objects) for each key, in order.
+
+        Keys are pulled from `keys` in the calling thread, so a generator that
+        queries the database is safe to pass. An error while reading a key is
+        raised when that key is reached.
+        """
+        if self.workers <= 1:
+            for key in keys:
+                yield key, self.storage.read_data(key)
+            return
+
+        keys = iter(keys)
+        pending = deque()
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='storage-prefetch')
+        try:
+            for key in keys:
+                pending.append((key, executor.submit(self._read, key)))
+                if len(pending) >= self.max_in_flight:
+                    break
+
+            while pending:
+                key, future = pending.popleft()
+                link_objects = future.result()
+                # refill before handing the result over, so fetching overlaps the caller's work
+                for next_key in keys:
+                    pending.append((next_key, executor.submit(self._read, next_key)))
+                    break
+                yield key, link_objects
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,150 @@
+"""
+Shared cache of presigned URLs.
+
+Serializing a Data Manager page of multi-image tasks signs a URL for every
+field of every task. Presigned URLs are cached in Redis by (storage, object
+URI) and reused until STORAGE_PRESIGN_CACHE_MARGIN seconds before they
+expire, so all web workers hand out the same URL for an object while it is
+valid.
+
+Every storage has a generation number that is part of the cache key and is
+bumped when the storage is edited, so URLs signed with old credentials or
+an old TTL are never reused.
+
+Without Redis a bounded per-process cache is used instead.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from core.redis import redis_connected
+from django.conf import settings
+from django_rq import get_connection
+
+logger = logging.getLogger(__name__)
+
+# Redis keys
+KEY_PREFIX = getattr(settings, 'STORAGE_PRESIGN_CACHE_KEY_PREFIX', 'presign_cache')
+
+# Configuration
+MARGIN = getattr(settings, 'STORAGE_PRESIGN_CACHE_MARGIN', 120)  # seconds
+LOCAL_CACHE_SIZE = getattr(settings, 'STORAGE_PRESIGN_CACHE_LOCAL_SIZE', 10000)
+
+_local_cache = OrderedDict()  # key -> (url, expires at)
+_local_generations = {}
+_local_lock = threading.Lock()
+
+
+def is_enabled():
+    return getattr(settings, 'STORAGE_PRESIGN_CACHE', True)
+
+
+def _storage_member(storage):
+    return f'{storage._meta.label_lower}:{storage.id}'
+
+
+def _generation_key(storage):
+    return f'{KEY_PREFIX}:generation:{_storage_member(storage)}'
+
+
+def _url_key(storage, generation, url):
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:url:{_storage_member(storage)}:{generation}:{digest}'
+
+
+def _get_generation(redis_client, storage):
+    # read once per storage instance, storages are cached on the project for the request
+    generation = getattr(storage, '_presign_cache_generation', None)
+    if generation is None:
+        if redis_client is None:
+            generation = _local_generations.get(_storage_member(storage), 0)
+        else:
+            generation = int(redis_client.get(_generation_key(storage)) or 0)
+        storage._presign_cache_generation = generation
+    return generation
+
+
+def _get_local(key):
+    with _local_lock:
+        cached = _local_cache.get(key)
+        if cached is None:
+            return None, 0
+        url, expires_at = cached
+        remaining = int(expires_at - time.monotonic())
+        if remaining <= 0:
+            del _local_cache[key]
+            return None, 0
+        _local_cache.move_to_end(key)
+        return url, remaining
+
+
+def _set_local(key, url, timeout):
+    with _local_lock:
+        _local_cache[key] = (url, time.monotonic() + timeout)
+        _local_cache.move_to_end(key)
+        while len(_local_cache) > LOCAL_CACHE_SIZE:
+            _local_cache.popitem(last=False)
+
+
+def get_presigned_url(storage, url):
+    """
+    Presigned HTTP URL for a storage object URI, reusing a cached one while it stays valid.
+
+    Args:
+        storage: Import storage that can resolve `url`
+        url: Object URI, e.g. s3://bucket/key
+
+    Returns:
+        tuple: (HTTP URL, number of seconds it stays valid)
+    """
+    presign_ttl = getattr(storage, 'presign_ttl', None)
+    ttl = presign_ttl * 60 if presign_ttl else None
+    # storages without presigned URLs return proxy links or inline base64 data, which are not cached
+    if not is_enabled() or not getattr(storage, 'presign', False) or not ttl or storage.id is None:
+        return storage.generate_http_url(url), ttl
+    timeout = ttl - MARGIN
+    if timeout <= 0:
+        return storage.generate_http_url(url), ttl
+
+    redis_client = get_connection() if redis_connected() else None
+    key = _url_key(storage, _get_generation(redis_client, storage), url)
+
+    if redis_client is None:
+        http_url, remaining = _get_local(key)
+    else:
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.ttl(key)
+        http_url, remaining = pipe.execute()
+        if isinstance(http_url, bytes):
+            http_url = http_url.decode()
+    if http_url and remaining > 0:
+        return http_url, remaining + MARGIN
+
+    http_url = storage.generate_http_url(url)
+    # failed signing returns the original URI
+    if http_url and http_url != url:
+        if redis_client is None:
+            _set_local(key, http_url, timeout)
+        else:
+            redis_client.set(key, http_url, ex=timeout)
+    return http_url, ttl
+
+
+def invalidate(storage):
+    """Stop reusing URLs presigned by a storage, called when the storage is edited"""
+    if storage.id is None:
+        return
+    storage.__dict__.pop('_presign_cache_generation', None)
+    try:
+        if redis_connected():
+            redis_client = get_connection()
+            redis_client.incr(_generation_key(storage))
+            return
+    except Exception as exc:
+        logger.warning(f'Failed to invalidate presigned URLs of {_storage_member(storage)}: {exc}')
+    with _local_lock:
+        member = _storage_member(storage)
+        _local_generations[member] = _local_generations.get(member, 0) + 1
@@ -16,6 +16,7 @@ from io_storages.base_models import (
     ImportStorageLink,
     ProjectStorageMixin,
 )
+from io_storages.export_outbox import enqueue_annotation_export
 from io_storages.utils import StorageObject, load_tasks_json
 from tasks.models import Annotation
 
@@ -94,6 +95,11 @@ class RedisImportStorageBase(ImportStorage, RedisStorageMixin):
         for key in self.iter_objects():
             yield key
 
+    def iter_keys_with_last_modified(self):
+        # redis keys have no modification time
+        for key in self.iter_objects():
+            yield key, None
+
     def get_unified_metadata(self, obj):
         self.get_client()
         return {
@@ -129,19 +135,15 @@ class RedisImportStorage(ProjectStorageMixin, RedisImportStorageBase):
 class RedisExportStorage(RedisStorageMixin, ExportStorage):
     db = models.PositiveSmallIntegerField(_('db'), default=2, help_text='Server Database')
 
-    def save_annotation(self, annotation):
-        client = self.get_client()
-        logger.debug(f'Creating new object on {self.__class__.__name__} Storage {self} for annotation {annotation}')
-        ser_annotation = self._get_serialized_data(annotation)
-
-        # get key that identifies this object in storage
-        key = RedisExportStorageLink.get_key(annotation)
-
-        # put object into storage
-        client.set(key, json.dumps(ser_annotation))
+    def put_object(self, key, data):
+        self.get_client().set(key, json.dumps(data))
 
-        # create link if everything ok
-        RedisExportStorageLink.create(annotation, self)
+    def put_objects(self, objects):
+        # one round trip per chunk
+        pipe = self.get_client().pipeline(transaction=False)
+        for key, data in objects:
+            pipe.set(key, json.dumps(data))
+        pipe.execute()
 
     def validate_connection(self, client=None):
         if client is None:
@@ -153,7 +155,10 @@ class RedisExportStorage(RedisStorageMixin, ExportStorage):
 def export_annotation_to_redis_storages(sender, instance, **kwargs):
     project = instance.project
     if hasattr(project, 'io_storages_redisexportstorages'):
-        for storage in project.io_storages_redisexportstorages.all():
+        storages = project.io_storages_redisexportstorages.all()
+        if enqueue_annotation_export(storages, instance):
+            return
+        for storage in storages:
             logger.debug(f'Export {instance} to Redis storage {storage}')
             storage.save_annotation(instance)
 
@@ -21,6 +21,7 @@ from io_storages.base_models import (
     ImportStorageLink,
     ProjectStorageMixin,
 )
+from io_storages.export_outbox import enqueue_annotation_export
 from io_storages.s3.utils import (
     catch_and_reraise_from_none,
     get_client_and_resource,
@@ -267,6 +268,12 @@ class S3ImportStorageBase(S3StorageMixin, ImportStorage):
         obj = s3.Object(bucket.name, key).get()["Body"].read()
         return load_tasks_json(obj, key)
 
+    @catch_and_reraise_from_none
+    def get_data_stream(self, key):
+        # boto3 clients are thread-safe, resources are not
+        client, _ = self.get_client_and_resource()
+        return client.get_object(Bucket=self.bucket, Key=key)["Body"]
+
     @catch_and_reraise_from_none
     def generate_http_url(self, url):
         return resolve_s3_url(
@@ -277,6 +284,9 @@ class S3ImportStorageBase(S3StorageMixin, ImportStorage):
     def can_resolve_url(self, url: Union[str, None]) -> bool:
         return storage_can_resolve_bucket_url(self, url)
 
+    def get_url_index_key(self):
+        return self.url_scheme, self.bucket
+
     @catch_and_reraise_from_none
     def get_blob_metadata(self, key):
         return AWS.get_blob_metadata(
@@ -301,17 +311,12 @@ class S3ImportStorage(ProjectStorageMixin, S3ImportStorageBase):
 class S3ExportStorage(S3StorageMixin, ExportStorage):
     @catch_and_reraise_from_none
     def save_annotation(self, annotation):
-        client, s3 = self.get_client_and_resource()
-        logger.debug(
-            f"Creating new object on {self.__class__.__name__} Storage {self} for annotation {annotation}"
-        )
-        ser_annotation = self._get_serialized_data(annotation)
+        super().save_annotation(annotation)
 
-        # get key that identifies this object in storage
-        key = S3ExportStorageLink.get_key(annotation)
-        key = str(self.prefix) + "/" + key if self.prefix else key
+    def get_export_key(self, key):
+        return str(self.prefix) + "/" + key if self.prefix else key
 
-        # put object into storage
+    def _get_put_params(self):
         additional_params = {}
 
         self.cached_user = getattr(
@@ -326,13 +331,20 @@ class S3ExportStorage(S3StorageMixin, ExportStorage):
                 additional_params["ServerSideEncryption"] = "aws:kms"
             else:
                 additional_params["ServerSideEncryption"] = "AES256"
+        return additional_params
 
-        s3.Object(self.bucket, key).put(
-            Body=json.dumps(ser_annotation), **additional_params
-        )
+    @catch_and_reraise_from_none
+    def put_objects(self, objects):
+        # boto3 clients are thread-safe, resources are not
+        client, _ = self.get_client_and_resource()
+        additional_params = self._get_put_params()
+        for key, data in objects:
+            client.put_object(
+                Bucket=self.bucket, Key=key, Body=json.dumps(data), **additional_params
+            )
 
-        # create link if everything ok
-        S3ExportStorageLink.create(annotation, self)
+    def put_object(self, key, data):
+        self.put_objects([(key, data)])
 
     @catch_and_reraise_from_none
     def delete_annotation(self, annotation):
@@ -364,7 +376,8 @@ def async_export_annotation_to_s3_storages(annotation):
 def export_annotation_to_s3_storages(sender, instance, **kwargs):
     storages = getattr(instance.project, "io_storages_s3exportstorages", None)
     if storages and storages.exists():  # avoid excess jobs in rq
-        start_job_async_or_sync(async_export_annotation_to_s3_storages, instance)
+        if not enqueue_annotation_export(storages.all(), instance):
+            start_job_async_or_sync(async_export_annotation_to_s3_storages, instance)
 
 
 @receiver(pre_delete, sender=Annotation)
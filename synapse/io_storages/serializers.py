@@ -23,6 +23,12 @@ class ImportStorageSerializer(serializers.ModelSerializer):
             data = validate_func(self, data)
         return data
 
+    def get_fields(self):
+        fields = super().get_fields()
+        # incremental sync cursor is internal and can be large
+        fields.pop('sync_state', None)
+        return fields
+
     class Meta:
         model = ImportStorage
         fields = '__all__'
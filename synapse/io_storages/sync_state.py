@@ -0,0 +1,173 @@
+"""This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
+"""
+import base64
+import hashlib
+import logging
+import math
+import zlib
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SYNC_STATE_VERSION = 1
+
+
+class BloomFilter:
+    """
+    Compact probabilistic set of strings: no false negatives, false positives
+    at roughly `error_rate` while no more than `capacity` keys are added.
+    """
+
+    def __init__(
+        self, size: int, num_hashes: int, bits: Optional[bytearray] = None, count: int = 0, capacity: int = 0
+    ):
+        self.size = size
+        self.num_hashes = num_hashes
+        self.bits = bits if bits is not None else bytearray((size + 7) // 8)
+        self.count = count
+        self.capacity = capacity
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> 'BloomFilter':
+        capacity = max(int(capacity), 1)
+        size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 64)
+        num_hashes = max(int(round(size / capacity * math.log(2))), 1)
+        return cls(size, num_hashes, capacity=capacity)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        """Add a key, `count` grows only for keys that were not present yet"""
+        added = False
+        for pos in self._positions(key):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+
+    def update(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @property
+    def is_full(self) -> bool:
+        return self.count > self.capacity
+
+    def to_dict(self) -> dict:
+        return {
+            'size': self.size,
+            'num_hashes': self.num_hashes,
+            'count': self.count,
+            'capacity': self.capacity,
+            'bits': base64.b64encode(zlib.compress(bytes(self.bits))).decode('ascii'),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'BloomFilter':
+        bits = bytearray(zlib.decompress(base64.b64decode(data['bits'])))
+        return cls(data['size'], data['num_hashes'], bits=bits, count=data['count'], capacity=data['capacity'])
+
+
+class SyncCursor:
+    """
+    Incremental sync state of an import storage, persisted in ImportStorage.sync_state.
+
+    - high_water_mark: newest last-modified time seen by the previous sync
+    - linked: Bloom filter of keys already linked to tasks
+    - last_full_sync: time of the last full reconcile
+    - listed_count: number of keys listed by the last full reconcile
+
+    An incremental sync lists the storage as usual but only checks a key
+    against the database (and reads it) when the key is not in `linked`, or
+    when it was modified after the high-water mark. A full reconcile checks
+    every key, rebuilds the filter and refreshes ImportStorageLink.object_exists.
+    The filter is sized from the listed keys, so it doesn't saturate when the
+    storage holds many more objects than it had links before the listing.
+    """
+
+    def __init__(
+        self,
+        linked: BloomFilter,
+        high_water_mark: Optional[datetime] = None,
+        last_full_sync=None,
+        listed_count: int = 0,
+    ):
+        self.linked = linked
+        self.high_water_mark = high_water_mark
+        self.last_full_sync = last_full_sync
+        self.new_high_water_mark = high_water_mark
+        self.listed_count = listed_count
+
+    @staticmethod
+    def new_filter(capacity: int) -> BloomFilter:
+        """Empty filter for the expected number of keys, with room for keys added by incremental syncs"""
+        capacity = int(capacity * 1.5) + 1000
+        return BloomFilter.for_capacity(capacity, settings.STORAGE_SYNC_BLOOM_ERROR_RATE)
+
+    @classmethod
+    def create(cls, capacity: int) -> 'SyncCursor':
+        """Empty cursor for a full reconcile, sized for the expected number of linked keys"""
+        return cls(cls.new_filter(capacity))
+
+    @classmethod
+    def load(cls, state: Optional[dict]) -> Optional['SyncCursor']:
+        """Cursor usable for an incremental sync, or None if a full reconcile is due"""
+        if not state or state.get('version') != SYNC_STATE_VERSION:
+            return None
+
+        last_full_sync = datetime.fromisoformat(state['last_full_sync'])
+        interval = timedelta(hours=settings.STORAGE_SYNC_FULL_RECONCILE_INTERVAL)
+        if timezone.now() - last_full_sync > interval:
+            logger.debug(f'Full reconcile is due, last one was at {last_full_sync}')
+            return None
+
+        linked = BloomFilter.from_dict(state['linked'])
+        if linked.is_full:
+            logger.debug('Linked keys filter is over capacity, full reconcile is due')
+            return None
+
+        high_water_mark = state.get('high_water_mark')
+        return cls(
+            linked,
+            high_water_mark=datetime.fromisoformat(high_water_mark) if high_water_mark else None,
+            last_full_sync=last_full_sync,
+            listed_count=state.get('listed_count', 0),
+        )
+
+    def to_state(self) -> dict:
+        return {
+            'version': SYNC_STATE_VERSION,
+            'high_water_mark': self.new_high_water_mark.isoformat() if self.new_high_water_mark else None,
+            'last_full_sync': (self.last_full_sync or timezone.now()).isoformat(),
+            'linked': self.linked.to_dict(),
+            'listed_count': self.listed_count,
+        }
+
+    def observe(self, last_modified: Optional[datetime]) -> None:
+        """Move the high-water mark forward"""
+        if last_modified and (self.new_high_water_mark is None or last_modified > self.new_high_water_mark):
+            self.new_high_water_mark = last_modified
+
+    def is_candidate(self, key: str, last_modified: Optional[datetime]) -> bool:
+        """Whether a listed key can be new and has to be checked against the database"""
+        if key not in self.linked:
+            return True
+        if last_modified is None or self.high_water_mark is None:
+            return False
+        # keys modified close to the previous listing may have been missed by it
+        skew = timedelta(seconds=settings.STORAGE_SYNC_MODIFIED_SKEW)
+        return last_modified > self.high_water_mark - skew
@@ -0,0 +1,125 @@
+import json
+from datetime import timedelta
+
+import boto3
+import mock
+import pytest
+from django.utils import timezone
+from io_storages.s3.models import S3ImportStorage, S3ImportStorageLink
+from io_storages.sync_state import SyncCursor
+from moto import mock_s3
+from projects.tests.factories import ProjectFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_sync_cursor_candidates(settings):
+    settings.STORAGE_SYNC_MODIFIED_SKEW = 60
+    now = timezone.now()
+    cursor = SyncCursor.create(10)
+    cursor.linked.add('old.json')
+    # keys already present are not counted again
+    cursor.linked.add('old.json')
+    cursor.high_water_mark = now
+
+    assert cursor.is_candidate('new.json', now - timedelta(days=1))
+    assert not cursor.is_candidate('old.json', now - timedelta(days=1))
+    # linked keys modified around or after the previous listing are checked again
+    assert cursor.is_candidate('old.json', now - timedelta(seconds=30))
+
+    state = cursor.to_state()
+    assert SyncCursor.load(state).linked.count == 1
+
+    settings.STORAGE_SYNC_FULL_RECONCILE_INTERVAL = 0
+    assert SyncCursor.load(state) is None
+
+
+def test_incremental_sync_skips_linked_keys(settings):
+    settings.STORAGE_INCREMENTAL_SYNC = True
+    settings.STORAGE_SYNC_MODIFIED_SKEW = 0
+
+    with mock_s3():
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='pytest-s3-incremental')
+        s3.put_object(Bucket='pytest-s3-incremental', Key='1.json', Body=json.dumps({'data': {'text': '1'}}))
+
+        project = ProjectFactory()
+        storage = S3ImportStorage.objects.create(
+            project=project,
+            bucket='pytest-s3-incremental',
+            aws_access_key_id='example',
+            aws_secret_access_key='example',
+            use_blob_urls=False,
+        )
+
+        with mock.patch('io_storages.base_models.redis_connected', return_value=False):
+            # full reconcile: no cursor yet
+            storage.sync()
+            storage.refresh_from_db()
+            assert storage.sync_state['last_full_sync']
+            assert storage.sync_state['listed_count'] == 1
+            assert SyncCursor.load(storage.sync_state).linked.count == 1
+            assert project.tasks.count() == 1
+
+            # incremental: only the new key is read
+            s3.put_object(Bucket='pytest-s3-incremental', Key='2.json', Body=json.dumps({'data': {'text': '2'}}))
+            read_data = mock.patch.object(
+                S3ImportStorage, 'read_data', autospec=True, side_effect=S3ImportStorage.read_data
+            )
+            # ignore the high-water mark, moto timestamps have a one second resolution
+            is_candidate = mock.patch.object(
+                SyncCursor, 'is_candidate', autospec=True, side_effect=lambda self, key, _: key not in self.linked
+            )
+            with read_data as read_data, is_candidate:
+                storage.sync()
+            assert [call.args[1] for call in read_data.call_args_list] == ['2.json']
+            assert project.tasks.count() == 2
+            storage.refresh_from_db()
+            assert SyncCursor.load(storage.sync_state).linked.count == 2
+
+            # full reconcile marks links of deleted objects
+            s3.delete_object(Bucket='pytest-s3-incremental', Key='1.json')
+            storage.sync(full_reconcile=True)
+            assert not S3ImportStorageLink.objects.get(key='1.json').object_exists
+            assert S3ImportStorageLink.objects.get(key='2.json').object_exists
+
+
+def test_incremental_sync_skips_duplicate_keys(settings):
+    settings.STORAGE_INCREMENTAL_SYNC = True
+    settings.STORAGE_SYNC_MODIFIED_SKEW = 0
+
+    with mock_s3():
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='pytest-s3-duplicates')
+        body = json.dumps({'data': {'text': 'same'}})
+        s3.put_object(Bucket='pytest-s3-duplicates', Key='1.json', Body=body)
+        s3.put_object(Bucket='pytest-s3-duplicates', Key='copy.json', Body=body)
+
+        project = ProjectFactory()
+        storage = S3ImportStorage.objects.create(
+            project=project,
+            bucket='pytest-s3-duplicates',
+            aws_access_key_id='example',
+            aws_secret_access_key='example',
+            use_blob_urls=False,
+            skip_duplicates=True,
+        )
+
+        with mock.patch('io_storages.base_models.redis_connected', return_value=False):
+            storage.sync()
+            assert project.tasks.count() == 1
+            assert not S3ImportStorageLink.objects.filter(key='copy.json').exists()
+            storage.refresh_from_db()
+            # the duplicate has no link but the cursor knows it
+            assert SyncCursor.load(storage.sync_state).linked.count == 2
+
+            read_data = mock.patch.object(
+                S3ImportStorage, 'read_data', autospec=True, side_effect=S3ImportStorage.read_data
+            )
+            is_candidate = mock.patch.object(
+                SyncCursor, 'is_candidate', autospec=True, side_effect=lambda self, key, _: key not in self.linked
+            )
+            with read_data as read_data, is_candidate:
+                storage.sync()
+            assert read_data.call_count == 0
+            assert project.tasks.count() == 1
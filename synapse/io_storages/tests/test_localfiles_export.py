@@ -1,8 +1,11 @@
+import json
 from pathlib import Path
 
+import mock
 import pytest
 from io_storages.localfiles.models import LocalFilesExportStorage, LocalFilesExportStorageLink
 from projects.tests.factories import ProjectFactory
+from tasks.models import Annotation
 from tasks.tests.factories import AnnotationFactory, TaskFactory
 
 
@@ -93,3 +96,127 @@ def test_annotation_delete_respects_can_delete_flag(settings, tmp_path):
 
 
 
+
+
+@pytest.mark.django_db
+def test_save_annotations_writes_each_task_once(settings, tmp_path):
+    """Batched export groups annotations by task and only exports the given queryset."""
+
+    document_root = tmp_path / 'local-root'
+    export_dir = document_root / 'exports'
+    export_dir.mkdir(parents=True)
+
+    settings.LOCAL_FILES_DOCUMENT_ROOT = str(document_root)
+    settings.LOCAL_FILES_SERVING_ENABLED = True
+    settings.FUTURE_SAVE_TASK_TO_STORAGE = True
+
+    project = ProjectFactory()
+    task = TaskFactory(project=project)
+    other_task = TaskFactory(project=project)
+    annotations = [AnnotationFactory(task=task, project=project) for _ in range(2)]
+    other_annotation = AnnotationFactory(task=other_task, project=project)
+
+    storage = LocalFilesExportStorage.objects.create(project=project, path=str(export_dir))
+    storage.info_set_queued()
+    storage.save_annotations(Annotation.objects.filter(id__in=[a.id for a in annotations]))
+
+    exported_file = Path(storage.path) / LocalFilesExportStorageLink.get_key(annotations[0])
+    assert json.loads(exported_file.read_text())['id'] == task.id
+    assert len(json.loads(exported_file.read_text())['annotations']) == 2
+    assert not (Path(storage.path) / LocalFilesExportStorageLink.get_key(other_annotation)).exists()
+    links = LocalFilesExportStorageLink.objects.filter(storage=storage)
+    assert set(links.values_list('annotation_id', flat=True)) == {a.id for a in annotations}
+
+
+@pytest.mark.django_db
+def test_export_outbox_coalesces_annotation_saves(settings, tmp_path, django_capture_on_commit_callbacks):
+    """Repeated saves within the debounce window are exported by a single flush."""
+    from fakeredis import FakeRedis
+    from io_storages import export_outbox
+
+    document_root = tmp_path / 'local-root'
+    export_dir = document_root / 'exports'
+    export_dir.mkdir(parents=True)
+
+    settings.LOCAL_FILES_DOCUMENT_ROOT = str(document_root)
+    settings.LOCAL_FILES_SERVING_ENABLED = True
+
+    project = ProjectFactory()
+    storage = LocalFilesExportStorage.objects.create(project=project, path=str(export_dir))
+    task = TaskFactory(project=project)
+
+    redis = FakeRedis()
+    with mock.patch.object(export_outbox, 'redis_connected', return_value=True), mock.patch.object(
+        export_outbox, 'get_connection', return_value=redis
+    ), mock.patch.object(export_outbox, 'start_job_async_or_sync') as start_job:
+        # annotations are queued when the transaction commits
+        with django_capture_on_commit_callbacks(execute=True):
+            annotation = AnnotationFactory(task=task, project=project)
+            annotation.result = [{'value': {'choices': ['updated']}}]
+            annotation.save()
+            assert not redis.exists(export_outbox.DIRTY_STORAGES_KEY)
+
+        # nothing is written before the flush, which is scheduled once
+        exported_file = Path(storage.path) / LocalFilesExportStorageLink.get_key(annotation)
+        assert not exported_file.exists()
+        assert start_job.call_count == 1
+
+        export = mock.patch.object(
+            LocalFilesExportStorage,
+            'export_annotations',
+            autospec=True,
+            side_effect=LocalFilesExportStorage.export_annotations,
+        )
+        with export as export:
+            assert export_outbox.flush_export_outbox() == 1
+        assert export.call_count == 1
+
+    assert exported_file.exists()
+    assert LocalFilesExportStorageLink.objects.filter(storage=storage, annotation=annotation).exists()
+
+
+@pytest.mark.django_db
+def test_export_outbox_retries_failed_export_with_backoff(tmp_path, django_capture_on_commit_callbacks):
+    """Annotations of a failed export wait out a backoff, the storage fails after the last attempt."""
+    from fakeredis import FakeRedis
+    from io_storages import export_outbox
+
+    project = ProjectFactory()
+    storage = LocalFilesExportStorage.objects.create(project=project, path=str(tmp_path))
+    task = TaskFactory(project=project)
+    member = export_outbox._storage_member(storage)
+
+    redis = FakeRedis()
+    with mock.patch.object(export_outbox, 'redis_connected', return_value=True), mock.patch.object(
+        export_outbox, 'get_connection', return_value=redis
+    ), mock.patch.object(export_outbox, 'start_job_async_or_sync') as start_job, mock.patch.object(
+        export_outbox, 'MAX_ATTEMPTS', 2
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            annotation = AnnotationFactory(task=task, project=project)
+        assert start_job.call_count == 1
+        assert start_job.call_args.kwargs == {'queue_name': 'low'}
+
+        failing = mock.patch.object(LocalFilesExportStorage, 'export_annotations', side_effect=OSError('disk full'))
+        with failing as export:
+            assert export_outbox.flush_export_outbox() == 0
+            # the flush does not reschedule itself, the ids wait for the backoff
+            assert start_job.call_count == 1
+            assert redis.sismember(export_outbox._pending_key(member), annotation.id)
+            assert redis.zscore(export_outbox.RETRY_AT_KEY, member) is not None
+
+            # a flush before the backoff has passed leaves the storage alone
+            redis.sadd(export_outbox.DIRTY_STORAGES_KEY, member)
+            assert export_outbox.flush_export_outbox() == 0
+            assert export.call_count == 1
+
+            # the last attempt drops the ids and marks the storage failed
+            redis.zadd(export_outbox.RETRY_AT_KEY, {member: 0})
+            assert export_outbox.flush_export_outbox() == 0
+            assert export.call_count == 2
+
+        assert not redis.exists(export_outbox._pending_key(member))
+        assert not redis.hexists(export_outbox.ATTEMPTS_KEY, member)
+        storage.refresh_from_db()
+        assert storage.status == LocalFilesExportStorage.Status.FAILED
+        assert 'disk full' in storage.traceback
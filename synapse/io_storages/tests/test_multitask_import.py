@@ -1,9 +1,11 @@
+import io
 import json
 
 import boto3
 import mock
 import pytest
 from io_storages.models import S3ImportStorage
+from io_storages.prefetch import PrefetchingReader
 from io_storages.s3.models import S3ImportStorageLink
 from io_storages.tests.factories import (
     AzureBlobImportStorageFactory,
@@ -11,7 +13,7 @@ from io_storages.tests.factories import (
     RedisImportStorageFactory,
     S3ImportStorageFactory,
 )
-from io_storages.utils import StorageObject, load_tasks_json
+from io_storages.utils import StorageObject, load_tasks_json, load_tasks_json_stream
 from moto import mock_s3
 from projects.tests.factories import ProjectFactory
 from rest_framework.test import APIClient
@@ -191,6 +193,32 @@ def test_storagelink_fields(project, common_task_data):
         assert storage_links[1].row_group is None
 
 
+def test_sync_auto_assigns_created_tasks(project, common_task_data):
+    """Bulk created storage tasks skip post_save, the sync runs the import auto-assignment instead"""
+    with mock_s3():
+        s3 = boto3.client('s3', region_name='us-east-1')
+        s3.create_bucket(Bucket='pytest-s3-jsons')
+        s3.put_object(Bucket='pytest-s3-jsons', Key='test.json', Body=json.dumps(common_task_data))
+
+        storage = S3ImportStorage.objects.create(
+            project=project,
+            bucket='pytest-s3-jsons',
+            aws_access_key_id='example',
+            aws_secret_access_key='example',
+            use_blob_urls=False,
+            recursive_scan=True,
+        )
+        with mock.patch('annotators.signals.auto_assign_on_tasks_imported') as auto_assign:
+            storage.sync()
+            auto_assign.assert_called_once_with(project.id)
+
+            # nothing new on the next sync, nothing to assign
+            storage.sync()
+            auto_assign.assert_called_once()
+
+    assert project.tasks.count() == len(common_task_data)
+
+
 #
 # Unit tests for load_tasks_json()
 #
@@ -437,6 +465,43 @@ def test_allow_skip_false_is_saved(storage):
     assert task.allow_skip is False
 
 
+def test_add_tasks_bulk(storage):
+    project, s3_storage = storage
+    params_list = [
+        StorageObject(key='test.json', task_data=bare_task_list[0]),
+        StorageObject(key='test.json', task_data=annots_preds_task_list[0], row_index=1),
+        StorageObject(key='test.json', task_data=bare_task_list[1], row_index=2),
+    ]
+    tasks, errors = S3ImportStorage.add_tasks(project, 1, 5, s3_storage, params_list, S3ImportStorageLink)
+
+    assert errors == []
+    assert [task.inner_id for task in tasks] == [5, 6, 7]
+    assert S3ImportStorageLink.objects.filter(storage=s3_storage).count() == 3
+    assert tasks[1].predictions.count() == 1
+    assert tasks[1].annotations.count() == 1
+
+
+@pytest.mark.parametrize(
+    'blob',
+    [
+        json.dumps(bare_task_list[0]),
+        json.dumps(bare_task_list),
+        '\n'.join(json.dumps(task) for task in annots_preds_task_list),
+    ],
+)
+def test_load_tasks_json_stream_matches_blob(blob, fflag_feat_root_11_support_jsonl_cloud_storage_on):
+    expected = list(load_tasks_json(blob.encode(), 'test.json'))
+    assert load_tasks_json_stream(io.BytesIO(blob.encode()), 'test.json') == expected
+
 
+def test_prefetching_reader_keeps_key_order():
+    class DummyStorage:
+        def read_data(self, key):
+            return [StorageObject(key=key, task_data={'text': key})]
 
+    keys = [f'{i}.json' for i in range(20)]
+    reader = PrefetchingReader(DummyStorage(), workers=4, max_in_flight=5)
+    result = list(reader.iter_data(iter(keys)))
 
+    assert [key for key, _ in result] == keys
+    assert [link_objects[0].task_data['text'] for _, link_objects in result] == keys
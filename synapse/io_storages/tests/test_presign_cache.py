@@ -0,0 +1,51 @@
+import mock
+import pytest
+from fakeredis import FakeRedis
+from io_storages import presign_cache
+from io_storages.functions import StorageURLIndex
+from io_storages.s3.models import S3ImportStorage
+from projects.tests.factories import ProjectFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def fake_redis():
+    redis = FakeRedis()
+    with mock.patch.object(presign_cache, 'redis_connected', return_value=True), mock.patch.object(
+        presign_cache, 'get_connection', return_value=redis
+    ):
+        yield redis
+
+
+def test_presigned_url_is_reused_until_storage_edit(fake_redis):
+    project = ProjectFactory()
+    storage = S3ImportStorage.objects.create(project=project, bucket='bucket', presign=True, presign_ttl=15)
+
+    with mock.patch.object(S3ImportStorage, 'generate_http_url', side_effect=['https://signed/1', 'https://signed/2']):
+        url, ttl = presign_cache.get_presigned_url(storage, 's3://bucket/1.jpg')
+        assert (url, ttl) == ('https://signed/1', 15 * 60)
+
+        # another worker with its own storage instance gets the cached URL
+        url, ttl = presign_cache.get_presigned_url(S3ImportStorage.objects.get(id=storage.id), 's3://bucket/1.jpg')
+        assert url == 'https://signed/1'
+        assert ttl <= 15 * 60
+
+        # editing the storage invalidates URLs signed with the old settings
+        storage.presign_ttl = 30
+        storage.save()
+        url, _ = presign_cache.get_presigned_url(storage, 's3://bucket/1.jpg')
+        assert url == 'https://signed/2'
+
+
+def test_storage_url_index_keeps_storage_priority():
+    project = ProjectFactory()
+    first = S3ImportStorage(project=project, bucket='shared', id=1)
+    second = S3ImportStorage(project=project, bucket='shared', id=2)
+    other = S3ImportStorage(project=project, bucket='other', id=3)
+    index = StorageURLIndex([first, other, second])
+
+    assert index.get_storage('s3://shared/1.jpg') is first
+    assert index.get_storage('<img src="s3://other/1.jpg"/>') is other
+    assert index.get_storage('gs://shared/1.jpg') is None
+    assert index.get_storage(['s3://other/1.jpg']) is other
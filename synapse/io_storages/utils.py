@@ -1,6 +1,7 @@
 """This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
 """
 import io
+import itertools
 import json
 import logging
 import re
@@ -242,6 +243,90 @@ def load_tasks_json(blob: str, key: str) -> list[StorageObject]:
     return load_tasks_json_func(blob, key)
 
 
+class ChunkedStream(io.RawIOBase):
+    """Readable binary stream over an iterable of byte chunks (e.g. Azure download chunks)"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            self._buffer = next(self._chunks, None)
+            if self._buffer is None:
+                self._buffer = b''
+                return 0
+        size = min(len(b), len(self._buffer))
+        b[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def _peek_stream(stream, size: int = 64 * 1024):
+    """Return the first non-whitespace byte of a stream and a stream that still starts from the beginning"""
+    head = stream.read(size)
+    chunks = [head]
+    while head and not head.strip():
+        head = stream.read(size)
+        chunks.append(head)
+    first = head.lstrip()[:1]
+    rest = iter(lambda: stream.read(size), b'')
+    return first, io.BufferedReader(ChunkedStream(itertools.chain(chunks, rest)), buffer_size=size)
+
+
+def load_tasks_json_stream_lso(stream, key: str) -> list[StorageObject]:
+    """
+    Parse task JSON(s) from a binary stream without reading the whole object into memory.
+
+    A JSON list is parsed item by item, a JSONL stream line by line; the results
+    are the same as load_tasks_json_lso would return for the full blob.
+
+    Args:
+        stream: Binary file-like object with a read(size) method.
+        key (str): The key of the blob. Used for error messages.
+
+    Returns:
+        list[StorageObject]: link params for each task.
+    """
+
+    def _error_wrapper(exc: Optional[Exception] = None):
+        raise ValueError(
+            (
+                f"Can't import JSON-formatted tasks from {key}. If you're trying to import binary objects, "
+                f'perhaps you forgot to enable "Tasks" import method?'
+            )
+        ) from exc
+
+    import ijson
+
+    try:
+        first, stream = _peek_stream(stream)
+        if first == b'[':
+            return [
+                StorageObject(key=key, task_data=task_data, row_index=row_index)
+                for row_index, task_data in enumerate(ijson.items(stream, 'item', use_float=True))
+            ]
+
+        values = list(ijson.items(stream, '', multiple_values=True, use_float=True))
+    except (ijson.JSONError, UnicodeDecodeError) as e:
+        _error_wrapper(e)
+
+    if len(values) == 1 and isinstance(values[0], dict):
+        return [StorageObject(key=key, task_data=values[0])]
+    if len(values) != 1 and flag_set('fflag_feat_root_11_support_jsonl_cloud_storage'):
+        return StorageObject.bulk_create(values, key, range(len(values)))
+
+    _error_wrapper()
+
+
+def load_tasks_json_stream(stream, key: str) -> list[StorageObject]:
+    load_tasks_json_stream_func = load_func(settings.STORAGE_LOAD_TASKS_JSON_STREAM)
+    return load_tasks_json_stream_func(stream, key)
+
+
 
 
 
@@ -1,8 +1,11 @@
 import logging
 
+from core.models import AsyncMigrationStatus
 from core.permissions import ViewClassPermission, all_permissions
+from core.redis import start_job_async_or_sync
 from django.db.models import CharField, Count, Q
 from django.db.models.functions import Cast
+from django.shortcuts import get_object_or_404
 from django.utils.decorators import method_decorator
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
@@ -17,7 +20,7 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 from webhooks.utils import api_webhook, api_webhook_for_delete
 
-from .functions import bulk_update_label
+from .functions import MIGRATION_NAME, bulk_update_label, run_label_migration
 from .models import Label, LabelLink
 
 logger = logging.getLogger(__name__)
@@ -252,13 +255,75 @@ class LabelBulkUpdateAPI(views.APIView):
         if project is not None:
             self.check_object_permissions(self.request, project)
 
-        updated_count = bulk_update_label(
+        migration = bulk_update_label(
             old_label=serializer.validated_data['old_label'],
             new_label=serializer.validated_data['new_label'],
             organization=self.request.user.active_organization,
             project=project,
         )
-        return Response({'annotations_updated': updated_count})
+        return Response(label_migration_response(migration))
+
+
+def label_migration_response(migration):
+    finished = migration.status == AsyncMigrationStatus.STATUS_FINISHED
+    return {
+        # None while the job is running in the background
+        'annotations_updated': migration.meta['updated']['annotations'] if finished else None,
+        'migration_id': migration.id,
+        'status': migration.status,
+        'updated': migration.meta['updated'],
+        'error': migration.meta.get('error'),
+    }
+
+
+@method_decorator(
+    name='get',
+    decorator=extend_schema(
+        tags=['Labels'],
+        summary='Get bulk label update status',
+        description='Get the progress of a bulk label update started with the bulk update labels endpoint.',
+        extensions={
+            'x-fern-audiences': ['internal'],
+        },
+    ),
+)
+@method_decorator(
+    name='post',
+    decorator=extend_schema(
+        tags=['Labels'],
+        summary='Resume bulk label update',
+        description='Resume a failed bulk label update from its last processed chunk.',
+        extensions={
+            'x-fern-audiences': ['internal'],
+        },
+    ),
+)
+class LabelBulkUpdateStatusAPI(views.APIView):
+    permission_required = ViewClassPermission(
+        GET=all_permissions.labels_view,
+        POST=all_permissions.labels_change,
+    )
+
+    def get_object(self):
+        migration = get_object_or_404(
+            AsyncMigrationStatus,
+            pk=self.kwargs['pk'],
+            name=MIGRATION_NAME,
+            meta__organization_id=self.request.user.active_organization.id,
+        )
+        if migration.project is not None:
+            self.check_object_permissions(self.request, migration.project)
+        return migration
+
+    def get(self, request, pk):
+        return Response(label_migration_response(self.get_object()))
+
+    def post(self, request, pk):
+        migration = self.get_object()
+        if migration.status == AsyncMigrationStatus.STATUS_ERROR:
+            start_job_async_or_sync(run_label_migration, migration.id, queue_name='low')
+            migration.refresh_from_db()
+        return Response(label_migration_response(migration))
 
 
 
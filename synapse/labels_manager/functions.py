@@ -1,39 +1,174 @@
-from django.db import transaction
-from tasks.models import Annotation
+"""
+Renaming labels in saved results.
+
+A label rename can touch every annotation, draft and prediction of an organization, so it runs as a background
+job tracked by an AsyncMigrationStatus record. Results are processed per project and per source in id-ordered
+chunks, each chunk in its own short transaction, so the job never holds locks on a whole table. The last
+processed id is checkpointed in the record meta together with the chunk, and run_label_migration() continues
+from the checkpoint when it is called again for a failed or interrupted migration.
+"""
+
+import logging
+
+from core.models import AsyncMigrationStatus
+from core.redis import start_job_async_or_sync
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from projects.models import Project, ProjectSummary
+from tasks.models import Annotation, AnnotationDraft, Prediction
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_NAME = 'bulk_update_label'
+CHUNK_SIZE = getattr(settings, 'BULK_UPDATE_LABEL_CHUNK_SIZE', 1000)
+
+# source name => (model, project lookup, ProjectSummary field with label counters)
+SOURCES = {
+    'annotations': (Annotation, 'project_id', 'created_labels'),
+    'drafts': (AnnotationDraft, 'task__project_id', 'created_labels_drafts'),
+    'predictions': (Prediction, 'project_id', None),
+}
 
 
 def bulk_update_label(old_label, new_label, organization, project=None):
-    annotations = Annotation.objects.filter(project__organization=organization)
-    if project is not None:
-        annotations = annotations.filter(project=project)
+    """Start renaming old_label to new_label in the results of the organization or of one project
+
+    Returns:
+        AsyncMigrationStatus of the job, finished already when the job runs synchronously
+    """
+    migration = AsyncMigrationStatus.objects.create(
+        name=MIGRATION_NAME,
+        project=project,
+        status=AsyncMigrationStatus.STATUS_SCHEDULED,
+        meta={
+            'organization_id': organization.id,
+            'old_label': old_label,
+            'new_label': new_label,
+            'checkpoint': None,
+            'updated': {source: 0 for source in SOURCES},
+        },
+    )
+    start_job_async_or_sync(run_label_migration, migration.id, queue_name='low')
+    migration.refresh_from_db()
+    return migration
+
+
+def run_label_migration(migration_id):
+    """Run or resume a label rename started by bulk_update_label()"""
+    migration = AsyncMigrationStatus.objects.get(id=migration_id, name=MIGRATION_NAME)
+    if migration.status == AsyncMigrationStatus.STATUS_FINISHED:
+        return migration
+
+    migration.status = AsyncMigrationStatus.STATUS_IN_PROGRESS
+    migration.save(update_fields=['status'])
+    try:
+        _run_label_migration(migration)
+    except Exception as e:
+        logger.error(f'Label migration {migration.id} failed: {e}', exc_info=True)
+        migration.status = AsyncMigrationStatus.STATUS_ERROR
+        migration.meta['error'] = str(e)
+        migration.save(update_fields=['status', 'meta'])
+        raise
+
+    migration.status = AsyncMigrationStatus.STATUS_FINISHED
+    migration.meta.pop('error', None)
+    migration.save(update_fields=['status', 'meta'])
+    logger.info(f'Label migration {migration.id} finished: {migration.meta["updated"]}')
+    return migration
+
+
+def _run_label_migration(migration):
+    meta = migration.meta
+    projects = Project.objects.filter(organization_id=meta['organization_id'])
+    if migration.project_id is not None:
+        projects = projects.filter(id=migration.project_id)
+
+    checkpoint = meta.get('checkpoint') or {}
+    if checkpoint:
+        projects = projects.filter(id__gte=checkpoint['project_id'])
+
+    sources = list(SOURCES)
+    for project in projects.order_by('id'):
+        resume = checkpoint.get('project_id') == project.id
+        result_types = _get_result_types(project)
+        start = sources.index(checkpoint['source']) if resume else 0
+        for source in sources[start:]:
+            last_id = checkpoint['last_id'] if resume and source == checkpoint['source'] else 0
+            _migrate_source(migration, project, source, result_types, last_id)
+
+
+def _get_result_types(project):
+    """Region types that can hold labels in the project results"""
+    types = {tag['type'].lower() for tag in project.get_parsed_config().values() if tag.get('type')}
+    summary = ProjectSummary.objects.filter(project=project).first()
+    if summary is not None:
+        types.update(key.rsplit('|', 1)[-1] for key in summary.created_annotations or {})
+    return types
+
+
+def _label_filter(result_types, old_label):
+    """JSON containment filter matching the results with old_label, a superset of the affected rows"""
+    condition = Q()
+    for result_type in result_types:
+        condition |= Q(result__contains=[{'type': result_type, 'value': {result_type: old_label}}])
+    return condition
+
+
+def _rename_label(result, old_label, new_label):
+    """Rename old_label in the regions of one result, returns the number of renamed regions"""
+    renamed = 0
+    if not isinstance(result, list):
+        return renamed
+    for region in result:
+        result_type = region.get('type')
+        value = region.get('value')
+        if result_type is None or not isinstance(value, dict):
+            continue
+        if value.get(result_type) == old_label:
+            value[result_type] = new_label
+            renamed += 1
+    return renamed
 
-    updated_count = 0
-    with transaction.atomic():
-        update_annotations = []
-        for annotation in annotations.only('result').all():
-            result = annotation.result
 
-            updated_result = []
-            need_update = False
-            for region in result:
-                result_type = region.get('type')
-                if result_type is not None:
-                    label = region['value'].get(result_type)
-                    if label is not None and label == old_label:
-                        region['value'][result_type] = new_label
-                        updated_count += 1
-                        need_update = True
-                updated_result.append(region)
+def _migrate_source(migration, project, source, result_types, last_id):
+    model, project_lookup, summary_field = SOURCES[source]
+    old_label, new_label = migration.meta['old_label'], migration.meta['new_label']
 
-            if need_update:
-                annotation.result = updated_result
-                update_annotations.append(annotation)
+    queryset = model.objects.filter(**{project_lookup: project.id})
+    if connection.vendor == 'postgresql':
+        if not result_types:
+            return
+        queryset = queryset.filter(_label_filter(result_types, old_label))
 
-        if update_annotations:
-            Annotation.objects.bulk_update(update_annotations, ['result'])
-    return updated_count
+    while True:
+        ids = list(queryset.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:CHUNK_SIZE])
+        if not ids:
+            break
 
+        with transaction.atomic():
+            objects = list(model.objects.select_for_update().filter(id__in=ids).only('id', 'result'))
+            summary = ProjectSummary.objects.filter(project=project).first() if summary_field else None
 
+            updated, renamed, labels_counts = [], 0, {}
+            for obj in objects:
+                if summary is not None and isinstance(obj.result, list):
+                    summary._count_labels(obj.result, labels_counts, -1)
+                count = _rename_label(obj.result, old_label, new_label)
+                if count:
+                    updated.append(obj)
+                    renamed += count
+                if summary is not None and isinstance(obj.result, list):
+                    summary._count_labels(obj.result, labels_counts, 1)
 
+            if updated:
+                model.objects.bulk_update(updated, ['result'], batch_size=CHUNK_SIZE)
+            if summary is not None:
+                summary._add_deltas(summary_field, {key: delta for key, delta in labels_counts.items() if delta})
 
+            last_id = ids[-1]
+            migration.meta['updated'][source] += renamed
+            migration.meta['checkpoint'] = {'project_id': project.id, 'source': source, 'last_id': last_id}
+            migration.save(update_fields=['meta', 'updated_at'])
 
+        logger.debug(f'Label migration {migration.id}: project {project.id} {source} up to id {last_id}')
@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+import pytest
+from core.models import AsyncMigrationStatus
+from labels_manager.functions import bulk_update_label, run_label_migration
+from projects.models import ProjectSummary
+from projects.tests.factories import ProjectFactory
+from tasks.models import Annotation
+from tasks.tests.factories import AnnotationFactory, TaskFactory
+
+pytestmark = pytest.mark.django_db
+
+LABEL_CONFIG = """
+<View>
+  <Text name="text" value="$text"/>
+  <Choices name="label" toName="text">
+    <Choice value="pos"/>
+    <Choice value="neg"/>
+  </Choices>
+</View>
+"""
+
+
+def _result(label):
+    return [{'from_name': 'label', 'to_name': 'text', 'type': 'choices', 'value': {'choices': label}}]
+
+
+@pytest.fixture
+def project():
+    project = ProjectFactory(label_config=LABEL_CONFIG)
+    for label in (['pos'], ['neg'], ['pos']):
+        task = TaskFactory(project=project, data={'text': 'text'})
+        AnnotationFactory(task=task, project=project, result=_result(label))
+    return project
+
+
+@patch('core.redis.redis_connected', return_value=False)
+def test_bulk_update_label_in_chunks(_, project):
+    with patch('labels_manager.functions.CHUNK_SIZE', 1):
+        migration = bulk_update_label(['pos'], ['neutral'], project.organization, project=project)
+
+    assert migration.status == AsyncMigrationStatus.STATUS_FINISHED
+    assert migration.meta['updated'] == {'annotations': 2, 'drafts': 0, 'predictions': 0}
+    labels = sorted(a.result[0]['value']['choices'][0] for a in Annotation.objects.filter(project=project))
+    assert labels == ['neg', 'neutral', 'neutral']
+    assert ProjectSummary.objects.get(pk=project.pk).created_labels == {'label': {'neg': 1, 'neutral': 2}}
+
+
+@patch('core.redis.redis_connected', return_value=False)
+def test_label_migration_resumes_from_checkpoint(_, project):
+    first = Annotation.objects.filter(project=project).order_by('id').first()
+    migration = AsyncMigrationStatus.objects.create(
+        name='bulk_update_label',
+        project=project,
+        status=AsyncMigrationStatus.STATUS_ERROR,
+        meta={
+            'organization_id': project.organization_id,
+            'old_label': ['pos'],
+            'new_label': ['neutral'],
+            'checkpoint': {'project_id': project.id, 'source': 'annotations', 'last_id': first.id},
+            'updated': {'annotations': 0, 'drafts': 0, 'predictions': 0},
+        },
+    )
+
+    run_label_migration(migration.id)
+
+    first.refresh_from_db()
+    assert first.result[0]['value']['choices'] == ['pos']
+    migration.refresh_from_db()
+    assert migration.status == AsyncMigrationStatus.STATUS_FINISHED
+    assert migration.meta['updated']['annotations'] == 1
@@ -13,6 +13,7 @@ api_urlpatterns = router.urls
 urlpatterns = [
     path('api/', include((api_urlpatterns, app_name), namespace='api-labels')),
     path('api/labels/bulk', api.LabelBulkUpdateAPI.as_view(), name='api-labels-bulk'),
+    path('api/labels/bulk/<int:pk>', api.LabelBulkUpdateStatusAPI.as_view(), name='api-labels-bulk-status'),
 ]
 
 
@@ -20,6 +20,8 @@ from django.db.models import (
     When,
 )
 from django.db.models.fields import DecimalField
+from projects.functions import next_task_queue
+from projects.functions.next_task_queue import NextTaskQueue
 from projects.functions.stream_history import add_stream_history
 from projects.models import Project
 from tasks.models import Annotation, Task
@@ -311,6 +313,7 @@ def get_next_task_without_dm_queue(
     assigned_flag: Union[bool, None],
     prioritized_low_agreement: bool,
     allow_gt_first: bool,
+    use_next_task_queue: bool = False,
 ) -> Tuple[Union[Task, None], bool, str]:
     next_task = None
     use_task_lock = True
@@ -331,6 +334,16 @@ def get_next_task_without_dm_queue(
             use_task_lock = False
             queue_info += (" & " if queue_info else "") + "Task lock"
 
+    # Precomputed queue: covers ground truth, breadth first, overlap first and sampling
+    if not next_task and use_next_task_queue:
+        logger.debug(f"User={user} tries next task queue")
+        next_task = NextTaskQueue(project, user, allow_gt_first).get_next_task(
+            not_solved_tasks
+        )
+        if next_task:
+            queue_info += (" & " if queue_info else "") + "Next task queue"
+        return next_task, use_task_lock, queue_info
+
     # Ground truth: use precomputed gating for GT-first
     if not next_task and allow_gt_first:
         logger.debug(f"User={user} tries ground truth from prepared tasks")
@@ -511,6 +524,13 @@ def get_next_task(
             except Exception as e:
                 logger.warning(f"Honeypot injection failed for user={user}: {e}")
 
+        use_next_task_queue = (
+            not dm_queue
+            and not assigned_flag
+            and not prioritized_low_agreement
+            and next_task_queue.is_enabled()
+        )
+
         if not dm_queue:
             next_task, use_task_lock, queue_info = get_next_task_without_dm_queue(
                 user,
@@ -519,11 +539,12 @@ def get_next_task(
                 assigned_flag,
                 prioritized_low_agreement,
                 allow_gt_first,
+                use_next_task_queue=use_next_task_queue,
             )
 
         if flag_set("fflag_fix_back_lsdv_4523_show_overlap_first_order_27022023_short"):
             # show tasks with overlap > 1 first
-            if not next_task and project.show_overlap_first:
+            if not next_task and project.show_overlap_first and not use_next_task_queue:
                 # don't output anything - just filter tasks with overlap
                 logger.debug(f"User={user} tries overlap first from prepared tasks")
                 _, tasks_with_overlap = _try_tasks_with_overlap(not_solved_tasks)
@@ -537,7 +558,7 @@ def get_next_task(
                     queue_info,
                 )
 
-        if not next_task:
+        if not next_task and not use_next_task_queue:
             if dm_queue:
                 queue_info += (" & " if queue_info else "") + "Data manager queue"
                 logger.debug(f"User={user} tries sequence sampling from prepared tasks")
@@ -0,0 +1,262 @@
+"""
+Precomputed next-task queues.
+
+get_next_task() normally samples the candidate queryset on every request:
+ORDER BY random() for uniform sampling, aggregated annotation counts for
+breadth first and Exists() for ground truth first. With NEXT_TASK_QUEUE
+enabled the candidates of a (project, annotator) pair are ordered once and
+kept in a Redis sorted set, and serving the next task pops the best ones:
+
+- ground truth tasks first (when GT-first is allowed), then tasks with
+  overlap > 1 (show overlap first), then tasks with the most annotations
+  (breadth first)
+- within these bands, tasks keep the order of the project sampling:
+  queryset order for sequence, random for uniform, lowest prediction score
+  of the task for uncertainty
+
+Popped candidates are checked against the candidate queryset by primary key
+and claimed with the usual row lock, so tasks solved or locked by others in
+the meantime are skipped. Candidates locked by others go back to the queue
+and are served again once their lock expires. Saving an annotation removes
+the task from the annotator's queue. A queue is rebuilt when it runs empty,
+after NEXT_TASK_QUEUE_TTL, or when the candidate query or the project
+sampling settings change.
+"""
+
+import hashlib
+import logging
+from typing import List, Tuple, Union
+
+from core.redis import redis_connected
+from django.conf import settings
+from django.core.exceptions import EmptyResultSet
+from django.db.models import (
+    BooleanField,
+    Count,
+    Exists,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+)
+from django.db.models.functions import Coalesce
+from django_rq import get_connection
+from tasks.models import Annotation, Prediction, Task
+
+logger = logging.getLogger(__name__)
+
+# Redis keys
+KEY_PREFIX = getattr(settings, "NEXT_TASK_QUEUE_KEY_PREFIX", "next_task_queue")
+
+# candidates popped and checked against the database at once
+POP_BATCH_SIZE = 10
+
+
+def is_enabled() -> bool:
+    return settings.NEXT_TASK_QUEUE and redis_connected()
+
+
+def queue_key(project_id: int, user_id: int) -> str:
+    return f"{KEY_PREFIX}:{project_id}:{user_id}"
+
+
+def discard_task(project_id: int, user_id: int, task_id: int) -> None:
+    """Remove a task from the annotator's queue, e.g. when they annotated it"""
+    get_connection().zrem(queue_key(project_id, user_id), task_id)
+
+
+def reset_project(project_id: int) -> None:
+    """Rebuild all queues of a project on their next use, e.g. after new tasks are imported"""
+    redis_client = get_connection()
+    keys = list(redis_client.scan_iter(match=f"{KEY_PREFIX}:{project_id}:*"))
+    if keys:
+        redis_client.delete(*keys)
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class NextTaskQueue:
+    """
+    Candidate queue of one annotator in one project.
+
+    Usage:
+        next_task = NextTaskQueue(project, user, allow_gt_first).get_next_task(not_solved_tasks)
+    """
+
+    def __init__(self, project, user, allow_gt_first: bool = False):
+        self.project = project
+        self.user = user
+        self.allow_gt_first = allow_gt_first
+        self.key = queue_key(project.id, user.id)
+        self.signature_key = f"{self.key}:signature"
+        self.redis = get_connection()
+
+    def _signature(self, tasks: QuerySet[Task]) -> str:
+        """Identifies the candidate query and the settings the queue was ordered by"""
+        sql, params = tasks.query.sql_with_params()
+        project = self.project
+        options = (
+            project.sampling,
+            project.show_overlap_first,
+            project.show_ground_truth_first,
+            project.maximum_annotations,
+            self.allow_gt_first,
+        )
+        return hashlib.sha1(repr((sql, params, options)).encode()).hexdigest()
+
+    def _ordered_candidates(self, tasks: QuerySet[Task]) -> QuerySet:
+        project = self.project
+        bands = []
+
+        if self.allow_gt_first:
+            ground_truth = Annotation.objects.filter(
+                task=OuterRef("pk"), ground_truth=True
+            )
+            tasks = tasks.annotate(_queue_ground_truth=Exists(ground_truth))
+            bands.append(F("_queue_ground_truth").desc())
+
+        if project.show_overlap_first:
+            tasks = tasks.annotate(
+                _queue_overlap=ExpressionWrapper(
+                    Q(overlap__gt=1), output_field=BooleanField()
+                )
+            )
+            bands.append(F("_queue_overlap").desc())
+
+        if project.maximum_annotations > 1:
+            # breadth first: same count as _try_breadth_first(), as a subquery so it
+            # doesn't multiply joins of an already annotated candidate queryset
+            annotations = Annotation.objects.filter(task=OuterRef("pk")).exclude(
+                completed_by=self.user
+            )
+            if not project.show_ground_truth_first:
+                annotations = annotations.exclude(ground_truth=True)
+            annotations_count = (
+                annotations.order_by()
+                .values("task")
+                .annotate(count=Count("id"))
+                .values("count")
+            )
+            tasks = tasks.annotate(
+                _queue_annotations=Coalesce(Subquery(annotations_count), 0)
+            )
+            bands.append(F("_queue_annotations").desc())
+
+        if project.sampling == project.SEQUENCE:
+            order = list(tasks.query.order_by) or list(Task._meta.ordering) or ["id"]
+        elif project.sampling == project.UNCERTAINTY:
+            # projects don't pin a model version, the lowest score of any prediction counts
+            score = (
+                Prediction.objects.filter(task=OuterRef("pk"))
+                .order_by("score")
+                .values("score")[:1]
+            )
+            tasks = tasks.annotate(_queue_score=Subquery(score))
+            order = [F("_queue_score").asc(nulls_last=True), "?"]
+        else:
+            order = ["?"]
+
+        return tasks.order_by(*bands, *order).values_list("id", flat=True)[
+            : settings.NEXT_TASK_QUEUE_SIZE
+        ]
+
+    def _fill(self, tasks: QuerySet[Task], signature: str) -> int:
+        task_ids = list(self._ordered_candidates(tasks))
+        logger.debug(
+            f"Next task queue for user={self.user.id} project={self.project.id} "
+            f"filled with {len(task_ids)} tasks"
+        )
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(self.key)
+        if task_ids:
+            pipe.zadd(
+                self.key,
+                {task_id: position for position, task_id in enumerate(task_ids)},
+            )
+            pipe.expire(self.key, settings.NEXT_TASK_QUEUE_TTL)
+        pipe.set(self.signature_key, signature, ex=settings.NEXT_TASK_QUEUE_TTL)
+        pipe.execute()
+        return len(task_ids)
+
+    def _push_back(self, candidates: List[Tuple[int, float]]) -> None:
+        if candidates:
+            self.redis.zadd(self.key, dict(candidates))
+
+    def _claim(
+        self,
+        tasks: QuerySet[Task],
+        candidates: List[Tuple[int, float]],
+        locked: List[Tuple[int, float]],
+    ) -> Union[Task, None]:
+        """Lock the first candidate that is still unsolved and not locked by others"""
+        valid_ids = set(
+            tasks.filter(pk__in=[task_id for task_id, _ in candidates]).values_list(
+                "id", flat=True
+            )
+        )
+        for position, (task_id, score) in enumerate(candidates):
+            # solved by this user, labeled or removed since the queue was filled
+            if task_id not in valid_ids:
+                continue
+
+            try:
+                task = Task.objects.select_for_update(skip_locked=True).get(pk=task_id)
+            except Task.DoesNotExist:
+                logger.debug("Task with id {} locked".format(task_id))
+                locked.append((task_id, score))
+                continue
+
+            if task.has_lock(self.user):
+                locked.append((task_id, score))
+                continue
+
+            self._push_back(candidates[position + 1 :])
+            return task
+
+    def get_next_task(self, tasks: QuerySet[Task]) -> Union[Task, None]:
+        """
+        Claim the next task from the queue, ordering `tasks` into a new queue when needed.
+
+        Args:
+            tasks: Candidate tasks of the user (not solved, not postponed)
+
+        Returns:
+            Task or None if no candidate is available
+        """
+        try:
+            signature = self._signature(tasks)
+        except EmptyResultSet:
+            return None
+
+        filled = False
+        if _decode(self.redis.get(self.signature_key)) != signature:
+            self._fill(tasks, signature)
+            filled = True
+
+        # tasks locked by others are kept out of the queue until the end of the
+        # call, so each candidate is checked at most once per fill
+        locked = []
+        try:
+            while True:
+                candidates = [
+                    (int(_decode(task_id)), score)
+                    for task_id, score in self.redis.zpopmin(self.key, POP_BATCH_SIZE)
+                ]
+                if not candidates:
+                    if filled:
+                        return None
+                    self._fill(tasks, signature)
+                    filled = True
+                    continue
+
+                task = self._claim(tasks, candidates, locked)
+                if task is not None:
+                    return task
+        finally:
+            # served again once their locks expire
+            self._push_back(locked)
@@ -1,6 +1,7 @@
 from logging import getLogger
 from typing import TYPE_CHECKING
 
+from django.conf import settings
 from django.db.models import QuerySet
 from tasks.models import AnnotationDraft, Task
 
@@ -95,14 +96,9 @@ def recalculate_created_annotations_and_labels_from_scratch(
     """
     logger.info(f'Reset cache started for project {project.id} and organization {organization_id}')
     logger.info(f'recalculate_created_annotations_and_labels_from_scratch project_id={project.id}')
-    summary.all_data_columns = {}
-    summary.common_data_columns = []
+    summary.reset(tasks_data_based=True)
     summary.update_data_columns(project.tasks.only('data'))
-
-    summary.created_labels, summary.created_annotations = {}, {}
     summary.update_created_annotations_and_labels(project.annotations.all())
-
-    summary.created_labels_drafts = {}
     drafts = AnnotationDraft.objects.filter(task__project=project)
     summary.update_created_labels_drafts(drafts)
 
@@ -114,6 +110,66 @@ def recalculate_created_annotations_and_labels_from_scratch(
     )
 
 
+def _summary_compaction_key(project_id: int) -> str:
+    return f'project_summary:compact_scheduled:{project_id}'
+
+
+def schedule_project_summary_compaction(project_id: int) -> None:
+    """
+    Fold pending ProjectSummaryDelta rows into the summary soon.
+
+    With Redis a compaction job is enqueued unless one is already pending for
+    the project. The summary is compacted in place once
+    PROJECT_SUMMARY_COMPACT_THRESHOLD deltas are pending, either without Redis
+    or while the pending job has not run yet (workers behind or down), so
+    ProjectSummary.from_db never has to merge an unbounded number of deltas.
+    """
+    from core.redis import redis_connected, start_job_async_or_sync
+
+    if redis_connected():
+        from django_rq import get_connection
+
+        scheduled_key = _summary_compaction_key(project_id)
+        ttl = getattr(settings, 'PROJECT_SUMMARY_COMPACT_SCHEDULED_TTL', 300)
+        if get_connection().set(scheduled_key, 1, nx=True, ex=ttl):
+            try:
+                start_job_async_or_sync(compact_project_summary, project_id, queue_name='low')
+                return
+            except Exception as e:
+                get_connection().delete(scheduled_key)
+                logger.error(f'Failed to schedule project summary compaction for project {project_id}: {e}')
+
+    from projects.models import ProjectSummaryDelta
+
+    threshold = getattr(settings, 'PROJECT_SUMMARY_COMPACT_THRESHOLD', 500)
+    if ProjectSummaryDelta.objects.filter(project_id=project_id).count() >= threshold:
+        compact_project_summary(project_id)
+
+
+def compact_project_summary(project_id: int) -> None:
+    from core.redis import redis_connected
+    from projects.models import ProjectSummary
+
+    if redis_connected():
+        from django_rq import get_connection
+
+        # deltas written from now on schedule another compaction
+        get_connection().delete(_summary_compaction_key(project_id))
+
+    summary = ProjectSummary.objects.filter(pk=project_id).only('pk').first()
+    if summary is not None:
+        summary.compact()
 
 
+def recompute_project_payload_stats(project_id: int) -> None:
+    from projects.models import ProjectPayloadStats
 
+    stats = ProjectPayloadStats.objects.filter(pk=project_id).first()
+    if stats is None:
+        return
+    try:
+        stats.recompute()
+    except Exception:
+        # statistics that were never computed are scheduled again on the next use
+        ProjectPayloadStats.objects.filter(pk=project_id, computed_at__isnull=True).delete()
+        raise
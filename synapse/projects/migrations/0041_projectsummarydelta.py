@@ -0,0 +1,34 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0040_project_expertise_requirements'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectSummaryDelta',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(help_text='ProjectSummary counter field', max_length=32, verbose_name='field')),
+                ('key', models.TextField(help_text='Data column, annotation type or from_name', verbose_name='key')),
+                (
+                    'label',
+                    models.TextField(blank=True, help_text='Label for labels counters', null=True, verbose_name='label'),
+                ),
+                ('delta', models.IntegerField(help_text='Change of the counter', verbose_name='delta')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Creation time', verbose_name='created at')),
+                (
+                    'project',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='summary_deltas',
+                        to='projects.project',
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-16 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0041_projectsummarydelta"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="projectimport",
+            name="skip_duplicates",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,89 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0042_projectimport_skip_duplicates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectPayloadStats',
+            fields=[
+                (
+                    'project',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name='payload_stats',
+                        serialize=False,
+                        to='projects.project',
+                    ),
+                ),
+                (
+                    'task_data_max',
+                    models.BigIntegerField(default=0, help_text='Largest task data, bytes', verbose_name='task data max'),
+                ),
+                (
+                    'task_data_p95',
+                    models.BigIntegerField(
+                        default=0,
+                        help_text='95th percentile of task data size at the last recomputation, bytes',
+                        verbose_name='task data p95',
+                    ),
+                ),
+                (
+                    'task_data_total',
+                    models.BigIntegerField(
+                        default=0, help_text='Sum of task data sizes, bytes', verbose_name='task data total'
+                    ),
+                ),
+                (
+                    'task_data_count',
+                    models.BigIntegerField(default=0, help_text='Number of measured tasks', verbose_name='task data count'),
+                ),
+                (
+                    'annotation_result_max',
+                    models.BigIntegerField(
+                        default=0, help_text='Largest annotation result, bytes', verbose_name='annotation result max'
+                    ),
+                ),
+                (
+                    'annotation_result_p95',
+                    models.BigIntegerField(
+                        default=0,
+                        help_text='95th percentile of annotation result size at the last recomputation, bytes',
+                        verbose_name='annotation result p95',
+                    ),
+                ),
+                (
+                    'annotation_result_total',
+                    models.BigIntegerField(
+                        default=0,
+                        help_text='Sum of annotation result sizes, bytes',
+                        verbose_name='annotation result total',
+                    ),
+                ),
+                (
+                    'annotation_result_count',
+                    models.BigIntegerField(
+                        default=0, help_text='Number of measured annotations', verbose_name='annotation result count'
+                    ),
+                ),
+                (
+                    'computed_count',
+                    models.BigIntegerField(
+                        default=0,
+                        help_text='Number of tasks and annotations at the last recomputation',
+                        verbose_name='computed count',
+                    ),
+                ),
+                (
+                    'computed_at',
+                    models.DateTimeField(help_text='Time of the last recomputation', null=True, verbose_name='computed at'),
+                ),
+            ],
+        ),
+    ]
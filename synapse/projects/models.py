@@ -35,6 +35,7 @@ from django.db.models import (
     BooleanField,
     Case,
     Count,
+    F,
     GeneratedField,
     JSONField,
     Max,
@@ -44,6 +45,8 @@ from django.db.models import (
     When,
 )
 from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Greatest, Length
+from django.utils import timezone
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from fsm.models import FsmHistoryStateModel
@@ -1368,6 +1371,12 @@ class Project(ProjectMixin, FsmHistoryStateModel):
 
         return storage_objects
 
+    @cached_property
+    def import_storage_index(self):
+        from io_storages.functions import StorageURLIndex
+
+        return StorageURLIndex(self.get_all_import_storage_objects)
+
     @cached_property
     def get_all_export_storage_objects(self):
         from io_storages.models import get_storage_classes
@@ -1394,20 +1403,21 @@ class Project(ProjectMixin, FsmHistoryStateModel):
         return values
 
     def resolve_storage_uri(self, url: str) -> Optional[Mapping[str, Any]]:
-        from io_storages.functions import get_storage_by_url
+        from io_storages.presign_cache import get_presigned_url
 
-        storage_objects = self.get_all_import_storage_objects
-        storage = get_storage_by_url(url, storage_objects)
+        storage = self.import_storage_index.get_storage(url)
 
         if storage:
+            http_url, ttl = get_presigned_url(storage, url)
             return {
-                "url": storage.generate_http_url(url),
-                "presign_ttl": storage.presign_ttl,
+                "url": http_url,
+                # minutes the URL stays valid, a cached URL has less left than storage.presign_ttl
+                "presign_ttl": ttl // 60 if ttl else storage.presign_ttl,
             }
 
     def _update_tasks_counters_and_is_labeled(self, task_ids, from_scratch=True):
         """
-        Update tasks counters and is_labeled in batches of size settings.BATCH_SIZE.
+        Update tasks counters and is_labeled in batches of get_task_batch_size() tasks.
         :param task_ids: List of task ids to be updated
         :param from_scratch: Skip calculated tasks
         :return: Count of updated tasks
@@ -1416,9 +1426,10 @@ class Project(ProjectMixin, FsmHistoryStateModel):
 
         num_tasks_updated = 0
         page_idx = 0
+        batch_size = self.get_task_batch_size()
 
         while task_ids_slice := task_ids[
-            page_idx * settings.BATCH_SIZE : (page_idx + 1) * settings.BATCH_SIZE
+            page_idx * batch_size : (page_idx + 1) * batch_size
         ]:
             with transaction.atomic():
                 # If counters are updated, is_labeled must be updated as well. Hence, if either fails, we
@@ -1459,32 +1470,18 @@ class Project(ProjectMixin, FsmHistoryStateModel):
 
         return objs
 
+    def get_payload_stats(self):
+        """Payload size statistics, see ProjectPayloadStats, None until first computed"""
+        return ProjectPayloadStats.for_project(self)
+
     def get_max_annotation_result_size(self):
         """Get the maximum annotation result size for this project"""
         # For SQLite, return 0 (no annotations to consider)
         if settings.DJANGO_DB == settings.DJANGO_DB_SQLITE:
             return 0
 
-        # Using raw SQL to ensure we use the specific index annotation_proj_result_octlen_idx
-        # which is optimized for this query pattern (project_id, octet_length DESC)
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT id,
-                       octet_length(result::text) AS bytes
-                FROM   task_completion
-                WHERE  project_id = %s
-                ORDER  BY octet_length(result::text) DESC
-                LIMIT  1
-            """,
-                [self.id],
-            )
-
-            row = cursor.fetchone()
-            if not row or not row[1]:
-                return 0
-
-            return row[1]
+        stats = self.get_payload_stats()
+        return stats.annotation_result_max if stats is not None else 0
 
     def get_task_batch_size(self):
         """Calculate optimal batch size based on task data size and annotation result size"""
@@ -1492,27 +1489,13 @@ class Project(ProjectMixin, FsmHistoryStateModel):
         if settings.DJANGO_DB == settings.DJANGO_DB_SQLITE:
             return settings.MAX_TASK_BATCH_SIZE
 
-        # Get maximum task data size using the optimized index
-        max_task_size = 0
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT id,
-                       octet_length(data::text) AS bytes
-                FROM   task
-                WHERE  project_id = %s
-                ORDER  BY octet_length(data::text) DESC
-                LIMIT  1
-            """,
-                [self.id],
-            )
-
-            row = cursor.fetchone()
-            if row and row[1]:
-                max_task_size = row[1]
-
-        # Get maximum annotation result size using the new optimized index
-        max_annotation_size = self.get_max_annotation_result_size()
+        # Sizes come from the cached statistics, not from the task tables
+        stats = self.get_payload_stats()
+        if stats is None:
+            # the statistics are computed in the background on first use
+            return settings.BATCH_SIZE
+        max_task_size = stats.task_data_max
+        max_annotation_size = stats.annotation_result_max
 
         # Use the larger of the two sizes for batch calculation
         max_data_size = max(max_task_size, max_annotation_size)
@@ -1656,6 +1639,24 @@ class ProjectMember(models.Model):
 
 
 class ProjectSummary(models.Model):
+    """
+    Counters of data columns, annotation types and labels of a project.
+
+    Writers don't rewrite the counter fields: they append ProjectSummaryDelta
+    rows, so concurrent annotation saves never wait for or overwrite each
+    other. Loading a summary merges the pending deltas into its fields, and
+    compact() folds them into the row under a row lock, scheduled after
+    writes (see projects.functions.utils.schedule_project_summary_compaction).
+    """
+
+    DELTA_FIELDS = (
+        "all_data_columns",
+        "created_annotations",
+        "created_labels",
+        "created_labels_drafts",
+    )
+    # { key: { label: count } } fields, the others are { key: count }
+    NESTED_DELTA_FIELDS = ("created_labels", "created_labels_drafts")
 
     project = AutoOneToOneField(
         Project, primary_key=True, on_delete=models.CASCADE, related_name="summary"
@@ -1696,22 +1697,123 @@ class ProjectSummary(models.Model):
         help_text="Unique drafts labels",
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(field in field_names for field in cls.DELTA_FIELDS):
+            instance._merge_pending_deltas()
+        return instance
+
+    @cached_property
+    def _folded_deltas(self):
+        """{delta id: field} of deltas included in the fields of this instance"""
+        return {}
+
+    def _merge_pending_deltas(self):
+        """Apply deltas not compacted yet, a save of the merged fields removes them"""
+        deltas = ProjectSummaryDelta.objects.filter(project_id=self.project_id)
+        for delta_id, field, key, label, delta in deltas.order_by("id").values_list(
+            "id", "field", "key", "label", "delta"
+        ):
+            self._apply_delta(field, key, label, delta)
+            self._folded_deltas[delta_id] = field
+
+    def _forget_folded_deltas(self, fields):
+        for delta_id, field in list(self._folded_deltas.items()):
+            if field in fields:
+                del self._folded_deltas[delta_id]
+
+    def _apply_delta(self, field, key, label, delta):
+        values = getattr(self, field) or {}
+        if field in self.NESTED_DELTA_FIELDS:
+            labels = values.setdefault(key, {})
+            if label is not None:
+                labels[label] = labels.get(label, 0) + delta
+                if labels[label] <= 0:
+                    labels.pop(label)
+                if not labels and delta < 0:
+                    values.pop(key)
+        else:
+            values[key] = values.get(key, 0) + delta
+            if values[key] <= 0:
+                values.pop(key)
+        setattr(self, field, values)
+
+    def _add_deltas(self, field, counts):
+        """
+        Record counter changes of one field.
+
+        Args:
+            field: One of DELTA_FIELDS
+            counts: {key: delta} or, for nested fields, {(key, label or None): delta}
+        """
+        if not counts:
+            return
+        deltas = []
+        for key, delta in counts.items():
+            key, label = key if field in self.NESTED_DELTA_FIELDS else (key, None)
+            deltas.append(
+                ProjectSummaryDelta(
+                    project_id=self.project_id,
+                    field=field,
+                    key=key,
+                    label=label,
+                    delta=delta,
+                )
+            )
+        deltas = ProjectSummaryDelta.objects.bulk_create(deltas)
+
+        # keep this instance consistent with what readers will see
+        for delta in deltas:
+            self._apply_delta(delta.field, delta.key, delta.label, delta.delta)
+            if delta.id is not None:
+                self._folded_deltas[delta.id] = delta.field
+
+        from projects.functions.utils import schedule_project_summary_compaction
+
+        schedule_project_summary_compaction(self.project_id)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not set(update_fields) & set(
+            self.DELTA_FIELDS
+        ):
+            return super().save(*args, **kwargs)
+
+        # the saved fields include the merged deltas, so they must not be applied again
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            saved_fields = self.DELTA_FIELDS if update_fields is None else update_fields
+            folded_ids = [
+                delta_id
+                for delta_id, field in self._folded_deltas.items()
+                if field in saved_fields
+            ]
+            if folded_ids:
+                ProjectSummaryDelta.objects.filter(id__in=folded_ids).delete()
+                self._forget_folded_deltas(saved_fields)
+
+    def compact(self):
+        """Fold pending deltas into the counter fields"""
+        with transaction.atomic():
+            # loading merges the committed deltas, the row lock serializes compactions
+            summary = ProjectSummary.objects.select_for_update().get(pk=self.pk)
+            if summary._folded_deltas:
+                summary.save(update_fields=list(self.DELTA_FIELDS))
+
     def has_permission(self, user):
         user.project = self.project  # link for activity log
         return self.project.has_permission(user)
 
     def reset(self, tasks_data_based=True):
+        fields = ["created_annotations", "created_labels", "created_labels_drafts"]
         if tasks_data_based:
-            self.all_data_columns = {}
-            self.common_data_columns = []
-        self.created_annotations = {}
-        self.created_labels = {}
-        self.created_labels_drafts = {}
-        self.save()
+            fields += ["all_data_columns", "common_data_columns"]
+        self._reset_fields(fields)
 
     def update_data_columns(self, tasks):
         common_data_columns = set()
-        all_data_columns = dict(self.all_data_columns)
+        counts = {}
         for task in tasks:
             try:
                 task_data = get_attr_or_item(task, "data")
@@ -1719,34 +1821,31 @@ class ProjectSummary(models.Model):
                 task_data = task
             task_data_keys = task_data.keys()
             for column in task_data_keys:
-                all_data_columns[column] = all_data_columns.get(column, 0) + 1
+                counts[column] = counts.get(column, 0) + 1
             if not common_data_columns:
                 common_data_columns = set(task_data_keys)
             else:
                 common_data_columns &= set(task_data_keys)
 
-        self.all_data_columns = all_data_columns
+        self._add_deltas("all_data_columns", counts)
         if not self.common_data_columns:
             self.common_data_columns = list(sorted(common_data_columns))
         else:
             self.common_data_columns = list(
                 sorted(set(self.common_data_columns) & common_data_columns)
             )
-        self.save(update_fields=["all_data_columns", "common_data_columns"])
+        self.save(update_fields=["common_data_columns"])
 
     def remove_data_columns(self, tasks):
-        all_data_columns = dict(self.all_data_columns)
-        keys_to_remove = []
-
+        counts = {}
         for task in tasks:
             task_data = get_attr_or_item(task, "data")
             for key in task_data.keys():
-                if key in all_data_columns:
-                    all_data_columns[key] -= 1
-                    if all_data_columns[key] == 0:
-                        keys_to_remove.append(key)
-                        all_data_columns.pop(key)
-        self.all_data_columns = all_data_columns
+                if key in self.all_data_columns:
+                    counts[key] = counts.get(key, 0) - 1
+
+        self._add_deltas("all_data_columns", counts)
+        keys_to_remove = [key for key in counts if key not in self.all_data_columns]
 
         if keys_to_remove:
             common_data_columns = list(self.common_data_columns)
@@ -1754,12 +1853,7 @@ class ProjectSummary(models.Model):
                 if key in common_data_columns:
                     common_data_columns.remove(key)
             self.common_data_columns = common_data_columns
-        self.save(
-            update_fields=[
-                "all_data_columns",
-                "common_data_columns",
-            ]
-        )
+            self.save(update_fields=["common_data_columns"])
 
     def _get_annotation_key(self, result):
         result_type = result.get("type", None)
@@ -1800,9 +1894,20 @@ class ProjectSummary(models.Model):
                 labels.append(str(label))
         return labels
 
+    def _count_labels(self, results, labels_counts, sign):
+        for result in results:
+            if "from_name" not in result:
+                continue
+            from_name = result["from_name"]
+            if sign > 0:
+                # from_name is listed even if the result has no labels
+                labels_counts.setdefault((from_name, None), 0)
+            for label in self._get_labels(result):
+                key = (from_name, label)
+                labels_counts[key] = labels_counts.get(key, 0) + sign
+
     def update_created_annotations_and_labels(self, annotations):
-        created_annotations = dict(self.created_annotations)
-        labels = dict(self.created_labels)
+        annotations_counts, labels_counts = {}, {}
         for annotation in annotations:
             results = get_attr_or_item(annotation, "result") or []
             if not isinstance(results, list):
@@ -1813,116 +1918,352 @@ class ProjectSummary(models.Model):
                 key = self._get_annotation_key(result)
                 if not key:
                     continue
-                created_annotations[key] = created_annotations.get(key, 0) + 1
-                from_name = result["from_name"]
-
+                annotations_counts[key] = annotations_counts.get(key, 0) + 1
                 # aggregate labels
-                if from_name not in self.created_labels:
-                    labels[from_name] = dict()
-
-                for label in self._get_labels(result):
-                    labels[from_name][label] = labels[from_name].get(label, 0) + 1
+                self._count_labels([result], labels_counts, 1)
 
-        logger.debug(f"summary.created_annotations = {created_annotations}")
-        logger.debug(f"summary.created_labels = {labels}")
-        self.created_annotations = created_annotations
-        self.created_labels = labels
-        self.save(update_fields=["created_annotations", "created_labels"])
+        self._add_deltas("created_annotations", annotations_counts)
+        self._add_deltas("created_labels", labels_counts)
+        logger.debug(f"summary.created_annotations = {self.created_annotations}")
+        logger.debug(f"summary.created_labels = {self.created_labels}")
 
     def remove_created_annotations_and_labels(self, annotations):
         # we are going to remove all annotations, so we'll reset the corresponding fields on the summary
-        remove_all_annotations = self.project.annotations.count() == len(annotations)
-        created_annotations, created_labels = (
-            ({}, {})
-            if remove_all_annotations
-            else (dict(self.created_annotations), dict(self.created_labels))
-        )
+        if self.project.annotations.count() == len(annotations):
+            self._reset_fields(["created_annotations", "created_labels"])
+            return
 
-        if not remove_all_annotations:
-            for annotation in annotations:
-                results = get_attr_or_item(annotation, "result") or []
-                if not isinstance(results, list):
-                    continue
+        annotations_counts, labels_counts = {}, {}
+        for annotation in annotations:
+            results = get_attr_or_item(annotation, "result") or []
+            if not isinstance(results, list):
+                continue
 
-                for result in results:
-                    # reduce annotation counters
-                    key = self._get_annotation_key(result)
-                    if key in created_annotations:
-                        created_annotations[key] -= 1
-                        if created_annotations[key] == 0:
-                            created_annotations.pop(key)
-
-                    # reduce labels counters
-                    from_name = result.get("from_name", None)
-                    if from_name not in created_labels:
-                        continue
-                    for label in self._get_labels(result):
-                        label = str(label)
-                        if label in created_labels[from_name]:
-                            created_labels[from_name][label] -= 1
-                            if created_labels[from_name][label] == 0:
-                                created_labels[from_name].pop(label)
-                    if not created_labels[from_name]:
-                        created_labels.pop(from_name)
-
-        logger.debug(f"summary.created_annotations = {created_annotations}")
-        logger.debug(f"summary.created_labels = {created_labels}")
-        self.created_annotations = created_annotations
-        self.created_labels = created_labels
-        self.save(update_fields=["created_annotations", "created_labels"])
+            for result in results:
+                # reduce annotation counters
+                key = self._get_annotation_key(result)
+                if key in self.created_annotations:
+                    annotations_counts[key] = annotations_counts.get(key, 0) - 1
+
+                # reduce labels counters
+                if result.get("from_name", None) in self.created_labels:
+                    self._count_labels([result], labels_counts, -1)
+
+        self._add_deltas("created_annotations", annotations_counts)
+        self._add_deltas("created_labels", labels_counts)
+        logger.debug(f"summary.created_annotations = {self.created_annotations}")
+        logger.debug(f"summary.created_labels = {self.created_labels}")
 
     def update_created_labels_drafts(self, drafts):
-        labels = dict(self.created_labels_drafts)
+        labels_counts = {}
         for draft in drafts:
             results = get_attr_or_item(draft, "result") or []
             if not isinstance(results, list):
                 continue
+            self._count_labels(results, labels_counts, 1)
 
-            for result in results:
-                if "from_name" not in result:
-                    continue
-                from_name = result["from_name"]
-
-                # aggregate labels
-                if from_name not in self.created_labels_drafts:
-                    labels[from_name] = dict()
-
-                for label in self._get_labels(result):
-                    labels[from_name][label] = labels[from_name].get(label, 0) + 1
-
-        logger.debug(f"update summary.created_labels_drafts = {labels}")
-        self.created_labels_drafts = labels
-        self.save(update_fields=["created_labels_drafts"])
+        self._add_deltas("created_labels_drafts", labels_counts)
+        logger.debug(
+            f"update summary.created_labels_drafts = {self.created_labels_drafts}"
+        )
 
     def remove_created_drafts_and_labels(self, drafts):
         # we are going to remove all drafts, so we'll reset the corresponding field on the summary
         remove_all_drafts = AnnotationDraft.objects.filter(
             task__project=self.project
         ).count() == len(drafts)
-        labels = {} if remove_all_drafts else dict(self.created_labels_drafts)
+        if remove_all_drafts:
+            self._reset_fields(["created_labels_drafts"])
+            return
 
-        if not remove_all_drafts:
-            for draft in drafts:
-                results = get_attr_or_item(draft, "result") or []
-                if not isinstance(results, list):
-                    continue
+        labels_counts = {}
+        for draft in drafts:
+            results = get_attr_or_item(draft, "result") or []
+            if not isinstance(results, list):
+                continue
+            results = [
+                result
+                for result in results
+                if result.get("from_name", None) in self.created_labels_drafts
+            ]
+            self._count_labels(results, labels_counts, -1)
+
+        self._add_deltas("created_labels_drafts", labels_counts)
+        logger.debug(f"summary.created_labels_drafts = {self.created_labels_drafts}")
 
-                for result in results:
-                    # reduce labels counters
-                    from_name = result.get("from_name", None)
-                    if from_name not in labels:
-                        continue
-                    for label in self._get_labels(result):
-                        label = str(label)
-                        if label in labels[from_name]:
-                            labels[from_name][label] -= 1
-                            if labels[from_name][label] == 0:
-                                labels[from_name].pop(label)
-                    if not labels[from_name]:
-                        labels.pop(from_name)
-        logger.debug(f"summary.created_labels_drafts = {labels}")
-        self.created_labels_drafts = labels
-        self.save(update_fields=["created_labels_drafts"])
+    def _reset_fields(self, fields):
+        """Empty counter fields together with their pending deltas"""
+        with transaction.atomic():
+            # the row lock waits for a running compaction
+            ProjectSummary.objects.select_for_update().filter(pk=self.pk).values_list(
+                "pk"
+            ).first()
+            ProjectSummaryDelta.objects.filter(
+                project_id=self.project_id, field__in=fields
+            ).delete()
+            for field in fields:
+                setattr(self, field, [] if field == "common_data_columns" else {})
+            self._forget_folded_deltas(fields)
+            super().save(update_fields=fields)
+
+
+class ProjectSummaryDelta(models.Model):
+    """Pending change of a ProjectSummary counter, folded in by ProjectSummary.compact()"""
+
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name="summary_deltas"
+    )
+    field = models.CharField(
+        _("field"), max_length=32, help_text="ProjectSummary counter field"
+    )
+    key = models.TextField(
+        _("key"), help_text="Data column, annotation type or from_name"
+    )
+    label = models.TextField(
+        _("label"), null=True, blank=True, help_text="Label for labels counters"
+    )
+    delta = models.IntegerField(_("delta"), help_text="Change of the counter")
+    created_at = models.DateTimeField(
+        _("created at"), auto_now_add=True, help_text="Creation time"
+    )
+
+
+class ProjectPayloadStats(models.Model):
+    """
+    Byte sizes of the task data and annotation results of a project.
+
+    Batch sizes are derived from these statistics instead of scanning the task
+    and task_completion tables on every export or sync. Bulk imports add to them
+    with atomic updates, single saves only raise the maximums (see record()) and
+    deletions aren't tracked, so the statistics are recomputed from the tables
+    once they are older than PROJECT_PAYLOAD_STATS_TTL seconds or the number of
+    measured rows has doubled since the last recomputation.
+
+    The first computation runs in the background; until it has finished there
+    are no statistics and saves of the project aren't measured.
+    """
+
+    SOURCES = {
+        "task_data": ("task", "data", Task),
+        "annotation_result": ("task_completion", "result", Annotation),
+    }
+
+    project = models.OneToOneField(
+        Project,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="payload_stats",
+    )
+    task_data_max = models.BigIntegerField(
+        _("task data max"), default=0, help_text="Largest task data, bytes"
+    )
+    task_data_p95 = models.BigIntegerField(
+        _("task data p95"),
+        default=0,
+        help_text="95th percentile of task data size at the last recomputation, bytes",
+    )
+    task_data_total = models.BigIntegerField(
+        _("task data total"), default=0, help_text="Sum of task data sizes, bytes"
+    )
+    task_data_count = models.BigIntegerField(
+        _("task data count"), default=0, help_text="Number of measured tasks"
+    )
+    annotation_result_max = models.BigIntegerField(
+        _("annotation result max"),
+        default=0,
+        help_text="Largest annotation result, bytes",
+    )
+    annotation_result_p95 = models.BigIntegerField(
+        _("annotation result p95"),
+        default=0,
+        help_text="95th percentile of annotation result size at the last recomputation, bytes",
+    )
+    annotation_result_total = models.BigIntegerField(
+        _("annotation result total"),
+        default=0,
+        help_text="Sum of annotation result sizes, bytes",
+    )
+    annotation_result_count = models.BigIntegerField(
+        _("annotation result count"),
+        default=0,
+        help_text="Number of measured annotations",
+    )
+    computed_count = models.BigIntegerField(
+        _("computed count"),
+        default=0,
+        help_text="Number of tasks and annotations at the last recomputation",
+    )
+    computed_at = models.DateTimeField(
+        _("computed at"), null=True, help_text="Time of the last recomputation"
+    )
+
+    @property
+    def task_data_mean(self):
+        if not self.task_data_count:
+            return 0
+        return self.task_data_total // self.task_data_count
+
+    @property
+    def annotation_result_mean(self):
+        if not self.annotation_result_count:
+            return 0
+        return self.annotation_result_total // self.annotation_result_count
+
+    @property
+    def max_payload_size(self):
+        return max(self.task_data_max, self.annotation_result_max)
+
+    @staticmethod
+    def payload_size(value):
+        """Size of a JSON value as PostgreSQL reports octet_length(value::text)"""
+        return len(json.dumps(value, ensure_ascii=False).encode())
+
+    @classmethod
+    def for_project(cls, project):
+        """
+        Statistics of a project, computed in the background on first use and when stale.
+
+        Returns:
+            ProjectPayloadStats, None until the first computation has finished
+        """
+        stats = cls.objects.filter(project=project).first()
+        if stats is None:
+            _, created = cls.objects.get_or_create(project=project)
+            if created:
+                cls._schedule_recompute(project.id)
+            # without Redis the computation has run in place
+            stats = cls.objects.filter(project=project).first()
+        if stats is None or stats.computed_at is None:
+            return None
+
+        if stats.is_stale():
+            # only the caller that moves computed_at forward schedules the recomputation
+            claimed = cls.objects.filter(
+                pk=stats.pk, computed_at=stats.computed_at
+            ).update(computed_at=timezone.now())
+            if claimed:
+                cls._schedule_recompute(project.id)
+                stats.refresh_from_db()
+        return stats
+
+    @classmethod
+    def _schedule_recompute(cls, project_id):
+        from core.redis import start_job_async_or_sync
+        from projects.functions.utils import recompute_project_payload_stats
+
+        try:
+            start_job_async_or_sync(
+                recompute_project_payload_stats, project_id, queue_name="low"
+            )
+        except Exception as e:
+            logger.error(f"Failed to compute payload stats of project {project_id}: {e}")
+            # statistics that were never computed are scheduled again on the next use
+            cls.objects.filter(pk=project_id, computed_at__isnull=True).delete()
+
+    @classmethod
+    def record(cls, project_id, task_data=(), annotation_results=(), count=True):
+        """
+        Add the sizes of new or changed payloads to the statistics.
+
+        Args:
+            project_id: Project of the payloads
+            task_data: Task data values
+            annotation_results: Annotation result values
+            count: Count the payloads into the mean. Without it the row is written
+                only when the maximum grows, so single saves don't contend for it.
+        """
+        # statistics that aren't computed yet measure the tables themselves,
+        # payloads are only sized for projects with statistics
+        stats = cls.objects.filter(project_id=project_id, computed_at__isnull=False)
+        maximums = stats.values("task_data_max", "annotation_result_max").first()
+        if maximums is None:
+            return
+
+        updates = {}
+        for source, values in (
+            ("task_data", task_data),
+            ("annotation_result", annotation_results),
+        ):
+            sizes = [cls.payload_size(value) for value in values]
+            if not sizes:
+                continue
+            if not count:
+                if max(sizes) > maximums[f"{source}_max"]:
+                    stats.filter(**{f"{source}_max__lt": max(sizes)}).update(
+                        **{f"{source}_max": max(sizes)}
+                    )
+                continue
+            updates[f"{source}_max"] = Greatest(
+                F(f"{source}_max"),
+                Value(max(sizes), output_field=models.BigIntegerField()),
+            )
+            updates[f"{source}_total"] = F(f"{source}_total") + sum(sizes)
+            updates[f"{source}_count"] = F(f"{source}_count") + len(sizes)
+        if updates:
+            stats.update(**updates)
+
+    def is_stale(self):
+        if self.computed_at is None:
+            return True
+        ttl = getattr(settings, "PROJECT_PAYLOAD_STATS_TTL", 24 * 60 * 60)
+        if (timezone.now() - self.computed_at).total_seconds() > ttl:
+            return True
+        return (
+            self.task_data_count + self.annotation_result_count
+            > 2 * self.computed_count
+        )
+
+    def recompute(self):
+        """Measure all task data and annotation results of the project"""
+        values = {}
+        for source in self.SOURCES:
+            measured = self._measure(source)
+            for name in ("max", "p95", "total", "count"):
+                values[f"{source}_{name}"] = measured[name]
+        values["computed_count"] = (
+            values["task_data_count"] + values["annotation_result_count"]
+        )
+        values["computed_at"] = timezone.now()
+
+        ProjectPayloadStats.objects.filter(pk=self.pk).update(**values)
+        for name, value in values.items():
+            setattr(self, name, value)
+        logger.info(
+            f"Project {self.project_id} payload stats: "
+            f"task data max {self.task_data_max} p95 {self.task_data_p95} "
+            f"mean {self.task_data_mean}, annotation result max "
+            f"{self.annotation_result_max} p95 {self.annotation_result_p95} "
+            f"mean {self.annotation_result_mean} bytes"
+        )
+
+    def _measure(self, source):
+        table, column, model = self.SOURCES[source]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT COALESCE(MAX(bytes), 0),
+                           COALESCE(PERCENTILE_DISC(0.95) WITHIN GROUP (ORDER BY bytes), 0),
+                           COALESCE(SUM(bytes), 0),
+                           COUNT(*)
+                    FROM   (SELECT octet_length({column}::text) AS bytes
+                            FROM   {table}
+                            WHERE  project_id = %s) sizes
+                """,
+                    [self.project_id],
+                )
+                row = cursor.fetchone()
+            return dict(zip(("max", "p95", "total", "count"), row))
+
+        # other databases have no percentiles, the maximum stands in for p95
+        measured = (
+            model.objects.filter(project_id=self.project_id)
+            .annotate(bytes=Length(Cast(column, output_field=models.TextField())))
+            .aggregate(max=Max("bytes"), total=Sum("bytes"), count=Count("id"))
+        )
+        measured = {name: value or 0 for name, value in measured.items()}
+        measured["p95"] = measured["max"]
+        return measured
 
 
 class ProjectImport(models.Model):
@@ -1938,6 +2279,7 @@ class ProjectImport(models.Model):
     preannotated_from_fields = models.JSONField(null=True, blank=True)
     commit_to_project = models.BooleanField(default=False)
     return_task_ids = models.BooleanField(default=False)
+    skip_duplicates = models.BooleanField(default=False)
     status = models.CharField(
         max_length=64, choices=Status.choices, default=Status.CREATED
     )
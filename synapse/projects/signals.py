@@ -1,5 +1,5 @@
 from django.dispatch import Signal, receiver
-from django.db.models.signals import post_save, m2m_changed
+from django.db.models.signals import m2m_changed, post_delete, post_save
 import logging
 
 logger = logging.getLogger(__name__)
@@ -106,6 +106,55 @@ def auto_assign_on_tasks_import(sender, project, **kwargs):
     trigger_auto_assignment(project.id)
 
 
+# ============================================================================
+# NEXT TASK QUEUE SIGNAL HANDLERS
+# ============================================================================
+
+
+@receiver(post_save, sender="tasks.Annotation")
+def discard_annotated_task_from_next_task_queue(sender, instance, **kwargs):
+    """Keep the task an annotator just annotated out of their next task queue"""
+    from projects.functions import next_task_queue
+
+    if not instance.completed_by_id or not next_task_queue.is_enabled():
+        return
+    next_task_queue.discard_task(
+        instance.project_id, instance.completed_by_id, instance.task_id
+    )
+
+
+@receiver(ProjectSignals.post_label_config_and_import_tasks)
+def reset_next_task_queues_on_tasks_import(sender, project, **kwargs):
+    """New tasks join the next task queues when they are rebuilt"""
+    from projects.functions import next_task_queue
 
+    if next_task_queue.is_enabled():
+        next_task_queue.reset_project(project.id)
 
 
+# ============================================================================
+# DATA MANAGER TOTALS SIGNAL HANDLERS
+# ============================================================================
+
+
+@receiver(post_save, sender="tasks.Task")
+@receiver(post_delete, sender="tasks.Task")
+@receiver(post_save, sender="tasks.Annotation")
+@receiver(post_delete, sender="tasks.Annotation")
+@receiver(post_save, sender="tasks.Prediction")
+@receiver(post_delete, sender="tasks.Prediction")
+def invalidate_data_manager_totals(sender, instance, **kwargs):
+    """Task list totals of the project are counted again on the next page load"""
+    from data_manager import totals
+
+    if instance.project_id and totals.is_enabled():
+        totals.bump_data_version(instance.project_id)
+
+
+@receiver(ProjectSignals.post_label_config_and_import_tasks)
+def invalidate_data_manager_totals_on_tasks_import(sender, project, **kwargs):
+    """Label config changes update task counters without model signals"""
+    from data_manager import totals
+
+    if totals.is_enabled():
+        totals.bump_data_version(project.id)
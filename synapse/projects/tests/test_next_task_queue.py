@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+import pytest
+from fakeredis import FakeRedis
+from projects.functions import next_task_queue
+from projects.functions.next_task_queue import NextTaskQueue
+from projects.models import Project
+from projects.tests.factories import ProjectFactory
+from tasks.tests.factories import AnnotationFactory, TaskFactory
+from users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def fake_redis():
+    redis = FakeRedis()
+    with patch.object(next_task_queue, 'get_connection', return_value=redis), patch.object(
+        next_task_queue, 'is_enabled', return_value=True
+    ):
+        yield redis
+
+
+def test_next_task_queue_serves_sequence_and_skips_annotated(fake_redis):
+    project = ProjectFactory(sampling=Project.SEQUENCE, maximum_annotations=1)
+    user = UserFactory()
+    tasks = [TaskFactory(project=project) for _ in range(3)]
+    candidates = project.tasks.filter(is_labeled=False).exclude(annotations__completed_by=user).order_by('id')
+
+    queue = NextTaskQueue(project, user)
+    assert queue.get_next_task(candidates) == tasks[0]
+    # the queue is built once and popped afterwards
+    assert fake_redis.zcard(queue.key) == 2
+
+    # tasks removed since the queue was built are skipped by the database check
+    tasks[1].delete()
+    assert NextTaskQueue(project, user).get_next_task(candidates) == tasks[2]
+
+    # annotating removes the task from the annotator's queue
+    fake_redis.zadd(queue.key, {tasks[2].id: 0})
+    AnnotationFactory(task=tasks[2], project=project, completed_by=user)
+    assert fake_redis.zscore(queue.key, tasks[2].id) is None
+
+
+def test_next_task_queue_is_rebuilt_when_settings_change(fake_redis):
+    project = ProjectFactory(sampling=Project.SEQUENCE, maximum_annotations=1)
+    user = UserFactory()
+    tasks = [TaskFactory(project=project) for _ in range(2)]
+
+    assert NextTaskQueue(project, user).get_next_task(project.tasks.order_by('id')) == tasks[0]
+    project.sampling = Project.UNIFORM
+    queue = NextTaskQueue(project, user)
+    assert queue.get_next_task(project.tasks.order_by('id')) in tasks
+    assert fake_redis.zcard(queue.key) == 1
@@ -0,0 +1,65 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.utils import timezone
+from projects.models import ProjectPayloadStats
+from projects.tests.factories import ProjectFactory
+from tasks.models import Annotation
+from tasks.tests.factories import AnnotationFactory, TaskFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_payload_stats_are_computed_once_and_updated_incrementally():
+    project = ProjectFactory()
+    task = TaskFactory(project=project, data={'text': 'x' * 100})
+    AnnotationFactory(task=task, project=project, result=[])
+
+    stats = ProjectPayloadStats.for_project(project)
+    assert stats.computed_at is not None
+    assert stats.task_data_count == 1
+    assert stats.annotation_result_count == 1
+    assert stats.task_data_max >= 100
+
+    # bulk imports are counted, single saves only raise the maximum
+    ProjectPayloadStats.record(project.id, task_data=[{'text': 'y' * 1000}])
+    TaskFactory(project=project, data={'text': 'z' * 2000})
+    Annotation.objects.bulk_create([Annotation(task=task, project=project, result=[{'value': 'r' * 500}])])
+
+    stats = ProjectPayloadStats.for_project(project)
+    assert stats.task_data_count == 2
+    assert stats.task_data_max == ProjectPayloadStats.payload_size({'text': 'z' * 2000})
+    assert stats.annotation_result_count == 2
+    assert stats.annotation_result_max == ProjectPayloadStats.payload_size([{'value': 'r' * 500}])
+
+
+@patch('core.redis.redis_connected', return_value=False)
+def test_stale_payload_stats_are_recomputed(_):
+    project = ProjectFactory()
+    TaskFactory(project=project, data={'text': 'x'})
+    stats = ProjectPayloadStats.for_project(project)
+    ProjectPayloadStats.objects.filter(pk=project.pk).update(
+        task_data_max=10**6, computed_at=timezone.now() - timedelta(days=30)
+    )
+
+    # without Redis the recomputation runs in place
+    stats = ProjectPayloadStats.for_project(project)
+    assert stats.task_data_max == ProjectPayloadStats.payload_size({'text': 'x'})
+
+
+def test_first_payload_stats_are_computed_in_background():
+    project = ProjectFactory()
+    TaskFactory(project=project, data={'text': 'x'})
+
+    with patch('core.redis.start_job_async_or_sync') as start_job:
+        assert ProjectPayloadStats.for_project(project) is None
+        assert ProjectPayloadStats.for_project(project) is None
+    assert start_job.call_count == 1
+
+    # saves aren't measured until the statistics are computed
+    TaskFactory(project=project, data={'text': 'y' * 1000})
+    assert ProjectPayloadStats.objects.get(pk=project.pk).task_data_max == 0
+
+    ProjectPayloadStats.objects.get(pk=project.pk).recompute()
+    assert ProjectPayloadStats.for_project(project).task_data_count == 2
@@ -0,0 +1,64 @@
+from unittest.mock import patch
+
+import pytest
+from projects.models import ProjectSummary, ProjectSummaryDelta
+from projects.tests.factories import ProjectFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def _annotation(label):
+    return {'result': [{'from_name': 'label', 'to_name': 'text', 'type': 'choices', 'value': {'choices': [label]}}]}
+
+
+@patch('core.redis.redis_connected', return_value=False)
+def test_concurrent_summary_updates_are_merged_and_compacted(_):
+    project = ProjectFactory()
+    ProjectSummary.objects.filter(pk=project.pk).update(created_annotations={}, created_labels={})
+
+    # two writers holding their own summary instances don't overwrite each other
+    first = ProjectSummary.objects.get(pk=project.pk)
+    second = ProjectSummary.objects.get(pk=project.pk)
+    first.update_created_annotations_and_labels([_annotation('Positive')])
+    second.update_created_annotations_and_labels([_annotation('Positive'), _annotation('Negative')])
+    second.remove_created_annotations_and_labels([_annotation('Negative')])
+
+    summary = ProjectSummary.objects.get(pk=project.pk)
+    assert summary.created_annotations == {'label|text|choices': 2}
+    assert summary.created_labels == {'label': {'Positive': 2}}
+    assert ProjectSummaryDelta.objects.filter(project=project).exists()
+
+    summary.compact()
+    assert not ProjectSummaryDelta.objects.filter(project=project).exists()
+    row = ProjectSummary.objects.filter(pk=project.pk).values('created_annotations', 'created_labels').get()
+    assert row == {'created_annotations': {'label|text|choices': 2}, 'created_labels': {'label': {'Positive': 2}}}
+
+    summary.reset()
+    assert ProjectSummary.objects.get(pk=project.pk).created_labels == {}
+
+
+def test_pending_deltas_are_compacted_inline_while_the_job_waits(settings):
+    from fakeredis import FakeRedis
+
+    settings.PROJECT_SUMMARY_COMPACT_THRESHOLD = 4
+    project = ProjectFactory()
+    ProjectSummary.objects.filter(pk=project.pk).update(created_annotations={}, created_labels={})
+    redis = FakeRedis()
+
+    with patch('core.redis.redis_connected', return_value=True), patch(
+        'django_rq.get_connection', return_value=redis
+    ), patch('core.redis.start_job_async_or_sync') as start_job:
+        summary = ProjectSummary.objects.get(pk=project.pk)
+        summary.update_created_annotations_and_labels([_annotation('Positive')])
+        # the job is enqueued right away and nothing is compacted inline yet
+        start_job.assert_called_once()
+        assert start_job.call_args.kwargs == {'queue_name': 'low'}
+        assert ProjectSummaryDelta.objects.filter(project=project).exists()
+
+        # the job has not run, deltas past the threshold are folded by the writer
+        summary.update_created_annotations_and_labels([_annotation('Negative')])
+        start_job.assert_called_once()
+        assert not ProjectSummaryDelta.objects.filter(project=project).exists()
+
+    row = ProjectSummary.objects.filter(pk=project.pk).values('created_labels').get()
+    assert row == {'created_labels': {'label': {'Positive': 1, 'Negative': 1}}}
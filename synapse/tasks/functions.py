@@ -237,6 +237,25 @@ def update_tasks_counters(queryset, from_scratch=True):
     return updated_count
 
 
+def fill_missing_data_fingerprints(queryset):
+    """Compute data fingerprints of tasks created before they existed or updated without Task.save()"""
+    tasks = queryset.filter(data_fingerprint__isnull=True).order_by('id')
+    filled, last_id = 0, 0
+    while True:
+        chunk = list(tasks.filter(id__gt=last_id).only('id', 'data')[: settings.BATCH_SIZE])
+        if not chunk:
+            break
+        last_id = chunk[-1].id
+        for task in chunk:
+            task.data_fingerprint = Task.get_data_fingerprint(task.data)
+        Task.objects.using(queryset.db).bulk_update(chunk, ['data_fingerprint'], batch_size=settings.BATCH_SIZE)
+        filled += len(chunk)
+
+    if filled:
+        logger.info(f'Filled data fingerprints for {filled} tasks')
+    return filled
+
+
 def bulk_update_is_labeled_by_overlap(tasks_ids, project):
     if not tasks_ids:
         return
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.15 on 2026-10-16 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0063_remove_failedprediction_model_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="data_fingerprint",
+            field=models.CharField(
+                default=None,
+                editable=False,
+                help_text="Hash of the canonical JSON of task data, used to find duplicated tasks",
+                max_length=40,
+                null=True,
+                verbose_name="data fingerprint",
+            ),
+        ),
+    ]
@@ -0,0 +1,87 @@
+from django.db import migrations, models, connections
+from core.redis import start_job_async_or_sync
+from core.models import AsyncMigrationStatus
+import logging
+
+logger = logging.getLogger(__name__)
+
+migration_name = '0065_task_data_fingerprint_index_async'
+
+
+def forward_migration(migration_name, db_alias):
+    from tasks.functions import fill_missing_data_fingerprints
+    from tasks.models import Task
+
+    migration = AsyncMigrationStatus.objects.using(db_alias).create(
+        name=migration_name,
+        status=AsyncMigrationStatus.STATUS_STARTED,
+    )
+    logger.debug(f'Start async migration {migration_name}')
+
+    conn = connections[db_alias]
+    if conn.vendor == 'postgresql':
+        sql = (
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS "task_project_fingerprint_idx" '
+            'ON "task" ("project_id", "data_fingerprint");'
+        )
+    else:
+        sql = 'CREATE INDEX IF NOT EXISTS "task_project_fingerprint_idx" ON "task" ("project_id", "data_fingerprint");'
+    with conn.cursor() as cursor:
+        cursor.execute(sql)
+
+    # tasks created before this migration get their fingerprints in id-ordered chunks
+    fill_missing_data_fingerprints(Task.objects.using(db_alias).all())
+
+    migration.status = AsyncMigrationStatus.STATUS_FINISHED
+    migration.save(using=db_alias)
+    logger.debug(f'Async migration {migration_name} complete')
+
+
+def reverse_migration(migration_name, db_alias):
+    migration = AsyncMigrationStatus.objects.using(db_alias).create(
+        name=migration_name,
+        status=AsyncMigrationStatus.STATUS_STARTED,
+    )
+    logger.debug(f'Start async migration rollback {migration_name}')
+
+    conn = connections[db_alias]
+    if conn.vendor == 'postgresql':
+        sql = 'DROP INDEX CONCURRENTLY IF EXISTS "task_project_fingerprint_idx";'
+    else:
+        sql = 'DROP INDEX IF EXISTS "task_project_fingerprint_idx";'
+    with conn.cursor() as cursor:
+        cursor.execute(sql)
+
+    migration.status = AsyncMigrationStatus.STATUS_FINISHED
+    migration.save(using=db_alias)
+    logger.debug(f'Async migration rollback {migration_name} complete')
+
+
+def forwards(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    start_job_async_or_sync(forward_migration, migration_name=migration_name, db_alias=db_alias)
+
+
+def backwards(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
+    start_job_async_or_sync(reverse_migration, migration_name=migration_name, db_alias=db_alias)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('tasks', '0064_task_data_fingerprint'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunPython(forwards, backwards)],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='task',
+                    index=models.Index(fields=['project', 'data_fingerprint'], name='task_project_fingerprint_idx'),
+                ),
+            ],
+        ),
+    ]
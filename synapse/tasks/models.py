@@ -2,6 +2,7 @@
 
 import base64
 import datetime
+import hashlib
 import logging
 import numbers
 import os
@@ -127,6 +128,14 @@ class Task(TaskMixin, FsmHistoryStateModel):
         null=True,
         help_text="Internal task ID in the project, starts with 1",
     )
+    data_fingerprint = models.CharField(
+        _("data fingerprint"),
+        max_length=40,
+        null=True,
+        default=None,
+        editable=False,
+        help_text="Hash of the canonical JSON of task data, used to find duplicated tasks",
+    )
     updates = ["is_labeled"]
     total_annotations = models.IntegerField(
         _("total_annotations"),
@@ -238,6 +247,10 @@ class Task(TaskMixin, FsmHistoryStateModel):
             models.Index(fields=["id", "overlap"]),
             models.Index(fields=["overlap"]),
             models.Index(fields=["project", "id"]),
+            models.Index(
+                fields=["project", "data_fingerprint"],
+                name="task_project_fingerprint_idx",
+            ),
         ]
 
     @property
@@ -480,22 +493,21 @@ class Task(TaskMixin, FsmHistoryStateModel):
         return filename
 
     def resolve_storage_uri(self, url) -> Optional[Mapping[str, Any]]:
-        from io_storages.functions import get_storage_by_url
+        from io_storages.presign_cache import get_presigned_url
 
         # Instead of using self.storage, we check all storage objects for the project to
         # support imported tasks that point to another bucket
-        storage_objects = self.project.get_all_import_storage_objects
-        storage = get_storage_by_url(url, storage_objects)
+        storage = self.project.import_storage_index.get_storage(url)
 
         if storage:
+            http_url, ttl = get_presigned_url(storage, url)
             return {
-                "url": storage.generate_http_url(url),
-                "presign_ttl": storage.presign_ttl,
+                "url": http_url,
+                # minutes the URL stays valid, a cached URL has less left than storage.presign_ttl
+                "presign_ttl": ttl // 60 if ttl else storage.presign_ttl,
             }
 
     def resolve_uri(self, task_data, project):
-        from io_storages.functions import get_storage_by_url
-
         if project.task_data_login and project.task_data_password:
             protected_data = {}
             for key, value in task_data.items():
@@ -509,7 +521,7 @@ class Task(TaskMixin, FsmHistoryStateModel):
                 protected_data[key] = value
             return protected_data
         else:
-            storage_objects = project.get_all_import_storage_objects
+            storage_index = project.import_storage_index
 
             # try resolve URLs via storage associated with that task
             for field in task_data:
@@ -536,12 +548,9 @@ class Task(TaskMixin, FsmHistoryStateModel):
 
                 # project storage
                 # TODO: to resolve nested lists and dicts we should improve get_storage_by_url(),
-                # Now always using get_storage_by_url to ensure the storage with the correct bucket is used
+                # Now always looking the storage up by URL to ensure the storage with the correct bucket is used
                 # As a last fallback we can use self.storage which is the storage the Task was imported from
-                storage = (
-                    get_storage_by_url(task_data[field], storage_objects)
-                    or self.storage
-                )
+                storage = storage_index.get_storage(task_data[field]) or self.storage
                 if storage:
                     try:
                         resolved_uri = storage.resolve_uri(task_data[field], self)
@@ -591,7 +600,50 @@ class Task(TaskMixin, FsmHistoryStateModel):
     def ensure_unique_groundtruth(self, annotation_id):
         self.annotations.exclude(id=annotation_id).update(ground_truth=False)
 
+    @staticmethod
+    def get_data_fingerprint(data) -> str:
+        """Hash of task data that doesn't depend on key order or JSON formatting"""
+        canonical = json.dumps(
+            data, sort_keys=True, ensure_ascii=False, escape_forward_slashes=False
+        )
+        return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def exclude_duplicates(cls, project_id, items, get_data):
+        """
+        Drop items whose task data is already in the project or earlier in `items`.
+
+        Args:
+            project_id: Project the items are imported to
+            items: Tasks to import in any form
+            get_data: Returns task data of an item
+
+        Returns:
+            List of the kept items, in the original order
+        """
+        fingerprints = [cls.get_data_fingerprint(get_data(item)) for item in items]
+        seen = set()
+        for i in range(0, len(fingerprints), settings.BATCH_SIZE):
+            seen.update(
+                cls.objects.filter(
+                    project_id=project_id,
+                    data_fingerprint__in=fingerprints[i : i + settings.BATCH_SIZE],
+                ).values_list("data_fingerprint", flat=True)
+            )
+
+        kept = []
+        for item, fingerprint in zip(items, fingerprints):
+            if fingerprint not in seen:
+                seen.add(fingerprint)
+                kept.append(item)
+        return kept
+
     def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None or "data" in update_fields:
+            self.data_fingerprint = self.get_data_fingerprint(self.data)
+            if update_fields is not None:
+                update_fields = {"data_fingerprint"}.union(update_fields)
+
         # Enforce 3-annotator consensus by default (always use 3, not 1)
         if self.pk is None and self.project:
             required_overlap = getattr(self.project, "required_overlap", 3)
@@ -1544,6 +1596,46 @@ def update_project_summary_annotations_and_is_labeled(
     )
 
 
+@receiver(post_save, sender=Task)
+def update_project_payload_stats_task_data(
+    sender, instance, created, update_fields, **kwargs
+):
+    """Raise the task data maximum of ProjectPayloadStats if needed"""
+    from projects.models import ProjectPayloadStats
+
+    if update_fields is not None and "data" not in update_fields:
+        return
+    ProjectPayloadStats.record(
+        instance.project_id, task_data=[instance.data], count=False
+    )
+
+
+@receiver(post_save, sender=Annotation)
+def update_project_payload_stats_annotation_result(
+    sender, instance, created, update_fields=None, **kwargs
+):
+    """Raise the annotation result maximum of ProjectPayloadStats if needed"""
+    from projects.models import ProjectPayloadStats
+
+    if update_fields is not None and "result" not in update_fields:
+        return
+    ProjectPayloadStats.record(
+        instance.project_id, annotation_results=[instance.result], count=False
+    )
+
+
+@receiver(post_bulk_create, sender=Annotation)
+def update_project_payload_stats_bulk_annotations(sender, objs, **kwargs):
+    """Count imported annotations into ProjectPayloadStats"""
+    from projects.models import ProjectPayloadStats
+
+    results = {}
+    for annotation in objs:
+        results.setdefault(annotation.project_id, []).append(annotation.result)
+    for project_id, project_results in results.items():
+        ProjectPayloadStats.record(project_id, annotation_results=project_results)
+
+
 @receiver(pre_delete, sender=Prediction)
 def remove_predictions_from_project(sender, instance, **kwargs):
     """Remove predictions counters"""
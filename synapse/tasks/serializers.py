@@ -8,6 +8,7 @@ from core.feature_flags import flag_set
 from core.label_config import replace_task_data_undefined_with_config_field
 from core.utils.common import load_func, retry_database_locked
 from core.utils.db import fast_first
+from data_manager import totals
 from django.conf import settings
 from django.db import IntegrityError, transaction
 from drf_spectacular.utils import extend_schema_field
@@ -15,7 +16,7 @@ from fsm.serializer_fields import FSMStateField
 from fsm.state_manager import get_state_manager
 from fsm.utils import is_fsm_enabled
 from synapse_sdk.synapse_interface import LabelInterface
-from projects.models import Project
+from projects.models import Project, ProjectPayloadStats
 from rest_flex_fields import FlexFieldsModelSerializer
 from rest_framework import generics, serializers
 from rest_framework.exceptions import ValidationError
@@ -431,7 +432,7 @@ class TaskSimpleSerializer(ModelSerializer):
 
     class Meta:
         model = Task
-        exclude = ("precomputed_agreement",)
+        exclude = ("precomputed_agreement", "data_fingerprint")
 
 
 class BaseTaskSerializer(FlexFieldsModelSerializer):
@@ -506,7 +507,7 @@ class BaseTaskSerializer(FlexFieldsModelSerializer):
 
     class Meta:
         model = Task
-        exclude = ("precomputed_agreement",)
+        exclude = ("precomputed_agreement", "data_fingerprint")
 
 
 class BaseTaskSerializerBulk(serializers.ListSerializer):
@@ -514,6 +515,7 @@ class BaseTaskSerializerBulk(serializers.ListSerializer):
 
     annotations = AnnotationSerializer(many=True, default=[], read_only=True)
     predictions = PredictionSerializer(many=True, default=[], read_only=True)
+    skipped_duplicates = 0
 
     @property
     def project(self):
@@ -688,6 +690,15 @@ class BaseTaskSerializerBulk(serializers.ListSerializer):
 
         # to be sure we add tasks with annotations at the same time
         with transaction.atomic():
+            if self.context.get("skip_duplicates"):
+                validated_tasks = Task.exclude_duplicates(
+                    self.project.id, validated_tasks, lambda task: task["data"]
+                )
+                self.skipped_duplicates = len(validated_data) - len(validated_tasks)
+                logger.info(
+                    f"Skipped {self.skipped_duplicates} duplicated tasks "
+                    f"on import to project {self.project.id}"
+                )
 
             # extract annotations, predictions, drafts, reviews, etc
             # all these lists will be grouped by tasks, e.g.:
@@ -728,6 +739,10 @@ class BaseTaskSerializerBulk(serializers.ListSerializer):
             db_tasks = self.add_tasks(
                 task_annotations, task_predictions, validated_tasks
             )
+            # annotations are counted by the post_bulk_create receiver
+            ProjectPayloadStats.record(
+                self.project.id, task_data=[task.data for task in db_tasks]
+            )
             db_annotations = self.add_annotations(task_annotations, user)
             prediction_errors = self.add_predictions(task_predictions)
 
@@ -741,6 +756,8 @@ class BaseTaskSerializerBulk(serializers.ListSerializer):
             if prediction_errors and raise_prediction_errors:
                 raise ValidationError({"predictions": prediction_errors})
 
+        # tasks and predictions are bulk created without model signals
+        totals.bump_data_version(self.project.id)
         self.post_process_annotations(user, db_annotations, "imported")
         self.post_process_tasks(self.project.id, [t.id for t in self.db_tasks])
         self.post_process_custom_callback(self.project.id, user)
@@ -981,6 +998,7 @@ class BaseTaskSerializerBulk(serializers.ListSerializer):
             t = Task(
                 project=self.project,
                 data=task["data"],
+                data_fingerprint=Task.get_data_fingerprint(task["data"]),
                 meta=task.get("meta", {}),
                 overlap=max_overlap,
                 target_assignment_count=max_overlap,  # Set target to match overlap for consensus
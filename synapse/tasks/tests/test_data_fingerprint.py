@@ -0,0 +1,37 @@
+import pytest
+from data_import.serializers import ImportApiSerializer
+from projects.tests.factories import ProjectFactory
+from tasks.functions import fill_missing_data_fingerprints
+from tasks.models import Task
+from tasks.tests.factories import TaskFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_data_fingerprint_ignores_key_order():
+    project = ProjectFactory()
+    task = TaskFactory(project=project, data={'text': 'a', 'meta': {'x': 1, 'y': 2}})
+    assert task.data_fingerprint == Task.get_data_fingerprint({'meta': {'y': 2, 'x': 1}, 'text': 'a'})
+    assert task.data_fingerprint != Task.get_data_fingerprint({'text': 'b', 'meta': {'x': 1, 'y': 2}})
+
+    # bulk updates without Task.save() are filled later
+    Task.objects.filter(id=task.id).update(data_fingerprint=None)
+    assert fill_missing_data_fingerprints(project.tasks.all()) == 1
+    task.refresh_from_db()
+    assert task.data_fingerprint == Task.get_data_fingerprint(task.data)
+
+
+def test_import_skips_duplicates():
+    project = ProjectFactory()
+    TaskFactory(project=project, data={'text': 'existing'})
+    tasks = [{'data': {'text': 'existing'}}, {'data': {'text': 'new'}}, {'data': {'text': 'new'}}]
+
+    serializer = ImportApiSerializer(
+        data=tasks, many=True, context={'project': project, 'skip_duplicates': True}
+    )
+    serializer.is_valid(raise_exception=True)
+    created = serializer.save(project_id=project.id)
+
+    assert [task.data for task in created] == [{'text': 'new'}]
+    assert serializer.skipped_duplicates == 2
+    assert project.tasks.count() == 2
@@ -2,7 +2,8 @@
 Rule Engine - Pattern Detection for Behavioral Surveillance
 
 Defines rules that detect suspicious behavior patterns and assign risk points.
-Rules are evaluated against recent telemetry events.
+Rules are evaluated against a sliding window of recent telemetry events
+(see streaming.py).
 """
 
 import logging
@@ -10,7 +11,7 @@ from dataclasses import dataclass
 from datetime import timedelta
 from typing import List, Optional, Callable
 
-from django.db.models import Count, Avg
+from django.db.models import Max
 from django.utils import timezone
 
 logger = logging.getLogger(__name__)
@@ -116,10 +117,26 @@ class RuleEngine:
             ),
         ]
 
+    # Event types read by the rule check functions
+    WINDOW_EVENT_TYPES = (
+        "dwell",
+        "zoom",
+        "devtools",
+        "copy",
+        "vm_detected",
+        "printscreen",
+        "contextmenu",
+        "headless",
+        "blur",
+    )
+
     def evaluate_user(self, user_id: int, window_minutes: int = 10) -> List[dict]:
         """
         Evaluate all rules for a user based on recent events.
 
+        Reads the event history and cooldowns from the database. Ingestion
+        uses evaluate_stream instead, which works from the streaming state.
+
         Args:
             user_id: User to evaluate
             window_minutes: Time window to consider
@@ -127,34 +144,106 @@ class RuleEngine:
         Returns:
             List of violations: [{'rule': name, 'points': int, 'data': dict}]
         """
-        from .models import TelemetryEvent, RuleViolation
+        from .models import TelemetryEvent
+        from .streaming import UserWindow
 
-        violations = []
         cutoff = timezone.now() - timedelta(minutes=window_minutes)
 
         # Get recent events for this user
         events = TelemetryEvent.objects.filter(
-            user_id=user_id, timestamp__gte=cutoff
-        ).order_by("-timestamp")
+            user_id=user_id,
+            timestamp__gte=cutoff,
+            event_type__in=self.WINDOW_EVENT_TYPES,
+        ).only("event_type", "timestamp", "value")
 
-        if not events.exists():
-            return violations
+        window = UserWindow.from_events(events)
+        if window.is_empty():
+            return []
 
-        for rule in self.rules:
-            # Check cooldown - don't trigger if recently triggered
-            recent_violation = RuleViolation.objects.filter(
+        cooling_down = self._get_recent_violations(
+            user_id, [rule.name for rule in self.rules]
+        )
+        return self._evaluate_window(window, user_id, cooling_down)
+
+    def evaluate_stream(self, user_id: int) -> List[dict]:
+        """
+        Evaluate all rules for a user from the streaming state.
+
+        Sliding windows and cooldowns come from Redis (or process memory),
+        so the cost does not depend on the length of the user's history.
+        The database is only consulted to confirm a cooldown when a rule
+        fires and the cooldown cache has no entry for it.
+
+        Args:
+            user_id: User to evaluate
+
+        Returns:
+            List of violations: [{'rule': name, 'points': int, 'data': dict}]
+        """
+        from .streaming import cooldown_cache, window_store
+
+        window = window_store.get_window(user_id, self.WINDOW_EVENT_TYPES)
+        if window.is_empty():
+            return []
+
+        rules_by_name = {rule.name: rule for rule in self.rules}
+        cooling_down = cooldown_cache.get_active(user_id, list(rules_by_name))
+        violations = self._evaluate_window(window, user_id, cooling_down)
+
+        if violations:
+            # The cache may have been lost (e.g. Redis restart) - confirm with the database
+            recent = self._get_recent_violations(
+                user_id, [violation["rule"] for violation in violations]
+            )
+            violations = [v for v in violations if v["rule"] not in recent]
+
+            for name in recent | {violation["rule"] for violation in violations}:
+                cooldown_cache.set(
+                    user_id, name, rules_by_name[name].cooldown_minutes * 60
+                )
+
+        return violations
+
+    def _get_recent_violations(self, user_id: int, rule_names: List[str]) -> set:
+        """Rule names that are still within their cooldown, from the database"""
+        from .models import RuleViolation
+
+        if not rule_names:
+            return set()
+
+        rules_by_name = {rule.name: rule for rule in self.rules}
+        longest = max(rules_by_name[name].cooldown_minutes for name in rule_names)
+        now = timezone.now()
+
+        last_triggered = (
+            RuleViolation.objects.filter(
                 user_id=user_id,
-                rule_name=rule.name,
-                timestamp__gte=timezone.now()
-                - timedelta(minutes=rule.cooldown_minutes),
-            ).exists()
+                rule_name__in=rule_names,
+                timestamp__gte=now - timedelta(minutes=longest),
+            )
+            .values("rule_name")
+            .annotate(last=Max("timestamp"))
+        )
+
+        return {
+            row["rule_name"]
+            for row in last_triggered
+            if row["last"]
+            >= now - timedelta(minutes=rules_by_name[row["rule_name"]].cooldown_minutes)
+        }
+
+    def _evaluate_window(self, window, user_id: int, cooling_down: set) -> List[dict]:
+        """Run the check function of every rule not cooling down"""
+        violations = []
 
-            if recent_violation:
+        for rule in self.rules:
+            # Check cooldown - don't trigger if recently triggered
+            if rule.name in cooling_down:
                 continue
 
             # Evaluate the rule
             try:
-                result = rule.check_function(events, user_id)
+                result = rule.check_function(window, user_id)
                 if result:
                     violations.append(
                         {
@@ -170,121 +259,87 @@ class RuleEngine:
         return violations
 
     # ========== Rule Check Functions ==========
+    # Each receives a streaming.UserWindow with the user's recent events
 
-    def _check_fast_navigation(self, events, user_id) -> Optional[dict]:
+    def _check_fast_navigation(self, window, user_id) -> Optional[dict]:
         """Check if user is viewing images too fast (>50 per minute)"""
-        one_minute_ago = timezone.now() - timedelta(minutes=1)
-
-        view_count = events.filter(
-            event_type="dwell", timestamp__gte=one_minute_ago
-        ).count()
+        view_count = window.count("dwell", seconds=60)
 
         if view_count > 50:
             return {"views_per_minute": view_count}
         return None
 
-    def _check_excessive_zoom(self, events, user_id) -> Optional[dict]:
+    def _check_excessive_zoom(self, window, user_id) -> Optional[dict]:
         """Check for excessive zoom events (>30 in 10 seconds)"""
-        ten_seconds_ago = timezone.now() - timedelta(seconds=10)
-
-        zoom_count = events.filter(
-            event_type="zoom", timestamp__gte=ten_seconds_ago
-        ).count()
+        zoom_count = window.count("zoom", seconds=10)
 
         if zoom_count > 30:
             return {"zooms_in_10s": zoom_count}
         return None
 
-    def _check_bot_behavior(self, events, user_id) -> Optional[dict]:
+    def _check_bot_behavior(self, window, user_id) -> Optional[dict]:
         """Check for inhuman dwell times (<200ms repeatedly)"""
-        dwell_events = events.filter(event_type="dwell")[:20]
+        dwell_values = window.recent_values("dwell", 20)
 
         short_dwells = 0
-        for event in dwell_events:
-            dwell_ms = event.value.get("duration_ms", 1000)
+        for value in dwell_values:
+            dwell_ms = value.get("duration_ms", 1000)
             if dwell_ms < 200:
                 short_dwells += 1
 
         # If more than 80% of recent dwells are too short
-        if dwell_events.count() >= 10 and short_dwells / dwell_events.count() > 0.8:
-            return {"short_dwell_ratio": short_dwells / dwell_events.count()}
+        if len(dwell_values) >= 10 and short_dwells / len(dwell_values) > 0.8:
+            return {"short_dwell_ratio": short_dwells / len(dwell_values)}
         return None
 
-    def _check_devtools_copy(self, events, user_id) -> Optional[dict]:
+    def _check_devtools_copy(self, window, user_id) -> Optional[dict]:
         """Check for DevTools + copy attempt combination"""
-        five_minutes_ago = timezone.now() - timedelta(minutes=5)
-
-        devtools_open = events.filter(
-            event_type="devtools", timestamp__gte=five_minutes_ago
-        ).exists()
-
-        copy_attempts = events.filter(
-            event_type="copy", timestamp__gte=five_minutes_ago
-        ).count()
+        devtools_open = window.count("devtools", seconds=300) > 0
+        copy_attempts = window.count("copy", seconds=300)
 
         if devtools_open and copy_attempts > 0:
             return {"devtools": True, "copy_attempts": copy_attempts}
         return None
 
-    def _check_vm_detected(self, events, user_id) -> Optional[dict]:
+    def _check_vm_detected(self, window, user_id) -> Optional[dict]:
         """Check if VM/RDP was detected"""
-        vm_events = events.filter(event_type="vm_detected")[:1]
-
-        if vm_events.exists():
-            return {"vm_detected": True, "data": vm_events[0].value}
+        if window.count("vm_detected"):
+            return {"vm_detected": True, "data": window.latest_value("vm_detected")}
         return None
 
-    def _check_screenshot_attempt(self, events, user_id) -> Optional[dict]:
+    def _check_screenshot_attempt(self, window, user_id) -> Optional[dict]:
         """Check for print screen key presses"""
-        one_minute_ago = timezone.now() - timedelta(minutes=1)
-
-        screenshot_count = events.filter(
-            event_type="printscreen", timestamp__gte=one_minute_ago
-        ).count()
+        screenshot_count = window.count("printscreen", seconds=60)
 
         if screenshot_count > 0:
             return {"screenshot_attempts": screenshot_count}
         return None
 
-    def _check_copy_attempts(self, events, user_id) -> Optional[dict]:
+    def _check_copy_attempts(self, window, user_id) -> Optional[dict]:
         """Check for multiple copy attempts"""
-        five_minutes_ago = timezone.now() - timedelta(minutes=5)
-
-        copy_count = events.filter(
-            event_type="copy", timestamp__gte=five_minutes_ago
-        ).count()
+        copy_count = window.count("copy", seconds=300)
 
         if copy_count >= 5:
             return {"copy_attempts": copy_count}
         return None
 
-    def _check_context_menu_spam(self, events, user_id) -> Optional[dict]:
+    def _check_context_menu_spam(self, window, user_id) -> Optional[dict]:
         """Check for repeated right-click attempts"""
-        one_minute_ago = timezone.now() - timedelta(minutes=1)
-
-        context_count = events.filter(
-            event_type="contextmenu", timestamp__gte=one_minute_ago
-        ).count()
+        context_count = window.count("contextmenu", seconds=60)
 
         if context_count >= 10:
             return {"context_menu_attempts": context_count}
         return None
 
-    def _check_headless_browser(self, events, user_id) -> Optional[dict]:
+    def _check_headless_browser(self, window, user_id) -> Optional[dict]:
         """Check if headless browser was detected"""
-        headless_events = events.filter(event_type="headless")[:1]
-
-        if headless_events.exists():
-            return {"headless": True, "data": headless_events[0].value}
+        if window.count("headless"):
+            return {"headless": True, "data": window.latest_value("headless")}
         return None
 
-    def _check_tab_switching(self, events, user_id) -> Optional[dict]:
+    def _check_tab_switching(self, window, user_id) -> Optional[dict]:
         """Check for frequent tab switching"""
-        one_minute_ago = timezone.now() - timedelta(minutes=1)
-
-        blur_count = events.filter(
-            event_type="blur", timestamp__gte=one_minute_ago
-        ).count()
+        blur_count = window.count("blur", seconds=60)
 
         if blur_count >= 20:
             return {"tab_switches": blur_count}
@@ -0,0 +1,364 @@
+"""
+Streaming Telemetry State - Sliding Windows, Cooldowns and Event Buffer
+
+Keeps the per-user state the rule engine needs so ingestion does not have
+to query TelemetryEvent history:
+
+- Sliding windows: recent event timestamps (and values where rules need
+  them) per (user, event type), trimmed to the evaluation window
+- Cooldowns: last trigger of each (user, rule), expiring with the cooldown
+- Event buffer: TelemetryEvent rows waiting to be bulk inserted by a
+  background job
+
+State lives in Redis when it is connected and in process memory otherwise.
+"""
+
+import bisect
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.redis import redis_connected, start_job_async_or_sync
+from django.conf import settings
+from django_rq import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+KEY_PREFIX = getattr(settings, "TELEMETRY_REDIS_KEY_PREFIX", "telemetry")
+EVENT_BUFFER_KEY = f"{KEY_PREFIX}:event_buffer"
+FLUSH_SCHEDULED_KEY = f"{KEY_PREFIX}:flush_scheduled"
+
+# Events older than this are dropped from the sliding windows
+WINDOW_SECONDS = getattr(settings, "TELEMETRY_WINDOW_SECONDS", 600)
+# Hard cap on events kept per (user, event type) window
+MAX_WINDOW_EVENTS = getattr(settings, "TELEMETRY_MAX_WINDOW_EVENTS", 5000)
+# Expiry of the scheduled flag, a flush job lost before it starts stops blocking new ones
+FLUSH_SCHEDULED_TTL = getattr(settings, "TELEMETRY_FLUSH_SCHEDULED_TTL", 60)
+FLUSH_BATCH_SIZE = getattr(settings, "TELEMETRY_FLUSH_BATCH_SIZE", 1000)
+# Requests write a batch themselves once this many events are waiting
+INLINE_FLUSH_THRESHOLD = getattr(settings, "TELEMETRY_INLINE_FLUSH_THRESHOLD", 10 * FLUSH_BATCH_SIZE)
+# Hard cap on the buffer, the oldest events are dropped beyond it
+MAX_BUFFERED_EVENTS = getattr(settings, "TELEMETRY_MAX_BUFFERED_EVENTS", 100000)
+
+# Event types whose value is kept in the window (rules read it)
+VALUE_EVENT_TYPES = {"dwell", "vm_detected", "headless"}
+
+
+class UserWindow:
+    """
+    Read-only view of a user's recent events, used by rule check functions.
+
+    Args:
+        now: Reference time (epoch seconds)
+        events: Dict of event_type -> list of (timestamp, value) sorted by timestamp
+    """
+
+    def __init__(self, now: float, events: Dict[str, List[Tuple[float, dict]]]):
+        self.now = now
+        self._events = events
+        self._timestamps = {
+            event_type: [ts for ts, _ in items] for event_type, items in events.items()
+        }
+
+    @classmethod
+    def from_events(cls, events: Iterable, now: Optional[float] = None) -> "UserWindow":
+        """Build a window from TelemetryEvent instances"""
+        grouped = defaultdict(list)
+        for event in events:
+            grouped[event.event_type].append((event.timestamp.timestamp(), event.value))
+        for items in grouped.values():
+            items.sort(key=lambda item: item[0])
+        return cls(now if now is not None else time.time(), grouped)
+
+    def is_empty(self) -> bool:
+        return not any(self._timestamps.values())
+
+    def count(self, event_type: str, seconds: Optional[float] = None) -> int:
+        """Number of events of a type in the last `seconds` (whole window if None)"""
+        timestamps = self._timestamps.get(event_type, [])
+        if seconds is None:
+            return len(timestamps)
+        return len(timestamps) - bisect.bisect_left(timestamps, self.now - seconds)
+
+    def recent_values(self, event_type: str, limit: int) -> List[dict]:
+        """Values of the most recent events of a type, newest first"""
+        items = self._events.get(event_type, [])
+        return [value for _, value in reversed(items[-limit:])]
+
+    def latest_value(self, event_type: str) -> Optional[dict]:
+        """Value of the most recent event of a type, or None"""
+        items = self._events.get(event_type)
+        return items[-1][1] if items else None
+
+
+class SlidingWindowStore:
+    """
+    Per-user sliding windows of telemetry events.
+
+    Usage:
+        window_store.add(user_id, [("zoom", 1715609033.2, {"level": 4.8})])
+        window = window_store.get_window(user_id)
+        window.count("zoom", seconds=10)
+    """
+
+    def __init__(self):
+        self._local = defaultdict(list)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(user_id: int, event_type: str) -> str:
+        return f"{KEY_PREFIX}:window:{user_id}:{event_type}"
+
+    def add(self, user_id: int, events: List[Tuple[str, float, dict]]) -> None:
+        """Append (event_type, timestamp, value) tuples to the user's windows"""
+        if not events:
+            return
+
+        cutoff = time.time() - WINDOW_SECONDS
+
+        if redis_connected():
+            pipe = get_connection().pipeline(transaction=False)
+            event_types = set()
+            for event_type, ts, value in events:
+                stored_value = value if event_type in VALUE_EVENT_TYPES else {}
+                member = f"{uuid.uuid4().hex}|{json.dumps(stored_value, separators=(',', ':'))}"
+                pipe.zadd(self._key(user_id, event_type), {member: ts})
+                event_types.add(event_type)
+            for event_type in event_types:
+                key = self._key(user_id, event_type)
+                pipe.zremrangebyscore(key, "-inf", cutoff)
+                pipe.zremrangebyrank(key, 0, -MAX_WINDOW_EVENTS - 1)
+                pipe.expire(key, WINDOW_SECONDS)
+            pipe.execute()
+            return
+
+        with self._lock:
+            for event_type, ts, value in events:
+                stored_value = value if event_type in VALUE_EVENT_TYPES else {}
+                bisect.insort(self._local[(user_id, event_type)], (ts, stored_value), key=lambda item: item[0])
+            for event_type in {event_type for event_type, _, _ in events}:
+                self._trim_local((user_id, event_type), cutoff)
+
+    def _trim_local(self, key, cutoff: float) -> None:
+        items = self._local[key]
+        start = max(
+            bisect.bisect_left(items, cutoff, key=lambda item: item[0]),
+            len(items) - MAX_WINDOW_EVENTS,
+        )
+        if start > 0:
+            del items[:start]
+        if not items:
+            del self._local[key]
+
+    def get_window(self, user_id: int, event_types: Iterable[str]) -> UserWindow:
+        """Snapshot of the user's windows for the given event types"""
+        now = time.time()
+        cutoff = now - WINDOW_SECONDS
+        event_types = list(event_types)
+        events = {}
+
+        if redis_connected():
+            pipe = get_connection().pipeline(transaction=False)
+            for event_type in event_types:
+                pipe.zrangebyscore(self._key(user_id, event_type), cutoff, "+inf", withscores=True)
+            for event_type, members in zip(event_types, pipe.execute()):
+                items = []
+                for member, ts in members:
+                    if isinstance(member, bytes):
+                        member = member.decode("utf-8")
+                    items.append((ts, json.loads(member.split("|", 1)[1])))
+                events[event_type] = items
+            return UserWindow(now, events)
+
+        with self._lock:
+            for event_type in event_types:
+                key = (user_id, event_type)
+                if key in self._local:
+                    self._trim_local(key, cutoff)
+                events[event_type] = list(self._local.get(key, []))
+        return UserWindow(now, events)
+
+
+class CooldownCache:
+    """
+    Remembers when a rule last fired for a user until its cooldown expires.
+    """
+
+    def __init__(self):
+        self._local = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(user_id: int, rule_name: str) -> str:
+        return f"{KEY_PREFIX}:cooldown:{user_id}:{rule_name}"
+
+    def get_active(self, user_id: int, rule_names: List[str]) -> set:
+        """Rule names that are still cooling down for the user"""
+        if not rule_names:
+            return set()
+
+        if redis_connected():
+            values = get_connection().mget([self._key(user_id, name) for name in rule_names])
+            return {name for name, value in zip(rule_names, values) if value is not None}
+
+        now = time.time()
+        with self._lock:
+            return {name for name in rule_names if self._local.get((user_id, name), 0) > now}
+
+    def set(self, user_id: int, rule_name: str, seconds: float) -> None:
+        """Start the cooldown of a rule for the user"""
+        seconds = int(seconds)
+        if seconds <= 0:
+            return
+
+        if redis_connected():
+            get_connection().set(self._key(user_id, rule_name), 1, ex=seconds)
+            return
+
+        with self._lock:
+            self._local[(user_id, rule_name)] = time.time() + seconds
+
+
+# ========== Asynchronous event persistence ==========
+
+_local_buffer = []
+_local_buffer_lock = threading.Lock()
+
+
+def _serialize_event(row: dict) -> str:
+    data = dict(row)
+    data["timestamp"] = row["timestamp"].isoformat()
+    return json.dumps(data, separators=(",", ":"))
+
+
+def _deserialize_event(raw) -> dict:
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8")
+    data = json.loads(raw)
+    data["timestamp"] = datetime.fromisoformat(data["timestamp"])
+    return data
+
+
+def buffer_events(rows: List[dict]) -> None:
+    """
+    Queue TelemetryEvent field dicts for bulk insertion.
+
+    Without Redis the rows are inserted right away in one bulk_create. With
+    Redis a flush job is enqueued unless one is already pending; when the
+    buffer grows past INLINE_FLUSH_THRESHOLD (workers are behind or down)
+    the request writes one batch itself.
+    """
+    if not rows:
+        return
+
+    if not redis_connected():
+        persist_events(rows)
+        return
+
+    redis_client = get_connection()
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.rpush(EVENT_BUFFER_KEY, *[_serialize_event(row) for row in rows])
+    pipe.ltrim(EVENT_BUFFER_KEY, -MAX_BUFFERED_EVENTS, -1)
+    length, _ = pipe.execute()
+
+    if length > MAX_BUFFERED_EVENTS:
+        logger.warning(
+            f"Telemetry event buffer is full, dropped {length - MAX_BUFFERED_EVENTS} oldest events"
+        )
+
+    if length >= INLINE_FLUSH_THRESHOLD:
+        try:
+            _flush_batches(redis_client, FLUSH_BATCH_SIZE, max_batches=1)
+        except Exception:
+            # Rows were pushed back, the flush job retries them
+            pass
+
+    _schedule_flush(redis_client)
+
+
+def _schedule_flush(redis_client) -> bool:
+    """Enqueue a flush job unless one is already pending"""
+    if not redis_client.set(FLUSH_SCHEDULED_KEY, 1, nx=True, ex=FLUSH_SCHEDULED_TTL):
+        return False
+
+    try:
+        start_job_async_or_sync(flush_event_buffer, queue_name="low")
+    except Exception:
+        redis_client.delete(FLUSH_SCHEDULED_KEY)
+        raise
+    return True
+
+
+def flush_event_buffer(batch_size: int = None) -> int:
+    """
+    Write buffered telemetry events to the database.
+
+    The scheduled flag is cleared before reading, so events buffered while
+    the flush runs schedule another one.
+
+    Returns:
+        Number of events written
+    """
+    if not redis_connected():
+        return 0
+
+    redis_client = get_connection()
+    redis_client.delete(FLUSH_SCHEDULED_KEY)
+
+    written = _flush_batches(redis_client, batch_size or FLUSH_BATCH_SIZE)
+    if written:
+        logger.debug(f"Persisted {written} buffered telemetry events")
+    return written
+
+
+def _flush_batches(redis_client, batch_size: int, max_batches: Optional[int] = None) -> int:
+    """Pop and persist batches until the buffer is empty or max_batches were written"""
+    written = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.lrange(EVENT_BUFFER_KEY, 0, batch_size - 1)
+        pipe.ltrim(EVENT_BUFFER_KEY, batch_size, -1)
+        raw_rows, _ = pipe.execute()
+        if not raw_rows:
+            break
+
+        rows = [_deserialize_event(raw) for raw in raw_rows]
+        try:
+            persist_events(rows)
+        except Exception as e:
+            logger.error(f"Failed to persist {len(rows)} telemetry events: {e}", exc_info=True)
+            redis_client.lpush(EVENT_BUFFER_KEY, *reversed(raw_rows))
+            raise
+        written += len(rows)
+        batches += 1
+
+    return written
+
+
+def persist_events(rows: List[dict]) -> None:
+    """Bulk insert TelemetryEvent rows from field dicts"""
+    from .models import TelemetryEvent
+
+    TelemetryEvent.objects.bulk_create(
+        [TelemetryEvent(**row) for row in rows], batch_size=FLUSH_BATCH_SIZE
+    )
+
+
+def to_epoch(value: datetime) -> float:
+    """Datetime to epoch seconds (naive datetimes are treated as UTC)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_timezone.utc)
+    return value.timestamp()
+
+
+# Global instances
+window_store = SlidingWindowStore()
+cooldown_cache = CooldownCache()
@@ -1,6 +1,8 @@
 """Tests for the cache_labels action."""
 
+import mock
 import pytest
+from data_manager.actions import cache_labels
 from data_manager.actions.cache_labels import cache_labels_job
 from django.contrib.auth import get_user_model
 from projects.models import Project
@@ -91,6 +93,23 @@ def test_cache_labels_job(source, control_tag, with_counters, expected_cache_col
         assert cached_labels == expected_cache
 
 
+@pytest.mark.django_db
+def test_cache_labels_job_in_chunks():
+    User = get_user_model()
+    test_user = User.objects.create(username='test_user')
+    project = Project.objects.create(title='Test Project', created_by=test_user)
+    tasks = [Task.objects.create(project=project, data={'text': f'This is task {i}'}) for i in range(5)]
+    for task in tasks[:4]:
+        for label in ['Cat', 'Dog', 'Cat']:
+            result = [{'from_name': 'label', 'to_name': 'text', 'type': 'labels', 'value': {'labels': [label]}}]
+            Annotation.objects.create(task=task, project=project, completed_by=test_user, result=result)
 
+    request_data = {'source': 'annotations', 'control_tag': 'ALL', 'with_counters': 'Yes'}
+    with mock.patch.object(cache_labels, 'CHUNK_SIZE', 2):
+        queryset = Task.objects.filter(project=project)
+        response = cache_labels.cache_labels_job(project, queryset, request_data=request_data)
 
-
+    assert response['detail'] == 'Updated 5 tasks'
+    for task in tasks:
+        task.refresh_from_db()
+    assert [task.data['cache_all'] for task in tasks] == ['Cat: 2, Dog: 1'] * 4 + ['']
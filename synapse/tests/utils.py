@@ -1,5 +1,6 @@
 """This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
 """
+import io
 import logging
 import os.path
 import re
@@ -158,6 +159,9 @@ def gcs_client_mock():
             logger.info(f'DummyGCSBlob.download_as_bytes bucket={self.bucket_name} key={self.key} size={len(b)}')
             return b
 
+        def open(self, mode='rb'):
+            return io.BytesIO(self.download_as_bytes())
+
     class DummyGCSBucket:
         def __init__(self, bucket_name, is_json, is_multitask):
             self.name = bucket_name
@@ -209,6 +213,9 @@ def gcs_client_mock():
             )
             return DummyGCSBucket(bucket_name, is_json, is_multitask)
 
+        def bucket(self, bucket_name):
+            return self.get_bucket(bucket_name)
+
         def list_blobs(self, bucket_name, prefix, delimiter=None):
             is_json = bucket_name.endswith('_JSON')
             is_multitask = bucket_name.startswith('multitask_')
@@ -285,6 +292,9 @@ def azure_client_mock(sample_json_contents=None, sample_blob_names=None):
         def content_as_bytes(self):
             return json.dumps(sample_json_contents).encode('utf-8')
 
+        def chunks(self):
+            yield self.content_as_bytes()
+
     class DummyAzureContainer:
         def __init__(self, container_name, **kwargs):
             self.name = container_name